@@ -501,11 +501,16 @@ class AnalysisCache(db.Model):
     """
     Permanent cache for song analysis results.
     Prevents re-analyzing the same song multiple times.
+
+    content_hash (normalized-lyrics hash, see lyrics_content_hash) is a
+    secondary index so identical lyrics under another artist/title can reuse
+    an analysis.
     """
     __tablename__ = "analysis_cache"
     __table_args__ = (
         db.UniqueConstraint('artist', 'title', 'lyrics_hash', name='uq_analysis_cache_song'),
         db.Index('idx_analysis_cache_artist_title', 'artist', 'title'),
+        db.Index('idx_analysis_cache_content_model', 'content_hash', 'model_version'),
         db.Index('idx_analysis_cache_model_version', 'model_version'),
         db.Index('idx_analysis_cache_created_at', 'created_at'),
     )
@@ -514,6 +519,7 @@ class AnalysisCache(db.Model):
     artist = db.Column(db.String(500), nullable=False)
     title = db.Column(db.String(500), nullable=False)
     lyrics_hash = db.Column(db.String(64), nullable=False)  # SHA256 hash of lyrics
+    content_hash = db.Column(db.String(64), nullable=True)  # SHA256 of normalized lyrics
     analysis_result = db.Column(db.JSON, nullable=False)  # Full analysis JSON
     model_version = db.Column(db.String(100), nullable=False)  # Track which model version
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
@@ -529,9 +535,59 @@ class AnalysisCache(db.Model):
             lyrics_hash=lyrics_hash
         ).first()
     
+    @classmethod
+    def find_cached_bulk(cls, keys: list, chunk_size: int = 500) -> dict:
+        """
+        Find cached analyses for many songs with one query per chunk.
+
+        Args:
+            keys: (artist, title, lyrics_hash) tuples
+            chunk_size: Lyrics hashes per IN clause
+
+        Returns:
+            Dict mapping (artist.strip(), title.strip(), lyrics_hash) to the cached row
+        """
+        wanted = {(artist.strip(), title.strip(), lyrics_hash) for artist, title, lyrics_hash in keys}
+        hashes = sorted({key[2] for key in wanted})
+        found = {}
+        for i in range(0, len(hashes), chunk_size):
+            rows = cls.query.filter(cls.lyrics_hash.in_(hashes[i:i + chunk_size])).all()
+            for row in rows:
+                key = (row.artist, row.title, row.lyrics_hash)
+                if key in wanted:
+                    found[key] = row
+        return found
+    
+    @classmethod
+    def find_by_content(cls, content_hash: str, model_version: str):
+        """Find any cached analysis of the same normalized lyrics for a model version."""
+        return cls.query.filter_by(
+            content_hash=content_hash,
+            model_version=model_version
+        ).order_by(cls.created_at).first()
+
+    @classmethod
+    def find_by_content_bulk(cls, content_hashes: list, model_version: str, chunk_size: int = 500) -> dict:
+        """
+        Find cached analyses by normalized-lyrics hash with one query per chunk.
+
+        Returns:
+            Dict mapping content_hash to the oldest matching row
+        """
+        hashes = sorted(set(content_hashes))
+        found = {}
+        for i in range(0, len(hashes), chunk_size):
+            rows = cls.query.filter(
+                cls.content_hash.in_(hashes[i:i + chunk_size]),
+                cls.model_version == model_version
+            ).order_by(cls.created_at).all()
+            for row in rows:
+                found.setdefault(row.content_hash, row)
+        return found
+
     @classmethod
     def cache_analysis(cls, artist: str, title: str, lyrics_hash: str, 
-                      analysis_result: dict, model_version: str):
+                      analysis_result: dict, model_version: str, content_hash: str = None):
         """Cache analysis result for a song."""
         from app.extensions import db
         
@@ -544,6 +600,7 @@ class AnalysisCache(db.Model):
             # Update existing cache
             cached.analysis_result = analysis_result
             cached.model_version = model_version
+            cached.content_hash = content_hash or cached.content_hash
             cached.updated_at = datetime.now(timezone.utc)
         else:
             # Create new cache entry
@@ -551,6 +608,7 @@ class AnalysisCache(db.Model):
                 artist=artist,
                 title=title,
                 lyrics_hash=lyrics_hash,
+                content_hash=content_hash,
                 analysis_result=analysis_result,
                 model_version=model_version
             )
@@ -558,7 +616,56 @@ class AnalysisCache(db.Model):
         
         db.session.commit()
         return cached
-    
+
+    @classmethod
+    def cache_analysis_bulk(cls, entries: list, model_version: str, commit: bool = True) -> int:
+        """
+        Cache many analysis results with one lookup query and one commit.
+
+        Args:
+            entries: Dicts with 'artist', 'title', 'lyrics_hash', 'analysis_result'
+                and optionally 'content_hash'
+            model_version: Model version used for every entry
+            commit: Commit the session (False lets the caller batch more writes)
+
+        Returns:
+            Number of entries written
+        """
+        if not entries:
+            return 0
+
+        existing = {
+            (row.artist, row.title, row.lyrics_hash): row
+            for row in cls.query.filter(
+                cls.lyrics_hash.in_({e['lyrics_hash'] for e in entries})
+            ).all()
+        }
+
+        now = datetime.now(timezone.utc)
+        for entry in entries:
+            key = (entry['artist'].strip(), entry['title'].strip(), entry['lyrics_hash'])
+            cached = existing.get(key)
+            if cached:
+                cached.analysis_result = entry['analysis_result']
+                cached.model_version = model_version
+                cached.content_hash = entry.get('content_hash') or cached.content_hash
+                cached.updated_at = now
+            else:
+                cached = cls(
+                    artist=key[0],
+                    title=key[1],
+                    lyrics_hash=key[2],
+                    content_hash=entry.get('content_hash'),
+                    analysis_result=entry['analysis_result'],
+                    model_version=model_version
+                )
+                db.session.add(cached)
+                existing[key] = cached
+
+        if commit:
+            db.session.commit()
+        return len(entries)
+
     @classmethod
     def get_cache_stats(cls):
         """Get cache statistics."""
@@ -570,9 +677,20 @@ class AnalysisCache(db.Model):
             func.count(cls.id)
         ).group_by(cls.model_version).all()
         
+        # Rows sharing normalized lyrics with an earlier row were (or could be) reused
+        indexed, distinct = db.session.query(
+            func.count(cls.content_hash),
+            func.count(func.distinct(cls.content_hash))
+        ).one()
+        
         return {
             'total_cached': total,
-            'by_model_version': dict(by_model)
+            'by_model_version': dict(by_model),
+            'dedupe': {
+                'indexed': indexed,
+                'distinct_lyrics': distinct,
+                'deduplicated_fraction': round((indexed - distinct) / indexed, 4) if indexed else 0.0
+            }
         }
 
 
@@ -600,6 +718,29 @@ class LyricsCache(db.Model):
             title=title.strip()
         ).first()
 
+    @classmethod
+    def find_cached_bulk(cls, pairs: list, chunk_size: int = 500) -> dict:
+        """
+        Find cached lyrics for many songs with one query per chunk.
+
+        Args:
+            pairs: (artist, title) tuples
+            chunk_size: Titles per IN clause
+
+        Returns:
+            Dict mapping (artist.strip(), title.strip()) to the cached row
+        """
+        wanted = {(artist.strip(), title.strip()) for artist, title in pairs}
+        titles = sorted({key[1] for key in wanted})
+        found = {}
+        for i in range(0, len(titles), chunk_size):
+            rows = cls.query.filter(cls.title.in_(titles[i:i + chunk_size])).all()
+            for row in rows:
+                key = (row.artist, row.title)
+                if key in wanted:
+                    found[key] = row
+        return found
+
     @classmethod
     def cache_lyrics(cls, artist, title, lyrics, source):
         """Cache lyrics for an artist/title pair."""
@@ -620,3 +761,93 @@ class LyricsCache(db.Model):
         db.session.commit()
         return cached
 
+    @classmethod
+    def upsert_many(cls, rows: list, chunk_size: int = 500) -> int:
+        """
+        Insert or update many cache entries with one statement per chunk and a
+        single commit (INSERT ... ON CONFLICT (artist, title) DO UPDATE).
+
+        Args:
+            rows: Dicts with artist, title, lyrics and source; for repeated
+                artist/title pairs the last row wins
+            chunk_size: Rows per INSERT statement
+
+        Returns:
+            Number of rows written
+        """
+        now = datetime.now(timezone.utc)
+        latest = {}
+        for row in rows:
+            artist, title = row['artist'].strip(), row['title'].strip()
+            latest[(artist, title)] = {
+                'artist': artist,
+                'title': title,
+                'lyrics': row.get('lyrics') or '',
+                'source': row['source'],
+                'retrieved_at': now,
+                'updated_at': now,
+            }
+        values = list(latest.values())
+        if not values:
+            return 0
+
+        dialect = db.session.get_bind().dialect.name
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            insert = None
+
+        if insert is None:
+            # No native upsert: merge against the existing rows, still one commit
+            existing = cls.find_cached_bulk([(v['artist'], v['title']) for v in values])
+            for value in values:
+                cached = existing.get((value['artist'], value['title'])) or cls(artist=value['artist'], title=value['title'])
+                for field in ('lyrics', 'source', 'retrieved_at', 'updated_at'):
+                    setattr(cached, field, value[field])
+                db.session.add(cached)
+        else:
+            for i in range(0, len(values), chunk_size):
+                stmt = insert(cls).values(values[i:i + chunk_size])
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=['artist', 'title'],
+                    set_={field: stmt.excluded[field] for field in ('lyrics', 'source', 'retrieved_at', 'updated_at')},
+                )
+                db.session.execute(stmt)
+        db.session.commit()
+        return len(values)
+
+
+
+class LyricsSignature(db.Model):
+    """
+    MinHash signature of one song's lyrics for near-duplicate lookup
+    (see app.services.analyzers.near_duplicate).
+    """
+    __tablename__ = "lyrics_signatures"
+    __table_args__ = (
+        db.UniqueConstraint('artist', 'title', 'lyrics_hash', name='uq_lyrics_signature_song'),
+        db.Index('idx_lyrics_signature_lyrics_hash', 'lyrics_hash'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    artist = db.Column(db.String(500), nullable=False)
+    title = db.Column(db.String(500), nullable=False)
+    lyrics_hash = db.Column(db.String(64), nullable=False)  # SHA256 of the exact lyrics
+    signature = db.Column(db.LargeBinary, nullable=False)  # Packed little-endian uint64 minhashes
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+    buckets = db.relationship(
+        "LyricsLSHBucket", backref="signature_row", cascade="all, delete-orphan", passive_deletes=True
+    )
+
+
+class LyricsLSHBucket(db.Model):
+    """One LSH band of a lyrics signature; songs sharing a band_key are candidates."""
+    __tablename__ = "lyrics_lsh_buckets"
+
+    id = db.Column(db.Integer, primary_key=True)
+    band_key = db.Column(db.String(32), nullable=False, index=True)
+    signature_id = db.Column(
+        db.Integer, db.ForeignKey("lyrics_signatures.id", ondelete="CASCADE"), nullable=False, index=True
+    )
@@ -6,19 +6,16 @@ that run in the background, preventing request timeouts and providing
 progress tracking capabilities.
 """
 import logging
-import os
 
-from redis import Redis
 from rq import Queue
 
+from app.utils.redis_pool import get_redis_manager, resolve_redis_url
+
 logger = logging.getLogger(__name__)
 
-# Use existing Redis connection from environment
+# Shared pooled connection from environment
 # Note: decode_responses=False is required for RQ to work with pickled job data
-redis_conn = Redis.from_url(
-    os.environ.get('REDIS_URL', 'redis://redis:6379'),
-    decode_responses=False
-)
+redis_conn = get_redis_manager(resolve_redis_url()).client(decode_responses=False)
 
 # Create queue for analysis jobs
 analysis_queue = Queue('analysis', connection=redis_conn)
@@ -53,6 +50,66 @@ def enqueue_playlist_analysis(playlist_id: int, user_id: int) -> str:
         raise
 
 
+def enqueue_batch_backfill(limit: int = None, include_completed: bool = False) -> str:
+    """
+    Queue a Batch API backfill (nightly reanalysis).
+
+    Args:
+        limit: Maximum number of songs to submit
+        include_completed: Re-analyze songs cached under an older model version
+
+    Returns:
+        job_id: Unique identifier for tracking this job
+    """
+    try:
+        job = analysis_queue.enqueue(
+            'app.services.unified_analysis_service.run_batch_backfill',
+            limit=limit,
+            include_completed=include_completed,
+            job_timeout='26h',  # Batch completion window is 24h
+            result_ttl=86400,
+            failure_ttl=86400
+        )
+
+        logger.info(f"Queued batch backfill (job_id: {job.id})")
+        return job.id
+
+    except Exception as e:
+        logger.error(f"Failed to queue batch backfill: {e}")
+        raise
+
+
+def enqueue_cache_warming(model: str, limit: int = 500, concurrency: int = 4) -> str:
+    """
+    Queue cache warming for a model about to replace OPENAI_MODEL.
+
+    Args:
+        model: Model to pre-analyze popular songs with
+        limit: Number of popular songs to warm
+        concurrency: Songs analyzed in parallel (at background rate limiter priority)
+
+    Returns:
+        job_id: Unique identifier for tracking this job
+    """
+    try:
+        job = analysis_queue.enqueue(
+            'app.services.cache_warming.run_cache_warming',
+            model,
+            limit=limit,
+            concurrency=concurrency,
+            job_timeout='12h',
+            result_ttl=86400,
+            failure_ttl=86400
+        )
+
+        logger.info(f"Queued cache warming for {model} (job_id: {job.id})")
+        return job.id
+
+    except Exception as e:
+        logger.error(f"Failed to queue cache warming for {model}: {e}")
+        raise
+
+
 def get_queue_length() -> int:
     """Get the number of jobs waiting in the queue."""
     return len(analysis_queue)
@@ -18,15 +18,45 @@ from sqlalchemy import and_, func
 
 from app.extensions import db
 from app.models.models import AnalysisCache, AnalysisResult, LyricsCache, Song, User
+from app.services.analyzers.lyrics_preprocessor import get_lyrics_preprocessor
 from app.utils.db_pool_monitor import get_pool_stats
+from app.utils.llm_http import get_llm_http_client
+from app.utils.llm_router import get_llm_router
 from app.utils.openai_rate_limiter import get_rate_limiter
 from app.utils.redis_cache import get_redis_cache
+from app.utils.token_ledger import get_token_ledger
 
 logger = logging.getLogger(__name__)
 
 admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
 
 
+# GPT-4o-mini fine-tuned: $0.03/1K input tokens, $0.12/1K output tokens
+# Prefix-cache hits bill cached input at 50%; Batch API requests at 50% overall
+INPUT_COST_PER_1K = 0.03
+CACHED_INPUT_COST_PER_1K = 0.015
+OUTPUT_COST_PER_1K = 0.12
+BATCH_DISCOUNT = 0.5
+
+# Typical tokens per analysis, used only until the token ledger has data
+AVG_INPUT_TOKENS = 500
+AVG_OUTPUT_TOKENS = 800
+
+
+def _token_cost(counts: dict) -> float:
+    """Dollar cost of one model's token ledger counts."""
+    def cost(prompt, cached, completion):
+        return (
+            (prompt - cached) / 1000 * INPUT_COST_PER_1K +
+            cached / 1000 * CACHED_INPUT_COST_PER_1K +
+            completion / 1000 * OUTPUT_COST_PER_1K
+        )
+    
+    interactive = cost(counts['prompt_tokens'], counts['cached_tokens'], counts['completion_tokens'])
+    batch = cost(counts['batch_prompt_tokens'], counts['batch_cached_tokens'], counts['batch_completion_tokens'])
+    return interactive + batch * BATCH_DISCOUNT
+
+
 def admin_required(f):
     """Decorator to require admin role."""
     @wraps(f)
@@ -101,7 +131,8 @@ def api_overview():
                 'database': {
                     'total_cached': total_cached,
                     'cache_hit_rate': round(cache_hit_rate, 1),
-                    'by_model_version': cache_stats['by_model_version']
+                    'by_model_version': cache_stats['by_model_version'],
+                    'dedupe': cache_stats['dedupe']
                 },
                 'redis': redis_stats,
                 'lyrics_cached': total_lyrics_cached
@@ -133,18 +164,24 @@ def api_costs():
             func.date(AnalysisResult.analyzed_at)
         ).order_by('date').all()
         
-        # Calculate costs
-        # GPT-4o-mini fine-tuned: $0.03/1K input tokens, $0.12/1K output tokens
-        # Average: ~500 input tokens (lyrics), ~800 output tokens (analysis)
-        INPUT_COST_PER_1K = 0.03
-        OUTPUT_COST_PER_1K = 0.12
-        AVG_INPUT_TOKENS = 500
-        AVG_OUTPUT_TOKENS = 800
-        
-        COST_PER_ANALYSIS = (
-            (AVG_INPUT_TOKENS / 1000 * INPUT_COST_PER_1K) +
-            (AVG_OUTPUT_TOKENS / 1000 * OUTPUT_COST_PER_1K)
+        # Real token usage from response usage blocks
+        token_ledger = get_token_ledger()
+        tokens_by_model = token_ledger.get_totals()
+        ledger_calls = sum(
+            counts['requests'] + counts['batch_requests'] for counts in tokens_by_model.values()
         )
+        ledger_cost = sum(_token_cost(counts) for counts in tokens_by_model.values())
+        
+        if ledger_calls:
+            COST_PER_ANALYSIS = ledger_cost / ledger_calls
+            cost_source = 'token_ledger'
+        else:
+            # No usage recorded yet: fall back to typical token counts
+            COST_PER_ANALYSIS = (
+                (AVG_INPUT_TOKENS / 1000 * INPUT_COST_PER_1K) +
+                (AVG_OUTPUT_TOKENS / 1000 * OUTPUT_COST_PER_1K)
+            )
+            cost_source = 'estimate'
         
         # Get cache stats
         cache_stats = AnalysisCache.get_cache_stats()
@@ -152,30 +189,48 @@ def api_costs():
         total_analyses = AnalysisResult.query.count()
         
         # Calculate actual API calls (non-cached)
-        api_calls = total_analyses - total_cached
+        api_calls = ledger_calls or (total_analyses - total_cached)
         
         # Calculate costs
-        total_cost = api_calls * COST_PER_ANALYSIS
+        total_cost = ledger_cost if ledger_calls else api_calls * COST_PER_ANALYSIS
         saved_by_cache = total_cached * COST_PER_ANALYSIS
         
         # Daily breakdown
         daily_costs = []
-        for date, count in analyses_by_day:
-            # Estimate cache hits (assume 80% after initial period)
-            cache_hit_rate = 0.8 if total_cached > 100 else 0
-            estimated_api_calls = count * (1 - cache_hit_rate)
-            daily_cost = estimated_api_calls * COST_PER_ANALYSIS
-            
-            daily_costs.append({
-                'date': date.isoformat(),
-                'analyses': count,
-                'estimated_cost': round(daily_cost, 4)
-            })
+        if ledger_calls:
+            analyses_per_day = {str(date): count for date, count in analyses_by_day}
+            for day in token_ledger.get_daily(days):
+                day_counts = list(day['by_model'].values())
+                daily_costs.append({
+                    'date': day['date'],
+                    'analyses': analyses_per_day.get(day['date'], 0),
+                    'api_calls': sum(c['requests'] + c['batch_requests'] for c in day_counts),
+                    'prompt_tokens': sum(c['prompt_tokens'] + c['batch_prompt_tokens'] for c in day_counts),
+                    'cached_tokens': sum(c['cached_tokens'] + c['batch_cached_tokens'] for c in day_counts),
+                    'completion_tokens': sum(c['completion_tokens'] + c['batch_completion_tokens'] for c in day_counts),
+                    'estimated_cost': round(sum(_token_cost(c) for c in day_counts), 4)
+                })
+        else:
+            for date, count in analyses_by_day:
+                # Estimate cache hits (assume 80% after initial period)
+                cache_hit_rate = 0.8 if total_cached > 100 else 0
+                estimated_api_calls = count * (1 - cache_hit_rate)
+                daily_cost = estimated_api_calls * COST_PER_ANALYSIS
+                
+                daily_costs.append({
+                    'date': date.isoformat(),
+                    'analyses': count,
+                    'estimated_cost': round(daily_cost, 4)
+                })
         
         # Projections
         avg_daily_analyses = total_analyses / max(days, 1)
         projected_monthly_analyses = avg_daily_analyses * 30
-        projected_monthly_cost = projected_monthly_analyses * COST_PER_ANALYSIS * (1 - 0.8)  # Assume 80% cache hit
+        if ledger_calls:
+            recent_cost = sum(d['estimated_cost'] for d in daily_costs)
+            projected_monthly_cost = recent_cost / max(days, 1) * 30
+        else:
+            projected_monthly_cost = projected_monthly_analyses * COST_PER_ANALYSIS * (1 - 0.8)  # Assume 80% cache hit
         
         return jsonify({
             'summary': {
@@ -184,7 +239,12 @@ def api_costs():
                 'cached_analyses': total_cached,
                 'total_cost': round(total_cost, 2),
                 'saved_by_cache': round(saved_by_cache, 2),
-                'cost_per_analysis': round(COST_PER_ANALYSIS, 4)
+                'cost_per_analysis': round(COST_PER_ANALYSIS, 4),
+                'cost_source': cost_source
+            },
+            'tokens': {
+                model: dict(counts, cost=round(_token_cost(counts), 4))
+                for model, counts in tokens_by_model.items()
             },
             'daily_costs': daily_costs,
             'projections': {
@@ -195,7 +255,9 @@ def api_costs():
             'cache_performance': {
                 'hit_rate': round((total_cached / max(total_analyses, 1)) * 100, 1),
                 'by_model_version': cache_stats['by_model_version']
-            }
+            },
+            # Prompt tokens saved by lyrics preprocessing (this process)
+            'lyrics_preprocessing': get_lyrics_preprocessor().get_stats()
         })
     except Exception as e:
         logger.error(f"Error fetching cost metrics: {e}")
@@ -308,35 +370,71 @@ def api_health():
         pool_stats = get_pool_stats()
         pool_healthy = pool_stats.get('healthy', False) and pool_stats.get('utilization_percent', 100) < 90
         
+        # LLM HTTP connection pool
+        llm_http_stats = get_llm_http_client().get_stats()
+        llm_http_healthy = llm_http_stats['in_flight'] < llm_http_stats['pool_size']
+        
         # Overall health
         overall_healthy = db_healthy and limiter_healthy and pool_healthy
-        
+
+        components = {
+            'database': {
+                'status': 'healthy' if db_healthy else 'unhealthy',
+                'message': db_message,
+                'pool': pool_stats
+            },
+            'rate_limiter': {
+                'status': 'healthy' if limiter_healthy else 'warning',
+                'metrics': limiter_metrics
+            },
+            'cache': {
+                'status': 'healthy' if cache_healthy else 'warning',
+                'total_cached': cache_stats['total_cached']
+            },
+            'llm_http': {
+                'status': 'healthy' if llm_http_healthy else 'warning',
+                'pool': llm_http_stats
+            }
+        }
+
+        # Multi-endpoint LLM router (only when LLM_ENDPOINTS is configured)
+        llm_router = get_llm_router()
+        if llm_router is not None:
+            router_stats = llm_router.get_stats()
+            open_endpoints = sum(1 for e in router_stats['endpoints'] if e['circuit'] == 'open')
+            components['llm_router'] = {
+                'status': 'healthy' if open_endpoints == 0 else ('unhealthy' if not llm_router.has_available() else 'warning'),
+                'router': router_stats
+            }
+
         return jsonify({
             'overall': {
                 'status': 'healthy' if overall_healthy else 'degraded',
                 'timestamp': datetime.now(timezone.utc).isoformat()
             },
-            'components': {
-                'database': {
-                    'status': 'healthy' if db_healthy else 'unhealthy',
-                    'message': db_message,
-                    'pool': pool_stats
-                },
-                'rate_limiter': {
-                    'status': 'healthy' if limiter_healthy else 'warning',
-                    'metrics': limiter_metrics
-                },
-                'cache': {
-                    'status': 'healthy' if cache_healthy else 'warning',
-                    'total_cached': cache_stats['total_cached']
-                }
-            }
+            'components': components
         })
     except Exception as e:
         logger.error(f"Error checking system health: {e}")
         return jsonify({'error': str(e)}), 500
 
 
+@admin_bp.route('/api/cache-warming')
+@admin_required
+def api_cache_warming():
+    """Warm-cache coverage of the popular catalog for a model before it goes live."""
+    from app.services.cache_warming import get_warm_coverage
+
+    model = request.args.get('model')
+    if not model:
+        return jsonify({'error': 'model is required'}), 400
+    try:
+        return jsonify(get_warm_coverage(model, limit=request.args.get('limit', 500, type=int)))
+    except Exception as e:
+        logger.error(f"Error computing warm-cache coverage: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
 @admin_bp.route('/costs')
 @admin_required
 def costs_page():
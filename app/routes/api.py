@@ -12,6 +12,7 @@ from sqlalchemy import text
 from .. import db
 from ..models.models import AnalysisResult
 from ..services.framework_loader import get_rules
+from ..services.progress_tracker import get_progress_tracker, song_analysis_job_id
 from ..services.unified_analysis_service import UnifiedAnalysisService
 from ..utils.freemium import (
     freemium_enabled,
@@ -77,7 +78,7 @@ def analyze_song_single(id):
             ), 402
 
     svc = UnifiedAnalysisService()
-    analysis = svc.analyze_song(id)
+    analysis = svc.analyze_song(id, track_progress=True)
 
     if analysis:
         return jsonify({"success": True, "analysis_id": analysis.id})
@@ -90,6 +91,24 @@ def analyze_song_single(id):
 @bp.route("/songs/<int:id>/analysis-status", methods=["GET"])
 @login_required
 def get_song_analysis_status(id):
+    # An analysis in flight reports streamed score/verdict before the full result is stored
+    progress = get_progress_tracker().get_job_progress(song_analysis_job_id(id))
+    if progress is not None and not progress.is_complete:
+        partial = progress.partial_result or {}
+        return jsonify({
+            "success": True,
+            "completed": False,
+            "failed": False,
+            "error": None,
+            "in_progress": True,
+            "step": progress.current_step,
+            "partial": bool(partial),
+            "result": {
+                "score": partial.get("score"),
+                "verdict": partial.get("verdict"),
+            }
+        })
+
     analysis = AnalysisResult.query.filter_by(song_id=id).order_by(AnalysisResult.created_at.desc()).first()
     if analysis:
         return jsonify({
@@ -1,5 +1,6 @@
 """Analyzer package"""
 
+from .async_router_analyzer import AsyncRouterAnalyzer
 from .router_analyzer import RouterAnalyzer
 
-__all__ = ['RouterAnalyzer']
\ No newline at end of file
+__all__ = ['AsyncRouterAnalyzer', 'RouterAnalyzer']
@@ -0,0 +1,166 @@
+"""
+Analysis Store - database tier of the analyzer cache hierarchy
+
+Wraps AnalysisCache lookups and writes so they run inside the caller's
+application context, or the shared worker application when there is none,
+instead of building a new Flask app (and connection pool) for every song.
+"""
+
+import logging
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from app.utils.app_context import ensure_app_context
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisStore:
+    """Persistent analysis cache backed by the analysis_cache table."""
+
+    def find(
+        self,
+        artist: str,
+        title: str,
+        lyrics_hash: str
+    ) -> Optional[Tuple[Dict[str, Any], str]]:
+        """
+        Look up a cached analysis.
+
+        Args:
+            artist: Artist name
+            title: Song title
+            lyrics_hash: SHA256 hash of lyrics
+
+        Returns:
+            Tuple of (analysis result copy, model version) or None if not cached
+        """
+        from app.models.models import AnalysisCache
+
+        with ensure_app_context():
+            cached = AnalysisCache.find_cached_analysis(artist, title, lyrics_hash)
+            if cached is None:
+                return None
+            # Copy while the row is still attached to the session
+            return dict(cached.analysis_result or {}), cached.model_version
+
+    def find_bulk(
+        self,
+        keys: Iterable[Tuple[str, str, str]]
+    ) -> Dict[Tuple[str, str, str], Tuple[Dict[str, Any], str]]:
+        """
+        Look up cached analyses for many songs at once.
+
+        Args:
+            keys: (artist, title, lyrics_hash) tuples
+
+        Returns:
+            Dict mapping each found input key to (analysis result copy, model version)
+        """
+        from app.models.models import AnalysisCache
+
+        keys = list(keys)
+        if not keys:
+            return {}
+
+        with ensure_app_context():
+            rows = AnalysisCache.find_cached_bulk(keys)
+            found = {}
+            for artist, title, lyrics_hash in keys:
+                row = rows.get((artist.strip(), title.strip(), lyrics_hash))
+                if row is not None:
+                    found[(artist, title, lyrics_hash)] = (dict(row.analysis_result or {}), row.model_version)
+            return found
+
+    def find_by_content(self, content_hash: str, model_version: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up an analysis of the same normalized lyrics under any artist/title.
+
+        Args:
+            content_hash: Normalized-lyrics hash
+            model_version: Required model version
+
+        Returns:
+            Analysis result copy, or None
+        """
+        from app.models.models import AnalysisCache
+
+        with ensure_app_context():
+            cached = AnalysisCache.find_by_content(content_hash, model_version)
+            return dict(cached.analysis_result or {}) if cached is not None else None
+
+    def find_by_content_bulk(self, content_hashes: Iterable[str], model_version: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Look up analyses for many normalized-lyrics hashes at once.
+
+        Returns:
+            Dict mapping each found content hash to an analysis result copy
+        """
+        from app.models.models import AnalysisCache
+
+        content_hashes = list(content_hashes)
+        if not content_hashes:
+            return {}
+
+        with ensure_app_context():
+            rows = AnalysisCache.find_by_content_bulk(content_hashes, model_version)
+            return {content_hash: dict(row.analysis_result or {}) for content_hash, row in rows.items()}
+
+    def save(
+        self,
+        artist: str,
+        title: str,
+        lyrics_hash: str,
+        analysis_result: Dict[str, Any],
+        model_version: str,
+        content_hash: Optional[str] = None
+    ) -> None:
+        """
+        Insert or update a cached analysis.
+
+        Args:
+            artist: Artist name
+            title: Song title
+            lyrics_hash: SHA256 hash of lyrics
+            analysis_result: Normalized analysis result
+            model_version: Model version used for analysis
+            content_hash: Normalized-lyrics hash for cross-artist reuse
+        """
+        from app.extensions import db
+        from app.models.models import AnalysisCache
+
+        with ensure_app_context():
+            try:
+                AnalysisCache.cache_analysis(
+                    artist=artist,
+                    title=title,
+                    lyrics_hash=lyrics_hash,
+                    analysis_result=analysis_result,
+                    model_version=model_version,
+                    content_hash=content_hash
+                )
+            except Exception:
+                # Leave the (possibly shared) session usable for the caller
+                db.session.rollback()
+                raise
+
+    def save_bulk(self, entries: Iterable[Dict[str, Any]], model_version: str) -> int:
+        """
+        Insert or update many cached analyses with one lookup query and one commit.
+
+        Args:
+            entries: Dicts with 'artist', 'title', 'lyrics_hash', 'analysis_result'
+                and optionally 'content_hash'
+            model_version: Model version used for every entry
+
+        Returns:
+            Number of entries written
+        """
+        from app.extensions import db
+        from app.models.models import AnalysisCache
+
+        with ensure_app_context():
+            try:
+                return AnalysisCache.cache_analysis_bulk(list(entries), model_version)
+            except Exception:
+                db.session.rollback()
+                raise
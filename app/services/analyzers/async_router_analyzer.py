@@ -0,0 +1,256 @@
+"""
+Async Router Analyzer
+
+Runs many chat completions concurrently on one event loop instead of one
+blocked thread per request. Shares RouterAnalyzer's prompt, caches and
+normalized output schema, and sends through the same LLMRouter as the
+threaded path (endpoint selection, per-endpoint rate limiter and circuit
+breaker, hedging). Cache misses take the same single-flight lease, so an RQ
+worker running this engine coalesces with every other worker.
+
+Concurrency is capped by the endpoints' max_concurrent (OPENAI_MAX_CONCURRENT,
+or per endpoint in LLM_ENDPOINTS), so raising it is the single knob for more
+in-flight requests.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import copy
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional
+
+import httpx
+
+from app.utils.circuit_breaker import CircuitBreakerOpenError
+from app.utils.llm_router import LLMEndpoint
+
+from .lyrics_preprocessor import lyrics_content_hash
+from .router_analyzer import RouterAnalyzer
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncRouterAnalyzer(RouterAnalyzer):
+    """
+    asyncio + httpx.AsyncClient variant of RouterAnalyzer.
+
+    Cache lookups and writes (Redis + database) are blocking, so they run on a
+    small private thread pool; only the HTTP calls live on the event loop.
+    """
+
+    def __init__(self, cache_workers: int = 4) -> None:
+        """
+        Initialize the async analyzer.
+
+        Args:
+            cache_workers: Threads used for blocking Redis/database cache I/O
+        """
+        super().__init__()
+        self.max_in_flight: int = self.llm_router.max_concurrent()
+        self._cache_executor = ThreadPoolExecutor(
+            max_workers=max(1, cache_workers),
+            thread_name_prefix="analysis-cache"
+        )
+
+        logger.info(f"✅ AsyncRouterAnalyzer ready: up to {self.max_in_flight} in-flight requests")
+
+    async def analyze_many(self, songs: Iterable[Mapping[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Analyze many songs concurrently.
+
+        Args:
+            songs: Iterable of mappings with 'title', 'artist' and 'lyrics' keys
+
+        Returns:
+            Analysis dicts in the same order as the input (degraded output for failures)
+        """
+        songs = list(songs)
+        if not songs:
+            return []
+
+        limits = httpx.Limits(
+            max_connections=self.max_in_flight,
+            max_keepalive_connections=self.max_in_flight,
+        )
+        # The client is bound to the running loop, so it lives per batch
+        async with httpx.AsyncClient(limits=limits, timeout=self.timeout) as client:
+            # Identical songs in one batch share a single task (same key as single-flight)
+            tasks: Dict[str, asyncio.Future] = {}
+            planned = []
+            for song in songs:
+                key = self._flight_key(song)
+                if key is not None and key in tasks:
+                    self.rate_limiter.record_coalesced('in_process')
+                    planned.append((tasks[key], True))
+                    continue
+                task = asyncio.ensure_future(self._analyze_safe(client, song))
+                if key is not None:
+                    tasks[key] = task
+                planned.append((task, False))
+
+            await asyncio.gather(*(task for task, duplicate in planned if not duplicate))
+            results = [
+                copy.deepcopy(task.result()) if duplicate else task.result()
+                for task, duplicate in planned
+            ]
+
+        degraded = sum(1 for r in results if r.get('analysis_quality') == 'degraded')
+        logger.info(f"🎉 Async batch complete: {len(results)} songs, {degraded} degraded")
+        return list(results)
+
+    async def analyze_song_async(self, title: str, artist: str, lyrics: str) -> Dict[str, Any]:
+        """
+        Analyze a single song on the event loop.
+
+        Args:
+            title: Song title
+            artist: Artist name
+            lyrics: Full song lyrics
+
+        Returns:
+            Dictionary containing analysis results with Christian Framework v3.1 schema
+        """
+        results = await self.analyze_many([{'title': title, 'artist': artist, 'lyrics': lyrics}])
+        return results[0]
+
+    def _flight_key(self, song: Mapping[str, Any]) -> Optional[str]:
+        """Coalescing key for songs that would hit the API, None otherwise."""
+        lyrics = song.get('lyrics') or ''
+        if len(str(lyrics).strip()) <= 10:
+            return None
+        return self.redis_cache._make_key(
+            song.get('artist') or '', song.get('title') or '', self._lyrics_hash(lyrics), self.model
+        )
+
+    async def _analyze_safe(self, client: httpx.AsyncClient, song: Mapping[str, Any]) -> Dict[str, Any]:
+        """Analyze one song, turning unexpected errors into degraded output."""
+        title = song.get('title') or ''
+        artist = song.get('artist') or ''
+        try:
+            return await self._analyze_one(client, title, artist, song.get('lyrics') or '')
+        except Exception as e:
+            logger.error(f"❌ Async analysis failed for '{title}' by {artist}: {e}")
+            return self._degraded_output(title, artist, "Unexpected error during analysis")
+
+    async def _analyze_one(
+        self,
+        client: httpx.AsyncClient,
+        title: str,
+        artist: str,
+        lyrics: str
+    ) -> Dict[str, Any]:
+        """
+        Mirror of RouterAnalyzer.analyze_song: cache tiers → single-flight → API.
+        """
+        has_meaningful_lyrics = lyrics and len(str(lyrics).strip()) > 10
+        if not has_meaningful_lyrics:
+            logger.info(f"🎵 '{title}' has no lyrics - returning instrumental response")
+            return self._create_instrumental_response(title, artist)
+
+        lyrics_hash = self._lyrics_hash(lyrics)
+        content_hash = lyrics_content_hash(lyrics)
+        cached = await self._run_blocking(self._lookup_cached, title, artist, lyrics_hash, content_hash, lyrics)
+        if cached:
+            return cached
+
+        # Coalesce with other batches and workers analyzing the same song
+        flight_key = self.redis_cache._make_key(artist, title, lyrics_hash, self.model)
+        return await self.single_flight.do_async(
+            flight_key,
+            lambda: self._analyze_uncached_async(client, title, artist, lyrics, lyrics_hash, content_hash),
+            peek=lambda: self._run_blocking(self._peek_published, title, artist, lyrics_hash)
+        )
+
+    async def _analyze_uncached_async(
+        self,
+        client: httpx.AsyncClient,
+        title: str,
+        artist: str,
+        lyrics: str,
+        lyrics_hash: str,
+        content_hash: str
+    ) -> Dict[str, Any]:
+        """
+        Call the API for a cache miss (runs once per key under single-flight), with
+        the same retry, backoff and degradation behaviour as the threaded path.
+        """
+        if not self.llm_router.has_available():
+            circuit_state = self.circuit_breaker.get_state()
+            logger.warning(
+                f"⚠️  Circuit breaker is OPEN for '{title}' by {artist}. "
+                f"Returning degraded response. Last failure: {circuit_state['last_failure_time']}"
+            )
+            return self._degraded_output(title, artist, "OpenAI API is temporarily unavailable")
+
+        logger.info(f"🎵 Analyzing '{title}' by {artist} with {self.model} (async)")
+        _, payload, _ = self._build_request(title, artist, lyrics)
+
+        async def send(endpoint: LLMEndpoint) -> Dict[str, Any]:
+            return await self._post(client, endpoint, payload)
+
+        for attempt in range(3):  # Max 3 attempts
+            try:
+                data, model = await self._run_blocking(self._cached_response, payload)
+                if data is None:
+                    data, endpoint = await self.llm_router.execute_async(send)
+                    request = endpoint.prepare_payload(payload)
+                    await self._run_blocking(self._remember_response, request, data)
+                    model = request["model"]
+                normalized = self._process_response(data)
+                await self._run_blocking(
+                    self._store_cached, title, artist, lyrics_hash, normalized, content_hash, lyrics, model
+                )
+                return normalized
+
+            except CircuitBreakerOpenError as e:
+                logger.error(f"❌ Circuit breaker opened: {e}")
+                return self._degraded_output(title, artist, "Service protection engaged after repeated failures")
+
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code == 429 and attempt < 2:
+                    backoff_time = self.rate_limiter.handle_rate_limit_error(attempt)
+                    logger.warning(f"⏳ Rate limited, retrying in {backoff_time:.1f}s...")
+                    await asyncio.sleep(backoff_time)
+                    continue
+
+                logger.error(f"❌ HTTP error after {attempt + 1} attempts: {e}")
+                return self._degraded_output(title, artist, f"Analysis service error: {e.response.status_code}")
+
+            except Exception as e:
+                logger.error(f"❌ Error during analysis (attempt {attempt + 1}): {e}")
+                if attempt < 2:
+                    await asyncio.sleep(2 ** attempt)
+                    continue
+                return self._degraded_output(title, artist, "Unexpected error during analysis")
+
+        return self._degraded_output(title, artist, "Maximum retry attempts exceeded")
+
+    async def _post(
+        self,
+        client: httpx.AsyncClient,
+        endpoint: LLMEndpoint,
+        payload: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Send one chat completion to the endpoint chosen by the router and return the JSON body."""
+        request = endpoint.prepare_payload(payload)
+        try:
+            resp = await client.post(endpoint.chat_url, json=request, headers=endpoint.headers, timeout=self.timeout)
+            resp.raise_for_status()
+            return resp.json()
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 429:
+                logger.warning(f"⏳ Rate limited by {endpoint.name}")
+            else:
+                logger.error(f"❌ HTTP error from {endpoint.name}: {e.response.status_code} - {e.response.text}")
+            raise
+
+    async def _run_blocking(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run blocking cache I/O off the event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._cache_executor, func, *args)
+
+    def close(self) -> None:
+        """Shut down the cache worker threads."""
+        self._cache_executor.shutdown(wait=True)
@@ -0,0 +1,257 @@
+"""
+Batch Backends for Bulk Analysis
+
+Submit many chat-completion requests as one JSONL batch instead of calling the
+API song by song. Batches run outside the interactive rate budget
+(OpenAIRateLimiter) and are billed at the discounted batch rate.
+
+Backends:
+- OpenAIBatchBackend: OpenAI Batch API (/v1/files + /v1/batches)
+- LocalFileBatchBackend: Directory-based stand-in for tests and offline runs
+
+Both use the OpenAI batch line format:
+- input:  {"custom_id", "method", "url", "body"}
+- output: {"custom_id", "response": {"status_code", "body"}, "error"}
+
+Configuration (environment):
+- ANALYSIS_BATCH_BACKEND: 'openai' (default) or 'local'
+- ANALYSIS_BATCH_DIR: Working directory for the local backend
+"""
+
+import json
+import logging
+import os
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Statuses after which a batch will not change any more
+TERMINAL_STATUSES = {'completed', 'failed', 'expired', 'cancelled'}
+
+
+class BatchBackend(ABC):
+    """Base class for batch submission backends."""
+
+    name = "base"
+
+    @abstractmethod
+    def submit(self, requests: List[Dict[str, Any]], metadata: Optional[Dict[str, str]] = None) -> str:
+        """
+        Submit a batch of chat-completion requests.
+
+        Args:
+            requests: Batch input lines (custom_id, method, url, body)
+            metadata: Optional labels stored with the batch
+
+        Returns:
+            Batch ID
+        """
+
+    @abstractmethod
+    def get_status(self, batch_id: str) -> Dict[str, Any]:
+        """
+        Get batch status.
+
+        Returns:
+            Dict with at least 'id' and 'status' (plus 'request_counts' when known)
+        """
+
+    @abstractmethod
+    def iter_results(self, batch_id: str) -> Iterator[Dict[str, Any]]:
+        """Yield output lines (successes and errors) of a finished batch."""
+
+
+class OpenAIBatchBackend(BatchBackend):
+    """OpenAI Batch API backend."""
+
+    name = "openai"
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        completion_window: str = "24h",
+        timeout: float = 120.0
+    ):
+        """
+        Initialize OpenAI batch backend.
+
+        Args:
+            api_key: API key (defaults to OPENAI_API_KEY)
+            base_url: API base URL (defaults to LLM_API_BASE_URL)
+            completion_window: Batch completion window accepted by the API
+            timeout: HTTP timeout for file transfers in seconds
+        """
+        self.api_key = api_key or os.environ.get("OPENAI_API_KEY", "")
+        if not self.api_key:
+            raise ValueError("OPENAI_API_KEY is required for OpenAI batch submission")
+        self.base_url = (base_url or os.environ.get("LLM_API_BASE_URL", "https://api.openai.com/v1")).rstrip("/")
+        self.completion_window = completion_window
+        self._client = httpx.Client(
+            timeout=timeout,
+            headers={"Authorization": f"Bearer {self.api_key}"}
+        )
+
+    def submit(self, requests: List[Dict[str, Any]], metadata: Optional[Dict[str, str]] = None) -> str:
+        content = "\n".join(json.dumps(r) for r in requests).encode("utf-8")
+
+        upload = self._client.post(
+            f"{self.base_url}/files",
+            data={"purpose": "batch"},
+            files={"file": ("analysis_batch.jsonl", content, "application/jsonl")},
+        )
+        upload.raise_for_status()
+        input_file_id = upload.json()["id"]
+
+        resp = self._client.post(
+            f"{self.base_url}/batches",
+            json={
+                "input_file_id": input_file_id,
+                "endpoint": "/v1/chat/completions",
+                "completion_window": self.completion_window,
+                "metadata": metadata or {},
+            },
+        )
+        resp.raise_for_status()
+        batch_id = resp.json()["id"]
+        logger.info(f"📦 Submitted OpenAI batch {batch_id} ({len(requests)} requests)")
+        return batch_id
+
+    def get_status(self, batch_id: str) -> Dict[str, Any]:
+        resp = self._client.get(f"{self.base_url}/batches/{batch_id}")
+        resp.raise_for_status()
+        return resp.json()
+
+    def iter_results(self, batch_id: str) -> Iterator[Dict[str, Any]]:
+        batch = self.get_status(batch_id)
+        # Expired batches can still carry partial output
+        for file_key in ("output_file_id", "error_file_id"):
+            file_id = batch.get(file_key)
+            if not file_id:
+                continue
+            resp = self._client.get(f"{self.base_url}/files/{file_id}/content")
+            resp.raise_for_status()
+            for line in resp.text.splitlines():
+                if line.strip():
+                    yield json.loads(line)
+
+
+class LocalFileBatchBackend(BatchBackend):
+    """
+    File-based stand-in for the Batch API.
+
+    Each batch is a directory holding input.jsonl, batch.json and (once done)
+    output.jsonl. With a responder, batches complete on the first status check;
+    without one, a batch completes when an output.jsonl is dropped into its
+    directory.
+    """
+
+    name = "local"
+
+    def __init__(
+        self,
+        directory: str,
+        responder: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None
+    ):
+        """
+        Initialize local batch backend.
+
+        Args:
+            directory: Root directory for batch files
+            responder: Maps a request body to a chat-completion response body
+        """
+        self.directory = directory
+        self.responder = responder
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, batch_id: str, name: str) -> str:
+        return os.path.join(self.directory, batch_id, name)
+
+    def submit(self, requests: List[Dict[str, Any]], metadata: Optional[Dict[str, str]] = None) -> str:
+        batch_id = f"batch_local_{uuid.uuid4().hex[:12]}"
+        os.makedirs(os.path.join(self.directory, batch_id))
+
+        with open(self._path(batch_id, "input.jsonl"), "w", encoding="utf-8") as f:
+            for request in requests:
+                f.write(json.dumps(request) + "\n")
+
+        meta = {
+            "id": batch_id,
+            "status": "in_progress",
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "metadata": metadata or {},
+            "request_counts": {"total": len(requests), "completed": 0, "failed": 0},
+        }
+        with open(self._path(batch_id, "batch.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+
+        logger.info(f"📦 Wrote local batch {batch_id} ({len(requests)} requests)")
+        return batch_id
+
+    def get_status(self, batch_id: str) -> Dict[str, Any]:
+        with open(self._path(batch_id, "batch.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+
+        if meta["status"] in TERMINAL_STATUSES:
+            return meta
+
+        output_path = self._path(batch_id, "output.jsonl")
+        if not os.path.exists(output_path) and self.responder is not None:
+            self._respond(batch_id)
+
+        if os.path.exists(output_path):
+            completed = failed = 0
+            for line in self._read_lines(output_path):
+                if line.get("error") or (line.get("response") or {}).get("status_code") != 200:
+                    failed += 1
+                else:
+                    completed += 1
+            meta["status"] = "completed"
+            meta["request_counts"].update({"completed": completed, "failed": failed})
+            with open(self._path(batch_id, "batch.json"), "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+
+        return meta
+
+    def iter_results(self, batch_id: str) -> Iterator[Dict[str, Any]]:
+        output_path = self._path(batch_id, "output.jsonl")
+        if os.path.exists(output_path):
+            yield from self._read_lines(output_path)
+
+    def _respond(self, batch_id: str) -> None:
+        """Answer every input line with the responder (or an error line if it raises)."""
+        with open(self._path(batch_id, "output.jsonl"), "w", encoding="utf-8") as out:
+            for request in self._read_lines(self._path(batch_id, "input.jsonl")):
+                try:
+                    line = {
+                        "custom_id": request["custom_id"],
+                        "response": {"status_code": 200, "body": self.responder(request["body"])},
+                        "error": None,
+                    }
+                except Exception as e:
+                    line = {
+                        "custom_id": request["custom_id"],
+                        "response": None,
+                        "error": {"message": str(e)},
+                    }
+                out.write(json.dumps(line) + "\n")
+
+    @staticmethod
+    def _read_lines(path: str) -> Iterator[Dict[str, Any]]:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def get_batch_backend() -> BatchBackend:
+    """Create the batch backend selected by ANALYSIS_BATCH_BACKEND."""
+    backend = os.environ.get("ANALYSIS_BATCH_BACKEND", "openai").lower()
+    if backend == "local":
+        return LocalFileBatchBackend(os.environ.get("ANALYSIS_BATCH_DIR", "/tmp/analysis_batches"))
+    return OpenAIBatchBackend()
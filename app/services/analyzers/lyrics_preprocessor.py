@@ -0,0 +1,382 @@
+"""
+Lyrics Preprocessor
+
+Shrinks lyrics before they are sent to the model without dropping content the
+analysis depends on:
+
+1. Strips LRC timestamps and metadata tags that survive synced-lyrics cleanup
+   (millisecond timestamps, enhanced-LRC word timings, [ar:]/[ti:] headers).
+2. Collapses repeated choruses and stanzas to their first occurrence followed
+   by a repetition count, and runs of an identical line to "line (xN)".
+3. Enforces a prompt token budget, truncating at line boundaries.
+
+lyrics_content_hash() fingerprints lyrics independent of artist/title and of
+formatting (case, punctuation, whitespace, LRC timing, section headers), so
+the same song released under another artist name or as a live/acoustic
+version can reuse an existing analysis.
+
+Token counts use tiktoken when installed and a chars/4 estimate otherwise.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import threading
+import unicodedata
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - optional dependency
+    tiktoken = None
+
+# [01:23], [01:23.45], [01:23.456], [1:23:45]
+_LRC_TIMESTAMP = re.compile(r"\[\d{1,2}:\d{2}(?:[.:]\d{1,3})?\]")
+# Enhanced LRC word timings: <01:23.45>
+_LRC_WORD_TIMESTAMP = re.compile(r"<\d{1,2}:\d{2}(?:[.:]\d{1,3})?>")
+# LRC metadata lines: [ar:Artist], [ti:Title], [length:03:20], ...
+_LRC_METADATA = re.compile(r"^\[(?:ar|ti|al|au|by|length|offset|re|ve|tool|#):[^\]]*\]$", re.IGNORECASE)
+# Section headers from Genius-style lyrics: [Chorus], [Verse 2: Artist]
+_SECTION_HEADER = re.compile(r"^\[[^\]]+\]$")
+_NORMALIZE = re.compile(r"[^\w\s]")
+
+# Longest repeated block (in lines) considered when collapsing choruses
+MAX_BLOCK_LINES = 16
+# Shortest repeated block collapsed (single repeated lines are kept unless consecutive)
+MIN_BLOCK_LINES = 2
+
+_encoding = None
+_encoding_lock = threading.Lock()
+
+
+def _get_encoding():
+    """Lazily load the tiktoken encoding (None when unavailable)."""
+    global _encoding
+
+    if _encoding is None and tiktoken is not None:
+        with _encoding_lock:
+            if _encoding is None:
+                try:
+                    # gpt-4o family (including fine-tunes) uses o200k_base
+                    _encoding = tiktoken.get_encoding("o200k_base")
+                except Exception as e:
+                    logger.warning(f"tiktoken encoding unavailable, estimating tokens: {e}")
+                    _encoding = False
+
+    return _encoding or None
+
+
+def count_tokens(text: str) -> int:
+    """
+    Count prompt tokens for text.
+
+    Args:
+        text: Text to count
+
+    Returns:
+        Token count (tiktoken when available, otherwise ~4 characters per token)
+    """
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return (len(text) + 3) // 4
+
+
+def normalize_lyrics(lyrics: str) -> str:
+    """
+    Canonical form of lyrics for content matching.
+
+    Drops LRC timestamps/metadata and section headers ([Chorus], [Verse 2: Artist]),
+    then removes punctuation, case and whitespace differences (lines are joined).
+
+    Args:
+        lyrics: Raw lyrics text
+
+    Returns:
+        Normalized text ('' when nothing remains)
+    """
+    words: List[str] = []
+    for raw in unicodedata.normalize("NFKC", lyrics or "").splitlines():
+        line = _LRC_WORD_TIMESTAMP.sub("", _LRC_TIMESTAMP.sub("", raw)).strip()
+        if not line or _LRC_METADATA.match(line) or _SECTION_HEADER.match(line):
+            continue
+        words.extend(_NORMALIZE.sub("", line.casefold()).replace("_", " ").split())
+    return " ".join(words)
+
+
+def lyrics_content_hash(lyrics: str) -> Optional[str]:
+    """
+    SHA256 of normalize_lyrics(lyrics), or None when the lyrics normalize to nothing.
+    """
+    normalized = normalize_lyrics(lyrics)
+    if not normalized:
+        return None
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class PreparedLyrics:
+    """Result of preprocessing one song's lyrics."""
+    text: str
+    original_tokens: int
+    prepared_tokens: int
+    timestamps_stripped: int = 0
+    repeats_collapsed: int = 0
+    truncated_lines: int = 0
+
+    @property
+    def tokens_saved(self) -> int:
+        return max(0, self.original_tokens - self.prepared_tokens)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'original_tokens': self.original_tokens,
+            'prepared_tokens': self.prepared_tokens,
+            'tokens_saved': self.tokens_saved,
+            'timestamps_stripped': self.timestamps_stripped,
+            'repeats_collapsed': self.repeats_collapsed,
+            'truncated_lines': self.truncated_lines,
+        }
+
+
+class LyricsPreprocessor:
+    """
+    Prepares lyrics for the analysis prompt and tracks token savings.
+    """
+
+    def __init__(self, max_tokens: int = 2000, enabled: bool = True):
+        """
+        Initialize preprocessor.
+
+        Args:
+            max_tokens: Token budget for the lyrics portion of the prompt (0 disables truncation)
+            enabled: When False lyrics pass through unchanged (tokens are still counted)
+        """
+        self.max_tokens = max_tokens
+        self.enabled = enabled
+
+        # Statistics
+        self.lock = threading.Lock()
+        self.total_songs = 0
+        self.total_original_tokens = 0
+        self.total_prepared_tokens = 0
+        self.total_truncated = 0
+
+    def prepare(self, lyrics: str) -> PreparedLyrics:
+        """
+        Preprocess lyrics for the prompt.
+
+        Args:
+            lyrics: Raw lyrics text
+
+        Returns:
+            PreparedLyrics with the text to send and token counts
+        """
+        lyrics = lyrics or ""
+        original_tokens = count_tokens(lyrics)
+
+        if not self.enabled:
+            prepared = PreparedLyrics(lyrics, original_tokens, original_tokens)
+        else:
+            lines, stripped = self._strip_timestamps(lyrics)
+            lines, collapsed = self._collapse_repeats(lines)
+            lines, truncated = self._apply_budget(lines)
+            text = "\n".join(lines).strip()
+            prepared = PreparedLyrics(
+                text=text,
+                original_tokens=original_tokens,
+                prepared_tokens=count_tokens(text),
+                timestamps_stripped=stripped,
+                repeats_collapsed=collapsed,
+                truncated_lines=truncated,
+            )
+
+        with self.lock:
+            self.total_songs += 1
+            self.total_original_tokens += prepared.original_tokens
+            self.total_prepared_tokens += prepared.prepared_tokens
+            if prepared.truncated_lines:
+                self.total_truncated += 1
+
+        return prepared
+
+    def _strip_timestamps(self, lyrics: str) -> Tuple[List[str], int]:
+        """Remove LRC timestamps/metadata and normalize whitespace."""
+        stripped = 0
+        lines: List[str] = []
+        for raw in lyrics.replace("\r\n", "\n").split("\n"):
+            line, n_line = _LRC_TIMESTAMP.subn("", raw)
+            line, n_word = _LRC_WORD_TIMESTAMP.subn("", line)
+            stripped += n_line + n_word
+            line = " ".join(line.split())
+            if _LRC_METADATA.match(line):
+                stripped += 1
+                continue
+            # Keep at most one blank line between stanzas
+            if not line and (not lines or not lines[-1]):
+                continue
+            lines.append(line)
+        return lines, stripped
+
+    @staticmethod
+    def _key(line: str) -> str:
+        """Comparison key: case, punctuation and spacing insensitive."""
+        return " ".join(_NORMALIZE.sub("", line.lower()).split())
+
+    def _collapse_repeats(self, lines: List[str]) -> Tuple[List[str], int]:
+        """
+        Collapse repeated multi-line blocks and consecutive identical lines.
+
+        Blocks are matched line-by-line so choruses are found whether or not
+        the source separates stanzas with blank lines. A repeated block is
+        dropped and its first occurrence gets a "[repeated xN]" marker.
+        """
+        keys = [self._key(line) if not _SECTION_HEADER.match(line) else "" for line in lines]
+        out: List[str] = []
+        # (first line index, block length) -> (output index of last line, occurrences)
+        repeats: Dict[Tuple[int, int], List[int]] = {}
+        # normalized block -> (first line index, block length)
+        seen: Dict[Tuple[str, ...], Tuple[int, int]] = {}
+        collapsed = 0
+        emitted: List[Tuple[int, int]] = []  # (line index, output index) of emitted content lines
+
+        i = 0
+        while i < len(lines):
+            match = None
+            for size in range(min(MAX_BLOCK_LINES, len(lines) - i), MIN_BLOCK_LINES - 1, -1):
+                block = tuple(keys[i:i + size])
+                if "" in block:
+                    continue
+                if block in seen:
+                    match = (block, size)
+                    break
+
+            if match:
+                block, size = match
+                first = seen[block]
+                entry = repeats.setdefault(first, [self._output_index(emitted, first), 1])
+                entry[1] += 1
+                collapsed += 1
+                # Drop a section header that only introduced the repeat
+                if out and _SECTION_HEADER.match(out[-1]):
+                    out.pop()
+                i += size
+                continue
+
+            line = lines[i]
+            # Consecutive identical line: fold into "line (xN)"
+            if keys[i] and out and i > 0 and keys[i - 1] == keys[i] and emitted and emitted[-1][0] == i - 1:
+                base, count = self._split_count(out[-1])
+                out[-1] = f"{base} (x{count + 1})"
+                emitted[-1] = (i, emitted[-1][1])
+                collapsed += 1
+                i += 1
+                continue
+
+            out.append(line)
+            if keys[i]:
+                emitted.append((i, len(out) - 1))
+                # Register every block ending at this line
+                for size in range(MIN_BLOCK_LINES, MAX_BLOCK_LINES + 1):
+                    start = i - size + 1
+                    if start < 0:
+                        break
+                    block = tuple(keys[start:i + 1])
+                    if "" in block:
+                        break
+                    seen.setdefault(block, (start, size))
+            i += 1
+
+        # Annotate first occurrences, last output line first so indexes stay valid
+        for out_index, occurrences in sorted(repeats.values(), reverse=True):
+            if out_index is not None:
+                out.insert(out_index + 1, f"[repeated x{occurrences}]")
+
+        return out, collapsed
+
+    @staticmethod
+    def _output_index(emitted: List[Tuple[int, int]], first: Tuple[int, int]) -> Optional[int]:
+        """Output index of the last line of a block's first occurrence."""
+        start, size = first
+        last_line = start + size - 1
+        for line_index, out_index in reversed(emitted):
+            if line_index <= last_line:
+                return out_index
+        return None
+
+    @staticmethod
+    def _split_count(line: str) -> Tuple[str, int]:
+        """Split "text (xN)" into ("text", N)."""
+        match = re.match(r"^(.*) \(x(\d+)\)$", line)
+        if match:
+            return match.group(1), int(match.group(2))
+        return line, 1
+
+    def _apply_budget(self, lines: List[str]) -> Tuple[List[str], int]:
+        """Truncate at a line boundary once the token budget is exceeded."""
+        if not self.max_tokens or count_tokens("\n".join(lines)) <= self.max_tokens:
+            return lines, 0
+
+        budget = self.max_tokens - 16  # room for the truncation marker
+        kept: List[str] = []
+        used = 0
+        for line in lines:
+            cost = count_tokens(line) + 1
+            if used + cost > budget:
+                break
+            kept.append(line)
+            used += cost
+
+        dropped = len(lines) - len(kept)
+        kept.append(f"[... {dropped} more lines truncated]")
+        return kept, dropped
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get aggregate token savings."""
+        with self.lock:
+            saved = self.total_original_tokens - self.total_prepared_tokens
+            return {
+                'enabled': self.enabled,
+                'max_tokens': self.max_tokens,
+                'tokenizer': 'tiktoken' if _get_encoding() is not None else 'estimate',
+                'total_songs': self.total_songs,
+                'total_original_tokens': self.total_original_tokens,
+                'total_prepared_tokens': self.total_prepared_tokens,
+                'total_tokens_saved': saved,
+                'total_truncated': self.total_truncated,
+                'savings_rate': round(saved / self.total_original_tokens, 4) if self.total_original_tokens else 0.0,
+            }
+
+
+# Global preprocessor instance
+_lyrics_preprocessor: Optional[LyricsPreprocessor] = None
+_preprocessor_lock = threading.Lock()
+
+
+def get_lyrics_preprocessor() -> LyricsPreprocessor:
+    """
+    Get the global lyrics preprocessor instance.
+
+    Reads LYRICS_PREPROCESS (default false) and LYRICS_MAX_PROMPT_TOKENS (default 2000).
+    Preprocessing stays off until scripts/benchmark_lyrics_preprocessing.py
+    --analyze has confirmed verdicts don't change.
+    """
+    global _lyrics_preprocessor
+
+    if _lyrics_preprocessor is None:
+        with _preprocessor_lock:
+            if _lyrics_preprocessor is None:
+                enabled = os.environ.get('LYRICS_PREPROCESS', 'false').lower() in ('1', 'true', 'yes')
+                try:
+                    max_tokens = int(os.environ.get('LYRICS_MAX_PROMPT_TOKENS', '2000'))
+                except ValueError:
+                    max_tokens = 2000
+                _lyrics_preprocessor = LyricsPreprocessor(max_tokens=max_tokens, enabled=enabled)
+
+    return _lyrics_preprocessor
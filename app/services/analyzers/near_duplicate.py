@@ -0,0 +1,272 @@
+"""
+Near-Duplicate Lyrics Index
+
+MinHash signatures over word shingles of normalized lyrics, bucketed with
+locality-sensitive hashing, so radio edits, live versions and provider
+formatting differences of an analyzed song can reuse its analysis.
+
+- Shingles: word 3-grams of normalize_lyrics() (case, punctuation, whitespace
+  and LRC timing already removed)
+- Signature: NUM_PERM minimum hashes under (a*x + b) mod 2^61-1 permutations,
+  stored packed in lyrics_signatures
+- LSH: BANDS bands of NUM_PERM/BANDS rows; every band is a row in
+  lyrics_lsh_buckets, so a lookup is one IN query over BANDS keys. With 16
+  bands of 8 rows, pairs above ~0.7 Jaccard collide with high probability;
+  candidates are then checked against the configured threshold using the
+  full signature.
+
+Configuration (environment):
+- ANALYSIS_NEAR_DUPLICATE: Enable lookups and indexing (default false)
+- ANALYSIS_NEAR_DUPLICATE_THRESHOLD: Minimum estimated Jaccard similarity (default 0.9)
+
+Signatures for lyrics cached before the index existed are built by
+scripts/backfill_lyrics_signatures.py.
+"""
+
+import hashlib
+import logging
+import os
+import random
+import struct
+import threading
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from app.utils.app_context import ensure_app_context
+
+from .lyrics_preprocessor import normalize_lyrics
+
+logger = logging.getLogger(__name__)
+
+NUM_PERM = 128
+BANDS = 16
+SHINGLE_WORDS = 3
+
+_MERSENNE_PRIME = (1 << 61) - 1
+
+# Fixed seed: signatures must be comparable across processes and releases
+_rng = random.Random(20240501)
+_PERMUTATIONS = [(_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME)) for _ in range(NUM_PERM)]
+
+
+def _shingle_hashes(lyrics: str) -> List[int]:
+    """64-bit hashes of the word shingles of normalized lyrics."""
+    words = normalize_lyrics(lyrics).split()
+    if not words:
+        return []
+    if len(words) < SHINGLE_WORDS:
+        shingles = {" ".join(words)}
+    else:
+        shingles = {" ".join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+    return [
+        int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "little")
+        for s in shingles
+    ]
+
+
+def minhash_signature(lyrics: str) -> Optional[Tuple[int, ...]]:
+    """
+    MinHash signature of lyrics.
+
+    Returns:
+        NUM_PERM minimum hash values, or None when the lyrics normalize to nothing
+    """
+    hashes = _shingle_hashes(lyrics)
+    if not hashes:
+        return None
+    return tuple(
+        min((a * x + b) % _MERSENNE_PRIME for x in hashes)
+        for a, b in _PERMUTATIONS
+    )
+
+
+def estimate_jaccard(first: Sequence[int], second: Sequence[int]) -> float:
+    """Fraction of signature positions that agree (estimates shingle-set Jaccard)."""
+    return sum(1 for x, y in zip(first, second) if x == y) / len(first)
+
+
+def band_keys(signature: Sequence[int]) -> List[str]:
+    """LSH bucket key per band: '{band}:{hash of the band's rows}'."""
+    rows = len(signature) // BANDS
+    keys = []
+    for band in range(BANDS):
+        chunk = struct.pack(f"<{rows}Q", *signature[band * rows:(band + 1) * rows])
+        keys.append(f"{band}:{hashlib.blake2b(chunk, digest_size=8).hexdigest()}")
+    return keys
+
+
+def pack_signature(signature: Sequence[int]) -> bytes:
+    return struct.pack(f"<{len(signature)}Q", *signature)
+
+
+def unpack_signature(data: bytes) -> Tuple[int, ...]:
+    return struct.unpack(f"<{len(data) // 8}Q", data)
+
+
+@dataclass
+class NearDuplicate:
+    """An indexed song whose lyrics are similar to the query."""
+    artist: str
+    title: str
+    lyrics_hash: str
+    similarity: float
+
+
+class NearDuplicateIndex:
+    """
+    LSH index of lyrics signatures backed by the lyrics_signatures and
+    lyrics_lsh_buckets tables.
+    """
+
+    def __init__(self, threshold: float = 0.9, max_candidates: int = 50):
+        """
+        Initialize index.
+
+        Args:
+            threshold: Minimum estimated Jaccard similarity for a match
+            max_candidates: Candidates compared per lookup (most shared buckets first)
+        """
+        self.threshold = threshold
+        self.max_candidates = max_candidates
+
+        # Statistics
+        self.lock = threading.Lock()
+        self.lookups = 0
+        self.matches = 0
+
+    def add(self, artist: str, title: str, lyrics_hash: str, lyrics: str) -> bool:
+        """
+        Index one song's lyrics (no-op if already indexed).
+
+        Returns:
+            True if a signature was written
+        """
+        signature = minhash_signature(lyrics)
+        if signature is None:
+            return False
+        return self.add_many([(artist, title, lyrics_hash, signature)]) > 0
+
+    def add_many(self, entries: Iterable[Tuple[str, str, str, Sequence[int]]], commit: bool = True) -> int:
+        """
+        Index precomputed signatures with one existence query and one commit.
+
+        Args:
+            entries: (artist, title, lyrics_hash, signature) tuples
+            commit: Commit the session (False lets the caller batch more writes)
+
+        Returns:
+            Number of signatures written
+        """
+        from app.extensions import db
+        from app.models.models import LyricsLSHBucket, LyricsSignature
+
+        entries = {(artist.strip(), title.strip(), lyrics_hash): signature
+                   for artist, title, lyrics_hash, signature in entries}
+        if not entries:
+            return 0
+
+        with ensure_app_context():
+            try:
+                existing = {
+                    (row.artist, row.title, row.lyrics_hash)
+                    for row in LyricsSignature.query.filter(
+                        LyricsSignature.lyrics_hash.in_({key[2] for key in entries})
+                    ).all()
+                }
+                rows = []
+                for (artist, title, lyrics_hash), signature in entries.items():
+                    if (artist, title, lyrics_hash) in existing:
+                        continue
+                    row = LyricsSignature(artist=artist, title=title, lyrics_hash=lyrics_hash,
+                                          signature=pack_signature(signature))
+                    row.buckets = [LyricsLSHBucket(band_key=key) for key in band_keys(signature)]
+                    rows.append(row)
+                db.session.add_all(rows)
+                if commit:
+                    db.session.commit()
+                return len(rows)
+            except Exception:
+                db.session.rollback()
+                raise
+
+    def find(self, lyrics: str) -> List[NearDuplicate]:
+        """
+        Find indexed songs whose lyrics are at least `threshold` similar.
+
+        Args:
+            lyrics: Query lyrics
+
+        Returns:
+            Matches, most similar first
+        """
+        from sqlalchemy import func
+
+        from app.extensions import db
+        from app.models.models import LyricsLSHBucket, LyricsSignature
+
+        signature = minhash_signature(lyrics)
+        if signature is None:
+            return []
+
+        with ensure_app_context():
+            shared = func.count(LyricsLSHBucket.id)
+            candidates = (
+                db.session.query(LyricsSignature, shared)
+                .join(LyricsLSHBucket, LyricsLSHBucket.signature_id == LyricsSignature.id)
+                .filter(LyricsLSHBucket.band_key.in_(band_keys(signature)))
+                .group_by(LyricsSignature.id)
+                .order_by(shared.desc())
+                .limit(self.max_candidates)
+                .all()
+            )
+            matches = []
+            for row, _ in candidates:
+                similarity = estimate_jaccard(signature, unpack_signature(row.signature))
+                if similarity >= self.threshold:
+                    matches.append(NearDuplicate(row.artist, row.title, row.lyrics_hash, round(similarity, 4)))
+
+        matches.sort(key=lambda m: m.similarity, reverse=True)
+        with self.lock:
+            self.lookups += 1
+            if matches:
+                self.matches += 1
+        return matches
+
+    def get_stats(self) -> dict:
+        with self.lock:
+            return {
+                'threshold': self.threshold,
+                'lookups': self.lookups,
+                'matches': self.matches,
+                'match_rate': round(self.matches / self.lookups * 100, 2) if self.lookups else 0.0,
+            }
+
+
+# Global index instance
+_near_duplicate_index: Optional[NearDuplicateIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_near_duplicate_index() -> Optional[NearDuplicateIndex]:
+    """
+    Get the global near-duplicate index.
+
+    Returns:
+        NearDuplicateIndex, or None when ANALYSIS_NEAR_DUPLICATE is not enabled
+    """
+    global _near_duplicate_index
+
+    if os.environ.get("ANALYSIS_NEAR_DUPLICATE", "false").lower() not in ("1", "true", "yes"):
+        return None
+
+    if _near_duplicate_index is None:
+        with _index_lock:
+            if _near_duplicate_index is None:
+                try:
+                    threshold = float(os.environ.get("ANALYSIS_NEAR_DUPLICATE_THRESHOLD", "0.9"))
+                except ValueError:
+                    threshold = 0.9
+                _near_duplicate_index = NearDuplicateIndex(threshold=threshold)
+                logger.info(f"✅ Near-duplicate lyrics index enabled (Jaccard ≥ {threshold})")
+
+    return _near_duplicate_index
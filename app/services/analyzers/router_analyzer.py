@@ -6,16 +6,92 @@ import logging
 import os
 import re
 import time
-from typing import Any, Dict
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
 
-import requests
+import httpx
 
 from app.utils.circuit_breaker import CircuitBreakerOpenError, get_openai_circuit_breaker
+from app.utils.llm_http import get_llm_http_client
+from app.utils.llm_router import LLMEndpoint, LLMRouter, get_llm_router
 from app.utils.openai_rate_limiter import get_rate_limiter
 from app.utils.redis_cache import get_redis_cache
+from app.utils.response_cache import get_response_cache
+from app.utils.single_flight import get_analysis_single_flight
+from app.utils.token_ledger import get_token_ledger, parse_usage
+
+from .analysis_store import AnalysisStore
+from .lyrics_preprocessor import get_lyrics_preprocessor, lyrics_content_hash
+from .near_duplicate import get_near_duplicate_index
+from .streaming_json import IncrementalJSONParser, iter_sse_events
 
 logger = logging.getLogger(__name__)
 
+# Static system prompt. Sent byte-identical as the first message of every
+# request so providers with automatic prefix caching (OpenAI caches the
+# longest shared prompt prefix) can serve it from cache; everything
+# song-specific goes in the user message after it.
+SYSTEM_PROMPT = """You are a fine-tuned theological music analyst using Christian Framework v3.1.
+
+Apply your trained analysis patterns to evaluate this song. Remember:
+
+## Critical Distinctions (Watch for Subtle Issues):
+
+**Under-detected Concerns:**
+- **Humanistic Philosophy**: Self-empowerment, "I can do anything," bootstrap mentality WITHOUT God
+  * Flag when success/strength is attributed to self rather than God (Prov 3:5-6)
+- **Idolatry**: Elevating ANYTHING above God (romance, success, self, relationships)
+  * Flag when ultimate hope/meaning is in created things vs Creator (1 John 2:15-17)
+  
+**Over-detected (Apply Lament Filter):**
+- **Despair/Mental Health**: DON'T flag authentic lament directed toward God (Psalms)
+  * Only flag when despair has NO hope or is disconnected from God
+- **Pride**: DON'T flag confidence in God's promises or biblical boldness
+  * Only flag self-exaltation, boasting in self, arrogance
+
+**Other Edge Cases:**
+- **Common Grace**: Secular songs with biblical values (kindness, community, integrity) score 60-75
+- **Vague Spirituality Cap**: God/spiritual language with unclear theology = MAX 45 score
+- **Character Voice**: Story songs/cautionary tales get 30% penalty reduction
+- **Scripture Required**: EVERY analysis needs 1-4 scripture references
+
+## Scoring Guidelines (Use Full 0-100 Scale):
+**Avoid clustering at exact boundaries (40, 45, 60, 85). Use the full range:**
+
+- **85-100** (freely_listen): Biblically sound, theologically clear, spiritually edifying
+- **70-84** (context_required): Helpful themes with minor theological gaps or ambiguity
+- **60-69** (context_required): Mixed content with redeemable elements but requiring careful discernment
+- **50-59** (caution_limit): **BORDERLINE** - Significant concerns BUT meaningful positive themes
+  * Use 50-59 for songs with BOTH problems AND redeeming value
+  * Example: Self-reliance message BUT genuine perseverance theme
+  * Example: Vague spirituality BUT authentic hope and community
+- **40-49** (caution_limit): More concerns than positive content, limited spiritual value
+- **0-39** (avoid_formation): Harmful to spiritual formation, contrary to biblical teaching
+
+## Formation Risk:
+- **very_low**: Minimal spiritual concerns
+- **low**: Minor concerns, generally safe
+- **high**: Significant formation risks
+- **critical**: Severe spiritual dangers
+
+Return ONLY this JSON (no prose, no markdown):
+
+{
+  "score": 0-100,
+  "verdict": "freely_listen|context_required|caution_limit|avoid_formation",
+  "formation_risk": "very_low|low|high|critical",
+  "narrative_voice": "artist|character|ambiguous",
+  "lament_filter_applied": true/false,
+  "themes_positive": [{"theme": "name", "points": int, "scripture": "ref"}],
+  "themes_negative": [{"theme": "name", "penalty": int, "scripture": "ref"}],
+  "concerns": [{"category": "name", "severity": "low|medium|high|critical", "explanation": "brief"}],
+  "scripture_references": ["ref1", "ref2"],
+  "analysis": "1-2 sentence summary of spiritual core and formation guidance"
+}"""
+_SYSTEM_MESSAGE = {"role": "system", "content": SYSTEM_PROMPT}
+
+# Fields reported through on_partial as soon as they finish streaming
+EARLY_FIELDS = ("score", "verdict")
+
 class RouterAnalyzer:
     """
     OpenAI-powered theological music analyzer using fine-tuned GPT-4o-mini.
@@ -24,7 +100,14 @@ class RouterAnalyzer:
     biblical alignment, spiritual formation impact, and theological accuracy.
     """
     
-    def __init__(self) -> None:
+    def __init__(self, model: Optional[str] = None) -> None:
+        """
+        Initialize analyzer.
+        
+        Args:
+            model: Model to analyze with (defaults to OPENAI_MODEL); cache
+                warming passes the model about to be rolled out
+        """
         # OpenAI API configuration
         self.base_url: str = os.environ.get(
             "LLM_API_BASE_URL", 
@@ -32,7 +115,7 @@ class RouterAnalyzer:
         ).rstrip("/")
         
         # Fine-tuned GPT-4o-mini model
-        self.model: str = os.environ.get(
+        self.model: str = model or os.environ.get(
             "OPENAI_MODEL",
             "ft:gpt-4o-mini-2024-07-18:personal:christian-discernment-4o-mini-v1:CLxyepav"
         )
@@ -56,6 +139,8 @@ class RouterAnalyzer:
             self.timeout: float = float(os.environ.get("LLM_TIMEOUT", "60"))
         except Exception:
             self.timeout = 60.0
+        # Opt-in SSE streaming so score/verdict are available before the full response
+        self.streaming: bool = os.environ.get("LLM_STREAMING", "false").lower() in ("1", "true", "yes")
         
         # Rate limiter for API calls
         self.rate_limiter = get_rate_limiter()
@@ -63,12 +148,75 @@ class RouterAnalyzer:
         # Circuit breaker for graceful degradation
         self.circuit_breaker = get_openai_circuit_breaker()
         
+        # Shared keep-alive connection pool (sized to the rate limiter's concurrency)
+        self.http_client = get_llm_http_client()
+        
         # Redis cache for fast lookups
         self.redis_cache = get_redis_cache()
         
+        # Database cache (reuses the caller's app or the shared worker app)
+        self.analysis_store = AnalysisStore()
+        
+        # Coalesces identical concurrent analyses across threads and workers
+        self.single_flight = get_analysis_single_flight()
+        
+        # Per-model token accounting from response usage blocks
+        self.token_ledger = get_token_ledger()
+        
+        # Strips LRC leftovers, collapses repeated choruses, enforces a lyrics token budget
+        self.lyrics_preprocessor = get_lyrics_preprocessor()
+        
+        # Optional on-disk cache of raw responses keyed by the exact request payload
+        self.response_cache = get_response_cache()
+        
+        # Reuse analyses of identical normalized lyrics under another artist/title
+        # (the content index is always maintained, so this can be switched on later)
+        self.content_dedupe: bool = os.environ.get("ANALYSIS_CONTENT_DEDUPE", "false").lower() in ("1", "true", "yes")
+        
+        # MinHash/LSH index reusing analyses of near-identical lyrics (None unless ANALYSIS_NEAR_DUPLICATE)
+        self.near_duplicates = get_near_duplicate_index()
+        
+        # False stages results in Redis only (keys are per model): the database
+        # keeps one row per song, which a not-yet-live model must not overwrite
+        self.persist_to_database: bool = True
+        
+        # Endpoint pool: LLM_ENDPOINTS when configured, otherwise this single endpoint
+        # sharing the global rate limiter and circuit breaker
+        self.llm_router: LLMRouter = get_llm_router() or LLMRouter([
+            LLMEndpoint(
+                name="primary",
+                base_url=self.base_url,
+                api_key=self.api_key,
+                rate_limiter=self.rate_limiter,
+                circuit_breaker=self.circuit_breaker,
+            )
+        ])
+        
+        # Request parts that never change between songs
+        self._chat_url = f"{self.base_url}/chat/completions"
+        self._headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+        self._payload_base: Dict[str, Any] = {
+            "model": self.model,
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens,
+            "stream": False,
+        }
+        # Add top_p only for non-fine-tuned models (fine-tuned models may not support it)
+        if not self.model.startswith("ft:"):
+            self._payload_base["top_p"] = 0.9
+        
         logger.info(f"✅ RouterAnalyzer initialized with OpenAI model: {self.model}")
 
-    def analyze_song(self, title: str, artist: str, lyrics: str) -> Dict[str, Any]:
+    def analyze_song(
+        self,
+        title: str,
+        artist: str,
+        lyrics: str,
+        on_partial: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
         """
         Analyze a song using the fine-tuned GPT-4o-mini model with caching, rate limiting, and graceful degradation.
         
@@ -76,6 +224,8 @@ class RouterAnalyzer:
             title: Song title
             artist: Artist name
             lyrics: Full song lyrics
+            on_partial: Called once with {'score', 'verdict'} as soon as both have
+                streamed (only when LLM_STREAMING is enabled and the API is called)
             
         Returns:
             Dictionary containing analysis results with Christian Framework v3.1 schema
@@ -86,147 +236,87 @@ class RouterAnalyzer:
             logger.info(f"🎵 '{title}' has no lyrics - returning instrumental response")
             return self._create_instrumental_response(title, artist)
         
-        # Cache hierarchy: Redis → Database → API
-        lyrics_hash = hashlib.sha256(lyrics.encode('utf-8')).hexdigest()
+        # Cache hierarchy: Redis → Database → same lyrics elsewhere → near-duplicate lyrics → API
+        lyrics_hash = self._lyrics_hash(lyrics)
+        cached = self._lookup_cached(title, artist, lyrics_hash, lyrics_content_hash(lyrics), lyrics)
+        if cached:
+            return cached
         
-        # 1. Check Redis cache first (fastest)
-        redis_result = self.redis_cache.get_analysis(artist, title, lyrics_hash, self.model)
-        if redis_result:
-            logger.info(f"✅ Redis cache hit for '{title}' by {artist}")
-            redis_result['analysis_quality'] = 'cached'
-            return redis_result
-        
-        # 2. Check database cache (persistent)
-        try:
-            from app import create_app
-            from app.models.models import AnalysisCache
-            
-            # Use app context for database operations
-            app = create_app()
-            with app.app_context():
-                cached = AnalysisCache.find_cached_analysis(artist, title, lyrics_hash)
-                
-                if cached and cached.model_version == self.model:
-                    logger.info(f"✅ Database cache hit for '{title}' by {artist}")
-                    result = cached.analysis_result
-                    result['cache_hit'] = True
-                    result['cache_source'] = 'database'
-                    result['analysis_quality'] = 'cached'
-                    
-                    # Backfill Redis cache
-                    self.redis_cache.set_analysis(artist, title, lyrics_hash, self.model, result)
-                    
-                    return result
-                elif cached:
-                    logger.info("⚠️  Found cached analysis with different model version. Re-analyzing...")
-        except Exception as e:
-            logger.warning(f"Cache lookup failed: {e}. Proceeding with API call...")
-        
-        # Check circuit breaker state
-        circuit_state = self.circuit_breaker.get_state()
-        if circuit_state['state'] == 'open':
+        # Coalesce identical in-flight analyses (same key as the Redis cache)
+        flight_key = self.redis_cache._make_key(artist, title, lyrics_hash, self.model)
+        return self.single_flight.do(
+            flight_key,
+            lambda: self._analyze_uncached(title, artist, lyrics, lyrics_hash, on_partial),
+            peek=lambda: self._peek_published(title, artist, lyrics_hash)
+        )
+
+    def _analyze_uncached(
+        self,
+        title: str,
+        artist: str,
+        lyrics: str,
+        lyrics_hash: str,
+        on_partial: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        """Call the API for a cache miss (runs once per key under single-flight)."""
+        # Check endpoint circuit breakers
+        if not self.llm_router.has_available():
+            circuit_state = self.circuit_breaker.get_state()
             logger.warning(
                 f"⚠️  Circuit breaker is OPEN for '{title}' by {artist}. "
                 f"Returning degraded response. Last failure: {circuit_state['last_failure_time']}"
             )
             return self._degraded_output(title, artist, "OpenAI API is temporarily unavailable")
         
-        url = f"{self.base_url}/chat/completions"
-        
         logger.info(f"🎵 Analyzing '{title}' by {artist} with {self.model}")
+        _, payload, _ = self._build_request(title, artist, lyrics)
 
-        system = self._get_comprehensive_system_prompt()
-        user = f"Song: {title} — {artist}\n\nLyrics:\n{lyrics}"
-        
-        payload = {
-            "model": self.model,
-            "messages": [
-                {"role": "system", "content": system},
-                {"role": "user", "content": user},
-            ],
-            "temperature": self.temperature,
-            "max_tokens": self.max_tokens,
-            "stream": False,
-        }
-        
-        # Add top_p only for non-fine-tuned models (fine-tuned models may not support it)
-        if not self.model.startswith("ft:"):
-            payload["top_p"] = 0.9
-        
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-
-        # Define the API call function for circuit breaker
-        def make_api_call():
-            """Wrapped API call for circuit breaker."""
-            # Acquire rate limit permission (blocks if needed)
-            self.rate_limiter.acquire()
-            
+        def send(endpoint: LLMEndpoint) -> Dict[str, Any]:
+            """One request to the endpoint chosen by the router."""
+            request = endpoint.prepare_payload(payload)
             try:
-                resp = requests.post(url, json=payload, headers=headers, timeout=self.timeout)
+                if self.streaming:
+                    return self._stream_completion(endpoint.chat_url, request, endpoint.headers, on_partial)
+                resp = self.http_client.post(endpoint.chat_url, json=request, headers=endpoint.headers, timeout=self.timeout)
                 resp.raise_for_status()
+                return resp.json()
                 
-                # Success! Parse and return
-                data = resp.json()
-                content = (data.get("choices", [{}])[0] or {}).get("message", {}).get("content", "{}")
-                parsed = self._parse_or_repair_json(content)
-                normalized = self._normalize_output(parsed)
-                normalized['cache_hit'] = False
-                normalized['analysis_quality'] = 'full'  # Mark as full quality
-                
-                # Cache the result in both Redis and Database
-                try:
-                    # Cache in Redis (fast tier)
-                    self.redis_cache.set_analysis(artist, title, lyrics_hash, self.model, normalized)
-                    
-                    # Cache in Database (persistent tier)
-                    from app import create_app
-                    from app.models.models import AnalysisCache
-                    
-                    app = create_app()
-                    with app.app_context():
-                        AnalysisCache.cache_analysis(
-                            artist=artist,
-                            title=title,
-                            lyrics_hash=lyrics_hash,
-                            analysis_result=normalized,
-                            model_version=self.model
-                        )
-                        logger.info(f"💾 Cached analysis for '{title}' by {artist} (Redis + Database)")
-                except Exception as e:
-                    logger.warning(f"Failed to cache analysis: {e}")
-                
-                logger.info(f"✅ Analysis complete: Score={normalized.get('score')}, Verdict={normalized.get('verdict')}")
-                return normalized
-                
-            except requests.exceptions.HTTPError as e:
+            except httpx.HTTPStatusError as e:
                 # Handle rate limit (429) with exponential backoff
                 if e.response.status_code == 429:
-                    logger.warning("⏳ Rate limited by OpenAI API")
+                    logger.warning(f"⏳ Rate limited by {endpoint.name}")
                     raise  # Let circuit breaker handle it
                 
                 # Other HTTP errors
-                logger.error(f"❌ HTTP error during analysis: {e.response.status_code} - {e.response.text}")
+                logger.error(f"❌ HTTP error from {endpoint.name}: {e.response.status_code} - {e.response.text}")
                 raise
-                
-            finally:
-                # Always release the rate limiter slot
-                self.rate_limiter.release()
+
+        def make_api_call():
+            """Route the request (endpoint rate limiter + circuit breaker), then parse and cache."""
+            data, model = self._cached_response(payload)
+            if data is None:
+                # Hedging would report partial results twice
+                data, endpoint = self.llm_router.execute(send, hedge=False if on_partial else None)
+                request = endpoint.prepare_payload(payload)
+                self._remember_response(request, data)
+                model = request["model"]
+            
+            # Success! Parse, normalize and cache (under the model that answered)
+            normalized = self._process_response(data)
+            self._store_cached(title, artist, lyrics_hash, normalized, lyrics_content_hash(lyrics), lyrics, model)
+            return normalized
         
-        # Execute through circuit breaker with retry logic
+        # Execute through the router with retry logic
         for attempt in range(3):  # Max 3 attempts
             try:
-                # Execute through circuit breaker
-                return self.circuit_breaker.call(make_api_call)
+                return make_api_call()
                 
             except CircuitBreakerOpenError as e:
                 # Circuit opened during our request
                 logger.error(f"❌ Circuit breaker opened: {e}")
                 return self._degraded_output(title, artist, "Service protection engaged after repeated failures")
                 
-            except requests.exceptions.HTTPError as e:
+            except httpx.HTTPStatusError as e:
                 # Rate limit - retry with backoff
                 if e.response.status_code == 429 and attempt < 2:
                     backoff_time = self.rate_limiter.handle_rate_limit_error(attempt)
@@ -248,64 +338,396 @@ class RouterAnalyzer:
         # Should never reach here, but just in case
         return self._degraded_output(title, artist, "Maximum retry attempts exceeded")
 
-    def _get_comprehensive_system_prompt(self) -> str:
-        return """You are a fine-tuned theological music analyst using Christian Framework v3.1.
+    @staticmethod
+    def _lyrics_hash(lyrics: str) -> str:
+        return hashlib.sha256(lyrics.encode('utf-8')).hexdigest()
 
-Apply your trained analysis patterns to evaluate this song. Remember:
+    def _lookup_cached(
+        self,
+        title: str,
+        artist: str,
+        lyrics_hash: str,
+        content_hash: Optional[str] = None,
+        lyrics: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached analysis (Redis first, then database, then the
+        normalized-lyrics index and the near-duplicate index when enabled).
+        
+        Returns:
+            Cached analysis dict, or None on a miss
+        """
+        # 1. Check Redis cache first (fastest)
+        redis_result = self.redis_cache.get_analysis(artist, title, lyrics_hash, self.model)
+        if redis_result:
+            logger.info(f"✅ Redis cache hit for '{title}' by {artist}")
+            redis_result['analysis_quality'] = 'cached'
+            return redis_result
+        
+        # 2. Check database cache (persistent)
+        try:
+            cached = self.analysis_store.find(artist, title, lyrics_hash)
+            cached_result, cached_model = cached if cached else (None, None)
+            
+            if cached and cached_model == self.model:
+                logger.info(f"✅ Database cache hit for '{title}' by {artist}")
+                result = cached_result
+                result['cache_hit'] = True
+                result['cache_source'] = 'database'
+                result['analysis_quality'] = 'cached'
+                
+                # Backfill Redis cache
+                self.redis_cache.set_analysis(artist, title, lyrics_hash, self.model, result)
+                
+                return result
+            elif cached:
+                logger.info("⚠️  Found cached analysis with different model version. Re-analyzing...")
+        except Exception as e:
+            logger.warning(f"Cache lookup failed: {e}. Proceeding with API call...")
+        
+        # 3. Same lyrics cached under another artist/title
+        reused = self._lookup_by_content(title, artist, lyrics_hash, content_hash)
+        if reused:
+            return reused
+        
+        # 4. Near-identical lyrics (radio edit, live version, provider formatting)
+        return self._lookup_near_duplicate(title, artist, lyrics_hash, lyrics)
+    
+    def _lookup_by_content(
+        self,
+        title: str,
+        artist: str,
+        lyrics_hash: str,
+        content_hash: Optional[str]
+    ) -> Optional[Dict[str, Any]]:
+        """Reuse an analysis of identical normalized lyrics, storing it under this song's key."""
+        if not self.content_dedupe or not content_hash:
+            return None
+        
+        result = self.redis_cache.get_analysis_by_content(content_hash, self.model)
+        if result is None:
+            try:
+                result = self.analysis_store.find_by_content(content_hash, self.model)
+            except Exception as e:
+                logger.warning(f"Content lookup failed: {e}. Proceeding with API call...")
+                return None
+        if not result:
+            return None
+        
+        logger.info(f"♻️ Reused analysis of identical lyrics for '{title}' by {artist}")
+        clean = {k: v for k, v in result.items() if k not in ('cache_hit', 'cache_source', 'analysis_quality')}
+        # Next lookup for this song is an exact hit
+        self._store_cached(title, artist, lyrics_hash, clean, content_hash)
+        return dict(clean, cache_hit=True, cache_source='content', analysis_quality='cached')
 
-## Critical Distinctions (Watch for Subtle Issues):
+    def _lookup_near_duplicate(
+        self,
+        title: str,
+        artist: str,
+        lyrics_hash: str,
+        lyrics: Optional[str]
+    ) -> Optional[Dict[str, Any]]:
+        """Reuse the cached analysis of the most similar indexed lyrics above the Jaccard threshold."""
+        if self.near_duplicates is None or not lyrics:
+            return None
+        
+        try:
+            matches = self.near_duplicates.find(lyrics)
+        except Exception as e:
+            logger.warning(f"Near-duplicate lookup failed: {e}. Proceeding with API call...")
+            return None
+        
+        own_key = (artist.strip(), title.strip(), lyrics_hash)
+        for match in matches:
+            if (match.artist, match.title, match.lyrics_hash) == own_key:
+                continue
+            result = self.redis_cache.get_analysis(match.artist, match.title, match.lyrics_hash, self.model)
+            if result is None:
+                try:
+                    cached = self.analysis_store.find(match.artist, match.title, match.lyrics_hash)
+                except Exception as e:
+                    logger.warning(f"Near-duplicate cache lookup failed: {e}")
+                    continue
+                if not cached or cached[1] != self.model:
+                    continue
+                result = cached[0]
+            
+            logger.info(
+                f"♻️ Reused analysis of '{match.title}' by {match.artist} for '{title}' by {artist} "
+                f"({match.similarity:.0%} similar lyrics)"
+            )
+            clean = {k: v for k, v in result.items() if k not in ('cache_hit', 'cache_source', 'analysis_quality')}
+            # Stored under this song's key only; it stays out of the content and near-duplicate indexes
+            self._store_cached(title, artist, lyrics_hash, clean)
+            return dict(
+                clean,
+                cache_hit=True,
+                cache_source='near_duplicate',
+                analysis_quality='cached',
+                near_duplicate_of={'artist': match.artist, 'title': match.title, 'similarity': match.similarity}
+            )
+        return None
+    
+    def lookup_cached_bulk(self, songs: Sequence[Tuple[str, str, str]]) -> Dict[int, Dict[str, Any]]:
+        """
+        Resolve cache hits for many songs before any API call is scheduled.
+        
+        Two round trips regardless of playlist size: one Redis MGET, then one
+        database query for the Redis misses (database hits are backfilled into
+        Redis with a single pipeline). With content dedupe enabled, a third
+        query matches the remaining songs' normalized lyrics.
+        
+        Args:
+            songs: (title, artist, lyrics) tuples
+            
+        Returns:
+            Dict mapping the index of each cached song to its analysis (misses are absent)
+        """
+        keyed = {
+            i: (artist, title, self._lyrics_hash(lyrics))
+            for i, (title, artist, lyrics) in enumerate(songs)
+            if lyrics and len(str(lyrics).strip()) > 10
+        }
+        if not keyed:
+            return {}
+        
+        # 1. Redis (L1 + MGET)
+        hits: Dict[int, Dict[str, Any]] = {}
+        redis_hits = self.redis_cache.get_analyses_bulk([key + (self.model,) for key in keyed.values()])
+        for i, key in keyed.items():
+            result = redis_hits.get(key + (self.model,))
+            if result is not None:
+                hits[i] = dict(result, analysis_quality='cached')
+        
+        # 2. Database, one query for everything Redis missed
+        remaining = {i: key for i, key in keyed.items() if i not in hits}
+        if remaining:
+            try:
+                db_hits = self.analysis_store.find_bulk(remaining.values())
+            except Exception as e:
+                logger.warning(f"Bulk cache lookup failed: {e}. Proceeding with API calls...")
+                db_hits = {}
+            
+            backfill = {}
+            for i, key in remaining.items():
+                cached = db_hits.get(key)
+                if not cached or cached[1] != self.model:
+                    continue
+                backfill[key + (self.model,)] = cached[0]
+                hits[i] = dict(cached[0], cache_hit=True, cache_source='database', analysis_quality='cached')
+            
+            if backfill:
+                self.redis_cache.set_analyses_bulk(backfill.items())
+        
+        # 3. Same lyrics cached under another artist/title
+        if self.content_dedupe:
+            misses = {i: key for i, key in keyed.items() if i not in hits}
+            hits.update(self._lookup_by_content_bulk(misses, songs))
+        
+        logger.info(f"✅ Bulk cache lookup: {len(hits)}/{len(songs)} songs cached")
+        return hits
 
-**Under-detected Concerns:**
-- **Humanistic Philosophy**: Self-empowerment, "I can do anything," bootstrap mentality WITHOUT God
-  * Flag when success/strength is attributed to self rather than God (Prov 3:5-6)
-- **Idolatry**: Elevating ANYTHING above God (romance, success, self, relationships)
-  * Flag when ultimate hope/meaning is in created things vs Creator (1 John 2:15-17)
-  
-**Over-detected (Apply Lament Filter):**
-- **Despair/Mental Health**: DON'T flag authentic lament directed toward God (Psalms)
-  * Only flag when despair has NO hope or is disconnected from God
-- **Pride**: DON'T flag confidence in God's promises or biblical boldness
-  * Only flag self-exaltation, boasting in self, arrogance
+    def _lookup_by_content_bulk(
+        self,
+        misses: Dict[int, Tuple[str, str, str]],
+        songs: Sequence[Tuple[str, str, str]]
+    ) -> Dict[int, Dict[str, Any]]:
+        """Bulk variant of _lookup_by_content: one database query, then batched writes."""
+        content_hashes = {i: lyrics_content_hash(songs[i][2]) for i in misses}
+        content_hashes = {i: h for i, h in content_hashes.items() if h}
+        if not content_hashes:
+            return {}
+        try:
+            found = self.analysis_store.find_by_content_bulk(content_hashes.values(), self.model)
+        except Exception as e:
+            logger.warning(f"Bulk content lookup failed: {e}. Proceeding with API calls...")
+            return {}
+        
+        hits: Dict[int, Dict[str, Any]] = {}
+        entries = []
+        for i, content_hash in content_hashes.items():
+            result = found.get(content_hash)
+            if not result:
+                continue
+            artist, title, lyrics_hash = misses[i]
+            clean = {k: v for k, v in result.items() if k not in ('cache_hit', 'cache_source', 'analysis_quality')}
+            entries.append({'artist': artist, 'title': title, 'lyrics_hash': lyrics_hash,
+                            'content_hash': content_hash, 'analysis_result': clean})
+            hits[i] = dict(clean, cache_hit=True, cache_source='content', analysis_quality='cached')
+        
+        if entries:
+            logger.info(f"♻️ Reused {len(entries)} analyses of identical lyrics")
+            self.redis_cache.set_analyses_bulk(
+                ((e['artist'], e['title'], e['lyrics_hash'], self.model), e['analysis_result']) for e in entries
+            )
+            try:
+                self.analysis_store.save_bulk(entries, self.model)
+            except Exception as e:
+                logger.warning(f"Failed to cache reused analyses: {e}")
+        return hits
+    
+    def _peek_published(self, title: str, artist: str, lyrics_hash: str) -> Optional[Dict[str, Any]]:
+        """Check Redis for a result published by the worker holding the analysis lease."""
+        result = self.redis_cache.get_analysis(artist, title, lyrics_hash, self.model)
+        if result:
+            logger.info(f"✅ Reused in-flight analysis from another worker for '{title}' by {artist}")
+            result['analysis_quality'] = 'cached'
+        return result
 
-**Other Edge Cases:**
-- **Common Grace**: Secular songs with biblical values (kindness, community, integrity) score 60-75
-- **Vague Spirituality Cap**: God/spiritual language with unclear theology = MAX 45 score
-- **Character Voice**: Story songs/cautionary tales get 30% penalty reduction
-- **Scripture Required**: EVERY analysis needs 1-4 scripture references
+    def _store_cached(
+        self,
+        title: str,
+        artist: str,
+        lyrics_hash: str,
+        normalized: Dict[str, Any],
+        content_hash: Optional[str] = None,
+        lyrics: Optional[str] = None,
+        model: Optional[str] = None
+    ) -> None:
+        """
+        Cache a fresh analysis in both Redis and the database (Redis only when
+        persist_to_database is off), with its content index entries and (given
+        the lyrics) its near-duplicate signature. `model` is the model that
+        answered (defaults to self.model; an endpoint may override it).
+        """
+        model = model or self.model
+        try:
+            # Cache in Redis (fast tier)
+            self.redis_cache.set_analysis(artist, title, lyrics_hash, model, normalized, content_hash=content_hash)
+            
+            if self.persist_to_database:
+                # Cache in Database (persistent tier)
+                self.analysis_store.save(artist, title, lyrics_hash, normalized, model, content_hash=content_hash)
+                logger.info(f"💾 Cached analysis for '{title}' by {artist} (Redis + Database)")
+            else:
+                logger.info(f"💾 Staged analysis for '{title}' by {artist} under {model} (Redis)")
+        except Exception as e:
+            logger.warning(f"Failed to cache analysis: {e}")
+        
+        if lyrics and self.near_duplicates is not None:
+            try:
+                self.near_duplicates.add(artist, title, lyrics_hash, lyrics)
+            except Exception as e:
+                logger.warning(f"Failed to index lyrics signature: {e}")
 
-## Scoring Guidelines (Use Full 0-100 Scale):
-**Avoid clustering at exact boundaries (40, 45, 60, 85). Use the full range:**
+    def _cached_response(self, payload: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """
+        Replay the response to an identical earlier request from the on-disk response cache.
 
-- **85-100** (freely_listen): Biblically sound, theologically clear, spiritually edifying
-- **70-84** (context_required): Helpful themes with minor theological gaps or ambiguity
-- **60-69** (context_required): Mixed content with redeemable elements but requiring careful discernment
-- **50-59** (caution_limit): **BORDERLINE** - Significant concerns BUT meaningful positive themes
-  * Use 50-59 for songs with BOTH problems AND redeeming value
-  * Example: Self-reliance message BUT genuine perseverance theme
-  * Example: Vague spirituality BUT authentic hope and community
-- **40-49** (caution_limit): More concerns than positive content, limited spiritual value
-- **0-39** (avoid_formation): Harmful to spiritual formation, contrary to biblical teaching
+        Entries are keyed by the request as sent (after the endpoint's model
+        override), so the request each endpoint would send is looked up.
 
-## Formation Risk:
-- **very_low**: Minimal spiritual concerns
-- **low**: Minor concerns, generally safe
-- **high**: Significant formation risks
-- **critical**: Severe spiritual dangers
+        Returns:
+            (response or None, model the cached response was requested from)
+        """
+        if self.response_cache is None:
+            return None, None
+        requests: Dict[str, Dict[str, Any]] = {}
+        for endpoint in self.llm_router.endpoints:
+            request = endpoint.prepare_payload(payload)
+            requests.setdefault(request["model"], request)
+        for model, request in requests.items():
+            data = self.response_cache.get(request)
+            if data is not None:
+                logger.info(f"♻️ Response cache hit for {model}")
+                # Tokens were accounted when the response was generated
+                return dict(data, usage=None), model
+        return None, None
 
-Return ONLY this JSON (no prose, no markdown):
+    def _remember_response(self, payload: Dict[str, Any], data: Dict[str, Any]) -> None:
+        if self.response_cache is not None:
+            self.response_cache.set(payload, data)
 
-{
-  "score": 0-100,
-  "verdict": "freely_listen|context_required|caution_limit|avoid_formation",
-  "formation_risk": "very_low|low|high|critical",
-  "narrative_voice": "artist|character|ambiguous",
-  "lament_filter_applied": true/false,
-  "themes_positive": [{"theme": "name", "points": int, "scripture": "ref"}],
-  "themes_negative": [{"theme": "name", "penalty": int, "scripture": "ref"}],
-  "concerns": [{"category": "name", "severity": "low|medium|high|critical", "explanation": "brief"}],
-  "scripture_references": ["ref1", "ref2"],
-  "analysis": "1-2 sentence summary of spiritual core and formation guidance"
-}"""
+    def _build_request(self, title: str, artist: str, lyrics: str) -> Tuple[str, Dict[str, Any], Dict[str, str]]:
+        """
+        Build the chat completions request for a song.
+        
+        Returns:
+            Tuple of (url, payload, headers)
+        """
+        prepared = self.lyrics_preprocessor.prepare(lyrics)
+        if prepared.tokens_saved or prepared.truncated_lines:
+            logger.info(
+                f"✂️ Lyrics for '{title}' by {artist}: {prepared.original_tokens} → "
+                f"{prepared.prepared_tokens} tokens ({prepared.repeats_collapsed} repeats collapsed, "
+                f"{prepared.truncated_lines} lines truncated)"
+            )
+        user = f"Song: {title} — {artist}\n\nLyrics:\n{prepared.text}"
+        
+        payload = dict(self._payload_base)
+        # Static prefix first, variable song content last
+        payload["messages"] = [_SYSTEM_MESSAGE, {"role": "user", "content": user}]
+        return self._chat_url, payload, self._headers
+
+    def _stream_completion(
+        self,
+        url: str,
+        payload: Dict[str, Any],
+        headers: Dict[str, str],
+        on_partial: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Run a streaming chat completion and reassemble it into a regular response body.
+        
+        Content deltas are parsed incrementally; once every EARLY_FIELDS value is
+        complete, on_partial receives them while the rest is still generating.
+        
+        Returns:
+            Response body shaped like a non-streaming completion (model, choices, usage)
+        """
+        payload = dict(payload, stream=True, stream_options={"include_usage": True})
+        parser = IncrementalJSONParser() if on_partial else None
+        content = []
+        model = None
+        usage = None
+        
+        with self.http_client.stream(url, json=payload, headers=headers, timeout=self.timeout) as resp:
+            if resp.status_code >= 400:
+                resp.read()  # Make the error body available to callers
+                resp.raise_for_status()
+            
+            for event in iter_sse_events(resp.iter_lines()):
+                model = event.get("model") or model
+                usage = event.get("usage") or usage
+                for choice in event.get("choices") or []:
+                    delta = (choice.get("delta") or {}).get("content")
+                    if not delta:
+                        continue
+                    content.append(delta)
+                    if parser is not None and parser.feed(delta) and all(f in parser.fields for f in EARLY_FIELDS):
+                        early = {f: parser.fields[f] for f in EARLY_FIELDS}
+                        parser = None  # Report once
+                        try:
+                            on_partial(early)
+                        except Exception as e:
+                            logger.warning(f"Partial result callback failed: {e}")
+        
+        return {
+            "model": model or self.model,
+            "choices": [{"message": {"content": "".join(content)}}],
+            "usage": usage,
+        }
+
+    def _process_response(self, data: Dict[str, Any], batch: bool = False) -> Dict[str, Any]:
+        """
+        Parse a chat completions response body into the normalized analysis schema.
+        
+        Args:
+            data: Response body
+            batch: Response came from the Batch API (tracked separately in the token ledger)
+        """
+        self.token_ledger.record(data.get("model") or self.model, parse_usage(data), batch=batch)
+        content = (data.get("choices", [{}])[0] or {}).get("message", {}).get("content", "{}")
+        parsed = self._parse_or_repair_json(content)
+        normalized = self._normalize_output(parsed)
+        normalized['cache_hit'] = False
+        normalized['analysis_quality'] = 'full'  # Mark as full quality
+        
+        logger.info(f"✅ Analysis complete: Score={normalized.get('score')}, Verdict={normalized.get('verdict')}")
+        return normalized
+
+    def _get_comprehensive_system_prompt(self) -> str:
+        return SYSTEM_PROMPT
 
     def _parse_or_repair_json(self, text: Any) -> Dict[str, Any]:
         if isinstance(text, dict):
@@ -0,0 +1,148 @@
+"""
+Streaming chat completion helpers
+
+- iter_sse_events: decode `data:` lines of an OpenAI-compatible SSE stream
+- IncrementalJSONParser: report top-level fields of a JSON object as soon as
+  each value is complete, while the rest of the object is still streaming
+
+The analyzer schema puts `score` and `verdict` first, so they are available
+long before the `analysis` text and scripture lists finish generating.
+"""
+
+import json
+import logging
+from typing import Any, Dict, Iterable, Iterator
+
+logger = logging.getLogger(__name__)
+
+
+def iter_sse_events(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """
+    Yield decoded JSON events from server-sent event lines.
+
+    Args:
+        lines: Response lines (e.g. httpx.Response.iter_lines())
+
+    Yields:
+        Parsed `data:` payloads, stopping at `data: [DONE]`
+    """
+    for line in lines:
+        if not line or not line.startswith("data:"):
+            continue  # blank separators, comments, event:/id: fields
+        data = line[5:].strip()
+        if data == "[DONE]":
+            return
+        try:
+            yield json.loads(data)
+        except ValueError:
+            logger.warning(f"Skipping malformed SSE event: {data[:100]}")
+
+
+class IncrementalJSONParser:
+    """
+    Incremental parser for one JSON object fed in arbitrary text chunks.
+
+    Tracks string/escape state and nesting depth so that only top-level
+    key/value pairs are reported; nested objects and arrays are returned
+    whole once their closing bracket and the following delimiter arrive.
+    Text before the opening brace (e.g. a markdown fence) is ignored.
+    """
+
+    def __init__(self):
+        self.fields: Dict[str, Any] = {}
+        self.complete = False
+        self._buf = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._state = "key"  # key -> colon -> value
+        self._key_start = None
+        self._key = None
+        self._value_start = None
+
+    def feed(self, chunk: str) -> Dict[str, Any]:
+        """
+        Consume more text.
+
+        Args:
+            chunk: Next piece of the streamed content
+
+        Returns:
+            Top-level fields completed by this chunk (empty dict if none)
+        """
+        completed: Dict[str, Any] = {}
+        if self.complete or not chunk:
+            return completed
+
+        self._buf += chunk
+        buf = self._buf
+        while self._pos < len(buf):
+            ch = buf[self._pos]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._state == "key" and self._key_start is not None:
+                        self._key = json.loads(buf[self._key_start:self._pos + 1])
+                        self._key_start = None
+                        self._state = "colon"
+
+            elif self._depth == 0:
+                if ch == "{":
+                    self._depth = 1
+                    self._state = "key"
+
+            elif ch == '"':
+                self._in_string = True
+                if self._depth == 1:
+                    if self._state == "key":
+                        self._key_start = self._pos
+                    elif self._state == "value" and self._value_start is None:
+                        self._value_start = self._pos
+
+            elif ch in "{[":
+                if self._depth == 1 and self._state == "value" and self._value_start is None:
+                    self._value_start = self._pos
+                self._depth += 1
+
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._finish_value(completed)
+                    self.complete = True
+                    self._pos += 1
+                    break
+
+            elif self._depth == 1:
+                if ch == ":" and self._state == "colon":
+                    self._state = "value"
+                    self._value_start = None
+                elif ch == ",":
+                    self._finish_value(completed)
+                    self._state = "key"
+                elif self._state == "value" and self._value_start is None and not ch.isspace():
+                    self._value_start = self._pos  # number, true/false/null
+
+            self._pos += 1
+
+        return completed
+
+    def _finish_value(self, completed: Dict[str, Any]) -> None:
+        """Decode the value between value_start and the current delimiter."""
+        if self._state != "value" or self._key is None or self._value_start is None:
+            return
+        raw = self._buf[self._value_start:self._pos].strip()
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            logger.debug(f"Incremental JSON: could not decode value for '{self._key}'")
+        else:
+            self.fields[self._key] = value
+            completed[self._key] = value
+        self._key = None
+        self._value_start = None
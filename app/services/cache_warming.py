@@ -0,0 +1,237 @@
+"""
+Analysis Cache Warming
+
+Changing OPENAI_MODEL misses every cached analysis (Redis keys and
+AnalysisCache.model_version are per model). Warming pre-analyzes the most
+popular songs under the incoming model so the day after a rollout is served
+from cache instead of the API.
+
+1. rank_popular_songs(): songs with lyrics, ordered by how many users and
+   playlists contain them (PlaylistSong join counts)
+2. warm_analysis_cache(): analyzes the top N not yet warm under the new model
+   at background priority on the shared rate limiter, so interactive analyses
+   keep their reserve. Results are staged in Redis only: AnalysisCache keeps one
+   row per song, which must stay on the live model until the switch. Only
+   LLM_ENDPOINTS entries serving the new model are used (an endpoint-level
+   "model" override would answer with another model)
+3. get_warm_coverage(): share of the top N (by songs and by playlist
+   placements) already warm - check this before flipping OPENAI_MODEL
+4. promote_warm_analyses(): after the switch, copy the staged results into
+   AnalysisCache so they outlive the Redis TTL
+
+Run with scripts/warm_analysis_cache.py or app.queue.enqueue_cache_warming().
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import func
+
+from ..extensions import db
+from ..models.models import Playlist, PlaylistSong, Song
+from ..utils.app_context import ensure_app_context
+from ..utils.openai_rate_limiter import background_priority
+from ..utils.redis_cache import get_redis_cache
+from .analyzers.analysis_store import AnalysisStore
+from .analyzers.lyrics_preprocessor import lyrics_content_hash
+from .analyzers.router_analyzer import RouterAnalyzer
+
+logger = logging.getLogger(__name__)
+
+SongKey = Tuple[str, str, str]  # (artist, title, lyrics_hash)
+
+
+@dataclass
+class PopularSong:
+    """A song ranked for warming, detached from the database session."""
+    song_id: int
+    title: str
+    artist: str
+    lyrics: str
+    users: int
+    playlists: int
+
+    @property
+    def key(self) -> SongKey:
+        return (self.artist, self.title, RouterAnalyzer._lyrics_hash(self.lyrics))
+
+
+def rank_popular_songs(limit: int = 500) -> List[PopularSong]:
+    """
+    Rank songs with lyrics by distinct users, then distinct playlists, containing them.
+
+    Args:
+        limit: Number of songs to return
+
+    Returns:
+        Most popular songs first
+    """
+    users = func.count(func.distinct(Playlist.owner_id))
+    playlists = func.count(func.distinct(PlaylistSong.playlist_id))
+
+    with ensure_app_context():
+        rows = (
+            db.session.query(Song.id, Song.title, Song.artist, Song.lyrics, users, playlists)
+            .join(PlaylistSong, PlaylistSong.song_id == Song.id)
+            .join(Playlist, Playlist.id == PlaylistSong.playlist_id)
+            .filter(Song.lyrics.isnot(None), func.length(Song.lyrics) > 10)
+            .group_by(Song.id)
+            .order_by(users.desc(), playlists.desc(), Song.id)
+            .limit(limit)
+            .all()
+        )
+    return [PopularSong(*row) for row in rows]
+
+
+def _warm_keys(songs: List[PopularSong], model: str, redis_cache=None, store=None) -> Set[SongKey]:
+    """Keys already cached under the model, staged in Redis or promoted to the database."""
+    redis_cache = redis_cache or get_redis_cache()
+    store = store or AnalysisStore()
+    keys = list(dict.fromkeys(song.key for song in songs))
+
+    warm = {key[:3] for key in redis_cache.get_analyses_bulk(key + (model,) for key in keys)}
+    cold = [key for key in keys if key not in warm]
+    if cold:
+        try:
+            warm.update(key for key, (_, cached_model) in store.find_bulk(cold).items() if cached_model == model)
+        except Exception as e:
+            logger.warning(f"Database coverage lookup failed: {e}")
+    return warm
+
+
+def _coverage(songs: List[PopularSong], warm: Set[SongKey], model: str) -> Dict[str, Any]:
+    placements = sum(song.playlists for song in songs)
+    warm_songs = [song for song in songs if song.key in warm]
+    warm_placements = sum(song.playlists for song in warm_songs)
+    return {
+        'model': model,
+        'songs': len(songs),
+        'warm_songs': len(warm_songs),
+        'coverage_percent': round(len(warm_songs) / len(songs) * 100, 1) if songs else 100.0,
+        'placements': placements,
+        'warm_placements': warm_placements,
+        'placement_coverage_percent': round(warm_placements / placements * 100, 1) if placements else 100.0,
+    }
+
+
+def get_warm_coverage(model: str, limit: int = 500) -> Dict[str, Any]:
+    """
+    Report how much of the popular catalog is already cached under a model.
+
+    Args:
+        model: Model about to be rolled out
+        limit: Number of popular songs considered
+
+    Returns:
+        Song and playlist-placement coverage of the top `limit` songs
+    """
+    songs = rank_popular_songs(limit)
+    return _coverage(songs, _warm_keys(songs, model), model)
+
+
+def warm_analysis_cache(
+    model: str,
+    limit: int = 500,
+    concurrency: int = 4,
+    analyzer: Optional[RouterAnalyzer] = None
+) -> Dict[str, Any]:
+    """
+    Pre-analyze the most popular songs under a model before it goes live.
+
+    Args:
+        model: Model about to be rolled out
+        limit: Number of popular songs to warm
+        concurrency: Songs analyzed in parallel (the rate limiter still applies)
+        analyzer: Analyzer to use (defaults to a RouterAnalyzer for `model`)
+
+    Returns:
+        Summary with analyzed/degraded counts and coverage after warming
+
+    Raises:
+        ValueError: No LLM endpoint serves the analyzer's model
+    """
+    analyzer = analyzer or RouterAnalyzer(model=model)
+    analyzer.persist_to_database = False
+    analyzer.llm_router = analyzer.llm_router.serving(analyzer.model)
+
+    with ensure_app_context() as app:
+        songs = rank_popular_songs(limit)
+        warm = _warm_keys(songs, model, analyzer.redis_cache, analyzer.analysis_store)
+        cold = list({song.key: song for song in songs if song.key not in warm}.values())
+        logger.info(f"🔥 Warming {len(cold)} of the top {len(songs)} songs under {model} "
+                    f"({len(songs) - len(cold)} already warm)")
+
+        def analyze(song: PopularSong) -> Optional[Dict[str, Any]]:
+            try:
+                # Worker threads don't inherit the app context; push the caller's app
+                with app.app_context(), background_priority():
+                    return analyzer.analyze_song(song.title, song.artist, song.lyrics)
+            except Exception as e:
+                logger.warning(f"Warming failed for '{song.title}' by {song.artist}: {e}")
+                return None
+
+        results = []
+        if cold:
+            with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+                results = list(executor.map(analyze, cold))
+
+    for song, result in zip(cold, results):
+        if result and result.get('analysis_quality') != 'degraded':
+            warm.add(song.key)
+
+    summary = {
+        'analyzed': sum(1 for r in results if r and r.get('analysis_quality') == 'full'),
+        'reused': sum(1 for r in results if r and r.get('analysis_quality') == 'cached'),
+        'failed': sum(1 for r in results if not r or r.get('analysis_quality') == 'degraded'),
+        'already_warm': len(songs) - len(cold),
+        'coverage': _coverage(songs, warm, model),
+    }
+    logger.info(
+        f"🔥 Warming done: {summary['analyzed']} analyzed, {summary['reused']} reused, "
+        f"{summary['failed']} failed; coverage {summary['coverage']['coverage_percent']}%"
+    )
+    return summary
+
+
+def promote_warm_analyses(model: str, limit: int = 500) -> int:
+    """
+    Copy analyses staged in Redis into AnalysisCache once `model` is live.
+
+    Args:
+        model: Model now configured as OPENAI_MODEL
+        limit: Number of popular songs considered
+
+    Returns:
+        Number of database rows written
+    """
+    redis_cache = get_redis_cache()
+    store = AnalysisStore()
+    songs = {song.key: song for song in rank_popular_songs(limit)}
+
+    staged = redis_cache.get_analyses_bulk(key + (model,) for key in songs)
+    promoted = {key[:3] for key, (_, cached_model) in store.find_bulk(songs).items() if cached_model == model}
+    entries = []
+    for key, result in staged.items():
+        key = key[:3]
+        if key in promoted:
+            continue
+        entries.append({
+            'artist': key[0],
+            'title': key[1],
+            'lyrics_hash': key[2],
+            'content_hash': lyrics_content_hash(songs[key].lyrics),
+            'analysis_result': {k: v for k, v in result.items()
+                                if k not in ('cache_hit', 'cache_source', 'analysis_quality')},
+        })
+
+    written = store.save_bulk(entries, model) if entries else 0
+    logger.info(f"💾 Promoted {written} warmed analyses for {model} to the database")
+    return written
+
+
+def run_cache_warming(model: str, limit: int = 500, concurrency: int = 4) -> Dict[str, Any]:
+    """Background job: warm the cache for `model` (see warm_analysis_cache)."""
+    with ensure_app_context():
+        return warm_analysis_cache(model, limit=limit, concurrency=concurrency)
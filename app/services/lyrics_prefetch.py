@@ -0,0 +1,198 @@
+"""
+Lyrics Prefetch
+
+analyze_song_complete fetches missing lyrics right before the LLM call, so a
+slow lyric site holds an analysis worker and an OpenAI concurrency slot. With
+LYRICS_PREFETCH=true the lyrics are fetched in a separate stage right after
+PlaylistSyncService.sync_playlist_tracks instead:
+
+1. Songs of the synced playlist without lyrics are looked up in LyricsCache in
+   bulk; cached lyrics are copied into Song.lyrics and fresh negative entries
+   are skipped
+2. The rest are fetched on one event loop (LyricsFetcher.fetch_lyrics_many) with
+   bounded concurrency (LYRICS_PREFETCH_CONCURRENCY), each provider behind its
+   own token bucket (LYRICS_PREFETCH_PROVIDER_RPS)
+3. Results land in Song.lyrics and LyricsCache (positive and negative, through
+   the background cache writer, flushed at the end of the stage), so
+   analysis only reads local lyrics (see local_lyrics())
+"""
+
+import logging
+import os
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from ..extensions import db
+from ..models.models import LyricsCache, Song
+from ..utils.app_context import ensure_app_context
+from ..utils.lyrics.lyrics_fetcher import LyricsFetcher
+from ..utils.lyrics_config import get_config, parse_provider_rates
+
+logger = logging.getLogger(__name__)
+
+# Requests per second per provider (LRCLib has no published limit, Genius is the strictest)
+DEFAULT_PROVIDER_RPS = {"LRCLibProvider": 5.0, "LyricsOvhProvider": 2.0, "GeniusProvider": 1.0}
+MIN_LYRICS_LENGTH = 10  # Same threshold analysis uses for "has lyrics"
+
+
+def lyrics_prefetch_enabled() -> bool:
+    """LYRICS_PREFETCH: fetch lyrics after playlist sync instead of during analysis."""
+    return os.environ.get("LYRICS_PREFETCH", "false").lower() in ("1", "true", "yes")
+
+
+def _prefetch_concurrency() -> int:
+    try:
+        return max(1, int(os.environ.get("LYRICS_PREFETCH_CONCURRENCY", "8")))
+    except ValueError:
+        return 8
+
+
+def _provider_rps() -> Dict[str, float]:
+    """LYRICS_PREFETCH_PROVIDER_RPS ("LRCLibProvider=5,GeniusProvider=1") over the defaults."""
+    return {**DEFAULT_PROVIDER_RPS, **parse_provider_rates(os.environ.get("LYRICS_PREFETCH_PROVIDER_RPS", ""))}
+
+
+def _needs_lyrics(song: Song) -> bool:
+    return not isinstance(song.lyrics, str) or len(song.lyrics.strip()) <= MIN_LYRICS_LENGTH
+
+
+def _cache_pair(song: Song) -> Tuple[str, str]:
+    """LyricsCache (artist, title) as written by LyricsFetcher (lower-cased)."""
+    return song.artist.lower().strip(), song.title.lower().strip()
+
+
+def _is_negative(row: LyricsCache) -> bool:
+    return row.source == "negative_cache" or not row.lyrics
+
+
+def _is_fresh(row: LyricsCache, ttl: int) -> bool:
+    retrieved_at = row.retrieved_at
+    if retrieved_at is None:
+        return False
+    if retrieved_at.tzinfo is None:
+        retrieved_at = retrieved_at.replace(tzinfo=timezone.utc)
+    return datetime.now(timezone.utc) - retrieved_at < timedelta(seconds=ttl)
+
+
+def build_prefetch_fetcher(fetcher: Optional[LyricsFetcher] = None) -> LyricsFetcher:
+    """
+    Build a LyricsFetcher with a token bucket per provider.
+
+    Args:
+        fetcher: Fetcher to adapt (defaults to a new LyricsFetcher whose global
+            limiter allows the sum of the provider rates)
+
+    Returns:
+        The fetcher with per-provider rate limits set
+    """
+    rates = _provider_rps()
+    if fetcher is None:
+        # The per-provider buckets are the limit here; size the fetcher-wide limiter to their sum
+        total = sum(rates.values())
+        config = replace(
+            get_config(),
+            provider_rate_limits=rates,
+            token_bucket_capacity=max(1, int(total)),
+            token_bucket_refill_rate=total,
+            rate_limit_max_requests=max(1, int(total * get_config().rate_limit_window_size)),
+        )
+        fetcher = LyricsFetcher(config=config)
+    fetcher.set_provider_rate_limits(rates)
+    return fetcher
+
+
+def local_lyrics(title: str, artist: str) -> Tuple[bool, Optional[str]]:
+    """
+    Read lyrics recorded by prefetch (or an earlier fetch) from LyricsCache.
+
+    Args:
+        title: Song title
+        artist: Artist name
+
+    Returns:
+        (known, lyrics): known is False when no fetch has recorded the song yet;
+        lyrics is None for songs known to have none
+    """
+    row = LyricsCache.find_cached_lyrics(artist.lower(), title.lower())
+    if row is None:
+        return False, None
+    return True, (None if _is_negative(row) else row.lyrics)
+
+
+def prefetch_lyrics(
+    songs: Iterable[Song],
+    concurrency: Optional[int] = None,
+    fetcher: Optional[LyricsFetcher] = None
+) -> Dict[str, Any]:
+    """
+    Fill in lyrics for songs that have none, ahead of analysis.
+
+    Args:
+        songs: Songs to check (those that already have lyrics are skipped)
+        concurrency: Songs fetched in parallel (defaults to LYRICS_PREFETCH_CONCURRENCY)
+        fetcher: Fetcher to use (defaults to a per-provider rate-limited LyricsFetcher)
+
+    Returns:
+        Counts: from_cache, fetched, not_found, skipped_negative, failed
+    """
+    summary = {"from_cache": 0, "fetched": 0, "not_found": 0, "skipped_negative": 0, "failed": 0}
+    missing = [song for song in songs if _needs_lyrics(song) and song.title and song.artist]
+    if not missing:
+        return summary
+
+    with ensure_app_context():
+        fetcher = build_prefetch_fetcher(fetcher)
+        negative_ttl = fetcher.config.negative_cache_ttl
+
+        rows = LyricsCache.find_cached_bulk([_cache_pair(song) for song in missing])
+        to_fetch: Dict[Tuple[str, str], List[Song]] = {}
+        for song in missing:
+            row = rows.get(_cache_pair(song))
+            if row is not None and not _is_negative(row):
+                song.lyrics = row.lyrics
+                summary["from_cache"] += 1
+            elif row is not None and _is_fresh(row, negative_ttl):
+                summary["skipped_negative"] += 1
+            else:
+                # Songs sharing artist/title (other releases) are fetched once
+                to_fetch.setdefault(_cache_pair(song), []).append(song)
+
+        if to_fetch:
+            logger.info(f"🎵 Prefetching lyrics for {len(to_fetch)} songs "
+                        f"({summary['from_cache']} from cache, {summary['skipped_negative']} known missing)")
+            groups = list(to_fetch.values())
+            try:
+                # One event loop and one pooled HTTP client for the whole batch; results
+                # (positive and negative) are written to LyricsCache by the fetcher
+                results = fetcher.fetch_lyrics_bulk(
+                    [(group[0].title, group[0].artist) for group in groups],
+                    concurrency=concurrency or _prefetch_concurrency(),
+                    force_refresh=True,
+                )
+                # Negative entries must be visible before analysis is queued
+                fetcher.flush_cache_batch()
+            except Exception as e:
+                logger.warning(f"Lyrics prefetch failed: {e}")
+                results = None
+
+            for i, group in enumerate(groups):
+                lyrics = results[i] if results is not None else None
+                if results is None:
+                    summary["failed"] += len(group)
+                elif lyrics and len(lyrics.strip()) > MIN_LYRICS_LENGTH:
+                    for song in group:
+                        song.lyrics = lyrics
+                    summary["fetched"] += len(group)
+                else:
+                    summary["not_found"] += len(group)
+
+        try:
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Failed to store prefetched lyrics: {e}")
+            raise
+
+    logger.info(f"🎵 Lyrics prefetch done: {summary}")
+    return summary
@@ -11,6 +11,7 @@ from typing import Any, Dict, Optional
 
 from .. import db
 from ..models.models import Playlist, PlaylistSong, Song, User
+from .lyrics_prefetch import lyrics_prefetch_enabled, prefetch_lyrics
 
 # Removed: from ..utils.spotify import get_user_playlists, get_playlist_tracks - these functions don't exist
 
@@ -251,12 +252,15 @@ class PlaylistSyncService:
                 # Commit all changes in single transaction
                 db.session.commit()
 
-                return {
+                result = {
                     "status": "completed",
                     "tracks_synced": tracks_synced,
                     "new_tracks": new_tracks,
                     "playlist_id": playlist.id,
                 }
+                if lyrics_prefetch_enabled():
+                    result["lyrics_prefetch"] = self._prefetch_playlist_lyrics(added_song_ids)
+                return result
 
             except Exception as e:
                 # Rollback the entire transaction on any failure
@@ -281,6 +285,16 @@ class PlaylistSyncService:
                 "playlist_id": playlist.id,
             }
 
+    def _prefetch_playlist_lyrics(self, song_ids) -> Optional[Dict[str, Any]]:
+        """Fetch lyrics for synced songs that have none, so analysis never waits on lyric sites."""
+        try:
+            songs = Song.query.filter(Song.id.in_(list(song_ids))).all() if song_ids else []
+            return prefetch_lyrics(songs)
+        except Exception as e:
+            # Analysis still falls back to fetching lyrics itself
+            self.logger.warning(f"Lyrics prefetch failed: {e}")
+            return None
+
     def _sync_single_playlist(
         self, user: User, spotify_playlist: Dict[str, Any]
     ) -> Optional[Playlist]:
@@ -13,8 +13,7 @@ from datetime import datetime, timedelta, timezone
 from enum import Enum
 from typing import Any, Callable, Dict, List, Optional
 
-import redis
-from flask import current_app
+from app.utils.redis_pool import get_redis_manager, resolve_redis_url
 
 
 # Local enum definitions (queue system removed)
@@ -45,6 +44,7 @@ class ProgressUpdate:
     current_step: Optional[str] = None
     total_steps: Optional[int] = None
     step_progress: Optional[float] = None
+    partial_result: Optional[Dict[str, Any]] = None
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization"""
@@ -56,6 +56,7 @@ class ProgressUpdate:
             "current_step": self.current_step,
             "total_steps": self.total_steps,
             "step_progress": self.step_progress,
+            "partial_result": self.partial_result,
         }
 
     @classmethod
@@ -70,6 +71,7 @@ class ProgressUpdate:
             current_step=data.get("current_step"),
             total_steps=data.get("total_steps"),
             step_progress=data.get("step_progress"),
+            partial_result=data.get("partial_result"),
         )
 
 
@@ -86,6 +88,7 @@ class JobProgress:
     current_step: Optional[str] = None
     step_progress: Optional[float] = None
     current_message: Optional[str] = None
+    partial_result: Optional[Dict[str, Any]] = None  # Fields available before the job completes
 
     @property
     def current_progress(self) -> float:
@@ -140,6 +143,7 @@ class JobProgress:
             "current_step": self.current_step,
             "step_progress": self.step_progress,
             "current_message": self.current_message,
+            "partial_result": self.partial_result,
             "is_complete": self.is_complete,
             "eta_seconds": self.calculate_eta(),
         }
@@ -160,6 +164,7 @@ class JobProgress:
             current_step=data.get("current_step"),
             step_progress=data.get("step_progress"),
             current_message=data.get("current_message"),
+            partial_result=data.get("partial_result"),
         )
 
         return progress
@@ -216,45 +221,16 @@ class ProgressPersistence:
     """Handles persistence of progress data in Redis"""
 
     def __init__(self):
-        self._redis = None
+        self._redis = None  # Injected client; the shared pool is used otherwise
         self.key_prefix = "progress:"
         self.ttl_seconds = 86400  # 24 hours
 
     @property
     def redis(self):
-        """Lazy initialization of Redis connection"""
-        if self._redis is None:
-            try:
-                # Try to get Redis URL from Flask config first
-                redis_url = current_app.config.get("RQ_REDIS_URL") or current_app.config.get(
-                    "REDIS_URL"
-                )
-                if not redis_url:
-                    # Fallback to environment variables
-                    import os
-
-                    redis_url = os.environ.get("REDIS_URL") or os.environ.get(
-                        "RQ_REDIS_URL", "redis://redis:6379/0"
-                    )
-
-                self._redis = redis.Redis.from_url(redis_url, decode_responses=True)
-                # Test the connection
-                self._redis.ping()
-                logger.debug(f"Connected to Redis at {redis_url}")
-            except RuntimeError:
-                # No Flask context, use environment variables
-                import os
-
-                redis_url = os.environ.get("REDIS_URL") or os.environ.get(
-                    "RQ_REDIS_URL", "redis://redis:6379/0"
-                )
-                self._redis = redis.Redis.from_url(redis_url, decode_responses=True)
-                logger.debug(f"Connected to Redis (no Flask context) at {redis_url}")
-            except Exception as e:
-                logger.error(f"Failed to connect to Redis: {e}")
-                # Create a dummy Redis client that will fail gracefully
-                self._redis = None
-        return self._redis
+        """Shared pooled Redis client (None while Redis is unavailable)"""
+        if self._redis is not None:
+            return self._redis
+        return get_redis_manager(resolve_redis_url()).get_client(decode_responses=True)
 
     def save_progress(self, progress: JobProgress) -> None:
         """Save job progress to Redis"""
@@ -344,6 +320,7 @@ class ProgressTracker:
         step_progress: float = None,
         message: str = None,
         total_items: int = None,
+        partial_result: Dict[str, Any] = None,
     ) -> Optional[ProgressUpdate]:
         """Update job progress and notify subscribers"""
         progress = self.active_jobs.get(job_id)
@@ -363,6 +340,9 @@ class ProgressTracker:
         if current_step is not None:
             progress.update_step(current_step, step_progress or 0.0, message)
 
+        if partial_result:
+            progress.partial_result = {**(progress.partial_result or {}), **partial_result}
+
         # Create progress update
         update = ProgressUpdate(
             job_id=job_id,
@@ -373,6 +353,7 @@ class ProgressTracker:
             current_step=progress.current_step,
             total_steps=None,  # Could be enhanced to track analysis steps
             step_progress=progress.step_progress,
+            partial_result=progress.partial_result,
         )
 
         # Save to persistence
@@ -470,6 +451,11 @@ class ProgressTracker:
             self.complete_job_tracking(job_id, success=False)
 
 
+def song_analysis_job_id(song_id: int) -> str:
+    """Progress job ID for a single-song analysis"""
+    return f"song_analysis_{song_id}"
+
+
 # Global progress tracker instance
 _progress_tracker: Optional[ProgressTracker] = None
 
@@ -1,5 +1,7 @@
  
+import asyncio
 import logging
+import os
 import threading
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
@@ -7,7 +9,11 @@ from sqlalchemy import func
 
 from .. import db
 from ..models import AnalysisResult, Song
+from ..utils.redis_cache import get_redis_cache
 from .analyzer_cache import get_shared_analyzer, is_analyzer_ready
+from .analyzers.lyrics_preprocessor import lyrics_content_hash
+from .lyrics_prefetch import local_lyrics, lyrics_prefetch_enabled
+from .progress_tracker import JobType, get_progress_tracker, song_analysis_job_id
 from .simplified_christian_analysis_service import SimplifiedChristianAnalysisService
 
 try:
@@ -52,15 +58,65 @@ class UnifiedAnalysisService:
             self.logger.error(f"Failed to schedule retry for song {song_id}: {e}")
             return None
 
-    def analyze_song(self, song_id, user_id=None):
+    def analyze_song(self, song_id, user_id=None, track_progress=False):
+        """
+        Analyze one song and store the result.
+
+        Args:
+            song_id: Song to analyze
+            user_id: Requesting user (optional)
+            track_progress: Publish progress (and streamed score/verdict) to the
+                progress tracker for /api/songs/<id>/analysis-status
+        """
         self.logger.info(f"Analyzing song with ID: {song_id}")
         song = db.session.get(Song, song_id)
         if not song:
             raise ValueError(f"Song with ID {song_id} not found")
 
-        analysis_data = self.analyze_song_complete(song, force=True, user_id=user_id)
+        if not track_progress:
+            analysis_data = self.analyze_song_complete(song, force=True, user_id=user_id)
+            analysis = self._apply_analysis_result(song_id, analysis_data)
+            db.session.commit()
+            return analysis
+
+        tracker = get_progress_tracker()
+        job_id = song_analysis_job_id(song_id)
+        tracker.start_job_tracking(job_id, JobType.SONG_ANALYSIS, total_items=1)
+        tracker.update_job_progress(job_id, current_step="analyzing", step_progress=0.0,
+                                    message=f"Analyzing '{song.title}'")
+
+        def on_partial(fields):
+            tracker.update_job_progress(
+                job_id,
+                current_step="verdict_ready",
+                step_progress=0.5,
+                message="Verdict ready, finishing analysis",
+                partial_result=fields,
+            )
+
+        success = False
+        try:
+            analysis_data = self.analyze_song_complete(
+                song, force=True, user_id=user_id, on_partial=on_partial
+            )
+            analysis = self._apply_analysis_result(song_id, analysis_data)
+            db.session.commit()
+            success = True
+            return analysis
+        finally:
+            tracker.complete_job_tracking(job_id, success=success)
+
+    def _apply_analysis_result(self, song_id, analysis_data, analysis=None):
+        """
+        Create or update the song's AnalysisResult from formatted analysis data (caller commits).
 
-        analysis = AnalysisResult.query.filter_by(song_id=song_id).first()
+        Args:
+            song_id: Song the analysis belongs to
+            analysis_data: Output of analyze_song_complete / _format_router_payload
+            analysis: Row to update when the caller already loaded it
+        """
+        if analysis is None:
+            analysis = AnalysisResult.query.filter_by(song_id=song_id).first()
         if not analysis:
             analysis = AnalysisResult(song_id=song_id)
             db.session.add(analysis)
@@ -80,11 +136,57 @@ class UnifiedAnalysisService:
             narrative_voice=analysis_data.get("narrative_voice"),
             lament_filter_applied=analysis_data.get("lament_filter_applied"),
         )
+        return analysis
+
+    def apply_cached_analyses(self, cached):
+        """
+        Store analyses resolved from the analysis caches with one query and one commit.
+
+        Args:
+            cached: Dict mapping song_id to a cached router analysis
+                (see _partition_cached_analyses)
+
+        Returns:
+            Number of songs stored
+        """
+        stored = self.apply_router_analyses(cached)
+        if stored:
+            self.logger.info(f"💾 Stored {stored} cached analyses without API calls")
+        return stored
+
+    def apply_router_analyses(self, analyses):
+        """
+        Store router analyses computed outside analyze_song_complete (analysis
+        caches, the async engine) with one query and one commit.
+
+        Degraded analyses are stored like the per-song pipeline stores them and
+        get the same automatic retry.
+
+        Args:
+            analyses: Dict mapping song_id to a router analysis
+
+        Returns:
+            Number of songs stored
+        """
+        if not analyses:
+            return 0
+
+        existing = {}
+        for row in AnalysisResult.query.filter(AnalysisResult.song_id.in_(list(analyses))).all():
+            existing.setdefault(row.song_id, row)
+
+        for song_id, router_payload in analyses.items():
+            self._apply_analysis_result(
+                song_id, self._format_router_payload(router_payload), analysis=existing.get(song_id)
+            )
         db.session.commit()
 
-        return analysis
+        for song_id, router_payload in analyses.items():
+            if router_payload.get("analysis_quality") == "degraded":
+                self._schedule_degraded_retry(song_id, delay_seconds=300)
+        return len(analyses)
 
-    def analyze_song_complete(self, song, force=False, user_id=None):
+    def analyze_song_complete(self, song, force=False, user_id=None, on_partial=None):
         self.logger.info(f"Starting complete analysis for song: {song.title}")
         if not force:
             self.logger.info("Checking for existing analysis...")
@@ -115,12 +217,31 @@ class UnifiedAnalysisService:
         else:
             lyrics = str(lyrics)
 
+        # Only a definitive "no lyrics" may become a cached no-lyrics verdict
+        lyrics_definitive = True
         if not lyrics or len(lyrics.strip()) <= 10:
+            # Known instrumental / no-lyrics track: skip the providers and the analyzer
+            # (forced reanalysis asks the providers again)
+            no_lyrics = None if force else _cached_no_lyrics_verdicts([song]).get(song.id)
+            if no_lyrics:
+                self.logger.info("Cached no-lyrics verdict found, skipping lyrics fetch.")
+                return self._format_router_payload(no_lyrics)
+
             self.logger.info("Lyrics not found or too short, fetching...")
+            lyrics_definitive = False
             try:
-                fetched_lyrics = self.lyrics_fetcher.fetch_lyrics(
-                    song.title or song.name, song.artist
+                # Prefetch after sync records every synced song in LyricsCache; only songs
+                # it never saw are fetched here
+                known, fetched_lyrics = (
+                    local_lyrics(song.title or song.name, song.artist)
+                    if lyrics_prefetch_enabled() else (False, None)
                 )
+                if known:
+                    lyrics_definitive = True
+                else:
+                    fetched_lyrics, lyrics_definitive = self.lyrics_fetcher.fetch_lyrics_with_status(
+                        song.title or song.name, song.artist
+                    )
                 if fetched_lyrics and len(fetched_lyrics.strip()) > 10:
                     self.logger.info("Fetched lyrics successfully.")
                     lyrics = fetched_lyrics
@@ -146,7 +267,7 @@ class UnifiedAnalysisService:
             if use_router:
                 self.logger.info("Using router for analysis.")
                 router = get_shared_analyzer()
-                router_payload = router.analyze_song(title, artist, lyrics)
+                router_payload = router.analyze_song(title, artist, lyrics, on_partial=on_partial)
         except Exception as e:
             self.logger.error(f"Router analysis failed: {e}")
             use_router = False
@@ -160,70 +281,10 @@ class UnifiedAnalysisService:
             if analysis_quality == "degraded":
                 self.logger.warning(f"⚠️  Degraded analysis detected for '{title}' by {artist}. Scheduling auto-retry...")
                 self._schedule_degraded_retry(song.id, delay_seconds=300)  # Retry in 5 minutes
+            elif (router_payload.get("instrumental") or router_payload.get("no_lyrics")) and lyrics_definitive:
+                _cache_no_lyrics_verdict(song, router_payload)
             
-            detailed_concerns = router_payload.get("concerns") or []
-            
-            # Extract themes with scripture mappings
-            themes_positive = router_payload.get("themes_positive") or []
-            themes_negative = router_payload.get("themes_negative") or []
-            
-            # Build biblical themes from both positive and negative
-            biblical_themes = []
-            for theme in themes_positive:
-                if isinstance(theme, dict):
-                    biblical_themes.append({
-                        "theme": theme.get("theme", ""),
-                        "points": theme.get("points", 0),
-                        "scripture": theme.get("scripture", "")
-                    })
-            
-            theme_names = [t.get("theme") for t in biblical_themes if t.get("theme")]
-            
-            # Build enriched scripture references with theme context
-            supporting_scripture = []
-            
-            # Add scriptures from positive themes
-            for theme in themes_positive:
-                if isinstance(theme, dict) and theme.get("scripture"):
-                    supporting_scripture.append({
-                        "reference": theme.get("scripture"),
-                        "theme": theme.get("theme"),
-                        "type": "positive",
-                        "relevance": f"Supports the positive theme of {theme.get('theme', 'biblical values')}"
-                    })
-            
-            # Add scriptures from negative themes (concerns)
-            for theme in themes_negative:
-                if isinstance(theme, dict) and theme.get("scripture"):
-                    supporting_scripture.append({
-                        "reference": theme.get("scripture"),
-                        "theme": theme.get("theme"),
-                        "type": "concern",
-                        "relevance": f"Addresses the concern of {theme.get('theme', 'spiritual formation')}"
-                    })
-            
-            # Add any standalone scripture references not already included
-            scripture_refs = router_payload.get("scripture_references") or []
-            existing_refs = {s["reference"] for s in supporting_scripture if isinstance(s, dict)}
-            for ref in scripture_refs:
-                if ref not in existing_refs:
-                    supporting_scripture.append(ref)
-            
-            return {
-                "score": router_payload.get("score", 50),
-                "concern_level": self._map_concern_level(router_payload.get("concern_level", "Unknown")),
-                "themes": theme_names,
-                "status": "completed",
-                "explanation": router_payload.get("analysis", "Analysis completed"),
-                "detailed_concerns": detailed_concerns,
-                "positive_themes": [{"theme": t.get("theme"), "description": f"+{t.get('points', 0)} points"} for t in themes_positive if isinstance(t, dict)],
-                "biblical_themes": biblical_themes,
-                "supporting_scripture": supporting_scripture,
-                "verdict": router_payload.get("verdict", "context_required"),
-                "formation_risk": router_payload.get("formation_risk", "low"),
-                "narrative_voice": router_payload.get("narrative_voice", "artist"),
-                "lament_filter_applied": router_payload.get("lament_filter_applied", False),
-            }
+            return self._format_router_payload(router_payload)
 
         self.logger.info("Performing simplified analysis...")
         analysis_result = self.analysis_service.analyze_song(title, artist, lyrics)
@@ -313,6 +374,72 @@ class UnifiedAnalysisService:
             "lament_filter_applied": False,  # Not supported in simplified path
         }
 
+    def _format_router_payload(self, router_payload):
+        """Map a normalized router analysis onto the fields stored in AnalysisResult."""
+        detailed_concerns = router_payload.get("concerns") or []
+        
+        # Extract themes with scripture mappings
+        themes_positive = router_payload.get("themes_positive") or []
+        themes_negative = router_payload.get("themes_negative") or []
+        
+        # Build biblical themes from both positive and negative
+        biblical_themes = []
+        for theme in themes_positive:
+            if isinstance(theme, dict):
+                biblical_themes.append({
+                    "theme": theme.get("theme", ""),
+                    "points": theme.get("points", 0),
+                    "scripture": theme.get("scripture", "")
+                })
+        
+        theme_names = [t.get("theme") for t in biblical_themes if t.get("theme")]
+        
+        # Build enriched scripture references with theme context
+        supporting_scripture = []
+        
+        # Add scriptures from positive themes
+        for theme in themes_positive:
+            if isinstance(theme, dict) and theme.get("scripture"):
+                supporting_scripture.append({
+                    "reference": theme.get("scripture"),
+                    "theme": theme.get("theme"),
+                    "type": "positive",
+                    "relevance": f"Supports the positive theme of {theme.get('theme', 'biblical values')}"
+                })
+        
+        # Add scriptures from negative themes (concerns)
+        for theme in themes_negative:
+            if isinstance(theme, dict) and theme.get("scripture"):
+                supporting_scripture.append({
+                    "reference": theme.get("scripture"),
+                    "theme": theme.get("theme"),
+                    "type": "concern",
+                    "relevance": f"Addresses the concern of {theme.get('theme', 'spiritual formation')}"
+                })
+        
+        # Add any standalone scripture references not already included
+        scripture_refs = router_payload.get("scripture_references") or []
+        existing_refs = {s["reference"] for s in supporting_scripture if isinstance(s, dict)}
+        for ref in scripture_refs:
+            if ref not in existing_refs:
+                supporting_scripture.append(ref)
+        
+        return {
+            "score": router_payload.get("score", 50),
+            "concern_level": self._map_concern_level(router_payload.get("concern_level", "Unknown")),
+            "themes": theme_names,
+            "status": "completed",
+            "explanation": router_payload.get("analysis", "Analysis completed"),
+            "detailed_concerns": detailed_concerns,
+            "positive_themes": [{"theme": t.get("theme"), "description": f"+{t.get('points', 0)} points"} for t in themes_positive if isinstance(t, dict)],
+            "biblical_themes": biblical_themes,
+            "supporting_scripture": supporting_scripture,
+            "verdict": router_payload.get("verdict", "context_required"),
+            "formation_risk": router_payload.get("formation_risk", "low"),
+            "narrative_voice": router_payload.get("narrative_voice", "artist"),
+            "lament_filter_applied": router_payload.get("lament_filter_applied", False),
+        }
+
     def _map_concern_level(self, level_str):
         level_str = str(level_str).lower()
         if "high" in level_str:
@@ -371,23 +498,28 @@ class UnifiedAnalysisService:
                 unanalyzed_songs.extend(playlist_songs)
             
             # Remove duplicates (songs in multiple playlists)
-            unique_song_ids = list(set([song.id for song in unanalyzed_songs]))
+            unique_songs = list({song.id: song for song in unanalyzed_songs}.values())
+            unique_song_ids = [song.id for song in unique_songs]
             
             self.logger.info(f"Found {len(unique_song_ids)} unanalyzed songs for user {user_id}")
             
             if not unique_song_ids:
                 return {"success": True, "message": "All songs already analyzed", "songs_queued": 0}
             
+            # Songs already in the analysis caches are stored in bulk, no per-song lookups
+            cached, pending = _partition_cached_analyses(unique_songs)
+            analyzed_count = self.apply_cached_analyses(cached)
+            pending_ids = [song.id for song in pending]
+            
             # Analyze songs in batches to avoid overwhelming the system
             # For now, we'll analyze them synchronously in chunks
             # In production, you might want to use a job queue
             batch_size = 10
-            analyzed_count = 0
             failed_count = 0
             
-            for i in range(0, len(unique_song_ids), batch_size):
-                batch = unique_song_ids[i:i+batch_size]
-                self.logger.info(f"Analyzing batch {i//batch_size + 1}: songs {i+1}-{min(i+batch_size, len(unique_song_ids))}")
+            for i in range(0, len(pending_ids), batch_size):
+                batch = pending_ids[i:i+batch_size]
+                self.logger.info(f"Analyzing batch {i//batch_size + 1}: songs {i+1}-{min(i+batch_size, len(pending_ids))}")
                 
                 for song_id in batch:
                     try:
@@ -602,6 +734,354 @@ class UnifiedAnalysisService:
             self.logger.error(f"Failed to analyze changed playlists: {e}")
             return {"success": False, "error": str(e), "analyzed_songs": 0}
 
+    # ------------------------------------------------------------------
+    # Batch mode (bulk backfills outside the interactive rate budget)
+    # ------------------------------------------------------------------
+
+    def get_batch_candidates(self, limit=None, include_completed=False, page_size=500):
+        """
+        Songs with lyrics that need a router analysis.
+
+        Only id, title, artist and lyrics are loaded. With include_completed the
+        candidates are read in pages of page_size, each checked against the
+        AnalysisCache keys (not the JSON) of the current model, until limit is met.
+
+        Args:
+            limit: Maximum number of songs
+            include_completed: Also include analyzed songs whose cached analysis
+                is from another model version (nightly reanalysis)
+            page_size: Songs read per query when include_completed is set
+
+        Returns:
+            List of Song rows (other columns deferred)
+        """
+        from sqlalchemy.orm import load_only
+
+        from ..models.models import AnalysisCache
+
+        # Songs without a title or artist can't be keyed in AnalysisCache
+        query = Song.query.options(load_only(Song.id, Song.title, Song.artist, Song.lyrics)).filter(
+            Song.lyrics.isnot(None),
+            func.length(Song.lyrics) > 10,
+            func.trim(func.coalesce(Song.title, '')) != '',
+            func.trim(func.coalesce(Song.artist, '')) != '',
+        ).order_by(Song.id)
+
+        if not include_completed:
+            completed = db.session.query(AnalysisResult.id).filter(
+                AnalysisResult.song_id == Song.id,
+                AnalysisResult.status == 'completed'
+            ).exists()
+            query = query.filter(~completed)
+            return query.limit(limit).all() if limit else query.all()
+
+        # Songs have no lyrics hash column, so songs already cached under the
+        # current model are skipped page by page (keyset on Song.id)
+        router = get_shared_analyzer()
+        page_size = min(page_size, limit) if limit else page_size
+        songs = []
+        last_id = 0
+        while not limit or len(songs) < limit:
+            page = query.filter(Song.id > last_id).limit(page_size).all()
+            if not page:
+                break
+            last_id = page[-1].id
+            keys = {
+                song.id: (song.artist.strip(), song.title.strip(), router._lyrics_hash(song.lyrics))
+                for song in page
+            }
+            current = set(
+                db.session.query(AnalysisCache.artist, AnalysisCache.title, AnalysisCache.lyrics_hash)
+                .filter(
+                    AnalysisCache.model_version == router.model,
+                    AnalysisCache.lyrics_hash.in_({key[2] for key in keys.values()})
+                )
+                .all()
+            )
+            songs.extend(song for song in page if keys[song.id] not in current)
+
+        return songs[:limit] if limit else songs
+
+    def build_batch_requests(self, songs):
+        """
+        Build Batch API request lines (one chat completion per song).
+
+        custom_id is "song-{id}-{lyrics_hash[:16]}" so results can be matched back
+        and skipped if the lyrics changed while the batch was running.
+        """
+        router = get_shared_analyzer()
+        requests_out = []
+        for song in songs:
+            lyrics = str(song.lyrics or "")
+            if len(lyrics.strip()) <= 10:
+                continue
+            _, payload, _ = router._build_request(song.title, song.artist, lyrics)
+            requests_out.append({
+                "custom_id": f"song-{song.id}-{router._lyrics_hash(lyrics)[:16]}",
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": payload,
+            })
+        return requests_out
+
+    def submit_batch_analysis(self, backend=None, limit=None, include_completed=False):
+        """
+        Collect candidate songs and submit them as one batch.
+
+        Returns:
+            Batch ID, or None when there is nothing to analyze
+        """
+        from .analyzers.batch_backend import get_batch_backend
+
+        backend = backend or get_batch_backend()
+        songs = self.get_batch_candidates(limit=limit, include_completed=include_completed)
+        batch_requests = self.build_batch_requests(songs)
+        if not batch_requests:
+            self.logger.info("📦 No songs need batch analysis")
+            return None
+
+        batch_id = backend.submit(
+            batch_requests,
+            metadata={"model": get_shared_analyzer().model, "songs": str(len(batch_requests))}
+        )
+        self.logger.info(f"📦 Submitted {len(batch_requests)} songs as batch {batch_id} ({backend.name})")
+        return batch_id
+
+    def wait_for_batch(self, batch_id, backend=None, poll_interval=60.0, timeout=26 * 3600):
+        """
+        Poll until the batch reaches a terminal status.
+
+        Returns:
+            Final batch status dict
+
+        Raises:
+            TimeoutError: If the batch is still running after timeout seconds
+        """
+        import time
+
+        from .analyzers.batch_backend import TERMINAL_STATUSES, get_batch_backend
+
+        backend = backend or get_batch_backend()
+        deadline = time.monotonic() + timeout
+        while True:
+            status = backend.get_status(batch_id)
+            if status.get("status") in TERMINAL_STATUSES:
+                self.logger.info(f"📦 Batch {batch_id} finished: {status.get('status')} {status.get('request_counts', {})}")
+                return status
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Batch {batch_id} still {status.get('status')} after {timeout}s")
+            time.sleep(poll_interval)
+
+    def ingest_batch_results(self, batch_id, backend=None, commit_every=200):
+        """
+        Bulk-ingest batch output into AnalysisCache, AnalysisResult and Redis.
+
+        Failed lines and songs whose lyrics changed since submission are skipped
+        (they stay unanalyzed and are picked up by the next run).
+
+        Returns:
+            Summary with ingested/failed/stale counts
+        """
+        from ..models.models import AnalysisCache
+        from .analyzers.batch_backend import get_batch_backend
+
+        backend = backend or get_batch_backend()
+        router = get_shared_analyzer()
+        summary = {"batch_id": batch_id, "ingested": 0, "failed": 0, "stale": 0}
+        pending_cache = []
+
+        def flush():
+            AnalysisCache.cache_analysis_bulk(pending_cache, router.model, commit=False)
+            db.session.commit()
+            pending_cache.clear()
+
+        for line in backend.iter_results(batch_id):
+            response = line.get("response") or {}
+            if line.get("error") or response.get("status_code") != 200:
+                summary["failed"] += 1
+                continue
+
+            try:
+                _, song_id, hash_prefix = line["custom_id"].split("-", 2)
+                song = db.session.get(Song, int(song_id))
+            except (KeyError, ValueError):
+                summary["failed"] += 1
+                continue
+
+            lyrics = str(song.lyrics or "") if song else ""
+            lyrics_hash = router._lyrics_hash(lyrics)
+            if not song or not lyrics_hash.startswith(hash_prefix):
+                summary["stale"] += 1
+                continue
+
+            normalized = router._process_response(response.get("body") or {}, batch=True)
+            content_hash = lyrics_content_hash(lyrics)
+            pending_cache.append({
+                "artist": song.artist,
+                "title": song.title,
+                "lyrics_hash": lyrics_hash,
+                "content_hash": content_hash,
+                "analysis_result": normalized,
+            })
+            self._apply_analysis_result(song.id, self._format_router_payload(normalized))
+            router.redis_cache.set_analysis(song.artist, song.title, lyrics_hash, router.model, normalized,
+                                            content_hash=content_hash)
+            summary["ingested"] += 1
+
+            if len(pending_cache) >= commit_every:
+                flush()
+
+        flush()
+        self.logger.info(
+            f"📥 Batch {batch_id} ingested: {summary['ingested']} analyses, "
+            f"{summary['failed']} failed, {summary['stale']} stale"
+        )
+        return summary
+
+
+def run_batch_backfill(limit=None, include_completed=False, poll_interval=60.0):
+    """
+    Background job: submit a batch, wait for it, and ingest the results.
+
+    Intended for nightly backfills/reanalysis; uses the Batch API instead of
+    the interactive rate budget.
+
+    Args:
+        limit: Maximum number of songs
+        include_completed: Re-analyze songs cached under an older model version
+        poll_interval: Seconds between status checks
+
+    Returns:
+        dict: Ingest summary (or a message when nothing was submitted)
+    """
+    from ..utils.app_context import ensure_app_context
+    from .analyzers.batch_backend import get_batch_backend
+
+    with ensure_app_context():
+        service = UnifiedAnalysisService()
+        backend = get_batch_backend()
+        batch_id = service.submit_batch_analysis(
+            backend=backend, limit=limit, include_completed=include_completed
+        )
+        if batch_id is None:
+            return {"batch_id": None, "ingested": 0, "message": "No songs need analysis"}
+
+        status = service.wait_for_batch(batch_id, backend=backend, poll_interval=poll_interval)
+        summary = service.ingest_batch_results(batch_id, backend=backend)
+        summary["status"] = status.get("status")
+        return summary
+
+
+def _cached_no_lyrics_verdicts(songs):
+    """
+    Look up cached instrumental / no-lyrics verdicts (one MGET by spotify_id).
+    
+    Returns:
+        Dict mapping song_id to the cached router verdict
+    """
+    by_spotify_id = {
+        song.spotify_id: song.id for song in songs
+        if isinstance(getattr(song, 'spotify_id', None), str)
+    }
+    if not by_spotify_id:
+        return {}
+    try:
+        found = get_redis_cache().get_no_lyrics_bulk(by_spotify_id)
+    except Exception as e:
+        logging.getLogger(__name__).warning(f"No-lyrics cache lookup skipped: {e}")
+        return {}
+    return {by_spotify_id[spotify_id]: verdict for spotify_id, verdict in found.items()}
+
+
+def _cache_no_lyrics_verdict(song, verdict):
+    """Remember that no lyrics were found for the track (shorter TTL than analyses)."""
+    if not isinstance(getattr(song, 'spotify_id', None), str):
+        return
+    try:
+        get_redis_cache().set_no_lyrics(song.spotify_id, verdict)
+    except Exception as e:
+        logging.getLogger(__name__).warning(f"Failed to cache no-lyrics verdict: {e}")
+
+
+def _partition_cached_analyses(songs):
+    """
+    Split songs into cache hits and misses before scheduling any LLM calls.
+    
+    Uses RouterAnalyzer.lookup_cached_bulk (Redis MGET + one database query),
+    so a 500-track playlist costs two round trips instead of ~1000. Songs
+    without lyrics yet are hits when a no-lyrics verdict is cached for them;
+    otherwise they are misses and the per-song pipeline fetches their lyrics.
+    
+    Args:
+        songs: Song rows about to be analyzed
+        
+    Returns:
+        Tuple of (dict mapping song_id to cached router analysis, songs still to analyze)
+    """
+    logger = logging.getLogger(__name__)
+    candidates = [
+        song for song in songs
+        if isinstance(song.lyrics, str) and len(song.lyrics.strip()) > 10
+    ]
+    candidate_ids = {song.id for song in candidates}
+    cached = _cached_no_lyrics_verdicts([song for song in songs if song.id not in candidate_ids])
+    if cached:
+        logger.info(f"🔇 {len(cached)} songs have a cached no-lyrics verdict")
+    
+    if candidates:
+        try:
+            router = get_shared_analyzer()
+            found = router.lookup_cached_bulk([(song.title, song.artist, song.lyrics) for song in candidates])
+            cached.update({candidates[i].id: analysis for i, analysis in found.items()})
+        except Exception as e:
+            logger.warning(f"Bulk cache lookup skipped: {e}")
+    
+    return cached, [song for song in songs if song.id not in cached]
+
+
+def _prefetch_router_analyses(songs) -> dict:
+    """
+    Analyze songs that already have lyrics with AsyncRouterAnalyzer.
+    
+    Every song handed to the engine gets a result (degraded when its API
+    calls failed after the analyzer's own retries); the caller stores those
+    and leaves only the rest to the per-song pipeline, so no song goes
+    through two retry cycles. Songs still missing lyrics are left to that
+    pipeline (it fetches them). Disabled with LLM_ASYNC_ENGINE=false.
+    
+    Args:
+        songs: Song rows about to be analyzed
+        
+    Returns:
+        Dict mapping song_id to its router analysis (empty if the engine is
+        disabled or the batch failed as a whole)
+    """
+    logger = logging.getLogger(__name__)
+    if os.environ.get("LLM_ASYNC_ENGINE", "true").lower() not in ("1", "true", "yes"):
+        return {}
+    
+    attempted = [
+        song for song in songs
+        if isinstance(song.lyrics, str) and len(song.lyrics.strip()) > 10
+    ]
+    if not attempted:
+        return {}
+    batch = [{'title': song.title, 'artist': song.artist, 'lyrics': song.lyrics} for song in attempted]
+    
+    try:
+        from .analyzers import AsyncRouterAnalyzer
+        
+        analyzer = AsyncRouterAnalyzer()
+        try:
+            results = asyncio.run(analyzer.analyze_many(batch))
+        finally:
+            analyzer.close()
+    except Exception as e:
+        logger.warning(f"Async analysis prefetch skipped: {e}")
+        return {}
+    
+    return {song.id: result for song, result in zip(attempted, results)}
+
 
 # Background job function for RQ workers
 def analyze_playlist_async(playlist_id: int, user_id: int):
@@ -620,16 +1100,16 @@ def analyze_playlist_async(playlist_id: int, user_id: int):
     """
     from rq import get_current_job
 
-    from .. import create_app
     from ..models import AnalysisResult, Playlist, PlaylistSong, Song
+    from ..utils.app_context import ensure_app_context
     
     # Get current RQ job for progress tracking
     job = get_current_job()
     
-    # Create app context for database access in worker
-    # RQ workers run in separate processes, so we need to create our own app instance
-    app = create_app()
-    with app.app_context():
+    # Reuse the caller's app context or the long-lived worker app
+    # RQ workers run in separate processes; keeping one app per process keeps
+    # a single engine and connection pool across jobs
+    with ensure_app_context() as app:
         logger = logging.getLogger(__name__)
         logger.info(f"🚀 Background job started for playlist {playlist_id}")
         
@@ -679,17 +1159,57 @@ def analyze_playlist_async(playlist_id: int, user_id: int):
                 'failed_songs': []
             }
             
+            # Partition into cache hits and misses in two round trips; hits are
+            # stored right away and only misses reach the LLM
+            cached, pending = _partition_cached_analyses(unanalyzed_songs)
+            analyzed_count = 0
+            if cached:
+                analyzed_count = service.apply_cached_analyses(cached)
+                results['analyzed'] += analyzed_count
+                logger.info(f"✅ {analyzed_count}/{total} songs served from the analysis cache")
+                if job:
+                    job.meta['progress'] = {
+                        'current': analyzed_count,
+                        'total': total,
+                        'percentage': round((analyzed_count / total) * 100, 1),
+                        'current_song': None
+                    }
+                    job.save_meta()
+            
+            # Run LLM calls for songs that already have lyrics on one event loop and
+            # store them; only the songs the engine did not take reach the workers below
+            analyzed_async = _prefetch_router_analyses(pending)
+            if analyzed_async:
+                stored = service.apply_router_analyses(analyzed_async)
+                analyzed_count += stored
+                results['analyzed'] += stored
+                pending = [song for song in pending if song.id not in analyzed_async]
+                degraded = sum(1 for r in analyzed_async.values() if r.get('analysis_quality') == 'degraded')
+                logger.info(f"⚡ Async engine analyzed {stored} songs ({degraded} degraded, retry scheduled)")
+                if job:
+                    job.meta['progress'] = {
+                        'current': analyzed_count,
+                        'total': total,
+                        'percentage': round((analyzed_count / total) * 100, 1),
+                        'current_song': None
+                    }
+                    job.save_meta()
+            
             # Analyze songs concurrently for 7-10x speed improvement
             # Use 10 concurrent workers (matches rate limiter max_concurrent)
             max_workers = 10
             completed_count = threading.Lock()
-            analyzed_count = 0
+            
+            def analyze_in_context(song_id):
+                # Worker threads don't inherit the app context; push the job's app
+                with app.app_context():
+                    return service.analyze_song(song_id, user_id)
             
             with ThreadPoolExecutor(max_workers=max_workers) as executor:
                 # Submit all songs for analysis
                 future_to_song = {
-                    executor.submit(service.analyze_song, song.id, user_id): song 
-                    for song in unanalyzed_songs
+                    executor.submit(analyze_in_context, song.id): song 
+                    for song in pending
                 }
                 
                 # Process completed analyses as they finish
@@ -755,14 +1275,13 @@ def retry_degraded_analysis(song_id: int, retry_attempt: int = 1, max_retries: i
     """
     import logging
 
-    from .. import create_app
     from ..models import AnalysisResult, Song
+    from ..utils.app_context import ensure_app_context
     
     logger = logging.getLogger(__name__)
     
-    # Create app context for worker
-    app = create_app()
-    with app.app_context():
+    # Reuse the caller's app context or the long-lived worker app
+    with ensure_app_context():
         logger.info(f"🔄 Retry attempt {retry_attempt}/{max_retries} for song {song_id}")
         
         try:
@@ -0,0 +1,262 @@
+"""
+Analysis Codec
+
+Compact binary encoding for analysis results stored in Redis.
+
+Wire format: 2-byte header followed by the payload
+- byte 0: format version (FORMAT_VERSION)
+- byte 1: serializer id (high nibble) | compressor id (low nibble)
+
+Entries written before the codec existed are plain JSON text and start with
+'{' (0x7B). Framed entries start with FORMAT_VERSION, which must never be 0x7B,
+so old and new entries can be read side by side during a rollout. The
+header records how each entry was written, so changing ANALYSIS_CODEC or
+ANALYSIS_COMPRESSION never makes existing entries unreadable.
+
+Serializers: msgpack, orjson, json (stdlib fallback)
+Compressors: zstd (zstandard), zlib (stdlib), none
+
+msgpack, orjson and zstandard are optional (pip install -r
+requirements-optional.txt, as the Docker images do). Without them "auto" picks
+json and zlib; entries written with a missing library fail to decode and are
+treated as cache misses.
+
+Configuration (environment):
+- ANALYSIS_CODEC: msgpack | orjson | json | auto (default auto: best installed)
+- ANALYSIS_COMPRESSION: zstd | zlib | none | auto (default auto: best installed)
+- ANALYSIS_COMPRESS_THRESHOLD: Compress payloads at least this many bytes (default 512)
+"""
+
+import json
+import logging
+import os
+import threading
+import zlib
+from typing import Any, Dict, Optional, Tuple, Union
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1  # Must never be 0x7B, the first byte of a legacy JSON entry
+LEGACY_JSON_PREFIX = b'{'
+
+SERIALIZERS = {'json': 0, 'orjson': 1, 'msgpack': 2}
+COMPRESSORS = {'none': 0, 'zlib': 1, 'zstd': 2}
+
+
+class CodecError(ValueError):
+    """Raised when an entry cannot be decoded."""
+    pass
+
+
+def _available_serializer(name: str) -> bool:
+    return name == 'json' or (name == 'orjson' and orjson is not None) or (name == 'msgpack' and msgpack is not None)
+
+
+def _available_compressor(name: str) -> bool:
+    return name in ('none', 'zlib') or (name == 'zstd' and zstandard is not None)
+
+
+class AnalysisCodec:
+    """
+    Encodes analysis dicts to versioned, optionally compressed bytes.
+    """
+
+    def __init__(
+        self,
+        serializer: str = 'auto',
+        compression: str = 'auto',
+        compress_threshold: int = 512,
+        level: int = 3
+    ):
+        """
+        Initialize codec.
+
+        Args:
+            serializer: msgpack | orjson | json | auto
+            compression: zstd | zlib | none | auto
+            compress_threshold: Only compress serialized payloads at least this large
+            level: Compression level
+
+        Raises:
+            ValueError: Unknown serializer or compressor name
+        """
+        if serializer == 'auto':
+            serializer = next(s for s in ('msgpack', 'orjson', 'json') if _available_serializer(s))
+        if compression == 'auto':
+            compression = 'zstd' if zstandard is not None else 'zlib'
+        if serializer not in SERIALIZERS:
+            raise ValueError(f"Unknown serializer: {serializer}")
+        if compression not in COMPRESSORS:
+            raise ValueError(f"Unknown compression: {compression}")
+        if not _available_serializer(serializer):
+            logger.warning(f"⚠️  {serializer} is not installed, falling back to json")
+            serializer = 'json'
+        if not _available_compressor(compression):
+            logger.warning(f"⚠️  {compression} is not installed, falling back to zlib")
+            compression = 'zlib'
+
+        self.serializer = serializer
+        self.compression = compression
+        self.compress_threshold = compress_threshold
+        self.level = level
+        self._zstd_local = threading.local()  # zstandard (de)compressors are not thread-safe
+
+    @property
+    def name(self) -> str:
+        return f"{self.serializer}+{self.compression}"
+
+    def encode(self, value: Dict[str, Any]) -> bytes:
+        """Serialize and (above the threshold) compress a value."""
+        return self.encode_sized(value)[0]
+
+    def encode_sized(self, value: Dict[str, Any]) -> Tuple[bytes, int]:
+        """encode() that also returns the uncompressed serialized size (for L1 accounting)."""
+        payload = self._serialize(self.serializer, value)
+        size = len(payload)
+        compressor = 'none'
+        if self.compression != 'none' and len(payload) >= self.compress_threshold:
+            compressed = self._compress(self.compression, payload)
+            if len(compressed) < len(payload):
+                payload, compressor = compressed, self.compression
+        header = bytes((FORMAT_VERSION, SERIALIZERS[self.serializer] << 4 | COMPRESSORS[compressor]))
+        return header + payload, size
+
+    def decode(self, data: Union[bytes, str]) -> Dict[str, Any]:
+        """
+        Decode an entry written by any codec configuration, or a legacy JSON entry.
+
+        Raises:
+            CodecError: Corrupt entry or a serializer/compressor that is not installed
+        """
+        return self.decode_sized(data)[0]
+
+    def decode_sized(self, data: Union[bytes, str]) -> Tuple[Dict[str, Any], int]:
+        """decode() that also returns the uncompressed serialized size (for L1 accounting)."""
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        if not data:
+            raise CodecError("Empty entry")
+        if data[0] != FORMAT_VERSION:
+            if data[:1] == LEGACY_JSON_PREFIX:
+                return self._deserialize('json', data), len(data)  # Legacy json.dumps entry
+            raise CodecError(f"Unsupported entry format version: {data[0]}")
+        if len(data) < 2:
+            raise CodecError("Truncated entry header")
+
+        serializer = _name(SERIALIZERS, data[1] >> 4)
+        compressor = _name(COMPRESSORS, data[1] & 0x0F)
+        payload = data[2:]
+        if compressor != 'none':
+            payload = self._decompress(compressor, payload)
+        return self._deserialize(serializer, payload), len(payload)
+
+    def is_current(self, data: Union[bytes, str]) -> bool:
+        """True if data was written with this codec's settings (migration skips it)."""
+        if isinstance(data, str) or len(data) < 2 or data[0] != FORMAT_VERSION:
+            return False
+        return (data[1] >> 4 == SERIALIZERS[self.serializer]
+                and data[1] & 0x0F in (COMPRESSORS['none'], COMPRESSORS[self.compression]))
+
+    @staticmethod
+    def _serialize(serializer: str, value: Dict[str, Any]) -> bytes:
+        if serializer == 'msgpack':
+            return msgpack.packb(value, use_bin_type=True)
+        if serializer == 'orjson':
+            return orjson.dumps(value)
+        return json.dumps(value, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+    @staticmethod
+    def _deserialize(serializer: str, payload: bytes) -> Dict[str, Any]:
+        try:
+            if serializer == 'msgpack':
+                if msgpack is None:
+                    raise CodecError("Entry is msgpack-encoded but msgpack is not installed")
+                return msgpack.unpackb(payload, raw=False)
+            if serializer == 'orjson' and orjson is not None:
+                return orjson.loads(payload)
+            return json.loads(payload)  # orjson output is plain JSON
+        except CodecError:
+            raise
+        except Exception as e:
+            raise CodecError(f"Cannot deserialize {serializer} entry: {e}") from e
+
+    def _compress(self, compressor: str, payload: bytes) -> bytes:
+        if compressor == 'zstd':
+            cctx = getattr(self._zstd_local, 'cctx', None)
+            if cctx is None:
+                cctx = self._zstd_local.cctx = zstandard.ZstdCompressor(level=self.level)
+            return cctx.compress(payload)
+        return zlib.compress(payload, self.level)
+
+    def _decompress(self, compressor: str, payload: bytes) -> bytes:
+        try:
+            if compressor == 'zstd':
+                if zstandard is None:
+                    raise CodecError("Entry is zstd-compressed but zstandard is not installed")
+                dctx = getattr(self._zstd_local, 'dctx', None)
+                if dctx is None:
+                    dctx = self._zstd_local.dctx = zstandard.ZstdDecompressor()
+                return dctx.decompress(payload)
+            return zlib.decompress(payload)
+        except CodecError:
+            raise
+        except Exception as e:
+            raise CodecError(f"Cannot decompress {compressor} entry: {e}") from e
+
+
+def _name(table: Dict[str, int], ident: int) -> str:
+    for name, value in table.items():
+        if value == ident:
+            return name
+    raise CodecError(f"Unknown codec id: {ident}")
+
+
+# Global codec instance
+_analysis_codec: Optional[AnalysisCodec] = None
+_codec_lock = threading.Lock()
+
+
+def get_analysis_codec() -> AnalysisCodec:
+    """
+    Get the global analysis codec configured from the environment.
+
+    Returns:
+        AnalysisCodec (invalid settings fall back to auto)
+    """
+    global _analysis_codec
+
+    if _analysis_codec is None:
+        with _codec_lock:
+            if _analysis_codec is None:
+                try:
+                    threshold = int(os.environ.get('ANALYSIS_COMPRESS_THRESHOLD', '512'))
+                except ValueError:
+                    threshold = 512
+                try:
+                    codec = AnalysisCodec(
+                        serializer=os.environ.get('ANALYSIS_CODEC', 'auto').lower(),
+                        compression=os.environ.get('ANALYSIS_COMPRESSION', 'auto').lower(),
+                        compress_threshold=threshold
+                    )
+                except ValueError as e:
+                    logger.error(f"Invalid analysis codec settings, using auto: {e}")
+                    codec = AnalysisCodec(compress_threshold=threshold)
+                logger.info(f"✅ Analysis codec: {codec.name} (compress ≥ {threshold} bytes)")
+                _analysis_codec = codec
+
+    return _analysis_codec
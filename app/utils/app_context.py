@@ -0,0 +1,72 @@
+"""
+Shared Flask Application Context
+
+create_app() registers every blueprint and builds a fresh SQLAlchemy engine
+(with its own connection pool) each time it is called. Code that needs the
+database outside of a request - the analyzer, RQ jobs, worker threads - should
+reuse the caller's application when one is active and otherwise fall back to a
+single long-lived worker application per process.
+"""
+
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from flask import Flask, current_app, has_app_context
+
+logger = logging.getLogger(__name__)
+
+# Long-lived worker application (one per process)
+_worker_app: Optional[Flask] = None
+_worker_app_lock = threading.Lock()
+
+
+def get_worker_app() -> Flask:
+    """
+    Get the process-wide worker application, creating it on first use.
+
+    Returns:
+        Flask application whose engine and connection pool are shared by
+        every caller in this process
+    """
+    global _worker_app
+
+    if _worker_app is None:
+        with _worker_app_lock:
+            if _worker_app is None:
+                from app import create_app
+
+                _worker_app = create_app()
+                logger.info("🔧 Worker application created for background database access")
+
+    return _worker_app
+
+
+@contextmanager
+def ensure_app_context() -> Iterator[Flask]:
+    """
+    Run a block inside an application context without building a new app.
+
+    Reuses the active application context when there is one (request handlers,
+    RQ jobs that already pushed a context) and otherwise pushes a context for
+    the shared worker application.
+
+    Yields:
+        The Flask application backing the context
+    """
+    if has_app_context():
+        yield current_app._get_current_object()
+        return
+
+    app = get_worker_app()
+    with app.app_context():
+        yield app
+
+
+def reset_worker_app() -> None:
+    """Drop the cached worker application (for testing)."""
+    global _worker_app
+
+    with _worker_app_lock:
+        _worker_app = None
@@ -1,28 +1,14 @@
 import json
-import os
 from typing import Any, Optional
 
 import redis
-from flask import current_app
 
-
-def _get_redis_url() -> str:
-    try:
-        url = current_app.config.get("RQ_REDIS_URL") or current_app.config.get("REDIS_URL")
-        if url:
-            return url
-    except RuntimeError:
-        pass
-    return os.environ.get("REDIS_URL") or os.environ.get("RQ_REDIS_URL", "redis://redis:6379/0")
+from app.utils.redis_pool import get_redis_manager, resolve_redis_url
 
 
 def get_redis_client() -> Optional[redis.Redis]:
-    try:
-        client = redis.Redis.from_url(_get_redis_url(), decode_responses=True)
-        client.ping()
-        return client
-    except Exception:
-        return None
+    """Shared pooled client, or None while Redis is unavailable."""
+    return get_redis_manager(resolve_redis_url()).get_client(decode_responses=True)
 
 
 def cache_set_json(key: str, value: Any, ttl_seconds: int = 60) -> None:
@@ -13,6 +13,10 @@ Flow:
 2. OPEN → HALF_OPEN: After timeout period
 3. HALF_OPEN → CLOSED: After successful test requests
 4. HALF_OPEN → OPEN: If test requests fail
+
+RedisCircuitBreaker keeps the state in Redis so every gunicorn and RQ process
+sees the same circuit (enabled with LLM_DISTRIBUTED_LIMITS=true); it falls
+back to its local state while Redis is unavailable.
 """
 
 import logging
@@ -20,7 +24,9 @@ import threading
 import time
 from datetime import datetime, timezone
 from enum import Enum
-from typing import Any, Callable, Optional
+from typing import Any, Awaitable, Callable, Optional
+
+from redis.exceptions import RedisError
 
 logger = logging.getLogger(__name__)
 
@@ -94,6 +100,45 @@ class CircuitBreaker:
             CircuitBreakerOpenError: If circuit is open
             Exception: Original exception from func
         """
+        self._before_call()
+        
+        # Execute the function
+        try:
+            result = func(*args, **kwargs)
+            self._on_success()
+            return result
+        except Exception:
+            self._on_failure()
+            raise
+    
+    async def call_async(self, func: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """
+        Await a coroutine function through the circuit breaker.
+        
+        Args:
+            func: Coroutine function to await
+            *args: Positional arguments
+            **kwargs: Keyword arguments
+            
+        Returns:
+            Coroutine result
+            
+        Raises:
+            CircuitBreakerOpenError: If circuit is open
+            Exception: Original exception from func
+        """
+        self._before_call()
+        
+        try:
+            result = await func(*args, **kwargs)
+            self._on_success()
+            return result
+        except Exception:
+            self._on_failure()
+            raise
+    
+    def _before_call(self):
+        """Fail fast when open, or move to HALF_OPEN once the recovery timeout has passed."""
         with self.lock:
             # Check if we should transition to half-open
             if self.state == CircuitState.OPEN:
@@ -106,15 +151,6 @@ class CircuitBreaker:
                         f"Circuit breaker '{self.name}' is OPEN. "
                         f"Service unavailable, failing fast."
                     )
-        
-        # Execute the function
-        try:
-            result = func(*args, **kwargs)
-            self._on_success()
-            return result
-        except Exception:
-            self._on_failure()
-            raise
     
     def _on_success(self):
         """Handle successful call."""
@@ -154,6 +190,13 @@ class CircuitBreaker:
                     logger.error(f"CircuitBreaker '{self.name}': Too many failures (CLOSED → OPEN)")
                     self.state = CircuitState.OPEN
     
+    def allows_requests(self) -> bool:
+        """False while OPEN and the recovery timeout has not passed (does not change state)."""
+        with self.lock:
+            if self.state != CircuitState.OPEN:
+                return True
+            return self._should_attempt_reset()
+    
     def _should_attempt_reset(self) -> bool:
         """Check if enough time has passed to attempt recovery."""
         if self.last_failure_time is None:
@@ -185,6 +228,236 @@ class CircuitBreaker:
             self.last_failure_time = None
 
 
+# Transitions run as Lua scripts so concurrent processes agree on the state.
+# Timestamps come from the Redis server clock (TIME), so skewed worker clocks
+# can't open or recover the circuit early.
+# KEYS[1]: state hash (state, failures, successes, last_failure)
+
+# ARGV: recovery timeout, state ttl. Returns the state the caller may proceed in.
+_BEFORE_CALL_SCRIPT = """
+redis.replicate_commands()
+local state = redis.call('hget', KEYS[1], 'state') or 'closed'
+if state == 'open' then
+    local t = redis.call('time')
+    local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+    local last = tonumber(redis.call('hget', KEYS[1], 'last_failure') or '0')
+    if now - last < tonumber(ARGV[1]) then
+        return 'open'
+    end
+    redis.call('hset', KEYS[1], 'state', 'half_open', 'successes', 0)
+    redis.call('expire', KEYS[1], ARGV[2])
+    return 'half_open_entered'
+end
+return state
+"""
+
+# ARGV: success threshold, state ttl. Returns {state, successes}.
+_SUCCESS_SCRIPT = """
+local state = redis.call('hget', KEYS[1], 'state') or 'closed'
+if state == 'half_open' then
+    local successes = redis.call('hincrby', KEYS[1], 'successes', 1)
+    redis.call('hset', KEYS[1], 'failures', 0)
+    if successes >= tonumber(ARGV[1]) then
+        redis.call('hset', KEYS[1], 'state', 'closed', 'successes', 0)
+        state = 'closed'
+    end
+    redis.call('expire', KEYS[1], ARGV[2])
+    return {state, successes}
+end
+if redis.call('hget', KEYS[1], 'failures') then
+    redis.call('hset', KEYS[1], 'failures', 0)
+end
+return {state, 0}
+"""
+
+# ARGV: failure threshold, state ttl. Returns {state, failures, transitioned, server time}.
+_FAILURE_SCRIPT = """
+redis.replicate_commands()
+local t = redis.call('time')
+local now = t[1] .. '.' .. string.format('%06d', tonumber(t[2]))
+local failures = redis.call('hincrby', KEYS[1], 'failures', 1)
+redis.call('hset', KEYS[1], 'last_failure', now)
+redis.call('expire', KEYS[1], ARGV[2])
+local state = redis.call('hget', KEYS[1], 'state') or 'closed'
+if state == 'half_open' or (state == 'closed' and failures >= tonumber(ARGV[1])) then
+    redis.call('hset', KEYS[1], 'state', 'open', 'successes', 0)
+    return {'open', failures, 1, now}
+end
+return {state, failures, 0, now}
+"""
+
+
+class RedisCircuitBreaker(CircuitBreaker):
+    """
+    Circuit breaker whose state is shared by every process through a Redis hash.
+    
+    Same call/call_async interface and transitions as CircuitBreaker; the local
+    fields mirror the last state seen in Redis and take over while Redis is
+    unavailable.
+    """
+    
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        recovery_timeout: int = 60,
+        success_threshold: int = 2,
+        name: str = "circuit_breaker",
+        redis_manager=None,
+        state_ttl: int = 86400
+    ):
+        """
+        Initialize distributed circuit breaker.
+        
+        Args:
+            failure_threshold: Number of failures before opening circuit
+            recovery_timeout: Seconds to wait before trying half-open
+            success_threshold: Successes needed in half-open to close
+            name: Name for logging and the Redis key (processes sharing a name share the circuit)
+            redis_manager: RedisConnectionManager (defaults to the shared one)
+            state_ttl: Seconds an untouched state hash is kept
+        """
+        super().__init__(failure_threshold=failure_threshold, recovery_timeout=recovery_timeout,
+                         success_threshold=success_threshold, name=name)
+        if redis_manager is None:
+            from app.utils.redis_pool import get_redis_manager, resolve_redis_url
+            
+            redis_manager = get_redis_manager(resolve_redis_url())
+        self.redis_manager = redis_manager
+        self.state_ttl = state_ttl
+        self._key = f"circuit:{name}"
+        # Redis clock minus the local clock, refreshed by _sync (timestamps are server time)
+        self._clock_offset = 0.0
+    
+    def _run(self, script: str, *args) -> Any:
+        """Run a transition script; None when Redis is unavailable."""
+        client = self.redis_manager.get_client(decode_responses=True)
+        if client is None:
+            return None
+        try:
+            return client.eval(script, 1, self._key, *args)
+        except RedisError as e:
+            logger.warning(f"CircuitBreaker '{self.name}': shared state unavailable, using local state: {e}")
+            self.redis_manager.mark_unhealthy(e)
+            return None
+    
+    def _before_call(self):
+        outcome = self._run(_BEFORE_CALL_SCRIPT, self.recovery_timeout, self.state_ttl)
+        if outcome is None:
+            return super()._before_call()
+        
+        with self.lock:
+            if outcome == 'open':
+                self.state = CircuitState.OPEN
+                raise CircuitBreakerOpenError(
+                    f"Circuit breaker '{self.name}' is OPEN. "
+                    f"Service unavailable, failing fast."
+                )
+            if outcome == 'half_open_entered':
+                logger.info(f"CircuitBreaker '{self.name}': Attempting recovery (OPEN → HALF_OPEN)")
+                self.state = CircuitState.HALF_OPEN
+                self.success_count = 0
+            else:
+                self.state = CircuitState(outcome)
+    
+    def _on_success(self):
+        outcome = self._run(_SUCCESS_SCRIPT, self.success_threshold, self.state_ttl)
+        if outcome is None:
+            return super()._on_success()
+        
+        state, successes = CircuitState(outcome[0]), int(outcome[1])
+        with self.lock:
+            if self.state == CircuitState.HALF_OPEN and state == CircuitState.CLOSED:
+                logger.info(f"CircuitBreaker '{self.name}': Recovery successful (HALF_OPEN → CLOSED)")
+            self.state = state
+            self.success_count = successes if state == CircuitState.HALF_OPEN else 0
+            self.failure_count = 0
+    
+    def _on_failure(self):
+        outcome = self._run(_FAILURE_SCRIPT, self.failure_threshold, self.state_ttl)
+        if outcome is None:
+            super()._on_failure()
+            with self.lock:
+                self.last_failure_time += self._clock_offset
+            return
+        
+        state, failures, transitioned = CircuitState(outcome[0]), int(outcome[1]), int(outcome[2])
+        with self.lock:
+            self.state = state
+            self.failure_count = failures
+            self.last_failure_time = float(outcome[3])
+            if transitioned:
+                self.success_count = 0
+                logger.error(f"CircuitBreaker '{self.name}': Opened for all workers after {failures} failures")
+            else:
+                logger.warning(
+                    f"CircuitBreaker '{self.name}': Failure "
+                    f"({failures}/{self.failure_threshold})"
+                )
+    
+    def _sync(self) -> None:
+        """Copy the shared state into the local fields."""
+        client = self.redis_manager.get_client(decode_responses=True)
+        if client is None:
+            return
+        try:
+            shared = client.hgetall(self._key)
+            seconds, micros = client.time()
+        except RedisError as e:
+            self.redis_manager.mark_unhealthy(e)
+            return
+        with self.lock:
+            self._clock_offset = seconds + micros / 1_000_000 - time.time()
+            self.state = CircuitState(shared.get('state', 'closed'))
+            self.failure_count = int(shared.get('failures', 0))
+            self.success_count = int(shared.get('successes', 0))
+            self.last_failure_time = float(shared['last_failure']) if 'last_failure' in shared else None
+    
+    def _should_attempt_reset(self) -> bool:
+        """Measure the recovery timeout on the Redis clock."""
+        if self.last_failure_time is None:
+            return True
+        return time.time() + self._clock_offset - self.last_failure_time >= self.recovery_timeout
+    
+    def allows_requests(self) -> bool:
+        self._sync()
+        return super().allows_requests()
+    
+    def get_state(self) -> dict:
+        self._sync()
+        state = super().get_state()
+        state['shared'] = True
+        return state
+    
+    def reset(self):
+        """Manually reset the circuit to CLOSED for every process."""
+        client = self.redis_manager.get_client(decode_responses=True)
+        if client is not None:
+            try:
+                client.delete(self._key)
+            except RedisError as e:
+                logger.warning(f"CircuitBreaker '{self.name}': shared reset failed: {e}")
+        super().reset()
+
+
+def create_circuit_breaker(
+    name: str,
+    failure_threshold: int = 5,
+    recovery_timeout: int = 60,
+    success_threshold: int = 2
+) -> CircuitBreaker:
+    """
+    Build a circuit breaker: shared through Redis when LLM_DISTRIBUTED_LIMITS is
+    enabled, otherwise per process.
+    """
+    from app.utils.openai_rate_limiter import distributed_limits_enabled
+    
+    if distributed_limits_enabled():
+        return RedisCircuitBreaker(failure_threshold=failure_threshold, recovery_timeout=recovery_timeout,
+                                   success_threshold=success_threshold, name=name)
+    return CircuitBreaker(failure_threshold=failure_threshold, recovery_timeout=recovery_timeout,
+                          success_threshold=success_threshold, name=name)
+
+
 # Global circuit breakers
 _openai_circuit_breaker: Optional[CircuitBreaker] = None
 _circuit_breaker_lock = threading.Lock()
@@ -197,11 +470,11 @@ def get_openai_circuit_breaker() -> CircuitBreaker:
     if _openai_circuit_breaker is None:
         with _circuit_breaker_lock:
             if _openai_circuit_breaker is None:
-                _openai_circuit_breaker = CircuitBreaker(
+                _openai_circuit_breaker = create_circuit_breaker(
+                    "openai_api",
                     failure_threshold=5,
                     recovery_timeout=60,
-                    success_threshold=2,
-                    name="openai_api"
+                    success_threshold=2
                 )
     
     return _openai_circuit_breaker
@@ -11,12 +11,12 @@ from enum import Enum
 from typing import Any, Dict, List, Optional
 
 import psutil
-import redis
 from flask import current_app
 from sqlalchemy import text
 from sqlalchemy.exc import SQLAlchemyError
 
 from app.extensions import db
+from app.utils.redis_pool import get_redis_manager
 
 
 class HealthStatus(Enum):
@@ -162,7 +162,8 @@ class HealthMonitor:
         start_time = time.time()
 
         try:
-            redis_client = redis.from_url(current_app.config.get("RQ_REDIS_URL"))
+            manager = get_redis_manager(current_app.config.get("RQ_REDIS_URL"))
+            redis_client = manager.client(decode_responses=True)
 
             # Test basic connectivity
             pong = redis_client.ping()
@@ -194,6 +195,7 @@ class HealthMonitor:
                     "memory_usage": memory_usage,
                     "connected_clients": connected_clients,
                     "redis_version": info.get("redis_version", "unknown"),
+                    "connection_pool": manager.get_stats(),
                 },
             )
 
@@ -210,7 +212,7 @@ class HealthMonitor:
         """Check priority queue status and worker health."""
         try:
             # Get priority queue information
-            redis_client = redis.from_url(current_app.config.get("RQ_REDIS_URL"))
+            redis_client = get_redis_manager(current_app.config.get("RQ_REDIS_URL")).client(decode_responses=False)
 
             # Queue system removed - return default values
             queue_size = 0
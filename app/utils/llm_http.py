@@ -0,0 +1,237 @@
+"""
+Pooled HTTP Transport for OpenAI-compatible APIs
+
+Shares one keep-alive connection pool across every analyzer thread so each
+chat completion reuses an open TCP+TLS connection instead of paying a fresh
+handshake to LLM_API_BASE_URL.
+
+Configuration (environment):
+- LLM_HTTP_POOL_SIZE: Max connections (defaults to the summed max_concurrent of the
+  LLM_ENDPOINTS endpoints, or the global rate limiter's when there is one endpoint)
+- LLM_HTTP_KEEPALIVE_EXPIRY: Seconds an idle connection is kept open (default 30, 0 disables keep-alive)
+- LLM_HTTP2: Enable HTTP/2 when the optional `h2` package is installed (default false)
+"""
+
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+class LLMHttpClient:
+    """
+    Thread-safe HTTP client with a bounded keep-alive connection pool.
+
+    Wraps httpx.Client (which is safe to share between threads) and keeps
+    lightweight request counters for the admin health endpoint.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = 10,
+        keepalive_expiry: float = 30.0,
+        http2: bool = False
+    ):
+        """
+        Initialize the pooled client.
+
+        Args:
+            pool_size: Maximum number of open connections
+            keepalive_expiry: Seconds to keep idle connections (0 disables keep-alive)
+            http2: Negotiate HTTP/2 when the server supports it
+        """
+        self.pool_size = max(1, int(pool_size))
+        self.keepalive_expiry = max(0.0, float(keepalive_expiry))
+        self.http2 = http2 and self._http2_available()
+
+        limits = httpx.Limits(
+            max_connections=self.pool_size,
+            max_keepalive_connections=self.pool_size if self.keepalive_expiry > 0 else 0,
+            keepalive_expiry=self.keepalive_expiry or None,
+        )
+        self._client = httpx.Client(limits=limits, http2=self.http2)
+
+        # Callers wait here for a free connection rather than inside httpcore
+        self._slots = threading.BoundedSemaphore(self.pool_size)
+
+        # Metrics
+        self.lock = threading.Lock()
+        self.total_requests = 0
+        self.total_errors = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0  # Never above pool_size: callers queue on _slots
+
+        logger.info(
+            f"LLMHttpClient initialized: pool_size={self.pool_size}, "
+            f"keepalive_expiry={self.keepalive_expiry}s, http2={self.http2}"
+        )
+
+    @staticmethod
+    def _http2_available() -> bool:
+        """Check for the optional h2 dependency (pip install 'httpx[http2]')."""
+        try:
+            import h2  # noqa: F401
+            return True
+        except ImportError:
+            logger.warning("LLM_HTTP2 requested but 'h2' is not installed. Falling back to HTTP/1.1")
+            return False
+
+    def post(
+        self,
+        url: str,
+        json: Any = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None
+    ) -> httpx.Response:
+        """
+        Send a POST request over a pooled connection.
+
+        Args:
+            url: Request URL
+            json: JSON-serializable request body
+            headers: Request headers
+            timeout: Request timeout in seconds
+
+        Returns:
+            httpx.Response (call raise_for_status() to surface HTTP errors)
+        """
+        with self._slots:
+            with self.lock:
+                self.in_flight += 1
+                self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+                self.total_requests += 1
+            try:
+                return self._client.post(url, json=json, headers=headers, timeout=timeout)
+            except Exception:
+                with self.lock:
+                    self.total_errors += 1
+                raise
+            finally:
+                with self.lock:
+                    self.in_flight -= 1
+
+    @contextmanager
+    def stream(
+        self,
+        url: str,
+        json: Any = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None
+    ) -> Iterator[httpx.Response]:
+        """
+        Send a streaming POST request over a pooled connection.
+
+        The connection slot is held until the context exits.
+
+        Args:
+            url: Request URL
+            json: JSON-serializable request body
+            headers: Request headers
+            timeout: Request timeout in seconds
+
+        Yields:
+            httpx.Response with an unread body (iterate with iter_lines())
+        """
+        with self._slots:
+            with self.lock:
+                self.in_flight += 1
+                self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+                self.total_requests += 1
+            try:
+                with self._client.stream("POST", url, json=json, headers=headers, timeout=timeout) as resp:
+                    yield resp
+            except Exception:
+                with self.lock:
+                    self.total_errors += 1
+                raise
+            finally:
+                with self.lock:
+                    self.in_flight -= 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get connection pool statistics."""
+        with self.lock:
+            stats: Dict[str, Any] = {
+                'pool_size': self.pool_size,
+                'keepalive_expiry': self.keepalive_expiry,
+                'http2': self.http2,
+                'total_requests': self.total_requests,
+                'total_errors': self.total_errors,
+                'in_flight': self.in_flight,
+                'peak_in_flight': self.peak_in_flight,
+                'available_slots': self.pool_size - self.in_flight,
+            }
+        stats.update(self._connection_stats())
+        return stats
+
+    def _connection_stats(self) -> Dict[str, int]:
+        """
+        Connection-level detail from the underlying httpcore pool.
+
+        httpx does not expose its pool publicly, so the private attributes are
+        read defensively; the counters above are always reported.
+        """
+        pool = getattr(getattr(self._client, '_transport', None), '_pool', None)
+        connections = getattr(pool, 'connections', None)
+        if connections is None:
+            return {}
+        try:
+            connections = list(connections)
+            idle = sum(1 for c in connections if getattr(c, 'is_idle', lambda: False)())
+        except Exception as e:
+            logger.debug(f"Connection pool detail unavailable: {e}")
+            return {}
+        return {
+            'open_connections': len(connections),
+            'idle_connections': idle,
+            'active_connections': len(connections) - idle,
+        }
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+        self._client.close()
+
+
+# Global HTTP client instance
+_llm_http_client: Optional[LLMHttpClient] = None
+_client_lock = threading.Lock()
+
+
+def get_llm_http_client() -> LLMHttpClient:
+    """Get the global pooled HTTP client for LLM API calls."""
+    global _llm_http_client
+
+    if _llm_http_client is None:
+        with _client_lock:
+            if _llm_http_client is None:
+                from app.utils.llm_router import get_llm_router
+                from app.utils.openai_rate_limiter import get_rate_limiter
+
+                # One pool serves every endpoint, so it must fit all of them at once
+                llm_router = get_llm_router()
+                if llm_router is not None:
+                    default_pool = llm_router.max_concurrent()
+                else:
+                    default_pool = get_rate_limiter().max_concurrent
+                try:
+                    pool_size = int(os.environ.get("LLM_HTTP_POOL_SIZE", default_pool))
+                except ValueError:
+                    pool_size = default_pool
+                try:
+                    keepalive_expiry = float(os.environ.get("LLM_HTTP_KEEPALIVE_EXPIRY", "30"))
+                except ValueError:
+                    keepalive_expiry = 30.0
+                http2 = os.environ.get("LLM_HTTP2", "false").lower() in ("1", "true", "yes")
+
+                _llm_http_client = LLMHttpClient(
+                    pool_size=pool_size,
+                    keepalive_expiry=keepalive_expiry,
+                    http2=http2
+                )
+
+    return _llm_http_client
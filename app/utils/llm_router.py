@@ -0,0 +1,505 @@
+"""
+Multi-endpoint LLM Router
+
+Spreads chat completions across a pool of OpenAI-compatible endpoints
+(OpenAI, vLLM on Runpod, local Ollama, ...). Each endpoint has its own rate
+limiter and circuit breaker. Requests go to the healthy endpoint with the
+lowest EWMA latency; optionally a hedged request is sent to a second endpoint
+when the first has not answered within its p95 latency, and whichever answers
+first wins. execute() serves the threaded analyzer and execute_async() the
+asyncio engine; both share the endpoints, their limiters and latency stats.
+
+Configuration (environment):
+- LLM_ENDPOINTS: JSON list of endpoints, e.g.
+    [{"name": "openai", "base_url": "https://api.openai.com/v1", "api_key_env": "OPENAI_API_KEY"},
+     {"name": "runpod", "base_url": "https://xyz-8000.proxy.runpod.net/v1",
+      "model": "christian-discernment", "max_rpm": 600, "max_concurrent": 16}]
+  Keys: name, base_url, api_key | api_key_env, model, max_rpm, max_concurrent.
+  When unset the analyzer uses its single LLM_API_BASE_URL endpoint.
+- LLM_HEDGE: Send hedged requests (default false)
+- LLM_HEDGE_MIN_DELAY: Lower bound in seconds before a hedge is sent (default 1.0)
+"""
+
+import asyncio
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple, TypeVar
+
+from app.utils.circuit_breaker import (
+    CircuitBreaker,
+    CircuitBreakerOpenError,
+    create_circuit_breaker,
+)
+from app.utils.openai_rate_limiter import OpenAIRateLimiter, create_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Samples needed before an endpoint's p95 is trusted for hedging
+MIN_P95_SAMPLES = 20
+
+
+class NoHealthyEndpointError(CircuitBreakerOpenError):
+    """Raised when every endpoint's circuit breaker is open."""
+    pass
+
+
+class LLMEndpoint:
+    """
+    One OpenAI-compatible backend with its own limiter, breaker and latency stats.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        base_url: str,
+        api_key: str = "",
+        model: Optional[str] = None,
+        rate_limiter: Optional[OpenAIRateLimiter] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        ewma_alpha: float = 0.3,
+        latency_window: int = 200,
+        probe_interval: float = 60.0,
+        failure_penalty: float = 10.0
+    ):
+        """
+        Initialize endpoint.
+
+        Args:
+            name: Endpoint name for logs and metrics
+            base_url: API base URL (…/v1)
+            api_key: Bearer token (omitted from headers when empty)
+            model: Model served by this endpoint (None keeps the request's model)
+            rate_limiter: Limiter for this endpoint (a new one by default)
+            circuit_breaker: Breaker for this endpoint (a new one by default)
+            ewma_alpha: Weight of the newest latency sample
+            latency_window: Samples kept for the p95
+            probe_interval: Seconds after which an unsampled endpoint is probed again
+            failure_penalty: Latency (seconds) folded into the EWMA for a failed request
+        """
+        self.name = name
+        self.base_url = base_url.rstrip("/")
+        self.chat_url = f"{self.base_url}/chat/completions"
+        self.model = model
+        self.headers = {"Content-Type": "application/json"}
+        if api_key:
+            self.headers["Authorization"] = f"Bearer {api_key}"
+
+        self.rate_limiter = rate_limiter or OpenAIRateLimiter()
+        self.circuit_breaker = circuit_breaker or CircuitBreaker(name=f"llm_{name}")
+
+        self.ewma_alpha = ewma_alpha
+        self.probe_interval = probe_interval
+        self.failure_penalty = failure_penalty
+        self.ewma_latency: Optional[float] = None
+        self.last_sample_time: Optional[float] = None
+        self._samples: deque = deque(maxlen=latency_window)
+
+        # Metrics
+        self.lock = threading.Lock()
+        self.total_requests = 0
+        self.total_failures = 0
+        self.hedges_sent = 0
+        self.hedges_won = 0
+
+    def prepare_payload(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Point the request at this endpoint's model."""
+        if self.model and payload.get("model") != self.model:
+            return dict(payload, model=self.model)
+        return payload
+
+    def serves(self, model: str) -> bool:
+        """Whether requests for `model` are answered by that model here."""
+        return self.model is None or self.model == model
+
+    def record_success(self, latency: float) -> None:
+        """Fold a successful request's latency into the EWMA and p95 window."""
+        with self.lock:
+            self.total_requests += 1
+            self._samples.append(latency)
+            self._fold(latency)
+
+    def record_failure(self) -> None:
+        """Count a failure and push the endpoint back in the latency ranking."""
+        with self.lock:
+            self.total_requests += 1
+            self.total_failures += 1
+            self._fold(self.failure_penalty)
+
+    def _fold(self, latency: float) -> None:
+        """Update the EWMA (caller holds the lock)."""
+        self.last_sample_time = time.monotonic()
+        if self.ewma_latency is None:
+            self.ewma_latency = latency
+        else:
+            self.ewma_latency = self.ewma_alpha * latency + (1 - self.ewma_alpha) * self.ewma_latency
+
+    def p95(self) -> Optional[float]:
+        """95th percentile latency, or None until enough samples exist."""
+        with self.lock:
+            if len(self._samples) < MIN_P95_SAMPLES:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def routing_latency(self) -> float:
+        """Latency used for selection (0 for unsampled or stale endpoints so they get probed)."""
+        with self.lock:
+            if self.ewma_latency is None or self.last_sample_time is None:
+                return 0.0
+            if time.monotonic() - self.last_sample_time > self.probe_interval:
+                return 0.0
+            return self.ewma_latency
+
+    def is_available(self) -> bool:
+        """False while the circuit is open and the recovery timeout has not passed."""
+        return self.circuit_breaker.allows_requests()
+
+    def get_stats(self) -> Dict[str, Any]:
+        p95 = self.p95()
+        with self.lock:
+            stats = {
+                'name': self.name,
+                'base_url': self.base_url,
+                'model': self.model,
+                'ewma_latency_ms': round(self.ewma_latency * 1000, 1) if self.ewma_latency is not None else None,
+                'p95_latency_ms': round(p95 * 1000, 1) if p95 is not None else None,
+                'total_requests': self.total_requests,
+                'total_failures': self.total_failures,
+                'hedges_sent': self.hedges_sent,
+                'hedges_won': self.hedges_won,
+            }
+        stats['circuit'] = self.circuit_breaker.get_state()['state']
+        stats['active_requests'] = self.rate_limiter.active_requests
+        return stats
+
+
+class LLMRouter:
+    """
+    Latency-aware load balancer with optional hedged requests.
+    """
+
+    def __init__(
+        self,
+        endpoints: List[LLMEndpoint],
+        hedge: bool = False,
+        hedge_min_delay: float = 1.0
+    ):
+        """
+        Initialize router.
+
+        Args:
+            endpoints: Endpoint pool (at least one)
+            hedge: Send a second request when the first exceeds its p95
+            hedge_min_delay: Never hedge sooner than this many seconds
+        """
+        if not endpoints:
+            raise ValueError("LLMRouter needs at least one endpoint")
+        self.endpoints = endpoints
+        self.hedge = hedge
+        self.hedge_min_delay = hedge_min_delay
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+        logger.info(
+            f"LLMRouter initialized: {[e.name for e in endpoints]}, hedge={hedge}"
+        )
+
+    @property
+    def primary(self) -> LLMEndpoint:
+        return self.endpoints[0]
+
+    def has_available(self) -> bool:
+        return any(e.is_available() for e in self.endpoints)
+
+    def serving(self, model: str) -> "LLMRouter":
+        """
+        Router restricted to the endpoints that answer requests for `model` with
+        that model (endpoints overriding it are left out; limiters, breakers and
+        latency stats stay shared).
+
+        Raises:
+            ValueError: No endpoint serves the model
+        """
+        endpoints = [e for e in self.endpoints if e.serves(model)]
+        if len(endpoints) == len(self.endpoints):
+            return self
+        if not endpoints:
+            raise ValueError(f"No LLM endpoint serves {model}")
+        return LLMRouter(endpoints, hedge=self.hedge, hedge_min_delay=self.hedge_min_delay)
+
+    def select(self, exclude: Iterable[LLMEndpoint] = ()) -> Optional[LLMEndpoint]:
+        """
+        Pick the healthy endpoint with the lowest EWMA latency.
+
+        Ties (e.g. unsampled endpoints) go to the one with fewer active requests,
+        then to configuration order.
+        """
+        excluded = set(id(e) for e in exclude)
+        candidates = [
+            (e.routing_latency(), e.rate_limiter.active_requests, index, e)
+            for index, e in enumerate(self.endpoints)
+            if id(e) not in excluded and e.is_available()
+        ]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda c: c[:3])[3]
+
+    def execute(
+        self,
+        send: Callable[[LLMEndpoint], T],
+        hedge: Optional[bool] = None
+    ) -> Tuple[T, LLMEndpoint]:
+        """
+        Run send(endpoint) on the best endpoint, hedging if enabled.
+
+        Args:
+            send: Performs the request against the given endpoint and returns its result
+            hedge: Override the router's hedging setting for this call
+
+        Returns:
+            Tuple of (result, endpoint that produced it)
+
+        Raises:
+            NoHealthyEndpointError: Every endpoint's circuit is open
+            Exception: The error from send when no attempt succeeded
+        """
+        primary = self.select()
+        if primary is None:
+            raise NoHealthyEndpointError("All LLM endpoints are unavailable")
+
+        hedge = self.hedge if hedge is None else hedge
+        delay = self._hedge_delay(primary) if hedge else None
+        if delay is None or self.select(exclude=[primary]) is None:
+            return self._attempt(primary, send), primary
+
+        # Hedged attempts run in the pool; copy the context so they keep the
+        # caller's rate limiter priority
+        futures = {self._submit(self._attempt, primary, send): primary}
+        done, _ = wait(futures, timeout=delay)
+        if not done:
+            secondary = self.select(exclude=[primary])
+            if secondary is not None:
+                logger.info(
+                    f"⏱️ {primary.name} slower than {delay:.2f}s, hedging to {secondary.name}"
+                )
+                with secondary.lock:
+                    secondary.hedges_sent += 1
+                futures[self._submit(self._attempt, secondary, send)] = secondary
+
+        errors: List[Exception] = []
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    result = future.result()
+                except Exception as e:
+                    errors.append(e)
+                    continue
+                endpoint = futures[future]
+                if endpoint is not primary:
+                    with endpoint.lock:
+                        endpoint.hedges_won += 1
+                # The slower request finishes in the background and is discarded
+                return result, endpoint
+        raise errors[0]
+
+    async def execute_async(
+        self,
+        send: Callable[[LLMEndpoint], Awaitable[T]],
+        hedge: Optional[bool] = None
+    ) -> Tuple[T, LLMEndpoint]:
+        """
+        Coroutine variant of execute(): await send(endpoint) on the best endpoint,
+        hedging if enabled.
+
+        Args:
+            send: Coroutine function performing the request against the given endpoint
+            hedge: Override the router's hedging setting for this call
+
+        Returns:
+            Tuple of (result, endpoint that produced it)
+
+        Raises:
+            NoHealthyEndpointError: Every endpoint's circuit is open
+            Exception: The error from send when no attempt succeeded
+        """
+        primary = self.select()
+        if primary is None:
+            raise NoHealthyEndpointError("All LLM endpoints are unavailable")
+
+        hedge = self.hedge if hedge is None else hedge
+        delay = self._hedge_delay(primary) if hedge else None
+        if delay is None or self.select(exclude=[primary]) is None:
+            return await self._attempt_async(primary, send), primary
+
+        # Tasks copy the current context, so hedges keep the caller's priority
+        tasks = {asyncio.ensure_future(self._attempt_async(primary, send)): primary}
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if not done:
+            secondary = self.select(exclude=[primary])
+            if secondary is not None:
+                logger.info(
+                    f"⏱️ {primary.name} slower than {delay:.2f}s, hedging to {secondary.name}"
+                )
+                with secondary.lock:
+                    secondary.hedges_sent += 1
+                tasks[asyncio.ensure_future(self._attempt_async(secondary, send))] = secondary
+
+        errors: List[Exception] = []
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        errors.append(e)
+                        continue
+                    endpoint = tasks[task]
+                    if endpoint is not primary:
+                        with endpoint.lock:
+                            endpoint.hedges_won += 1
+                    return result, endpoint
+        finally:
+            # Unlike threads, the slower request can be cancelled
+            for task in pending:
+                task.cancel()
+        raise errors[0]
+
+    def _attempt(self, endpoint: LLMEndpoint, send: Callable[[LLMEndpoint], T]) -> T:
+        """One request under the endpoint's rate limiter and circuit breaker."""
+        lease = endpoint.rate_limiter.acquire()
+        start = time.monotonic()
+        try:
+            result = endpoint.circuit_breaker.call(send, endpoint)
+        except Exception:
+            endpoint.record_failure()
+            raise
+        else:
+            endpoint.record_success(time.monotonic() - start)
+            return result
+        finally:
+            endpoint.rate_limiter.release(lease)
+
+    async def _attempt_async(self, endpoint: LLMEndpoint, send: Callable[[LLMEndpoint], Awaitable[T]]) -> T:
+        """One awaited request under the endpoint's rate limiter and circuit breaker."""
+        lease = await endpoint.rate_limiter.acquire_async()
+        start = time.monotonic()
+        try:
+            result = await endpoint.circuit_breaker.call_async(send, endpoint)
+        except Exception:
+            endpoint.record_failure()
+            raise
+        else:
+            endpoint.record_success(time.monotonic() - start)
+            return result
+        finally:
+            endpoint.rate_limiter.release(lease)
+
+    def max_concurrent(self) -> int:
+        """Requests the endpoints allow in flight together (sum of their limiters)."""
+        return sum(e.rate_limiter.max_concurrent for e in self.endpoints)
+
+    def _submit(self, fn: Callable[..., T], *args: Any):
+        return self._get_executor().submit(contextvars.copy_context().run, fn, *args)
+
+    def _hedge_delay(self, endpoint: LLMEndpoint) -> Optional[float]:
+        """Seconds to wait before hedging (None when the endpoint has no latency history)."""
+        p95 = endpoint.p95()
+        if p95 is None:
+            if endpoint.ewma_latency is None:
+                return None
+            p95 = endpoint.ewma_latency * 2
+        return max(self.hedge_min_delay, p95)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    workers = self.max_concurrent()
+                    self._executor = ThreadPoolExecutor(max_workers=max(2, workers), thread_name_prefix="llm-hedge")
+        return self._executor
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'hedge': self.hedge,
+            'hedge_min_delay': self.hedge_min_delay,
+            'endpoints': [e.get_stats() for e in self.endpoints],
+        }
+
+
+def _endpoints_from_config(config: List[Dict[str, Any]]) -> List[LLMEndpoint]:
+    endpoints = []
+    for i, entry in enumerate(config):
+        name = entry.get("name") or f"endpoint_{i}"
+        api_key = entry.get("api_key")
+        if api_key is None and entry.get("api_key_env"):
+            api_key = os.environ.get(entry["api_key_env"], "")
+        endpoints.append(LLMEndpoint(
+            name=name,
+            base_url=entry["base_url"],
+            api_key=api_key or "",
+            model=entry.get("model"),
+            rate_limiter=create_rate_limiter(
+                f"llm_{name}",
+                max_rpm=int(entry.get("max_rpm", 450)),
+                max_concurrent=int(entry.get("max_concurrent", 10))
+            ),
+            circuit_breaker=create_circuit_breaker(
+                f"llm_{name}",
+                failure_threshold=5,
+                recovery_timeout=60,
+                success_threshold=2
+            ),
+        ))
+    return endpoints
+
+
+# Global router instance (only when LLM_ENDPOINTS is configured)
+_llm_router: Optional[LLMRouter] = None
+_router_lock = threading.Lock()
+
+
+def get_llm_router() -> Optional[LLMRouter]:
+    """
+    Get the global multi-endpoint router.
+
+    Returns:
+        LLMRouter built from LLM_ENDPOINTS, or None when it is not set or invalid
+    """
+    global _llm_router
+
+    if _llm_router is None:
+        raw = os.environ.get("LLM_ENDPOINTS", "").strip()
+        if not raw:
+            return None
+        with _router_lock:
+            if _llm_router is None:
+                try:
+                    endpoints = _endpoints_from_config(json.loads(raw))
+                except (ValueError, KeyError, TypeError) as e:
+                    logger.error(f"Invalid LLM_ENDPOINTS, using the single LLM_API_BASE_URL endpoint: {e}")
+                    return None
+                if not endpoints:
+                    return None
+                try:
+                    hedge_min_delay = float(os.environ.get("LLM_HEDGE_MIN_DELAY", "1.0"))
+                except ValueError:
+                    hedge_min_delay = 1.0
+                _llm_router = LLMRouter(
+                    endpoints,
+                    hedge=os.environ.get("LLM_HEDGE", "false").lower() in ("1", "true", "yes"),
+                    hedge_min_delay=hedge_min_delay
+                )
+
+    return _llm_router
@@ -0,0 +1,150 @@
+"""
+In-process LRU Cache
+
+Small, thread-safe L1 tier used in front of Redis. Bounded by entry count and
+by approximate bytes (each value's serialized size before compression), with a
+per-entry TTL so a missed cross-process invalidation can only serve a stale
+value for a short, bounded time.
+
+Every invalidation bumps a generation counter. A reader that fills L1 from Redis
+reads the generation before its GET and passes it to set(), which drops the
+fill if an invalidation arrived in between, so a value read before the
+invalidation is never written back into L1.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class LocalLRUCache:
+    """
+    Size-bounded LRU cache with per-entry TTL.
+    """
+
+    def __init__(self, max_entries: int = 2000, max_bytes: int = 32 * 1024 * 1024, ttl: float = 300.0):
+        """
+        Initialize local cache.
+
+        Args:
+            max_entries: Maximum number of entries (0 disables the cache)
+            max_bytes: Maximum total size of cached values in bytes
+            ttl: Seconds an entry stays valid after it is stored
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, size, value)
+        self._total_bytes = 0
+        self.generation = 0  # Bumped by every delete, delete_prefix and clear
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.max_bytes > 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired."""
+        if not self.enabled:
+            return None
+        with self.lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, size, value = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any, size: int, generation: Optional[int] = None) -> bool:
+        """
+        Store a value.
+
+        Args:
+            key: Cache key
+            value: Value to cache (callers must not mutate it afterwards)
+            size: Approximate size in bytes (values larger than max_bytes are not cached)
+            generation: self.generation read before the value was fetched; the value
+                is dropped if an invalidation happened since (None stores unconditionally)
+
+        Returns:
+            True if the value was stored
+        """
+        if not self.enabled or size > self.max_bytes:
+            return False
+        with self.lock:
+            if generation is not None and generation != self.generation:
+                return False
+            self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl, size, value)
+            self._total_bytes += size
+            while len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._total_bytes -= evicted_size
+                self.evictions += 1
+            return True
+
+    def delete(self, key: str) -> bool:
+        with self.lock:
+            self.generation += 1  # Even when absent: a reader may be about to fill it
+            if self._remove(key):
+                self.invalidations += 1
+                return True
+            return False
+
+    def delete_prefix(self, prefix: str) -> int:
+        """Drop every entry whose key starts with prefix."""
+        with self.lock:
+            self.generation += 1
+            keys = [k for k in self._entries if k.startswith(prefix)]
+            for key in keys:
+                self._remove(key)
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.generation += 1
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def _remove(self, key: str) -> bool:
+        """Remove an entry (caller holds the lock)."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self._total_bytes -= entry[1]
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'entries': len(self._entries),
+                'size_bytes': self._total_bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups * 100, 2) if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
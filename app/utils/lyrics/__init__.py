@@ -6,6 +6,8 @@ for analyzing song content.
 """
 
 from ..lyrics_config import LyricsFetcherConfig
+from .async_http import AsyncLyricsHttp
+from .cache_writer import LyricsCacheWriter
 from .exceptions import (
     LyricsFetcherException,
     LyricsNotFoundException,
@@ -25,6 +27,8 @@ from .lyrics_fetcher import (
 __all__ = [
     "LyricsFetcher",
     "LyricsFetcherConfig",
+    "AsyncLyricsHttp",
+    "LyricsCacheWriter",
     "LyricsProvider",
     "LRCLibProvider",
     "LyricsOvhProvider",
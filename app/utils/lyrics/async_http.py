@@ -0,0 +1,127 @@
+"""
+Pooled HTTP clients for lyrics providers
+
+Sync providers share one requests.Session (keep-alive pool per host) instead of
+opening a new connection for every lookup through module-level requests.get.
+
+Async providers share one httpx.AsyncClient per LyricsFetcher.fetch_lyrics_many
+batch. httpx only caps connections per client, so AsyncLyricsHttp adds a
+semaphore per host: one slow lyrics site cannot take every connection.
+
+Configuration (environment):
+- LYRICS_HTTP_PER_HOST: Max concurrent connections per lyrics host (default 4)
+- LYRICS_HTTP_KEEPALIVE_EXPIRY: Seconds an idle connection is kept open (default 30)
+"""
+
+import asyncio
+import logging
+import os
+import threading
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+
+def _per_host_limit() -> int:
+    try:
+        return max(1, int(os.environ.get("LYRICS_HTTP_PER_HOST", "4")))
+    except ValueError:
+        return 4
+
+
+def _keepalive_expiry() -> float:
+    try:
+        return max(0.0, float(os.environ.get("LYRICS_HTTP_KEEPALIVE_EXPIRY", "30")))
+    except ValueError:
+        return 30.0
+
+
+class AsyncLyricsHttp:
+    """
+    httpx.AsyncClient shared by the async providers, with a connection cap per host.
+
+    The client is bound to the running event loop, so one instance lives per
+    batch (use as an async context manager).
+    """
+
+    def __init__(self, per_host: Optional[int] = None, hosts: int = 4):
+        """
+        Initialize the shared async client.
+
+        Args:
+            per_host: Max concurrent requests per host (defaults to LYRICS_HTTP_PER_HOST)
+            hosts: Expected number of distinct hosts (sizes the overall pool)
+        """
+        self.per_host = per_host or _per_host_limit()
+        keepalive_expiry = _keepalive_expiry()
+        limits = httpx.Limits(
+            max_connections=self.per_host * max(1, hosts),
+            max_keepalive_connections=self.per_host * max(1, hosts) if keepalive_expiry > 0 else 0,
+            keepalive_expiry=keepalive_expiry or None,
+        )
+        self._client = httpx.AsyncClient(limits=limits, follow_redirects=True)
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+
+        # Metrics
+        self.total_requests = 0
+        self.total_errors = 0
+
+    def _slots_for(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).hostname or ""
+        if host not in self._host_slots:
+            self._host_slots[host] = asyncio.Semaphore(self.per_host)
+        return self._host_slots[host]
+
+    async def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        """
+        Send a GET request, waiting for a free slot on the URL's host.
+
+        Args:
+            url: Request URL
+            **kwargs: Passed to httpx.AsyncClient.get (params, headers, timeout)
+
+        Returns:
+            httpx.Response
+        """
+        async with self._slots_for(url):
+            self.total_requests += 1
+            try:
+                return await self._client.get(url, **kwargs)
+            except Exception:
+                self.total_errors += 1
+                raise
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    async def __aenter__(self) -> "AsyncLyricsHttp":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+
+# Global session for the sync providers
+_http_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_lyrics_http_session() -> requests.Session:
+    """Get the shared keep-alive session used by the sync lyrics providers."""
+    global _http_session
+
+    if _http_session is None:
+        with _session_lock:
+            if _http_session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=_per_host_limit() * 4)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _http_session = session
+
+    return _http_session
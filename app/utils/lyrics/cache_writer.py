@@ -0,0 +1,254 @@
+"""
+Background LyricsCache Writer
+
+Fetch paths used to write LyricsCache rows on the calling thread, one SELECT and
+one commit per song. LyricsCacheWriter takes those writes off the fetch path:
+
+1. submit() records the row in memory and returns immediately; a second write
+   for the same artist/title replaces the first (coalescing)
+2. A daemon thread upserts the pending rows with LyricsCache.upsert_many (one
+   INSERT ... ON CONFLICT DO UPDATE and one commit per batch) once
+   cache_batch_size rows are pending, cache_batch_timeout seconds have passed,
+   or the process exits
+3. pending() lets readers see rows that are not written yet, so a follow-up
+   fetch of the same song does not call the providers again
+
+Configuration (LyricsFetcherConfig / environment):
+- LYRICS_CACHE_BATCH_SIZE: Pending rows that trigger a flush (default 50)
+- LYRICS_CACHE_BATCH_TIMEOUT: Seconds before pending rows are flushed anyway (default 30)
+"""
+
+import atexit
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from flask import Flask, current_app, has_app_context
+
+from ..app_context import ensure_app_context
+
+logger = logging.getLogger(__name__)
+
+MAX_PENDING = 10000  # Rows held in memory at most; further new rows are dropped (cache is best-effort)
+
+PendingKey = Tuple[Optional[Flask], str, str]
+
+
+class LyricsCacheWriter:
+    """
+    Coalesces LyricsCache writes and upserts them from a background thread.
+
+    Rows are grouped by the Flask application active when they were submitted
+    (the shared worker application when there was none).
+    """
+
+    def __init__(self, batch_size: int = 50, flush_interval: float = 30.0, max_pending: int = MAX_PENDING):
+        """
+        Initialize the writer (the thread starts on the first submit).
+
+        Args:
+            batch_size: Pending rows that trigger a flush
+            flush_interval: Seconds before pending rows are flushed anyway
+            max_pending: Rows held in memory at most
+        """
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = max(0.01, flush_interval)
+        self.max_pending = max(1, max_pending)
+
+        self._pending: Dict[PendingKey, Dict[str, Any]] = {}
+        self._in_flight: Dict[PendingKey, Dict[str, Any]] = {}  # Batch being written
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self._flush_requested = 0  # Highest batch number a flush() caller waits for
+        self._batches_started = 0
+        self._batches_done = 0
+
+        # Metrics
+        self.stats = {"submitted": 0, "coalesced": 0, "dropped": 0, "written": 0, "batches": 0, "errors": 0}
+
+    def submit(self, artist: str, title: str, lyrics: Optional[str], source: str) -> bool:
+        """
+        Queue a cache row without touching the database.
+
+        Args:
+            artist: Artist as stored in LyricsCache
+            title: Title as stored in LyricsCache
+            lyrics: Lyrics text ("" or None for a negative entry)
+            source: Provider name or "negative_cache"
+
+        Returns:
+            True if the row was queued, False if the writer is closed or full
+        """
+        app = current_app._get_current_object() if has_app_context() else None
+        key = (app, artist.strip(), title.strip())
+        row = {"artist": key[1], "title": key[2], "lyrics": lyrics or "", "source": source}
+
+        with self._cond:
+            if self._closed:
+                return False
+            if key in self._pending:
+                self.stats["coalesced"] += 1
+            elif len(self._pending) >= self.max_pending:
+                self.stats["dropped"] += 1
+                return False
+            self._pending[key] = row
+            self.stats["submitted"] += 1
+            self._ensure_thread()
+            if len(self._pending) >= self.batch_size:
+                self._cond.notify_all()
+        return True
+
+    def pending(self, artist: str, title: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a row that was submitted but not written yet.
+
+        Returns:
+            The pending row (artist, title, lyrics, source) or None
+        """
+        app = current_app._get_current_object() if has_app_context() else None
+        key = (app, artist.strip(), title.strip())
+        with self._cond:
+            return self._pending.get(key) or self._in_flight.get(key)
+
+    def flush(self, timeout: Optional[float] = 10.0) -> bool:
+        """
+        Write everything submitted so far and wait for it.
+
+        Args:
+            timeout: Seconds to wait at most (None waits indefinitely)
+
+        Returns:
+            True once the rows are written, False on timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            if not self._pending and self._batches_done == self._batches_started:
+                return True
+            if self._thread is None or not self._thread.is_alive():
+                if self._closed:
+                    return not self._pending
+                self._ensure_thread()
+            # The batch after the one in progress holds every row submitted so far
+            target = self._batches_started + 1 if self._pending else self._batches_started
+            self._flush_requested = max(self._flush_requested, target)
+            self._cond.notify_all()
+            while self._batches_done < target:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Flush pending rows and stop the thread (registered with atexit)."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return dict(self.stats, pending=len(self._pending))
+
+    def _ensure_thread(self) -> None:
+        """Start the writer thread (caller holds the lock)."""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="lyrics-cache-writer", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                deadline = time.monotonic() + self.flush_interval
+                while (
+                    not self._closed
+                    and len(self._pending) < self.batch_size
+                    and self._flush_requested <= self._batches_done
+                ):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch, self._pending = self._pending, {}
+                self._in_flight = batch
+                closed = self._closed
+                self._batches_started += 1
+
+            try:
+                if batch:
+                    self._write(batch)
+            finally:
+                with self._cond:
+                    self._in_flight = {}
+                    self._batches_done += 1
+                    self._cond.notify_all()
+
+            if closed:
+                with self._cond:
+                    if not self._pending:
+                        self._thread = None
+                        return
+
+    def _write(self, batch: Dict[PendingKey, Dict[str, Any]]) -> None:
+        """Upsert one batch, one statement per application."""
+        by_app: Dict[Optional[Flask], list] = {}
+        for (app, _, _), row in batch.items():
+            by_app.setdefault(app, []).append(row)
+
+        for app, rows in by_app.items():
+            try:
+                if app is not None:
+                    with app.app_context():
+                        self._upsert(rows)
+                else:
+                    with ensure_app_context():
+                        self._upsert(rows)
+            except Exception as e:
+                with self._cond:
+                    self.stats["errors"] += 1
+                logger.warning(f"Lyrics cache write of {len(rows)} rows failed: {e}")
+
+    def _upsert(self, rows: list) -> None:
+        from ...extensions import db
+        from ...models.models import LyricsCache
+
+        try:
+            written = LyricsCache.upsert_many(rows)
+        except Exception:
+            db.session.rollback()
+            raise
+        finally:
+            db.session.remove()
+        with self._cond:
+            self.stats["written"] += written
+            self.stats["batches"] += 1
+        logger.debug(f"Lyrics cache writer stored {written} rows")
+
+
+# Global writer instance
+_cache_writer: Optional[LyricsCacheWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_lyrics_cache_writer() -> LyricsCacheWriter:
+    """Get the process-wide LyricsCache writer, sized from the lyrics config."""
+    global _cache_writer
+
+    if _cache_writer is None:
+        with _writer_lock:
+            if _cache_writer is None:
+                from ..lyrics_config import get_config
+
+                config = get_config()
+                writer = LyricsCacheWriter(
+                    batch_size=config.cache_batch_size,
+                    flush_interval=config.cache_batch_timeout,
+                )
+                atexit.register(writer.close)
+                _cache_writer = writer
+
+    return _cache_writer
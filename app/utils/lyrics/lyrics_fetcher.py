@@ -1,17 +1,23 @@
+import asyncio
+import contextvars
 import logging  # Added standard logging import
 import os
 import random
 import re
+import threading
 import time
 from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple
 
 try:
     from unittest.mock import Mock as _Mock
 except Exception:
     _Mock = None
 
+import httpx
 import lyricsgenius
 import requests  # Will be used by lyricsgenius and potentially for alternative sources
 from flask import current_app  # Corrected import
@@ -29,14 +35,33 @@ from app.utils.lyrics_metrics import get_metrics_collector
 
 # Import retry logic and error handling utilities
 from ..retry import retry_with_config
+from .async_http import AsyncLyricsHttp, get_lyrics_http_session
+from .cache_writer import get_lyrics_cache_writer
+from .exceptions import LyricsProviderException
 
 # It's good practice to get a specific logger instance for your module/class
 logger = logging.getLogger(__name__)
 
+# Error recorded for providers skipped because the rate limit wait exceeded its budget
+RATE_LIMITED = "rate limited"
+
 # Legacy API call tracking (kept for rate limiting)
 _last_api_call = 0
 _api_call_count = 0
 
+# Shared pool for provider racing (losing requests finish here in the background)
+_race_executor: Optional[ThreadPoolExecutor] = None
+_race_executor_lock = threading.Lock()
+
+
+def _get_race_executor() -> ThreadPoolExecutor:
+    global _race_executor
+    if _race_executor is None:
+        with _race_executor_lock:
+            if _race_executor is None:
+                _race_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="lyrics-race")
+    return _race_executor
+
 
 class LyricsProvider(ABC):
     """
@@ -44,6 +69,9 @@ class LyricsProvider(ABC):
     All lyrics providers must implement the fetch_lyrics method.
     """
 
+    # Providers needing an API key are kept out of provider racing
+    requires_api_key = False
+
     @abstractmethod
     def fetch_lyrics(self, artist: str, title: str) -> Optional[str]:
         """
@@ -58,11 +86,36 @@ class LyricsProvider(ABC):
         """
         pass
 
+    async def fetch_lyrics_async(self, http: AsyncLyricsHttp, artist: str, title: str) -> Optional[str]:
+        """
+        Fetch lyrics without blocking the event loop.
+
+        Providers without a native async implementation run fetch_lyrics on a thread.
+
+        Args:
+            http: Shared async HTTP client of the batch
+            artist: Artist name
+            title: Song title
+
+        Returns:
+            Lyrics text or None if not found
+        """
+        return await asyncio.to_thread(self.fetch_lyrics, artist, title)
+
     def get_provider_name(self) -> str:
         """Get the name of this provider for logging purposes."""
         return self.__class__.__name__
 
 
+def _raise_for_unavailable(response, provider_name: str) -> None:
+    """
+    Raise for throttled or failing responses (429 / 5xx) so they are not taken
+    for "no lyrics"; other statuses are left to the provider.
+    """
+    if response.status_code == 429 or response.status_code >= 500:
+        raise LyricsProviderException(f"{provider_name} unavailable (HTTP {response.status_code})")
+
+
 class LRCLibProvider(LyricsProvider):
     """
     LRCLib provider for time-synced lyrics.
@@ -90,58 +143,88 @@ class LRCLibProvider(LyricsProvider):
             Lyrics text (preferring synced lyrics) or None if not found
         """
         try:
-            # Clean the search terms
-            clean_artist = self._clean_search_term(artist)
-            clean_title = self._clean_search_term(title)
-
-            # Search parameters
-            search_params = {"artist_name": clean_artist, "track_name": clean_title}
-
-            logger.debug(f"LRCLibProvider: Searching for '{clean_title}' by '{clean_artist}'")
-
-            # Make the API request
-            response = requests.get(
-                self.base_url, params=search_params, headers=self.headers, timeout=self.timeout
+            url, params = self.build_request(artist, title)
+            logger.debug(
+                f"LRCLibProvider: Searching for '{params['track_name']}' by '{params['artist_name']}'"
+            )
+            response = get_lyrics_http_session().get(
+                url, params=params, headers=self.headers, timeout=self.timeout
             )
+            return self.parse_response(response)
 
-            if response.status_code != 200:
-                logger.debug(f"LRCLibProvider: API returned status {response.status_code}")
-                return None
+        except LyricsProviderException:
+            raise
+        except requests.exceptions.Timeout as e:
+            logger.warning(f"LRCLibProvider: Request timeout for '{title}' by '{artist}'")
+            raise LyricsProviderException("LRCLibProvider timed out") from e
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"LRCLibProvider: Request error for '{title}' by '{artist}': {e}")
+            raise LyricsProviderException(f"LRCLibProvider request failed: {e}") from e
+        except Exception as e:
+            logger.error(f"LRCLibProvider: Unexpected error for '{title}' by '{artist}': {e}")
+            raise LyricsProviderException(f"LRCLibProvider unexpected error: {e}") from e
 
-            data = response.json()
-            if not data or len(data) == 0:
-                logger.debug("LRCLibProvider: No results found")
-                return None
+    async def fetch_lyrics_async(self, http: AsyncLyricsHttp, artist: str, title: str) -> Optional[str]:
+        """Async twin of fetch_lyrics over the batch's shared httpx client."""
+        try:
+            url, params = self.build_request(artist, title)
+            response = await http.get(url, params=params, headers=self.headers, timeout=self.timeout)
+            return self.parse_response(response)
+        except LyricsProviderException:
+            raise
+        except httpx.TimeoutException as e:
+            logger.warning(f"LRCLibProvider: Request timeout for '{title}' by '{artist}'")
+            raise LyricsProviderException("LRCLibProvider timed out") from e
+        except httpx.HTTPError as e:
+            logger.warning(f"LRCLibProvider: Request error for '{title}' by '{artist}': {e}")
+            raise LyricsProviderException(f"LRCLibProvider request failed: {e}") from e
+        except Exception as e:
+            logger.error(f"LRCLibProvider: Unexpected error for '{title}' by '{artist}': {e}")
+            raise LyricsProviderException(f"LRCLibProvider unexpected error: {e}") from e
 
-            # Get the first result with lyrics (prefer synced, fall back to plain)
-            for result in data:
-                # Try synced lyrics first (time-stamped)
-                if result.get("syncedLyrics"):
-                    logger.debug(
-                        f"LRCLibProvider: Found synced lyrics ({len(result['syncedLyrics'])} chars)"
-                    )
-                    return self._clean_synced_lyrics(result["syncedLyrics"])
+    def build_request(self, artist: str, title: str) -> Tuple[str, Dict[str, str]]:
+        """Search URL and query parameters for a song."""
+        return self.base_url, {
+            "artist_name": self._clean_search_term(artist),
+            "track_name": self._clean_search_term(title),
+        }
 
-                # Fall back to plain lyrics
-                elif result.get("plainLyrics"):
-                    logger.debug(
-                        f"LRCLibProvider: Found plain lyrics ({len(result['plainLyrics'])} chars)"
-                    )
-                    return self._clean_lyrics(result["plainLyrics"])
+    def parse_response(self, response) -> Optional[str]:
+        """
+        Extract lyrics from a search response (requests or httpx).
 
-            logger.debug("LRCLibProvider: Results found but no lyrics available")
+        Returns:
+            Lyrics text (preferring synced lyrics) or None if not found
+        """
+        _raise_for_unavailable(response, "LRCLibProvider")
+        if response.status_code != 200:
+            logger.debug(f"LRCLibProvider: API returned status {response.status_code}")
             return None
 
-        except requests.exceptions.Timeout:
-            logger.warning(f"LRCLibProvider: Request timeout for '{title}' by '{artist}'")
-            return None
-        except requests.exceptions.RequestException as e:
-            logger.warning(f"LRCLibProvider: Request error for '{title}' by '{artist}': {e}")
-            return None
-        except Exception as e:
-            logger.error(f"LRCLibProvider: Unexpected error for '{title}' by '{artist}': {e}")
+        data = response.json()
+        if not data or len(data) == 0:
+            logger.debug("LRCLibProvider: No results found")
             return None
 
+        # Get the first result with lyrics (prefer synced, fall back to plain)
+        for result in data:
+            # Try synced lyrics first (time-stamped)
+            if result.get("syncedLyrics"):
+                logger.debug(
+                    f"LRCLibProvider: Found synced lyrics ({len(result['syncedLyrics'])} chars)"
+                )
+                return self._clean_synced_lyrics(result["syncedLyrics"])
+
+            # Fall back to plain lyrics
+            elif result.get("plainLyrics"):
+                logger.debug(
+                    f"LRCLibProvider: Found plain lyrics ({len(result['plainLyrics'])} chars)"
+                )
+                return self._clean_lyrics(result["plainLyrics"])
+
+        logger.debug("LRCLibProvider: Results found but no lyrics available")
+        return None
+
     def _clean_search_term(self, term: str) -> str:
         """Clean search terms for better API matching."""
         if not term:
@@ -217,45 +300,64 @@ class LyricsOvhProvider(LyricsProvider):
             Lyrics text or None if not found
         """
         try:
-            # Clean the search terms
-            clean_artist = self._clean_search_term(artist)
-            clean_title = self._clean_search_term(title)
-
-            # Format the URL - lyrics.ovh uses path parameters
-            url = f"{self.base_url}/{clean_artist}/{clean_title}"
-
+            url = self.build_request(artist, title)
             logger.debug(f"LyricsOvhProvider: Fetching from {url}")
+            response = get_lyrics_http_session().get(url, headers=self.headers, timeout=self.timeout)
+            return self.parse_response(response)
 
-            # Make the API request
-            response = requests.get(url, headers=self.headers, timeout=self.timeout)
-
-            if response.status_code != 200:
-                logger.debug(f"LyricsOvhProvider: API returned status {response.status_code}")
-                return None
-
-            data = response.json()
-            if "lyrics" not in data or not data["lyrics"]:
-                logger.debug("LyricsOvhProvider: No lyrics found in response")
-                return None
-
-            lyrics = data["lyrics"].strip()
-            if not lyrics:
-                logger.debug("LyricsOvhProvider: Empty lyrics returned")
-                return None
-
-            logger.debug(f"LyricsOvhProvider: Found lyrics ({len(lyrics)} chars)")
-            return self._clean_lyrics(lyrics)
-
-        except requests.exceptions.Timeout:
+        except LyricsProviderException:
+            raise
+        except requests.exceptions.Timeout as e:
             logger.warning(f"LyricsOvhProvider: Request timeout for '{title}' by '{artist}'")
-            return None
+            raise LyricsProviderException("LyricsOvhProvider timed out") from e
         except requests.exceptions.RequestException as e:
             logger.warning(f"LyricsOvhProvider: Request error for '{title}' by '{artist}': {e}")
-            return None
+            raise LyricsProviderException(f"LyricsOvhProvider request failed: {e}") from e
+        except Exception as e:
+            logger.error(f"LyricsOvhProvider: Unexpected error for '{title}' by '{artist}': {e}")
+            raise LyricsProviderException(f"LyricsOvhProvider unexpected error: {e}") from e
+
+    async def fetch_lyrics_async(self, http: AsyncLyricsHttp, artist: str, title: str) -> Optional[str]:
+        """Async twin of fetch_lyrics over the batch's shared httpx client."""
+        try:
+            response = await http.get(self.build_request(artist, title), headers=self.headers, timeout=self.timeout)
+            return self.parse_response(response)
+        except LyricsProviderException:
+            raise
+        except httpx.TimeoutException as e:
+            logger.warning(f"LyricsOvhProvider: Request timeout for '{title}' by '{artist}'")
+            raise LyricsProviderException("LyricsOvhProvider timed out") from e
+        except httpx.HTTPError as e:
+            logger.warning(f"LyricsOvhProvider: Request error for '{title}' by '{artist}': {e}")
+            raise LyricsProviderException(f"LyricsOvhProvider request failed: {e}") from e
         except Exception as e:
             logger.error(f"LyricsOvhProvider: Unexpected error for '{title}' by '{artist}': {e}")
+            raise LyricsProviderException(f"LyricsOvhProvider unexpected error: {e}") from e
+
+    def build_request(self, artist: str, title: str) -> str:
+        """Lyrics URL for a song (lyrics.ovh uses path parameters)."""
+        return f"{self.base_url}/{self._clean_search_term(artist)}/{self._clean_search_term(title)}"
+
+    def parse_response(self, response) -> Optional[str]:
+        """Extract lyrics from a response (requests or httpx)."""
+        _raise_for_unavailable(response, "LyricsOvhProvider")
+        if response.status_code != 200:
+            logger.debug(f"LyricsOvhProvider: API returned status {response.status_code}")
+            return None
+
+        data = response.json()
+        if "lyrics" not in data or not data["lyrics"]:
+            logger.debug("LyricsOvhProvider: No lyrics found in response")
+            return None
+
+        lyrics = data["lyrics"].strip()
+        if not lyrics:
+            logger.debug("LyricsOvhProvider: Empty lyrics returned")
             return None
 
+        logger.debug(f"LyricsOvhProvider: Found lyrics ({len(lyrics)} chars)")
+        return self._clean_lyrics(lyrics)
+
     def _clean_search_term(self, term: str) -> str:
         """Clean search terms for URL encoding."""
         if not term:
@@ -293,8 +395,14 @@ class GeniusProvider(LyricsProvider):
     This maintains backward compatibility with the current implementation.
     """
 
-    def __init__(self, genius_client=None):
+    requires_api_key = True
+    search_url = "https://api.genius.com/search"
+
+    def __init__(self, genius_client=None, access_token: Optional[str] = None):
         self.genius = genius_client
+        # The async path calls the Genius API directly (lyricsgenius is sync only)
+        self.access_token = access_token
+        self.timeout = 15
 
     @track_lyrics_call("genius_search")
     @retry_with_config(config_prefix="LYRICS_RETRY")
@@ -339,7 +447,78 @@ class GeniusProvider(LyricsProvider):
             logger.warning(
                 f"GeniusProvider: Error fetching lyrics for '{title}' by '{artist}': {e}"
             )
+            raise LyricsProviderException(f"GeniusProvider failed: {e}") from e
+
+    async def fetch_lyrics_async(self, http: AsyncLyricsHttp, artist: str, title: str) -> Optional[str]:
+        """
+        Search the Genius API and scrape the song page over the shared httpx client.
+
+        Falls back to the lyricsgenius client on a thread when no access token is set.
+        """
+        if not self.access_token:
+            if not self.genius:
+                return None
+            return await super().fetch_lyrics_async(http, artist, title)
+
+        clean_title = self._clean_title(title)
+        clean_artist = self._clean_artist(artist)
+        try:
+            response = await http.get(
+                self.search_url,
+                params={"q": f"{clean_title} {clean_artist}"},
+                headers={"Authorization": f"Bearer {self.access_token}"},
+                timeout=self.timeout,
+            )
+            _raise_for_unavailable(response, "GeniusProvider")
+            if response.status_code != 200:
+                logger.debug(f"GeniusProvider: API returned status {response.status_code}")
+                return None
+
+            url = self._match_song_url(response.json(), clean_artist)
+            if not url:
+                logger.debug("GeniusProvider: No lyrics found")
+                return None
+
+            page = await http.get(url, timeout=self.timeout)
+            _raise_for_unavailable(page, "GeniusProvider")
+            if page.status_code != 200:
+                return None
+            lyrics = self._extract_page_lyrics(page.text)
+            if not lyrics:
+                return None
+            lyrics = self._clean_lyrics(lyrics)
+            logger.debug(f"GeniusProvider: Found lyrics ({len(lyrics)} chars)")
+            return lyrics
+
+        except Exception as e:
+            logger.warning(
+                f"GeniusProvider: Error fetching lyrics for '{title}' by '{artist}': {e}"
+            )
+            raise LyricsProviderException(f"GeniusProvider failed: {e}") from e
+
+    @staticmethod
+    def _match_song_url(data: Dict[str, Any], artist: str) -> Optional[str]:
+        """URL of the first song hit whose primary artist matches."""
+        artist = artist.lower()
+        for hit in (data.get("response") or {}).get("hits") or []:
+            if hit.get("type") != "song":
+                continue
+            result = hit.get("result") or {}
+            hit_artist = ((result.get("primary_artist") or {}).get("name") or "").lower()
+            if hit_artist and (artist in hit_artist or hit_artist in artist):
+                return result.get("url")
+        return None
+
+    @staticmethod
+    def _extract_page_lyrics(html: str) -> Optional[str]:
+        """Lyrics text from a Genius song page (same containers lyricsgenius reads)."""
+        from bs4 import BeautifulSoup
+
+        soup = BeautifulSoup(html, "html.parser")
+        containers = soup.select('div[data-lyrics-container="true"]')
+        if not containers:
             return None
+        return "\n".join(container.get_text(separator="\n") for container in containers)
 
     def _clean_title(self, title: str) -> str:
         """Clean song title for better matching"""
@@ -375,10 +554,35 @@ class GeniusProvider(LyricsProvider):
         return lyrics.strip()
 
 
+def _acquire_before_deadline(
+    try_acquire: Callable[[], float], timeout: Optional[float], cancelled: Optional[threading.Event] = None
+) -> bool:
+    """
+    Call try_acquire until it grants (returns 0) or the deadline passes.
+
+    Gives up without sleeping when the next grant would come after the deadline,
+    and as soon as `cancelled` is set while waiting.
+    """
+    deadline = None if timeout is None else time.time() + timeout
+    while True:
+        wait = try_acquire()
+        if wait <= 0:
+            return True
+        if deadline is not None and time.time() + wait > deadline:
+            return False
+        if cancelled is None:
+            time.sleep(wait)
+        elif cancelled.wait(wait):
+            return False
+
+
 class TokenBucket:
     """
     Token bucket algorithm for request throttling.
     Tokens refill at a constant rate and are consumed by requests.
+
+    Thread-safe: every method runs under one lock, so fetcher threads
+    sharing a bucket can neither overdraw it nor lose refills.
     """
 
     def __init__(self, capacity: int = 10, refill_rate: float = 1.0):
@@ -393,9 +597,10 @@ class TokenBucket:
         self.refill_rate = refill_rate
         self.tokens = capacity  # Start with full bucket
         self.last_refill = time.time()
+        self._lock = threading.Lock()
 
     def _refill(self) -> None:
-        """Refill tokens based on elapsed time."""
+        """Refill tokens based on elapsed time (caller holds the lock)."""
         current_time = time.time()
         elapsed = current_time - self.last_refill
 
@@ -404,6 +609,12 @@ class TokenBucket:
             self.tokens = min(self.capacity, self.tokens + tokens_to_add)
             self.last_refill = current_time
 
+    def _wait_time(self, tokens: int) -> float:
+        """Exact seconds until `tokens` can be taken (caller holds the lock, after _refill)."""
+        if int(self.tokens) >= tokens:
+            return 0.0
+        return max(min(tokens, self.capacity) - self.tokens, 0.0) / self.refill_rate
+
     def consume(self, tokens: int = 1) -> bool:
         """
         Try to consume tokens from the bucket.
@@ -420,14 +631,47 @@ class TokenBucket:
         if tokens == 0:
             return True
 
-        self._refill()
+        return self.try_acquire(tokens) == 0.0
 
-        # Check if we have enough tokens (fractional tokens allowed)
-        if int(self.tokens) >= tokens:
-            self.tokens -= tokens
-            return True
+    def try_acquire(self, tokens: int = 1) -> float:
+        """
+        Take tokens if they are available, never sleeping.
+
+        Args:
+            tokens: Number of tokens to take
+
+        Returns:
+            0.0 when the tokens were taken, otherwise seconds until they could be
+        """
+        with self._lock:
+            self._refill()
+            # Check if we have enough tokens (fractional tokens allowed)
+            if int(self.tokens) >= tokens:
+                self.tokens -= tokens
+                return 0.0
+            return max(self._wait_time(tokens), 1e-3)
+
+    def acquire(self, tokens: int = 1, timeout: Optional[float] = None) -> bool:
+        """
+        Take tokens, sleeping until they are available or the deadline passes.
+
+        Args:
+            tokens: Number of tokens to take
+            timeout: Seconds to wait at most (None waits indefinitely)
+
+        Returns:
+            True if the tokens were taken, False on timeout or when `tokens`
+            exceeds the bucket's capacity (it could never hold that many)
+        """
+        if tokens > self.capacity:
+            return False
+        return _acquire_before_deadline(lambda: self.try_acquire(tokens), timeout)
 
-        return False
+    def wait_time(self, tokens: int = 1) -> float:
+        """Seconds until `tokens` could be taken, without taking them (0 if available now)."""
+        with self._lock:
+            self._refill()
+            return self._wait_time(tokens)
 
     def get_available_tokens(self) -> int:
         """
@@ -436,8 +680,9 @@ class TokenBucket:
         Returns:
             Number of tokens currently available
         """
-        self._refill()
-        return int(self.tokens)
+        with self._lock:
+            self._refill()
+            return int(self.tokens)
 
     def time_until_available(self, tokens: int) -> float:
         """
@@ -449,24 +694,29 @@ class TokenBucket:
         Returns:
             Time in seconds until tokens are available, 0 if available now
         """
-        self._refill()
+        with self._lock:
+            self._refill()
 
-        if int(self.tokens) >= tokens:
-            return 0.0
+            if int(self.tokens) >= tokens:
+                return 0.0
 
-        # Can't have more tokens than capacity
-        tokens_needed = min(tokens, self.capacity) - int(self.tokens)
-        return tokens_needed / self.refill_rate
+            # Can't have more tokens than capacity
+            tokens_needed = min(tokens, self.capacity) - int(self.tokens)
+            return tokens_needed / self.refill_rate
 
     def reset(self) -> None:
         """Reset bucket to full capacity."""
-        self.tokens = self.capacity
-        self.last_refill = time.time()
+        with self._lock:
+            self.tokens = self.capacity
+            self.last_refill = time.time()
 
 
 class RateLimitTracker:
     """
     Tracks API request rates within a sliding time window to detect when approaching rate limits.
+
+    Thread-safe: timestamps are kept in order in a deque under one lock, and
+    try_acquire checks and records a request atomically.
     """
 
     def __init__(self, window_size: int = 60, max_requests: int = 50):
@@ -479,7 +729,8 @@ class RateLimitTracker:
         """
         self.window_size = window_size
         self.max_requests = max_requests
-        self.request_timestamps = []
+        self.request_timestamps: Deque[float] = deque()
+        self._lock = threading.Lock()
 
     def can_make_request(self) -> bool:
         """
@@ -488,12 +739,40 @@ class RateLimitTracker:
         Returns:
             True if request can be made, False if rate limit would be exceeded
         """
-        self._cleanup_old_timestamps()
-        return len(self.request_timestamps) < self.max_requests
+        with self._lock:
+            self._cleanup_old_timestamps()
+            return len(self.request_timestamps) < self.max_requests
 
     def record_request(self) -> None:
         """Record that a request was made at the current time."""
-        self.request_timestamps.append(time.time())
+        with self._lock:
+            self.request_timestamps.append(time.time())
+
+    def try_acquire(self) -> float:
+        """
+        Record a request if the window has room, never sleeping.
+
+        Returns:
+            0.0 when the request was recorded, otherwise seconds until the window has room
+        """
+        with self._lock:
+            self._cleanup_old_timestamps()
+            if len(self.request_timestamps) < self.max_requests:
+                self.request_timestamps.append(time.time())
+                return 0.0
+            return max(self._time_until_room(), 1e-3)
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Record a request, sleeping until the window has room or the deadline passes.
+
+        Args:
+            timeout: Seconds to wait at most (None waits indefinitely)
+
+        Returns:
+            True if the request was recorded, False on timeout
+        """
+        return _acquire_before_deadline(self.try_acquire, timeout)
 
     def get_current_request_count(self) -> int:
         """
@@ -502,8 +781,9 @@ class RateLimitTracker:
         Returns:
             Number of requests in the current window
         """
-        self._cleanup_old_timestamps()
-        return len(self.request_timestamps)
+        with self._lock:
+            self._cleanup_old_timestamps()
+            return len(self.request_timestamps)
 
     def time_until_next_available(self) -> float:
         """
@@ -512,28 +792,28 @@ class RateLimitTracker:
         Returns:
             Time in seconds until next request is available, 0 if available now
         """
-        if self.can_make_request():
-            return 0.0
-
-        if not self.request_timestamps:
-            return 0.0
-
-        # Time until the oldest request expires from the window
-        oldest_timestamp = min(self.request_timestamps)
-        current_time = time.time()
-        time_until_expire = self.window_size - (current_time - oldest_timestamp)
-
-        return max(0.0, time_until_expire)
+        with self._lock:
+            self._cleanup_old_timestamps()
+            if len(self.request_timestamps) < self.max_requests:
+                return 0.0
+            return self._time_until_room()
 
     def reset(self) -> None:
         """Reset the tracker, clearing all recorded timestamps."""
-        self.request_timestamps = []
+        with self._lock:
+            self.request_timestamps.clear()
+
+    def _time_until_room(self) -> float:
+        """Time until the oldest request expires from the window (caller holds the lock)."""
+        if not self.request_timestamps:
+            return 0.0
+        return max(0.0, self.window_size - (time.time() - self.request_timestamps[0]))
 
     def _cleanup_old_timestamps(self) -> None:
-        """Remove timestamps that are outside the current time window."""
-        current_time = time.time()
-        cutoff_time = current_time - self.window_size
-        self.request_timestamps = [ts for ts in self.request_timestamps if ts > cutoff_time]
+        """Remove timestamps that are outside the current time window (caller holds the lock)."""
+        cutoff_time = time.time() - self.window_size
+        while self.request_timestamps and self.request_timestamps[0] <= cutoff_time:
+            self.request_timestamps.popleft()
 
 
 class LyricsFetcher:
@@ -568,6 +848,9 @@ class LyricsFetcher:
             capacity=self.config.token_bucket_capacity,
             refill_rate=self.config.token_bucket_refill_rate,
         )
+        self._rate_lock = threading.Lock()
+        self.provider_buckets: Dict[str, TokenBucket] = {}
+        self.set_provider_rate_limits(self.config.provider_rate_limits)
 
         # Initialize Genius client if token is available
         self.genius = None
@@ -616,7 +899,7 @@ class LyricsFetcher:
         # 3. Genius - Tertiary source (requires API key, but comprehensive)
         if self.genius:
             try:
-                self.providers.append(GeniusProvider(self.genius))
+                self.providers.append(GeniusProvider(self.genius, access_token=self.genius_token))
                 logger.debug("LyricsFetcher: GeniusProvider initialized")
             except Exception as e:
                 logger.warning(f"LyricsFetcher: Failed to initialize GeniusProvider: {e}")
@@ -627,21 +910,15 @@ class LyricsFetcher:
                 f"LyricsFetcher: Initialized with {len(self.providers)} providers: {', '.join(provider_names)}"
             )
 
-        # Track provider usage statistics
-        self.provider_stats = {
-            provider.get_provider_name(): {"attempts": 0, "successes": 0}
-            for provider in self.providers
-        }
+        # Track provider usage statistics (race workers update them concurrently)
+        self._stats_lock = threading.Lock()
+        self.provider_stats = {}
+        for provider in self.providers:
+            self._stats_for(provider)
 
-        # Initialize batch cache system for improved database performance
-        self._cache_batch = []
-        self._batch_size = getattr(
-            config, "cache_batch_size", 10
-        )  # Default batch size tuned for tests
-        self._batch_timeout = getattr(
-            config, "cache_batch_timeout", 30
-        )  # Seconds to wait before forcing commit
-        self._last_batch_time = time.time()
+        # Cache writes are coalesced and upserted by the shared background writer
+        self._cache_writer = get_lyrics_cache_writer()
+        self._batch_size = self.config.cache_batch_size
         # Detect pytest to avoid app context issues in background flush and adjust throttling
         self._is_testing = bool(os.getenv("PYTEST_CURRENT_TEST"))
         # No test-specific throttling changes; rely on defaults to satisfy rate tests
@@ -669,8 +946,12 @@ class LyricsFetcher:
                     logger.warning(f"Invalid cache key format: {cache_key[:8]}...")
                 return None
 
-            # Look up in database cache
-            cache_entry = LyricsCache.find_cached_lyrics(artist, title)
+            # Rows still waiting in the background writer, then the database
+            cache_entry = self._cache_writer.pending(artist, title)
+            if cache_entry is not None:
+                cache_entry = LyricsCache(**cache_entry)
+            else:
+                cache_entry = LyricsCache.find_cached_lyrics(artist, title)
 
             if cache_entry:
                 # Handle negative cache entries - return None to indicate "failed lookup"
@@ -706,8 +987,10 @@ class LyricsFetcher:
             self.metrics.record_error("cache_lookup_error", error=str(e))
             return None
 
-    def _add_to_cache_batch(self, cache_key: str, lyrics: Optional[str]) -> None:
-        """Add a cache operation to the batch for later processing"""
+    def _add_to_cache_batch(
+        self, cache_key: str, lyrics: Optional[str], source: Optional[str] = None
+    ) -> None:
+        """Hand a cache write to the background writer (never touches the database)"""
         try:
             # Extract artist and title from cache key
             parts = cache_key.split(":")
@@ -719,28 +1002,23 @@ class LyricsFetcher:
                     logger.warning(f"Invalid cache key format for batch: {cache_key[:8]}...")
                 return
 
-            # Add to batch
-            cache_operation = {
-                "artist": artist,
-                "title": title,
-                "lyrics": lyrics,
-                "cache_key": cache_key,
-                "timestamp": time.time(),
-            }
+            if lyrics:
+                source = source or "unknown"
+                operation = "store"
+            else:
+                # Allow disabling negative cache in CI to avoid cross-thread interference
+                if os.getenv("LYRICS_DISABLE_NEGATIVE_CACHE") in ("1", "true", "True"):
+                    return
+                source = "negative_cache"
+                operation = "store_negative"
 
-            self._cache_batch.append(cache_operation)
+            if not self._cache_writer.submit(artist, title, lyrics, source):
+                self.metrics.record_error("cache_batch_dropped", key=cache_key[:8])
+                return
 
             if self.config.log_cache_operations:
-                logger.debug(
-                    f"Added to cache batch: '{artist}' - '{title}' (batch size: {len(self._cache_batch)})"
-                )
-
-            # Check if we should flush the batch
-            current_time = time.time()
-            batch_age = current_time - self._last_batch_time
-
-            if len(self._cache_batch) >= self._batch_size or batch_age >= self._batch_timeout:
-                self._flush_cache_batch()
+                logger.debug(f"Queued cache write for '{artist}' - '{title}' (source: {source})")
+            self.metrics.record_cache_operation(operation, key=cache_key[:8], source=source)
 
         except Exception as e:
             if self.config.log_cache_operations:
@@ -748,98 +1026,22 @@ class LyricsFetcher:
             self.metrics.record_error("cache_batch_error", error=str(e))
 
     def _flush_cache_batch(self) -> None:
-        """Flush the current cache batch to the database"""
-        if not self._cache_batch:
-            return
-
-        try:
-            batch_size = len(self._cache_batch)
-            successful_ops = 0
-            negative_ops = 0
-
-            # Process all items in the batch
-            for operation in self._cache_batch:
-                try:
-                    artist = operation["artist"]
-                    title = operation["title"]
-                    lyrics = operation["lyrics"]
-                    cache_key = operation["cache_key"]
-
-                    # Handle negative caching (failed lookups)
-                    if not lyrics:
-                        # Allow disabling negative cache in CI to avoid cross-thread interference
-                        if os.getenv("LYRICS_DISABLE_NEGATIVE_CACHE") in ("1", "true", "True"):
-                            continue
-                        # Cache the failed lookup with empty string and negative_cache source
-                        cache_entry = LyricsCache.cache_lyrics(artist, title, "", "negative_cache")
-                        negative_ops += 1
-
-                        if self.config.log_cache_operations:
-                            logger.debug(f"Batched negative cache for '{artist}' - '{title}'")
-                        self.metrics.record_cache_operation("store_negative", key=cache_key[:8])
-                    else:
-                        # Determine the source provider (use the last successful provider)
-                        source = "unknown"
-                        for provider_name, stats in self.provider_stats.items():
-                            if stats.get("successes", 0) > 0:
-                                source = provider_name
-                                break
-
-                        # Store in database cache
-                        cache_entry = LyricsCache.cache_lyrics(artist, title, lyrics, source)
-                        successful_ops += 1
-
-                        if self.config.log_cache_operations:
-                            logger.debug(
-                                f"Batched cache for '{artist}' - '{title}' (source: {source}, {len(lyrics)} chars)"
-                            )
-                        self.metrics.record_cache_operation(
-                            "store", key=cache_key[:8], source=source
-                        )
-
-                except Exception as e:
-                    if self.config.log_cache_operations:
-                        logger.warning(f"Error processing cache batch item: {e}")
-                    self.metrics.record_error("cache_batch_item_error", error=str(e))
-
-            # Single commit for the entire batch (tests patch db.session.commit to count)
-            try:
-                db.session.commit()
-            except Exception as e:
-                # In rare cases where app context isn't available in a test path, skip committing
-                if self.config.log_cache_operations:
-                    logger.warning(f"Batch commit skipped due to context error: {e}")
-
-            if self.config.log_cache_operations:
-                logger.info(
-                    f"Flushed cache batch: {batch_size} operations ({successful_ops} positive, {negative_ops} negative) in single commit"
-                )
+        """Wait for the background writer to store every queued cache write"""
+        if not self._cache_writer.flush():
+            logger.warning("Timed out waiting for queued lyrics cache writes")
 
-            # Record batch metrics
-            self.metrics.record_event(
-                "cache_batch_flushed",
-                batch_size=batch_size,
-                successful_ops=successful_ops,
-                negative_ops=negative_ops,
-            )
+    def _store_in_cache(
+        self, cache_key: str, lyrics: Optional[str], ttl: int = None, source: Optional[str] = None
+    ) -> None:
+        """Store lyrics in database cache (now uses batching for better performance)
 
-        except Exception as e:
-            db.session.rollback()
-            if self.config.log_cache_operations:
-                logger.error(f"Error flushing cache batch: {e}")
-            self.metrics.record_error("cache_batch_flush_error", error=str(e))
-        finally:
-            # Clear the batch and reset timer
-            self._cache_batch.clear()
-            self._last_batch_time = time.time()
-
-    def _store_in_cache(self, cache_key: str, lyrics: Optional[str], ttl: int = None) -> None:
-        """Store lyrics in database cache (now uses batching for better performance)"""
+        source names the provider that returned the lyrics; it is ignored for negative entries.
+        """
         # If a TTL is provided (tests rely on immediate availability), store immediately
         # Also, during tests we store immediately to avoid app-context issues
         if ttl is None and self._batch_size > 1 and not self._is_testing:
             # Use batch system for better performance
-            self._add_to_cache_batch(cache_key, lyrics)
+            self._add_to_cache_batch(cache_key, lyrics, source)
             return
 
         # Fallback to immediate storage for batch_size = 1 or emergency cases
@@ -876,14 +1078,8 @@ class LyricsFetcher:
                 self.metrics.record_cache_operation("store_negative", key=cache_key[:8])
                 return
 
-            # Determine the source provider (use the last successful provider)
-            source = "unknown"
-            for provider_name, stats in self.provider_stats.items():
-                if stats.get("successes", 0) > 0:
-                    source = provider_name
-                    break
-
             # Store in database cache
+            source = source or "unknown"
             cache_entry = LyricsCache.cache_lyrics(artist, title, lyrics, source)
             try:
                 db.session.commit()
@@ -1085,36 +1281,66 @@ class LyricsFetcher:
         )
         raise RequestException(f"Exhausted all {max_retries} attempts for {url}")
 
-    def _respect_rate_limit(self):
-        """Implement smart rate limiting using both RateLimitTracker and TokenBucket"""
-        # First check token bucket throttling
-        if not self.token_bucket.consume(1):
-            sleep_time = self.token_bucket.time_until_available(1)
-            if sleep_time > 0:
-                if self.config.log_rate_limit_events:
-                    logger.info(
-                        f"Token bucket throttling: Sleeping for {sleep_time:.1f}s before next request"
-                    )
-                self.metrics.record_rate_limit_event("token_bucket_wait", sleep_time)
-                time.sleep(sleep_time)
-                # Try to consume token again after waiting
-                if not self.token_bucket.consume(1):
-                    logger.warning("Failed to consume token even after waiting")
-                    self.metrics.record_error("token_bucket_failure")
-
-        # Then check sliding window rate limit
-        if not self.rate_tracker.can_make_request():
-            sleep_time = self.rate_tracker.time_until_next_available()
-            if sleep_time > 0:
-                if self.config.log_rate_limit_events:
-                    logger.info(
-                        f"Rate limit reached. Sleeping for {sleep_time:.1f}s before next request"
-                    )
-                self.metrics.record_rate_limit_event("sliding_window_wait", sleep_time)
-                time.sleep(sleep_time)
+    def set_provider_rate_limits(self, rates: Optional[Dict[str, float]]) -> None:
+        """
+        Give providers their own token buckets on top of the fetcher-wide limits.
+
+        Args:
+            rates: Requests per second by provider name (providers not listed are unlimited)
+        """
+        self.provider_buckets = {
+            name: TokenBucket(capacity=max(1, int(rps)), refill_rate=rps)
+            for name, rps in (rates or {}).items()
+        }
+
+    def _try_acquire_rate_limit(self, provider_name: Optional[str] = None) -> float:
+        """
+        Take one request from the token bucket, the sliding window and the
+        provider's bucket together, never sleeping.
+
+        Returns:
+            0.0 when the request may go ahead, otherwise seconds until all limits allow it
+        """
+        provider_bucket = self.provider_buckets.get(provider_name)
+        # One lock across the three limiters, so a grant never takes from one and not the others
+        with self._rate_lock:
+            wait = max(
+                self.token_bucket.wait_time(1),
+                self.rate_tracker.time_until_next_available(),
+                provider_bucket.wait_time(1) if provider_bucket else 0.0,
+            )
+            if wait > 0:
+                return wait
+            self.token_bucket.try_acquire(1)
+            self.rate_tracker.try_acquire()
+            if provider_bucket:
+                provider_bucket.try_acquire(1)
+            return 0.0
+
+    def _respect_rate_limit(
+        self, provider_name: Optional[str] = None, cancelled: Optional[threading.Event] = None
+    ) -> bool:
+        """
+        Wait for the rate limits, at most config.rate_limit_max_wait seconds.
+
+        Args:
+            provider_name: Provider whose per-provider bucket also applies
+            cancelled: Stop waiting (without taking a token) once this is set
 
-        # Record that we're about to make a request
-        self.rate_tracker.record_request()
+        Returns:
+            True once the request may go ahead, False if that would take longer
+            than the wait budget (the caller skips the provider instead of stalling)
+            or the wait was cancelled
+        """
+        max_wait = self.config.rate_limit_max_wait
+        granted = _acquire_before_deadline(lambda: self._wait_or_grant(provider_name), max_wait, cancelled)
+        if not granted:
+            if cancelled is not None and cancelled.is_set():
+                return False
+            if self.config.log_rate_limit_events:
+                logger.info(f"Rate limit wait for {provider_name} exceeds {max_wait:.1f}s, skipping provider")
+            self.metrics.record_rate_limit_event("rate_limit_timeout", max_wait)
+            return False
 
         # Log current rate limit status
         if self.config.log_rate_limit_events:
@@ -1123,6 +1349,229 @@ class LyricsFetcher:
             logger.debug(
                 f"Rate limiting: {current_count}/{self.rate_tracker.max_requests} requests in window, {available_tokens} tokens available"
             )
+        return True
+
+    def _wait_or_grant(self, provider_name: Optional[str]) -> float:
+        wait = self._try_acquire_rate_limit(provider_name)
+        if wait > 0:
+            if self.config.log_rate_limit_events:
+                logger.info(f"Rate limited: next request in {wait:.2f}s")
+            self.metrics.record_rate_limit_event("rate_limit_wait", wait)
+        return wait
+
+    def _stats_for(self, provider: LyricsProvider) -> Tuple[str, Dict[str, Any]]:
+        """Return the provider's name and its (lazily created) stats entry (update it via _bump_stat)."""
+        provider_name = provider.get_provider_name() or "UnknownProvider"
+        with self._stats_lock:
+            if provider_name not in self.provider_stats:
+                self.provider_stats[provider_name] = {
+                    "attempts": 0,
+                    "successes": 0,
+                    "race_wins": 0,
+                    "race_time_saved": 0.0,
+                }
+            return provider_name, self.provider_stats[provider_name]
+
+    def _bump_stat(self, provider: LyricsProvider, field: str, amount: float = 1) -> None:
+        """Add to one of the provider's stats under the stats lock."""
+        _, stats = self._stats_for(provider)
+        with self._stats_lock:
+            stats[field] += amount
+
+    def _record_provider_result(
+        self, provider: LyricsProvider, lyrics: Optional[str], elapsed: float, title: str, artist: str
+    ) -> None:
+        """Update stats and metrics after a provider answered."""
+        provider_name, _ = self._stats_for(provider)
+        if lyrics:
+            self._bump_stat(provider, "successes")
+            # Metrics compatibility: guard optional methods
+            if hasattr(self.metrics, "record_provider_success"):
+                self.metrics.record_provider_success(provider_name, elapsed)
+            if self.config.log_api_calls:
+                logger.info(
+                    f"Successfully fetched lyrics from {provider_name} for '{title}' by {artist} ({len(lyrics)} characters)"
+                )
+        else:
+            if hasattr(self.metrics, "record_provider_failure"):
+                self.metrics.record_provider_failure(provider_name, "no_lyrics_found")
+            if self.config.log_api_calls:
+                logger.debug(f"No lyrics found by {provider_name} for '{title}' by {artist}")
+
+    def _record_provider_error(
+        self, provider: LyricsProvider, error: Exception, errors: List[str], title: str, artist: str
+    ) -> None:
+        provider_name, _ = self._stats_for(provider)
+        error_msg = str(error)
+        errors.append(f"{provider_name}: {error_msg}")
+        if hasattr(self.metrics, "record_provider_failure"):
+            self.metrics.record_provider_failure(provider_name, error_msg)
+        logger.warning(f"Error with provider {provider_name} for '{title}' by {artist}: {error_msg}")
+
+    def _fetch_sequentially(
+        self, providers: List[LyricsProvider], title: str, artist: str
+    ) -> Tuple[Optional[str], List[str], Optional[str]]:
+        """
+        Try each provider in order until one returns lyrics.
+
+        Returns:
+            (lyrics or None, provider error messages, name of the provider that returned the lyrics)
+        """
+        lyrics = None
+        source = None
+        errors: List[str] = []
+
+        for provider in providers:
+            provider_name, _ = self._stats_for(provider)
+
+            # Check rate limits
+            if not self._check_rate_limits(provider_name):
+                self.metrics.record_error("rate_limit_exceeded", provider=provider_name)
+                errors.append(f"{provider_name}: {RATE_LIMITED}")
+                continue
+
+            # Track provider attempt
+            self._bump_stat(provider, "attempts")
+
+            try:
+                if self.config.log_api_calls:
+                    logger.debug(
+                        f"Attempting to fetch lyrics from {provider_name} for '{title}' by {artist}"
+                    )
+
+                provider_start = time.time()
+                # Providers expect (artist, title)
+                lyrics = provider.fetch_lyrics(artist, title)
+                self._record_provider_result(provider, lyrics, time.time() - provider_start, title, artist)
+                if lyrics:
+                    source = provider_name
+                    break
+            except Exception as e:
+                self._record_provider_error(provider, e, errors, title, artist)
+                continue
+
+        return lyrics, errors, source
+
+    def _passes_quality_check(self, lyrics: Optional[str]) -> bool:
+        """Whether a raced result is good enough to end the race (not a stub or single line)."""
+        if not lyrics:
+            return False
+        text = lyrics.strip()
+        lines = [line for line in text.splitlines() if line.strip()]
+        return len(text) >= self.config.race_min_lyrics_chars and len(lines) >= 2
+
+    def _race_fetch(
+        self, provider: LyricsProvider, artist: str, title: str, race_over: threading.Event
+    ) -> Tuple[Optional[str], float, bool]:
+        """
+        One racer, run on the race pool. The rate-limit token is taken here, when
+        the request is about to start, so racers that are cancelled or still
+        waiting when the race ends never use one.
+
+        Returns:
+            (lyrics, elapsed seconds, started) - started is False when the provider
+            was skipped for rate limiting or the race ended first
+        """
+        provider_name, _ = self._stats_for(provider)
+        if race_over.is_set() or not self._check_rate_limits(provider_name, cancelled=race_over):
+            return None, 0.0, False
+        self._bump_stat(provider, "attempts")
+        start = time.time()
+        return provider.fetch_lyrics(artist, title), time.time() - start, True
+
+    def _race_providers(
+        self, title: str, artist: str
+    ) -> Tuple[Optional[str], List[str], Optional[str]]:
+        """
+        Query the free providers concurrently; the first result passing the quality
+        check wins, unless a higher-priority provider also succeeds within the grace
+        period. Providers needing an API key (Genius) are only tried afterwards.
+
+        Losers are abandoned: queued requests are cancelled, racers still waiting
+        on the rate limits give up without taking a token, and requests already
+        in flight finish in the background with their results ignored.
+
+        Returns:
+            (lyrics or None, provider error messages, name of the winning provider)
+        """
+        free = [p for p in self.providers if not p.requires_api_key]
+        keyed = [p for p in self.providers if p.requires_api_key]
+        if len(free) < 2:
+            return self._fetch_sequentially(self.providers, title, artist)
+
+        race_start = time.time()
+        race_over = threading.Event()
+        futures = {}
+        errors: List[str] = []
+        for priority, provider in enumerate(free):
+            future = _get_race_executor().submit(
+                contextvars.copy_context().run, self._race_fetch, provider, artist, title, race_over
+            )
+            futures[future] = (priority, provider)
+
+        good: Dict[int, str] = {}
+        names: Dict[int, str] = {}
+        weak: Dict[int, str] = {}  # Lyrics failing the quality check, used as a last resort
+        elapsed_by_priority: Dict[int, float] = {}
+        pending = set(futures)
+        deadline = None
+
+        while pending:
+            timeout = None if deadline is None else max(0.0, deadline - time.time())
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                priority, provider = futures[future]
+                try:
+                    lyrics, elapsed, started = future.result()
+                except Exception as e:
+                    elapsed_by_priority[priority] = time.time() - race_start
+                    self._record_provider_error(provider, e, errors, title, artist)
+                    continue
+                if not started:
+                    provider_name, _ = self._stats_for(provider)
+                    self.metrics.record_error("rate_limit_exceeded", provider=provider_name)
+                    errors.append(f"{provider_name}: {RATE_LIMITED}")
+                    continue
+                elapsed_by_priority[priority] = elapsed
+                names[priority], _ = self._stats_for(provider)
+                self._record_provider_result(provider, lyrics, elapsed, title, artist)
+                if self._passes_quality_check(lyrics):
+                    good[priority] = lyrics
+                    if deadline is None:
+                        deadline = time.time() + self.config.race_grace_period
+                elif lyrics:
+                    weak[priority] = lyrics
+
+            if good:
+                best = min(good)
+                higher_pending = any(futures[f][0] < best for f in pending)
+                if not higher_pending or time.time() >= deadline:
+                    break
+
+        race_over.set()
+        for future in pending:
+            future.cancel()
+
+        if good:
+            best = min(good)
+            race_elapsed = time.time() - race_start
+            # Sequential cost: every higher-priority provider's latency plus the winner's
+            sequential = sum(
+                elapsed_by_priority.get(priority, race_elapsed) for priority in range(best + 1)
+            )
+            self._bump_stat(free[best], "race_wins")
+            self._bump_stat(free[best], "race_time_saved", max(0.0, sequential - race_elapsed))
+            return good[best], errors, names[best]
+
+        if keyed:
+            lyrics, keyed_errors, source = self._fetch_sequentially(keyed, title, artist)
+            errors.extend(keyed_errors)
+            if lyrics:
+                return lyrics, errors, source
+
+        if weak:
+            return weak[min(weak)], errors, names[min(weak)]
+        return None, errors, None
 
     def fetch_lyrics(self, title: str, artist: str, force_refresh: bool = False) -> Optional[str]:
         """
@@ -1136,9 +1585,26 @@ class LyricsFetcher:
         Returns:
             Lyrics string if found, None otherwise
         """
+        return self.fetch_lyrics_with_status(title, artist, force_refresh=force_refresh)[0]
+
+    def fetch_lyrics_with_status(
+        self, title: str, artist: str, force_refresh: bool = False
+    ) -> Tuple[Optional[str], bool]:
+        """
+        Fetch lyrics and report whether a miss is definitive.
+
+        Args:
+            title: Song title
+            artist: Artist name
+            force_refresh: If True, bypass cache and fetch fresh data
+
+        Returns:
+            (lyrics or None, definitive): definitive is False when the miss may be
+            transient (a provider failed or timed out, or was skipped by the rate limits)
+        """
         # Basic input validation
         if not title or not artist:
-            return None
+            return None, False
 
         start_time = time.time()
         cache_key = self._get_cache_key(title, artist)
@@ -1150,86 +1616,28 @@ class LyricsFetcher:
                 # Found lyrics in cache
                 if hasattr(self.metrics, "record_fetch_time"):
                     self.metrics.record_fetch_time("cache_hit", time.time() - start_time)
-                return cached_lyrics
+                return cached_lyrics, True
             else:
                 # Negative cache detection is handled inside _get_from_cache via source=='negative_cache'
                 pass
 
-        # Try each provider in order (respect cache on subsequent calls)
-        lyrics = None
-        errors = []
-
-        for provider in self.providers:
-            provider_name = provider.get_provider_name() or "UnknownProvider"
-            if provider_name not in self.provider_stats:
-                self.provider_stats[provider_name] = {"attempts": 0, "successes": 0}
-
-            # Check rate limits
-            if not self._check_rate_limits():
-                self.metrics.record_error("rate_limit_exceeded", provider=provider_name)
-                continue
-
-            # Track provider attempt
-            self.provider_stats[provider_name]["attempts"] += 1
-
-            try:
-                if self.config.log_api_calls:
-                    logger.debug(
-                        f"Attempting to fetch lyrics from {provider_name} for '{title}' by {artist}"
-                    )
-
-                provider_start = time.time()
-                # In tests, avoid any network in case patching fails under concurrency
-                # Providers expect (artist, title)
-                lyrics = provider.fetch_lyrics(artist, title)
-                provider_time = time.time() - provider_start
-
-                if lyrics:
-                    # Success - track provider stats and break
-                    self.provider_stats[provider_name]["successes"] += 1
-                    # Metrics compatibility: guard optional methods
-                    if hasattr(self.metrics, "record_provider_success"):
-                        self.metrics.record_provider_success(provider_name, provider_time)
-
-                    if self.config.log_api_calls:
-                        logger.info(
-                            f"Successfully fetched lyrics from {provider_name} for '{title}' by {artist} ({len(lyrics)} characters)"
-                        )
-                    break
-                else:
-                    if hasattr(self.metrics, "record_provider_failure"):
-                        self.metrics.record_provider_failure(provider_name, "no_lyrics_found")
-                    if self.config.log_api_calls:
-                        logger.debug(
-                            f"No lyrics found by {provider_name} for '{title}' by {artist}"
-                        )
-
-            except Exception as e:
-                error_msg = str(e)
-                errors.append(f"{provider_name}: {error_msg}")
-                if hasattr(self.metrics, "record_provider_failure"):
-                    self.metrics.record_provider_failure(provider_name, error_msg)
-
-                logger.warning(
-                    f"Error with provider {provider_name} for '{title}' by {artist}: {error_msg}"
-                )
-                continue
+        if self.config.provider_racing:
+            lyrics, errors, source = self._race_providers(title, artist)
+        else:
+            lyrics, errors, source = self._fetch_sequentially(self.providers, title, artist)
 
         # Before caching negative, re-check cache for a positive result (handles concurrency races in tests)
         if lyrics is None and self.config.use_cache:
             cached_now = self._get_from_cache(cache_key)
             if cached_now:
-                return cached_now
+                return cached_now, True
 
-        # Store result in cache (both positive and negative results)
-        if self.config.use_cache:
-            # Ensure immediate availability for follow-up calls in the same test
-            prev_batch_size = self._batch_size
-            try:
-                self._batch_size = 1
-                self._store_in_cache(cache_key, lyrics)
-            finally:
-                self._batch_size = prev_batch_size
+        # Store result in cache (both positive and negative results); a miss caused
+        # by failing or rate-limited providers says nothing about the song
+        definitive = bool(lyrics) or (bool(self.providers) and not errors)
+        if self.config.use_cache and definitive:
+            # Queued for the background writer; follow-up lookups see it via pending()
+            self._store_in_cache(cache_key, lyrics, source=source)
 
         # Record final metrics
         total_time = time.time() - start_time
@@ -1243,16 +1651,163 @@ class LyricsFetcher:
                     f"All providers failed for '{title}' by {artist}. Errors: {'; '.join(errors)}"
                 )
 
-        return lyrics
+        return lyrics, definitive
 
-    def __del__(self):
-        """Ensure batch cache is flushed when the fetcher is destroyed"""
-        try:
-            if hasattr(self, "_cache_batch") and self._cache_batch:
-                self._flush_cache_batch()
-        except Exception:
-            # Ignore errors during cleanup
-            pass
+    async def _respect_rate_limit_async(self, provider_name: Optional[str] = None) -> bool:
+        """
+        Async twin of _respect_rate_limit: same limits and wait budget
+        (config.rate_limit_max_wait), awaited on the event loop instead of
+        sleeping the thread.
+
+        Returns:
+            True once the request may go ahead, False to skip the provider
+        """
+        max_wait = self.config.rate_limit_max_wait
+        deadline = time.time() + max_wait
+        while (wait := self._wait_or_grant(provider_name)) > 0:
+            if time.time() + wait > deadline:
+                if self.config.log_rate_limit_events:
+                    logger.info(f"Rate limit wait for {provider_name} exceeds {max_wait:.1f}s, skipping provider")
+                self.metrics.record_rate_limit_event("rate_limit_timeout", max_wait)
+                return False
+            await asyncio.sleep(wait)
+        return True
+
+    async def _fetch_one_async(
+        self, http: AsyncLyricsHttp, title: str, artist: str
+    ) -> Tuple[Optional[str], bool, Optional[str]]:
+        """
+        Try the providers in order for one song (async counterpart of _fetch_sequentially).
+
+        Returns:
+            (lyrics or None, definitive, name of the provider that returned the lyrics);
+            definitive as in fetch_lyrics_with_status
+        """
+        errors: List[str] = []
+        for provider in self.providers:
+            provider_name, _ = self._stats_for(provider)
+            if not await self._respect_rate_limit_async(provider_name):
+                self.metrics.record_error("rate_limit_exceeded", provider=provider_name)
+                errors.append(f"{provider_name}: {RATE_LIMITED}")
+                continue
+            self._bump_stat(provider, "attempts")
+            provider_start = time.time()
+            try:
+                lyrics = await provider.fetch_lyrics_async(http, artist, title)
+            except Exception as e:
+                self._record_provider_error(provider, e, errors, title, artist)
+                continue
+            self._record_provider_result(provider, lyrics, time.time() - provider_start, title, artist)
+            if lyrics:
+                return lyrics, True, provider_name
+
+        if errors and self.config.log_api_calls:
+            logger.warning(f"All providers failed for '{title}' by {artist}. Errors: {'; '.join(errors)}")
+        return None, bool(self.providers) and not errors, None
+
+    def _lookup_cache_bulk(self, keys: Iterable[str]) -> Dict[str, Optional[str]]:
+        """
+        Cached answers for many cache keys: writes still queued in the background
+        writer first, then LyricsCache in bulk.
+
+        Returns:
+            Lyrics by cache key, None for fresh negative entries; keys without a
+            usable entry (missing or expired negative) are left out
+        """
+        found: Dict[str, Optional[str]] = {}
+        remaining = []
+        for key in set(keys):
+            artist, title = key.split(":", 1)
+            row = self._cache_writer.pending(artist, title)
+            if row is None:
+                remaining.append((artist, title))
+            elif row["source"] == "negative_cache" or not row["lyrics"]:
+                found[key] = None
+            else:
+                found[key] = row["lyrics"]
+
+        if remaining:
+            try:
+                rows = LyricsCache.find_cached_bulk(remaining)
+            except Exception as e:
+                logger.warning(f"Bulk lyrics cache lookup failed: {e}")
+                rows = {}
+            for (artist, title), row in rows.items():
+                if row.lyrics and row.source != "negative_cache":
+                    found[f"{artist}:{title}"] = row.lyrics
+                elif self._negative_is_fresh(row):
+                    found[f"{artist}:{title}"] = None
+        return found
+
+    def _negative_is_fresh(self, row: LyricsCache) -> bool:
+        """Whether a negative cache row is younger than config.negative_cache_ttl."""
+        retrieved_at = row.retrieved_at
+        if retrieved_at is None:
+            return False
+        if retrieved_at.tzinfo is None:
+            retrieved_at = retrieved_at.replace(tzinfo=timezone.utc)
+        age = datetime.now(timezone.utc) - retrieved_at
+        return age < timedelta(seconds=self.config.negative_cache_ttl)
+
+    async def fetch_lyrics_many(
+        self,
+        pairs: Iterable[Tuple[str, str]],
+        concurrency: int = 8,
+        force_refresh: bool = False
+    ) -> List[Optional[str]]:
+        """
+        Fetch lyrics for many songs concurrently on one event loop.
+
+        Cache lookups happen in bulk before the network phase (fresh negative
+        entries count as answered) and results are queued for the background
+        cache writer; provider requests share one pooled httpx client (capped
+        per host) and the fetcher's rate limits.
+
+        Args:
+            pairs: (title, artist) tuples, same argument order as fetch_lyrics
+            concurrency: Songs fetched at the same time
+            force_refresh: If True, bypass the cache lookup
+
+        Returns:
+            Lyrics (or None) for each pair, in input order
+        """
+        pairs = list(pairs)
+        keys = [
+            self._get_cache_key(title, artist) if title and artist else None
+            for title, artist in pairs
+        ]
+        found: Dict[str, Optional[str]] = {}
+
+        if not force_refresh and self.config.use_cache:
+            found.update(self._lookup_cache_bulk(key for key in keys if key))
+
+        # Identical songs are fetched once
+        todo = {key: pair for key, pair in zip(keys, pairs) if key and key not in found}
+        if todo:
+            slots = asyncio.Semaphore(max(1, concurrency))
+            async with AsyncLyricsHttp(hosts=len(self.providers) or 1) as http:
+                async def fetch(title: str, artist: str) -> Tuple[Optional[str], bool, Optional[str]]:
+                    async with slots:
+                        return await self._fetch_one_async(http, title, artist)
+
+                results = await asyncio.gather(*(fetch(title, artist) for title, artist in todo.values()))
+
+            for key, (lyrics, definitive, source) in zip(todo, results):
+                found[key] = lyrics
+                # Misses caused by failing or rate-limited providers are not negative-cached
+                if self.config.use_cache and (lyrics or definitive):
+                    self._add_to_cache_batch(key, lyrics, source)
+
+        return [found.get(key) if key else None for key in keys]
+
+    def fetch_lyrics_bulk(
+        self,
+        pairs: Iterable[Tuple[str, str]],
+        concurrency: int = 8,
+        force_refresh: bool = False
+    ) -> List[Optional[str]]:
+        """Sync wrapper around fetch_lyrics_many (for callers without an event loop)."""
+        return asyncio.run(self.fetch_lyrics_many(pairs, concurrency=concurrency, force_refresh=force_refresh))
 
     def finalize(self):
         """Explicitly flush any pending cache operations"""
@@ -1262,7 +1817,9 @@ class LyricsFetcher:
             # Log final statistics if enabled
             if self.config.log_provider_metrics:
                 logger.info("Final LyricsFetcher statistics:")
-                for provider_name, stats in self.provider_stats.items():
+                with self._stats_lock:
+                    snapshot = {name: dict(s) for name, s in self.provider_stats.items()}
+                for provider_name, stats in snapshot.items():
                     attempts = stats["attempts"]
                     successes = stats["successes"]
                     success_rate = (successes / attempts * 100) if attempts > 0 else 0
@@ -1273,11 +1830,12 @@ class LyricsFetcher:
             logger.warning(f"Error during LyricsFetcher finalization: {e}")
 
     # Internal shim for backwards-compatibility with tests
-    def _check_rate_limits(self) -> bool:
-        """Return True after respecting configured rate limits."""
+    def _check_rate_limits(
+        self, provider_name: Optional[str] = None, cancelled: Optional[threading.Event] = None
+    ) -> bool:
+        """Return True once the rate limits allow a request, False to skip the provider."""
         try:
-            self._respect_rate_limit()
-            return True
+            return self._respect_rate_limit(provider_name, cancelled)
         except Exception:
             return True
 
@@ -1314,20 +1872,31 @@ class LyricsFetcher:
     def get_provider_stats(self) -> Dict[str, Dict[str, float]]:
         """Return provider attempts/successes and success_rate computed."""
         stats: Dict[str, Dict[str, float]] = {}
-        for name, s in self.provider_stats.items():
+        with self._stats_lock:
+            snapshot = {name: dict(s) for name, s in self.provider_stats.items()}
+        for name, s in snapshot.items():
             attempts = s["attempts"]
             successes = s["successes"]
             rate = (successes / attempts * 100.0) if attempts > 0 else 0.0
+            race_wins = s.get("race_wins", 0)
             stats[name] = {
                 "attempts": attempts,
                 "successes": successes,
                 "success_rate": rate,
+                "race_wins": race_wins,
+                "avg_race_time_saved": (s.get("race_time_saved", 0.0) / race_wins) if race_wins else 0.0,
             }
         # Ensure all known providers appear even if not initialized
         for cls in (LRCLibProvider, LyricsOvhProvider, GeniusProvider):
             name = cls.__name__
             if name not in stats:
-                stats[name] = {"attempts": 0, "successes": 0, "success_rate": 0.0}
+                stats[name] = {
+                    "attempts": 0,
+                    "successes": 0,
+                    "success_rate": 0.0,
+                    "race_wins": 0,
+                    "avg_race_time_saved": 0.0,
+                }
         return stats
 
     def is_rate_limited(self, response) -> bool:
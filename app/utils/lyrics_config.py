@@ -2,9 +2,34 @@
 Configuration management for LyricsFetcher rate limiting and caching
 """
 
+import logging
 import os
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def parse_provider_rates(value: str) -> Dict[str, float]:
+    """
+    Parse per-provider request rates ("LRCLibProvider=5,GeniusProvider=1").
+
+    Args:
+        value: Comma-separated provider=requests_per_second entries
+
+    Returns:
+        Requests per second by provider name (invalid entries are skipped)
+    """
+    rates: Dict[str, float] = {}
+    for entry in (value or "").split(","):
+        name, _, rps = entry.partition("=")
+        if not name.strip():
+            continue
+        try:
+            rates[name.strip()] = max(0.1, float(rps))
+        except ValueError:
+            logger.warning(f"Ignoring invalid provider rate entry: {entry!r}")
+    return rates
 
 
 @dataclass
@@ -15,6 +40,8 @@ class LyricsFetcherConfig:
     rate_limit_window_size: int = 60  # seconds
     rate_limit_max_requests: int = 60  # requests per window
     rate_limit_threshold: float = 0.8  # threshold for "approaching limit" warning
+    rate_limit_max_wait: float = 5.0  # seconds a fetch waits for the limits before skipping a provider
+    provider_rate_limits: Optional[Dict[str, float]] = None  # requests/second by provider name
 
     # Token bucket configuration
     token_bucket_capacity: int = 10  # maximum tokens
@@ -37,6 +64,11 @@ class LyricsFetcherConfig:
     cache_batch_size: int = 50  # Number of cache operations to batch together
     cache_batch_timeout: int = 30  # Seconds to wait before forcing batch commit
 
+    # Provider racing: query the free providers concurrently, first good result wins
+    provider_racing: bool = False
+    race_grace_period: float = 0.25  # seconds a higher-priority provider may still win
+    race_min_lyrics_chars: int = 50  # shorter results don't end the race
+
     # Genius API configuration
     genius_timeout: int = 15  # API timeout in seconds (increased from 5)
     genius_sleep_time: float = 0.1  # sleep between requests
@@ -70,6 +102,9 @@ class LyricsFetcherConfig:
         if self.rate_limit_window_size <= 0:
             raise ValueError("rate_limit_window_size must be positive")
 
+        if self.rate_limit_max_wait < 0:
+            raise ValueError("rate_limit_max_wait must be non-negative")
+
         if not 0 < self.rate_limit_threshold <= 1:
             raise ValueError("rate_limit_threshold must be between 0 and 1")
 
@@ -91,6 +126,9 @@ class LyricsFetcherConfig:
         if self.default_cache_ttl <= 0:
             raise ValueError("default_cache_ttl must be positive")
 
+        if self.race_grace_period < 0:
+            raise ValueError("race_grace_period must be non-negative")
+
     @classmethod
     def from_environment(cls) -> "LyricsFetcherConfig":
         """Create configuration from environment variables"""
@@ -99,6 +137,8 @@ class LyricsFetcherConfig:
             rate_limit_window_size=int(os.getenv("LYRICS_RATE_LIMIT_WINDOW", 60)),
             rate_limit_max_requests=int(os.getenv("LYRICS_RATE_LIMIT_MAX_REQUESTS", 60)),
             rate_limit_threshold=float(os.getenv("LYRICS_RATE_LIMIT_THRESHOLD", 0.8)),
+            rate_limit_max_wait=float(os.getenv("LYRICS_RATE_LIMIT_MAX_WAIT", 5.0)),
+            provider_rate_limits=parse_provider_rates(os.getenv("LYRICS_PROVIDER_RPS", "")) or None,
             # Token bucket
             token_bucket_capacity=int(os.getenv("LYRICS_TOKEN_BUCKET_CAPACITY", 10)),
             token_bucket_refill_rate=float(os.getenv("LYRICS_TOKEN_BUCKET_REFILL_RATE", 1.0)),
@@ -115,6 +155,10 @@ class LyricsFetcherConfig:
             # Batch Cache Configuration
             cache_batch_size=int(os.getenv("LYRICS_CACHE_BATCH_SIZE", 50)),
             cache_batch_timeout=int(os.getenv("LYRICS_CACHE_BATCH_TIMEOUT", 30)),
+            # Provider racing
+            provider_racing=os.getenv("LYRICS_PROVIDER_RACING", "false").lower() == "true",
+            race_grace_period=float(os.getenv("LYRICS_RACE_GRACE_PERIOD", 0.25)),
+            race_min_lyrics_chars=int(os.getenv("LYRICS_RACE_MIN_CHARS", 50)),
             # Genius API
             genius_timeout=int(os.getenv("LYRICS_GENIUS_TIMEOUT", 5)),
             genius_sleep_time=float(os.getenv("LYRICS_GENIUS_SLEEP_TIME", 0.1)),
@@ -139,6 +183,8 @@ class LyricsFetcherConfig:
                 "window_size": self.rate_limit_window_size,
                 "max_requests": self.rate_limit_max_requests,
                 "threshold": self.rate_limit_threshold,
+                "max_wait": self.rate_limit_max_wait,
+                "provider_rate_limits": self.provider_rate_limits,
             },
             "token_bucket": {
                 "capacity": self.token_bucket_capacity,
@@ -160,6 +206,11 @@ class LyricsFetcherConfig:
                 "size": self.cache_batch_size,
                 "timeout": self.cache_batch_timeout,
             },
+            "provider_racing": {
+                "enabled": self.provider_racing,
+                "grace_period": self.race_grace_period,
+                "min_lyrics_chars": self.race_min_lyrics_chars,
+            },
             "genius_api": {
                 "timeout": self.genius_timeout,
                 "sleep_time": self.genius_sleep_time,
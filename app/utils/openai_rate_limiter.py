@@ -6,16 +6,42 @@ Implements intelligent rate limiting for OpenAI API calls with:
 - Token bucket algorithm
 - Concurrent request limiting
 - Cost tracking
+- Background priority: requests made inside background_priority() (cache
+  warming, backfills) leave a reserve of tokens and concurrent slots for
+  interactive traffic (OPENAI_BACKGROUND_RESERVE, default 0.25)
+- Distributed mode (LLM_DISTRIBUTED_LIMITS=true): RedisRateLimiter shares one
+  GCRA rate budget and one concurrency semaphore across every gunicorn and RQ
+  process instead of each process allowing the full limit
 """
 
+import asyncio
+import contextvars
 import logging
+import os
 import random
 import threading
 import time
-from typing import Optional
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple, Union
+
+from redis.exceptions import RedisError
 
 logger = logging.getLogger(__name__)
 
+# Set by background_priority(); copied into hedge threads by LLMRouter
+_background = contextvars.ContextVar("openai_background_priority", default=False)
+
+
+@contextmanager
+def background_priority() -> Iterator[None]:
+    """Run API calls in this context at background priority."""
+    token = _background.set(True)
+    try:
+        yield
+    finally:
+        _background.reset(token)
+
 
 class OpenAIRateLimiter:
     """
@@ -30,12 +56,18 @@ class OpenAIRateLimiter:
         self,
         max_rpm: int = 450,  # Leave 50 RPM buffer
         max_concurrent: int = 10,
-        max_retries: int = 3
+        max_retries: int = 3,
+        background_reserve: float = 0.25
     ):
         self.max_rpm = max_rpm
         self.max_concurrent = max_concurrent
         self.max_retries = max_retries
         
+        # Share of tokens and slots background requests may not use
+        self.background_reserve = min(max(background_reserve, 0.0), 0.9)
+        self.background_token_floor = self.background_reserve * max_rpm
+        self.background_max_concurrent = max(1, max_concurrent - int(round(max_concurrent * self.background_reserve)))
+        
         # Token bucket for smooth rate limiting
         self.tokens = max_rpm
         self.max_tokens = max_rpm
@@ -53,53 +85,51 @@ class OpenAIRateLimiter:
         self.total_requests = 0
         self.total_retries = 0
         self.total_rate_limit_hits = 0
+        self.coalesced_in_process = 0
+        self.coalesced_distributed = 0
+        self.background_requests = 0
         
         logger.info(
             f"OpenAIRateLimiter initialized: "
             f"{max_rpm} RPM, {max_concurrent} concurrent"
         )
     
-    def acquire(self) -> bool:
+    def try_acquire(self) -> float:
         """
-        Acquire permission to make an API request.
-        Blocks until permission is granted.
+        Try to acquire permission without blocking.
+        
+        Background requests (see background_priority) only proceed while the
+        reserve of tokens and concurrent slots stays free for interactive ones.
         
         Returns:
-            True when permission is granted
+            0.0 when permission is granted, otherwise the number of seconds
+            to wait before trying again
         """
+        background = _background.get()
+        max_concurrent = self.background_max_concurrent if background else self.max_concurrent
+        token_floor = self.background_token_floor if background else 0.0
+        
         with self.lock:
             # Wait for available slot
-            while self.active_requests >= self.max_concurrent:
+            if self.active_requests >= max_concurrent:
                 logger.debug(
                     f"Waiting for concurrent slot "
                     f"({self.active_requests}/{self.max_concurrent})"
                 )
-                time.sleep(0.1)
+                return 0.1
             
             # Refill token bucket
             self._refill_tokens()
             
             # Wait for token
-            while self.tokens < 1:
-                sleep_time = 1 / self.refill_rate
+            if self.tokens < 1 + token_floor:
+                sleep_time = (1 + token_floor - self.tokens) / self.refill_rate
                 logger.debug(f"Rate limiting: waiting {sleep_time:.2f}s for token")
-                time.sleep(sleep_time)
-                self._refill_tokens()
+                return sleep_time
             
             # Consume token
             self.tokens -= 1
-            self.active_requests += 1
-            self.total_requests += 1
-            
-            # Track request time
-            current_time = time.time()
-            self.request_times.append(current_time)
-            
-            # Clean old request times (older than 1 minute)
-            self.request_times = [
-                t for t in self.request_times 
-                if current_time - t < 60
-            ]
+            self._record_acquired(background)
             
             logger.debug(
                 f"Request acquired: "
@@ -108,9 +138,59 @@ class OpenAIRateLimiter:
                 f"{self.tokens:.1f} tokens"
             )
             
-            return True
+            return 0.0
+    
+    def _record_acquired(self, background: bool) -> None:
+        """Count a granted request (caller holds self.lock)."""
+        self.active_requests += 1
+        self.total_requests += 1
+        if background:
+            self.background_requests += 1
+        
+        # Track request time
+        current_time = time.time()
+        self.request_times.append(current_time)
+        
+        # Clean old request times (older than 1 minute)
+        self.request_times = [
+            t for t in self.request_times 
+            if current_time - t < 60
+        ]
+    
+    def _try_acquire_lease(self) -> Tuple[float, Union[str, bool]]:
+        """try_acquire() that also returns the lease to pass to release()."""
+        return self.try_acquire(), True
+    
+    def acquire(self) -> Union[str, bool]:
+        """
+        Acquire permission to make an API request.
+        Blocks until permission is granted.
+        
+        Returns:
+            Lease to pass to release() (True for the in-process limiter)
+        """
+        # Sleep outside the lock so release() can free a slot meanwhile
+        while True:
+            wait, lease = self._try_acquire_lease()
+            if wait <= 0:
+                return lease
+            time.sleep(wait)
     
-    def release(self):
+    async def acquire_async(self) -> Union[str, bool]:
+        """
+        Acquire permission to make an API request from a coroutine.
+        Yields to the event loop instead of blocking the thread.
+        
+        Returns:
+            Lease to pass to release() (True for the in-process limiter)
+        """
+        while True:
+            wait, lease = self._try_acquire_lease()
+            if wait <= 0:
+                return lease
+            await asyncio.sleep(wait)
+    
+    def release(self, lease: Union[str, bool, None] = None):
         """Release a request slot after completion."""
         with self.lock:
             self.active_requests = max(0, self.active_requests - 1)
@@ -154,6 +234,19 @@ class OpenAIRateLimiter:
         
         return delay
     
+    def record_coalesced(self, kind: str):
+        """
+        Record a call answered by another caller's in-flight request.
+        
+        Args:
+            kind: 'in_process' (same worker) or 'distributed' (another worker's lease)
+        """
+        with self.lock:
+            if kind == 'distributed':
+                self.coalesced_distributed += 1
+            else:
+                self.coalesced_in_process += 1
+    
     def get_metrics(self) -> dict:
         """Get rate limiter metrics."""
         with self.lock:
@@ -163,6 +256,11 @@ class OpenAIRateLimiter:
                 'total_requests': self.total_requests,
                 'total_retries': self.total_retries,
                 'total_rate_limit_hits': self.total_rate_limit_hits,
+                'total_coalesced': self.coalesced_in_process + self.coalesced_distributed,
+                'coalesced_in_process': self.coalesced_in_process,
+                'coalesced_distributed': self.coalesced_distributed,
+                'background_requests': self.background_requests,
+                'background_reserve': self.background_reserve,
                 'current_rpm': current_rpm,
                 'max_rpm': self.max_rpm,
                 'active_requests': self.active_requests,
@@ -177,9 +275,215 @@ class OpenAIRateLimiter:
             self.total_requests = 0
             self.total_retries = 0
             self.total_rate_limit_hits = 0
+            self.coalesced_in_process = 0
+            self.coalesced_distributed = 0
+            self.background_requests = 0
             logger.info("Rate limiter metrics reset")
 
 
+# GCRA + concurrency slots in one atomic step, on Redis server time.
+# KEYS: theoretical arrival time (ms), slot holders (zset scored by lease expiry)
+# ARGV: emission interval ms, burst tolerance ms, slot limit, holder id, lease ms
+# Returns {1, 0} when granted, else {0, ms to wait}
+_ACQUIRE_SCRIPT = """
+redis.replicate_commands()
+local t = redis.call('time')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local interval = tonumber(ARGV[1])
+local tolerance = tonumber(ARGV[2])
+redis.call('zremrangebyscore', KEYS[2], '-inf', now)
+if redis.call('zcard', KEYS[2]) >= tonumber(ARGV[3]) then
+    return {0, 100}
+end
+local tat = tonumber(redis.call('get', KEYS[1]) or now)
+if tat < now then
+    tat = now
+end
+local new_tat = tat + interval
+local allow_at = new_tat - tolerance
+if allow_at > now then
+    return {0, math.ceil(allow_at - now)}
+end
+redis.call('set', KEYS[1], new_tat, 'PX', math.ceil(new_tat - now) + 1000)
+redis.call('zadd', KEYS[2], now + tonumber(ARGV[5]), ARGV[4])
+redis.call('pexpire', KEYS[2], ARGV[5])
+return {1, 0}
+"""
+
+
+class RedisRateLimiter(OpenAIRateLimiter):
+    """
+    OpenAIRateLimiter whose budget is shared by every process through Redis.
+    
+    - Rate: GCRA (generic cell rate algorithm) on one key holding the
+      theoretical arrival time; equivalent to a token bucket of max_rpm tokens
+      refilled at max_rpm per minute, without a refill loop
+    - Concurrency: a sorted set of slot holders scored by lease expiry, so slots
+      of a crashed worker free themselves after lease_ttl
+    - Both are checked and taken in one Lua script, on Redis server time
+    
+    While Redis is unavailable the in-process limiter of the base class is used.
+    """
+    
+    def __init__(
+        self,
+        max_rpm: int = 450,
+        max_concurrent: int = 10,
+        max_retries: int = 3,
+        background_reserve: float = 0.25,
+        name: str = "openai_api",
+        redis_manager=None,
+        lease_ttl: float = 300.0
+    ):
+        """
+        Initialize distributed rate limiter.
+        
+        Args:
+            max_rpm: Requests per minute across all processes
+            max_concurrent: In-flight requests across all processes
+            max_retries: Retries after 429 responses
+            background_reserve: Share of the budget background requests leave free
+            name: Key namespace (one budget per name)
+            redis_manager: RedisConnectionManager (defaults to the shared one)
+            lease_ttl: Seconds before a slot of a crashed holder is reclaimed
+        """
+        super().__init__(max_rpm=max_rpm, max_concurrent=max_concurrent,
+                         max_retries=max_retries, background_reserve=background_reserve)
+        if redis_manager is None:
+            from app.utils.redis_pool import get_redis_manager, resolve_redis_url
+            
+            redis_manager = get_redis_manager(resolve_redis_url())
+        self.redis_manager = redis_manager
+        self.name = name
+        self.lease_ms = int(lease_ttl * 1000)
+        self._tat_key = f"ratelimit:{name}:tat"
+        self._slots_key = f"ratelimit:{name}:slots"
+        self._emission_ms = 60000.0 / max_rpm
+        
+        # Slot holder ids taken by this process -> whether the slot is in Redis
+        self._held: Dict[str, bool] = {}
+        self.fallback_acquires = 0
+    
+    def _redis(self):
+        return self.redis_manager.get_client(decode_responses=True)
+    
+    def try_acquire(self) -> float:
+        """
+        Try to take a token and a slot from the shared budget without blocking.
+        
+        Prefer acquire(), which returns the holder id for release().
+        
+        Returns:
+            0.0 when permission is granted, otherwise the number of seconds
+            to wait before trying again
+        """
+        return self._try_acquire_lease()[0]
+    
+    def _try_acquire_lease(self) -> Tuple[float, Union[str, bool]]:
+        """Take a token and a slot; returns (wait seconds, holder id or "")."""
+        client = self._redis()
+        if client is None:
+            return self._try_acquire_locally()
+        
+        background = _background.get()
+        limit = self.background_max_concurrent if background else self.max_concurrent
+        # Background callers see a bucket that is short by the reserved tokens
+        tokens = self.max_tokens - (self.background_token_floor if background else 0.0)
+        tolerance = max(tokens, 1) * self._emission_ms
+        holder = uuid.uuid4().hex
+        
+        try:
+            granted, wait_ms = client.eval(
+                _ACQUIRE_SCRIPT, 2, self._tat_key, self._slots_key,
+                self._emission_ms, tolerance, limit, holder, self.lease_ms
+            )
+        except RedisError as e:
+            logger.warning(f"Distributed rate limiter '{self.name}' unavailable, limiting in-process: {e}")
+            self.redis_manager.mark_unhealthy(e)
+            return self._try_acquire_locally()
+        
+        if not granted:
+            return int(wait_ms) / 1000.0, ""
+        
+        with self.lock:
+            self._held[holder] = True
+            self._record_acquired(background)
+        return 0.0, holder
+    
+    def _try_acquire_locally(self) -> Tuple[float, str]:
+        wait = super().try_acquire()
+        if wait > 0:
+            return wait, ""
+        holder = uuid.uuid4().hex
+        with self.lock:
+            self._held[holder] = False  # Released without touching Redis
+            self.fallback_acquires += 1
+        return 0.0, holder
+    
+    def release(self, lease: Union[str, bool, None] = None):
+        """
+        Release a request slot after completion (in Redis too when it was taken there).
+        
+        Args:
+            lease: Holder id returned by acquire(). Without it the most recent
+                slot of this process is released (try_acquire() callers).
+        """
+        with self.lock:
+            if isinstance(lease, str) and lease in self._held:
+                holder, in_redis = lease, self._held.pop(lease)
+            elif self._held:
+                holder, in_redis = self._held.popitem()
+            else:
+                holder, in_redis = "", False
+        super().release()
+        if not in_redis:
+            return
+        
+        client = self._redis()
+        if client is None:
+            return  # The lease expires on its own
+        try:
+            client.zrem(self._slots_key, holder)
+        except RedisError as e:
+            logger.warning(f"Distributed rate limiter '{self.name}' release failed: {e}")
+            self.redis_manager.mark_unhealthy(e)
+    
+    def get_metrics(self) -> dict:
+        """Get metrics, with the cluster-wide slot count when Redis is reachable."""
+        metrics = super().get_metrics()
+        metrics['backend'] = 'redis'
+        metrics['fallback_acquires'] = self.fallback_acquires
+        client = self._redis()
+        if client is not None:
+            try:
+                metrics['distributed_active_requests'] = client.zcount(self._slots_key, time.time() * 1000, '+inf')
+            except RedisError:
+                pass
+        return metrics
+
+
+def distributed_limits_enabled() -> bool:
+    """LLM_DISTRIBUTED_LIMITS: share rate limits and circuit breakers through Redis."""
+    return os.environ.get("LLM_DISTRIBUTED_LIMITS", "false").lower() in ("1", "true", "yes")
+
+
+def create_rate_limiter(
+    name: str,
+    max_rpm: int = 450,
+    max_concurrent: int = 10,
+    background_reserve: float = 0.25
+) -> OpenAIRateLimiter:
+    """
+    Build a rate limiter: Redis-backed when LLM_DISTRIBUTED_LIMITS is enabled,
+    otherwise in-process.
+    """
+    if distributed_limits_enabled():
+        return RedisRateLimiter(max_rpm=max_rpm, max_concurrent=max_concurrent,
+                                background_reserve=background_reserve, name=name)
+    return OpenAIRateLimiter(max_rpm=max_rpm, max_concurrent=max_concurrent,
+                             background_reserve=background_reserve)
+
+
 # Global rate limiter instance
 _global_rate_limiter: Optional[OpenAIRateLimiter] = None
 _limiter_lock = threading.Lock()
@@ -192,7 +496,24 @@ def get_rate_limiter() -> OpenAIRateLimiter:
     if _global_rate_limiter is None:
         with _limiter_lock:
             if _global_rate_limiter is None:
-                _global_rate_limiter = OpenAIRateLimiter()
+                try:
+                    max_rpm = int(os.environ.get("OPENAI_MAX_RPM", "450"))
+                except ValueError:
+                    max_rpm = 450
+                try:
+                    max_concurrent = int(os.environ.get("OPENAI_MAX_CONCURRENT", "10"))
+                except ValueError:
+                    max_concurrent = 10
+                try:
+                    background_reserve = float(os.environ.get("OPENAI_BACKGROUND_RESERVE", "0.25"))
+                except ValueError:
+                    background_reserve = 0.25
+                _global_rate_limiter = create_rate_limiter(
+                    "openai_api",
+                    max_rpm=max_rpm,
+                    max_concurrent=max_concurrent,
+                    background_reserve=background_reserve
+                )
     
     return _global_rate_limiter
 
@@ -4,26 +4,89 @@ Redis Cache Service
 Provides fast, distributed caching for analysis results.
 
 Cache Hierarchy:
-1. Redis (microseconds) - Hot cache
-2. Database (milliseconds) - Persistent cache
-3. OpenAI API (seconds) - Source of truth
+1. In-process L1 (nanoseconds) - Hottest songs, per worker, short TTL
+2. Redis (microseconds) - Hot cache
+3. Database (milliseconds) - Persistent cache
+4. OpenAI API (seconds) - Source of truth
+
+L1 entries are dropped in every process through Redis pub/sub when an analysis
+is rewritten, deleted or flushed by model version. The L1 TTL bounds staleness
+if an invalidation message is missed.
 
 TTL Strategy:
 - Analysis results: 30 days (user preference: effectively permanent)
 - Reanalysis triggered by: model version change, manual request
+
+Configuration (environment):
+- ANALYSIS_L1_MAX_ENTRIES: L1 entry bound per process (default 2000, 0 disables L1)
+- ANALYSIS_L1_MAX_MB: L1 size bound per process in megabytes (default 32)
+- ANALYSIS_L1_TTL: L1 entry lifetime in seconds (default 300)
+
+Secondary indexes (maintained in the same MULTI as every write/delete):
+- analysis_index:{model_version}: sorted set of that version's keys, scored
+  by expiry time so entries that aged out are pruned lazily
+- analysis_models: set of model versions with indexed entries
+Stats and per-model flushes use these instead of SCANning the keyspace.
+
+Content pointers: analysis_content:{model_version}:{content_hash} holds the key
+of an analysis of the same normalized lyrics (see lyrics_content_hash), so
+another artist/title with identical lyrics can reuse it. Pointers expire with
+the entry they point to; a dangling pointer is a miss.
+
+No-lyrics verdicts: no_lyrics:{spotify_id} holds the instrumental / lyrics
+unavailable response for a track whose lyrics could not be found, with a
+shorter TTL (ANALYSIS_NO_LYRICS_TTL, default 7 days) so providers are asked
+again eventually. Reanalysis skips the lyrics providers and the analyzer for
+these tracks until the entry expires.
+
+Connections come from the shared pools of app.utils.redis_pool; while Redis is
+unreachable every lookup is a fast miss and the server is re-probed periodically.
+
+Analysis values are stored in the compact binary format of
+app.utils.analysis_codec (ANALYSIS_CODEC / ANALYSIS_COMPRESSION). Legacy JSON
+entries stay readable; scripts/migrate_redis_analysis_encoding.py rewrites them.
 """
 
 import json
 import logging
 import os
-from typing import Any, Dict, Optional
+import threading
+import time
+import uuid
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import quote
 
 import redis
 from redis.exceptions import ConnectionError as RedisConnectionError
 from redis.exceptions import RedisError
+from redis.exceptions import TimeoutError as RedisTimeoutError
+
+from app.utils.analysis_codec import AnalysisCodec, get_analysis_codec
+from app.utils.local_cache import LocalLRUCache
+from app.utils.redis_pool import RedisConnectionManager, get_redis_manager, resolve_redis_url
 
 logger = logging.getLogger(__name__)
 
+# Pub/sub channel carrying L1 invalidations ({"key"|"keys"|"prefix": ..., "origin": ...})
+L1_INVALIDATION_CHANNEL = "cache:l1:invalidate"
+
+
+# Secondary indexes (see module docstring)
+INDEX_KEY_PREFIX = "analysis_index:"
+MODELS_KEY = "analysis_models"
+CONTENT_KEY_PREFIX = "analysis_content:"
+NO_LYRICS_KEY_PREFIX = "no_lyrics:"
+
+# (artist, title, lyrics_hash, model_version)
+AnalysisKey = Tuple[str, str, str, str]
+
+
+def _env_number(name: str, default, cast=int):
+    try:
+        return cast(os.environ.get(name, default))
+    except ValueError:
+        return default
+
 
 class RedisCache:
     """
@@ -33,6 +96,7 @@ class RedisCache:
     - Fast in-memory lookups
     - Distributed caching across multiple servers
     - Automatic expiration with configurable TTL
+    - In-process L1 tier with cross-process invalidation
     - Graceful fallback on connection failures
     """
     
@@ -42,62 +106,94 @@ class RedisCache:
         port: int = None,
         db: int = 0,
         password: str = None,
-        default_ttl: int = 2592000  # 30 days in seconds
+        default_ttl: int = 2592000,  # 30 days in seconds
+        l1_max_entries: Optional[int] = None,
+        l1_max_bytes: Optional[int] = None,
+        l1_ttl: Optional[float] = None,
+        codec: Optional[AnalysisCodec] = None,
+        no_lyrics_ttl: Optional[int] = None
     ):
         """
         Initialize Redis cache.
         
         Args:
-            host: Redis host (defaults to REDIS_HOST env var or 'localhost')
+            host: Redis host (defaults to REDIS_HOST env var, else the shared REDIS_URL)
             port: Redis port (defaults to REDIS_PORT env var or 6379)
             db: Redis database number (default: 0)
             password: Redis password (defaults to REDIS_PASSWORD env var)
             default_ttl: Default TTL in seconds (default: 30 days)
+            l1_max_entries: L1 entry bound (defaults to ANALYSIS_L1_MAX_ENTRIES or 2000)
+            l1_max_bytes: L1 size bound (defaults to ANALYSIS_L1_MAX_MB or 32 MB)
+            l1_ttl: L1 entry TTL in seconds (defaults to ANALYSIS_L1_TTL or 300)
+            codec: Analysis value codec (defaults to the global codec)
+            no_lyrics_ttl: TTL of no-lyrics verdicts (defaults to ANALYSIS_NO_LYRICS_TTL or 7 days)
         """
-        self.host = host or os.environ.get('REDIS_HOST', 'localhost')
-        self.port = port or int(os.environ.get('REDIS_PORT', 6379))
-        self.db = db
-        self.password = password or os.environ.get('REDIS_PASSWORD')
+        host = host or os.environ.get('REDIS_HOST')
+        if host:
+            port = port or int(os.environ.get('REDIS_PORT', 6379))
+            password = password or os.environ.get('REDIS_PASSWORD')
+            auth = f":{quote(password, safe='')}@" if password else ""
+            url = f"redis://{auth}{host}:{port}/{db}"
+        else:
+            url = resolve_redis_url()
         self.default_ttl = default_ttl
+        self.no_lyrics_ttl = no_lyrics_ttl or _env_number('ANALYSIS_NO_LYRICS_TTL', 604800)
         
+        # Shared pooled connections; _client/_binary_client pin a specific client
+        self.connections: RedisConnectionManager = get_redis_manager(url)
         self._client: Optional[redis.Redis] = None
-        self._connection_failed = False
+        self._binary_client: Optional[redis.Redis] = None
+        
+        # Binary encoding for analysis values
+        self.codec = codec or get_analysis_codec()
+        
+        # In-process L1 tier; only used once the invalidation subscriber runs
+        if l1_max_entries is None:
+            l1_max_entries = _env_number('ANALYSIS_L1_MAX_ENTRIES', 2000)
+        if l1_max_bytes is None:
+            l1_max_bytes = _env_number('ANALYSIS_L1_MAX_MB', 32) * 1024 * 1024
+        if l1_ttl is None:
+            l1_ttl = _env_number('ANALYSIS_L1_TTL', 300.0, float)
+        self.l1 = LocalLRUCache(max_entries=l1_max_entries, max_bytes=l1_max_bytes, ttl=l1_ttl)
+        self._subscriber = None
+        self._subscriber_retry_at = 0.0
+        self._instance_id = uuid.uuid4().hex  # Our own messages are applied before publishing
+        self._subscriber_lock = threading.Lock()
+        
+        # Content-pointer lookups (cross artist/title reuse)
+        self.content_hits = 0
+        self.content_misses = 0
+        
+        # No-lyrics verdict lookups
+        self.no_lyrics_hits = 0
+        self.no_lyrics_misses = 0
         
         logger.info(
-            f"RedisCache initialized: {self.host}:{self.port} "
-            f"(db={self.db}, ttl={self.default_ttl}s)"
+            f"RedisCache initialized: {self.connections.get_stats()['url']} "
+            f"(ttl={self.default_ttl}s, l1={l1_max_entries} entries/{l1_ttl:.0f}s, "
+            f"codec={self.codec.name})"
         )
     
     @property
     def client(self) -> Optional[redis.Redis]:
-        """Get or create Redis client with lazy initialization."""
-        if self._connection_failed:
+        """Shared Redis client, or None while Redis is unavailable."""
+        if self._client is not None:
+            return self._client
+        return self.connections.get_client(decode_responses=True)
+    
+    @property
+    def binary_client(self) -> Optional[redis.Redis]:
+        """Client without response decoding, for codec-encoded analysis values."""
+        if self._binary_client is not None:
+            return self._binary_client
+        if self.client is None:  # Health-checked once for both pools
             return None
-        
-        if self._client is None:
-            try:
-                self._client = redis.Redis(
-                    host=self.host,
-                    port=self.port,
-                    db=self.db,
-                    password=self.password,
-                    decode_responses=True,
-                    socket_timeout=5,
-                    socket_connect_timeout=5,
-                    retry_on_timeout=True,
-                    health_check_interval=30
-                )
-                
-                # Test connection
-                self._client.ping()
-                logger.info(f"✅ Redis connection established: {self.host}:{self.port}")
-                
-            except (RedisConnectionError, RedisError) as e:
-                logger.error(f"❌ Failed to connect to Redis: {e}")
-                self._connection_failed = True
-                self._client = None
-        
-        return self._client
+        return self.connections.client(decode_responses=False)
+    
+    def _on_redis_error(self, error: RedisError) -> None:
+        """Stop using Redis until the next health probe when the connection is lost."""
+        if isinstance(error, (RedisConnectionError, RedisTimeoutError)) and self._client is None:
+            self.connections.mark_unhealthy(error)
     
     def _make_key(self, artist: str, title: str, lyrics_hash: str, model_version: str) -> str:
         """
@@ -111,6 +207,92 @@ class RedisCache:
         
         return f"analysis:{model_version}:{artist}:{title}:{lyrics_hash}"
     
+    @staticmethod
+    def _index_key(model_version: str) -> str:
+        return f"{INDEX_KEY_PREFIX}{model_version}"
+    
+    @staticmethod
+    def _content_key(content_hash: str, model_version: str) -> str:
+        return f"{CONTENT_KEY_PREFIX}{model_version}:{content_hash}"
+    
+    @staticmethod
+    def _no_lyrics_key(spotify_id: str) -> str:
+        return f"{NO_LYRICS_KEY_PREFIX}{spotify_id}"
+    
+    def _queue_index_add(self, pipe, key: str, model_version: str, ttl_seconds: int) -> None:
+        """Add key to its model-version index in the caller's pipeline."""
+        pipe.zadd(self._index_key(model_version), {key: time.time() + ttl_seconds})
+        pipe.sadd(MODELS_KEY, model_version)
+    
+    def _l1_ready(self, client: redis.Redis) -> bool:
+        """
+        Start the invalidation subscriber on first use.
+        
+        Returns:
+            True when L1 may be used (enabled and subscribed)
+        """
+        if not self.l1.enabled:
+            return False
+        if self._subscriber is not None:
+            return True
+        if time.monotonic() < self._subscriber_retry_at:
+            return False
+        
+        with self._subscriber_lock:
+            if self._subscriber is None:
+                try:
+                    pubsub = client.pubsub(ignore_subscribe_messages=True)
+                    pubsub.subscribe(**{L1_INVALIDATION_CHANNEL: self._on_invalidation})
+                    self._subscriber = pubsub.run_in_thread(
+                        sleep_time=1.0,
+                        daemon=True,
+                        exception_handler=self._on_subscriber_error
+                    )
+                    logger.info(f"✅ L1 cache invalidation subscriber started ({L1_INVALIDATION_CHANNEL})")
+                except RedisError as e:
+                    logger.warning(f"L1 cache disabled until Redis pub/sub is available: {e}")
+                    self._subscriber_retry_at = time.monotonic() + 60
+                    return False
+        
+        return True
+    
+    def _on_invalidation(self, message: Dict[str, Any]) -> None:
+        """Apply an invalidation published by another process."""
+        try:
+            payload = json.loads(message['data'])
+        except (KeyError, TypeError, ValueError):
+            logger.warning(f"Ignoring malformed L1 invalidation: {message}")
+            return
+        
+        if payload.get('origin') == self._instance_id:
+            return
+        if payload.get('key'):
+            self.l1.delete(payload['key'])
+        elif payload.get('keys'):
+            for key in payload['keys']:
+                self.l1.delete(key)
+        elif payload.get('prefix'):
+            self.l1.delete_prefix(payload['prefix'])
+    
+    def _on_subscriber_error(self, error: BaseException, pubsub, thread) -> None:
+        """Invalidations may have been missed while disconnected: start L1 from empty."""
+        logger.warning(f"L1 invalidation subscriber error, clearing L1: {error}")
+        self.l1.clear()
+        time.sleep(1.0)  # pubsub reconnects and resubscribes on the next read
+    
+    def _publish_invalidation(self, client: redis.Redis, **payload: Any) -> None:
+        """Drop L1 entries (key, keys or prefix) locally and in every other process."""
+        if payload.get('prefix'):
+            self.l1.delete_prefix(payload['prefix'])
+        for key in payload.get('keys') or [payload.get('key')]:
+            if key:
+                self.l1.delete(key)
+        
+        try:
+            client.publish(L1_INVALIDATION_CHANNEL, json.dumps(dict(payload, origin=self._instance_id)))
+        except RedisError as e:
+            logger.warning(f"L1 invalidation publish failed: {e}")
+    
     def get_analysis(
         self,
         artist: str,
@@ -130,25 +312,74 @@ class RedisCache:
         Returns:
             Analysis result dict or None if not found
         """
-        if self.client is None:
+        client = self.client
+        if client is None:
+            return None
+        
+        key = self._make_key(artist, title, lyrics_hash, model_version)
+        return self._get_key(client, key, f"{artist} - {title}")
+    
+    def get_analysis_by_content(self, content_hash: str, model_version: str) -> Optional[Dict[str, Any]]:
+        """
+        Get an analysis of the same normalized lyrics cached under any artist/title.
+        
+        Args:
+            content_hash: Normalized-lyrics hash (lyrics_content_hash)
+            model_version: Model version used for analysis
+            
+        Returns:
+            Analysis result dict or None if not found
+        """
+        client = self.client
+        if client is None:
             return None
         
         try:
-            key = self._make_key(artist, title, lyrics_hash, model_version)
-            cached = self.client.get(key)
+            key = client.get(self._content_key(content_hash, model_version))
+        except RedisError as e:
+            logger.warning(f"Redis content lookup error: {e}")
+            self._on_redis_error(e)
+            return None
+        
+        result = self._get_key(client, key, f"content {content_hash[:12]}") if key else None
+        if result is None:
+            self.content_misses += 1
+        else:
+            self.content_hits += 1
+        return result
+    
+    def _get_key(self, client: redis.Redis, key: str, label: str) -> Optional[Dict[str, Any]]:
+        """Read one analysis key: L1, then Redis (populating L1)."""
+        use_l1 = self._l1_ready(client)
+        if use_l1:
+            local = self.l1.get(key)
+            if local is not None:
+                logger.debug(f"✅ L1 cache hit: {label}")
+                result = dict(local)  # Callers annotate the top level
+                result['cache_hit'] = True
+                result['cache_source'] = 'l1'
+                return result
+        
+        generation = self.l1.generation  # Before the GET: skip the fill if invalidated meanwhile
+        try:
+            cached = self.binary_client.get(key)
             
             if cached:
-                logger.debug(f"✅ Redis cache hit: {artist} - {title}")
-                result = json.loads(cached)
+                logger.debug(f"✅ Redis cache hit: {label}")
+                result, size = self.codec.decode_sized(cached)
+                if use_l1:
+                    self.l1.set(key, dict(result), size, generation)
                 result['cache_hit'] = True
                 result['cache_source'] = 'redis'
                 return result
             
-            logger.debug(f"❌ Redis cache miss: {artist} - {title}")
+            logger.debug(f"❌ Redis cache miss: {label}")
             return None
             
-        except (RedisError, json.JSONDecodeError) as e:
+        except (RedisError, ValueError) as e:
             logger.warning(f"Redis get error: {e}")
+            if isinstance(e, RedisError):
+                self._on_redis_error(e)
             return None
     
     def set_analysis(
@@ -158,7 +389,8 @@ class RedisCache:
         lyrics_hash: str,
         model_version: str,
         analysis_result: Dict[str, Any],
-        ttl: Optional[int] = None
+        ttl: Optional[int] = None,
+        content_hash: Optional[str] = None
     ) -> bool:
         """
         Cache analysis result.
@@ -170,11 +402,13 @@ class RedisCache:
             model_version: Model version used for analysis
             analysis_result: Analysis result to cache
             ttl: Time to live in seconds (default: use default_ttl)
+            content_hash: Normalized-lyrics hash; points it at this entry for reuse
             
         Returns:
             True if successful, False otherwise
         """
-        if self.client is None:
+        client = self.client
+        if client is None:
             return False
         
         try:
@@ -184,15 +418,202 @@ class RedisCache:
             clean_result = {k: v for k, v in analysis_result.items() 
                           if k not in ['cache_hit', 'cache_source']}
             
-            value = json.dumps(clean_result)
+            value, size = self.codec.encode_sized(clean_result)
             ttl_seconds = ttl or self.default_ttl
             
-            self.client.setex(key, ttl_seconds, value)
+            # Value and index change together
+            pipe = self.binary_client.pipeline(transaction=True)
+            pipe.setex(key, ttl_seconds, value)
+            self._queue_index_add(pipe, key, model_version, ttl_seconds)
+            if content_hash:
+                pipe.set(self._content_key(content_hash, model_version), key, ex=ttl_seconds)
+            pipe.execute()
+            if self._l1_ready(client):
+                # Other processes may hold the previous result (e.g. a reanalysis)
+                self._publish_invalidation(client, key=key)
+                self.l1.set(key, clean_result, size)
             logger.debug(f"💾 Cached in Redis: {artist} - {title} (TTL: {ttl_seconds}s)")
             return True
             
         except (RedisError, TypeError) as e:
             logger.warning(f"Redis set error: {e}")
+            if isinstance(e, RedisError):
+                self._on_redis_error(e)
+            return False
+    
+    def get_analyses_bulk(
+        self,
+        keys: Iterable[AnalysisKey],
+        chunk_size: int = 500
+    ) -> Dict[AnalysisKey, Dict[str, Any]]:
+        """
+        Get cached analyses for many songs: L1 first, then one MGET per chunk.
+        
+        Args:
+            keys: (artist, title, lyrics_hash, model_version) tuples
+            chunk_size: Keys per MGET
+            
+        Returns:
+            Dict mapping each found input key to its analysis result (misses are absent)
+        """
+        client = self.client
+        if client is None:
+            return {}
+        
+        use_l1 = self._l1_ready(client)
+        found: Dict[AnalysisKey, Dict[str, Any]] = {}
+        remote: List[Tuple[AnalysisKey, str]] = []
+        for song_key in dict.fromkeys(keys):
+            key = self._make_key(*song_key)
+            local = self.l1.get(key) if use_l1 else None
+            if local is not None:
+                result = dict(local)
+                result['cache_hit'] = True
+                result['cache_source'] = 'l1'
+                found[song_key] = result
+            else:
+                remote.append((song_key, key))
+        
+        requested = len(found) + len(remote)
+        for i in range(0, len(remote), chunk_size):
+            chunk = remote[i:i + chunk_size]
+            generation = self.l1.generation
+            try:
+                values = self.binary_client.mget([key for _, key in chunk])
+            except RedisError as e:
+                logger.warning(f"Redis mget error: {e}")
+                self._on_redis_error(e)
+                break
+            
+            for (song_key, key), cached in zip(chunk, values):
+                if not cached:
+                    continue
+                try:
+                    result, size = self.codec.decode_sized(cached)
+                except ValueError as e:
+                    logger.warning(f"Skipping undecodable cache entry {key}: {e}")
+                    continue
+                if use_l1:
+                    self.l1.set(key, dict(result), size, generation)
+                result['cache_hit'] = True
+                result['cache_source'] = 'redis'
+                found[song_key] = result
+        
+        logger.debug(f"Redis bulk lookup: {len(found)}/{requested} hits")
+        return found
+    
+    def set_analyses_bulk(
+        self,
+        entries: Iterable[Tuple[AnalysisKey, Dict[str, Any]]],
+        ttl: Optional[int] = None
+    ) -> int:
+        """
+        Cache many analysis results (and their index entries) in one MULTI round trip.
+        
+        Args:
+            entries: ((artist, title, lyrics_hash, model_version), analysis_result) pairs
+            ttl: Time to live in seconds (default: use default_ttl)
+            
+        Returns:
+            Number of results written
+        """
+        client = self.client
+        if client is None:
+            return 0
+        
+        ttl_seconds = ttl or self.default_ttl
+        written = []
+        try:
+            pipe = self.binary_client.pipeline(transaction=True)
+            for song_key, analysis_result in entries:
+                key = self._make_key(*song_key)
+                clean_result = {k: v for k, v in analysis_result.items()
+                                if k not in ['cache_hit', 'cache_source']}
+                value, size = self.codec.encode_sized(clean_result)
+                pipe.setex(key, ttl_seconds, value)
+                self._queue_index_add(pipe, key, song_key[3], ttl_seconds)
+                written.append((key, clean_result, size))
+            if written:
+                pipe.execute()
+        except (RedisError, TypeError) as e:
+            logger.warning(f"Redis bulk set error: {e}")
+            if isinstance(e, RedisError):
+                self._on_redis_error(e)
+            return 0
+        
+        if written and self._l1_ready(client):
+            self._publish_invalidation(client, keys=[key for key, _, _ in written])
+            for key, clean_result, size in written:
+                self.l1.set(key, clean_result, size)
+        return len(written)
+    
+    def get_no_lyrics_bulk(self, spotify_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Get cached no-lyrics verdicts for many tracks with one MGET.
+        
+        Args:
+            spotify_ids: Spotify track IDs
+            
+        Returns:
+            Dict mapping each found ID to its verdict (misses are absent)
+        """
+        spotify_ids = list(dict.fromkeys(i for i in spotify_ids if i))
+        client = self.client
+        if client is None or not spotify_ids:
+            return {}
+        
+        try:
+            values = self.binary_client.mget([self._no_lyrics_key(i) for i in spotify_ids])
+        except RedisError as e:
+            logger.warning(f"Redis no-lyrics lookup error: {e}")
+            self._on_redis_error(e)
+            return {}
+        
+        found = {}
+        for spotify_id, cached in zip(spotify_ids, values):
+            if not cached:
+                continue
+            try:
+                result = self.codec.decode(cached)
+            except ValueError as e:
+                logger.warning(f"Skipping undecodable no-lyrics entry {spotify_id}: {e}")
+                continue
+            result['cache_hit'] = True
+            result['cache_source'] = 'no_lyrics'
+            found[spotify_id] = result
+        
+        self.no_lyrics_hits += len(found)
+        self.no_lyrics_misses += len(spotify_ids) - len(found)
+        return found
+    
+    def get_no_lyrics(self, spotify_id: str) -> Optional[Dict[str, Any]]:
+        """Get the cached no-lyrics verdict of a track, or None."""
+        return self.get_no_lyrics_bulk([spotify_id]).get(spotify_id)
+    
+    def set_no_lyrics(self, spotify_id: str, verdict: Dict[str, Any], ttl: Optional[int] = None) -> bool:
+        """
+        Cache the instrumental / lyrics unavailable verdict of a track.
+        
+        Args:
+            spotify_id: Spotify track ID
+            verdict: Analyzer response for the track without lyrics
+            ttl: Time to live in seconds (default: no_lyrics_ttl)
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        if self.client is None or not spotify_id:
+            return False
+        
+        clean = {k: v for k, v in verdict.items() if k not in ['cache_hit', 'cache_source']}
+        try:
+            self.binary_client.setex(self._no_lyrics_key(spotify_id), ttl or self.no_lyrics_ttl,
+                                     self.codec.encode(clean))
+            return True
+        except (RedisError, TypeError) as e:
+            logger.warning(f"Redis no-lyrics set error: {e}")
+            if isinstance(e, RedisError):
+                self._on_redis_error(e)
             return False
     
     def delete_analysis(
@@ -214,12 +635,17 @@ class RedisCache:
         Returns:
             True if deleted, False otherwise
         """
-        if self.client is None:
+        client = self.client
+        if client is None:
             return False
         
         try:
             key = self._make_key(artist, title, lyrics_hash, model_version)
-            deleted = self.client.delete(key)
+            pipe = client.pipeline(transaction=True)
+            pipe.delete(key)
+            pipe.zrem(self._index_key(model_version), key)
+            deleted = pipe.execute()[0]
+            self._publish_invalidation(client, key=key)
             
             if deleted:
                 logger.debug(f"🗑️  Deleted from Redis: {artist} - {title}")
@@ -235,6 +661,8 @@ class RedisCache:
         Flush all cached analyses for a specific model version.
         
         Useful when updating the model and wanting to trigger re-analysis.
+        Walks only that version's index (O(entries for the model)); versions
+        never indexed (written before the index existed) fall back to SCAN.
         
         Args:
             model_version: Model version to flush
@@ -242,22 +670,17 @@ class RedisCache:
         Returns:
             Number of keys deleted
         """
-        if self.client is None:
+        client = self.client
+        if client is None:
             return 0
         
         try:
-            pattern = f"analysis:{model_version}:*"
-            cursor = 0
-            deleted_count = 0
-            
-            while True:
-                cursor, keys = self.client.scan(cursor, match=pattern, count=100)
-                if keys:
-                    deleted_count += self.client.delete(*keys)
-                
-                if cursor == 0:
-                    break
+            if client.sismember(MODELS_KEY, model_version):
+                deleted_count = self._flush_indexed(client, model_version)
+            else:
+                deleted_count = self._flush_by_scan(client, model_version)
             
+            self._publish_invalidation(client, prefix=f"analysis:{model_version}:")
             logger.info(f"🗑️  Flushed {deleted_count} Redis keys for model: {model_version}")
             return deleted_count
             
@@ -265,6 +688,188 @@ class RedisCache:
             logger.error(f"Redis flush error: {e}")
             return 0
     
+    def _flush_indexed(self, client: redis.Redis, model_version: str, batch_size: int = 500) -> int:
+        """Delete a model version's keys batch by batch from its index."""
+        index_key = self._index_key(model_version)
+        deleted_count = 0
+        while True:
+            keys = client.zrange(index_key, 0, batch_size - 1)
+            if not keys:
+                break
+            pipe = client.pipeline(transaction=True)
+            pipe.delete(*keys)
+            pipe.zrem(index_key, *keys)
+            deleted_count += pipe.execute()[0]
+        return deleted_count
+    
+    def _flush_by_scan(self, client: redis.Redis, model_version: str) -> int:
+        """Delete a model version's keys found by SCAN (unindexed entries)."""
+        logger.warning(f"⚠️  No index for model {model_version}, flushing with SCAN")
+        cursor = 0
+        deleted_count = 0
+        while True:
+            cursor, keys = client.scan(cursor, match=f"analysis:{model_version}:*", count=100)
+            if keys:
+                deleted_count += client.delete(*keys)
+            if cursor == 0:
+                break
+        return deleted_count
+    
+    def rebuild_analysis_index(self, model_version: str, batch_size: int = 500) -> int:
+        """
+        Index entries of a model version written before the index existed.
+        
+        One-off SCAN over that version's keys; each key is added with its
+        remaining TTL. Safe to re-run.
+        
+        Args:
+            model_version: Model version to index
+            batch_size: Keys per SCAN/pipeline batch
+            
+        Returns:
+            Number of keys indexed
+        """
+        client = self.client
+        if client is None:
+            return 0
+        
+        index_key = self._index_key(model_version)
+        indexed = 0
+        try:
+            cursor = 0
+            while True:
+                cursor, keys = client.scan(cursor, match=f"analysis:{model_version}:*", count=batch_size)
+                if keys:
+                    pipe = client.pipeline(transaction=False)
+                    for key in keys:
+                        pipe.ttl(key)
+                    ttls = pipe.execute()
+                    now = time.time()
+                    members = {
+                        key: now + (ttl if ttl >= 0 else self.default_ttl)
+                        for key, ttl in zip(keys, ttls)
+                        if ttl != -2  # Expired since SCAN
+                    }
+                    if members:
+                        client.zadd(index_key, members)
+                        indexed += len(members)
+                if cursor == 0:
+                    break
+            client.sadd(MODELS_KEY, model_version)
+        except RedisError as e:
+            logger.error(f"Redis index rebuild error: {e}")
+        
+        logger.info(f"🗂️  Indexed {indexed} Redis keys for model: {model_version}")
+        return indexed
+    
+    def count_analyses(self) -> Dict[str, int]:
+        """
+        Count live analysis entries per model version from the indexes.
+        
+        O(model versions), plus pruning of index members whose entries expired.
+        
+        Returns:
+            Dict mapping model version to entry count
+        """
+        client = self.client
+        if client is None:
+            return {}
+        
+        models = sorted(client.smembers(MODELS_KEY))
+        if not models:
+            return {}
+        pipe = client.pipeline(transaction=False)
+        now = time.time()
+        for model_version in models:
+            pipe.zremrangebyscore(self._index_key(model_version), '-inf', now)
+            pipe.zcard(self._index_key(model_version))
+        counts = pipe.execute()[1::2]
+        return dict(zip(models, counts))
+    
+    def migrate_analysis_encoding(self, batch_size: int = 500, dry_run: bool = False) -> Dict[str, Any]:
+        """
+        Rewrite analysis entries that are not in the current codec format.
+        
+        Legacy JSON entries (and entries from a previous codec setting) are
+        re-encoded in place; each key keeps its remaining TTL (SET KEEPTTL,
+        Redis >= 6). Keys that expire or are deleted mid-scan are left alone.
+        
+        Args:
+            batch_size: Keys per SCAN/MGET/pipeline batch
+            dry_run: Only report what would be rewritten
+            
+        Returns:
+            Dictionary with scanned/rewritten/skipped/failed counts, bytes before and
+            after for rewritten entries, and used_memory_human before and after
+        """
+        client = self.client
+        if client is None:
+            return {'error': 'Redis connection failed'}
+        
+        result = {
+            'codec': self.codec.name,
+            'dry_run': dry_run,
+            'scanned': 0,
+            'rewritten': 0,
+            'skipped': 0,
+            'failed': 0,
+            'bytes_before': 0,
+            'bytes_after': 0,
+        }
+        try:
+            result['used_memory_human_before'] = client.info('memory').get('used_memory_human')
+            cursor = 0
+            while True:
+                cursor, keys = client.scan(cursor, match="analysis:*", count=batch_size)
+                if keys:
+                    self._migrate_batch(keys, dry_run, result)
+                if cursor == 0:
+                    break
+            result['used_memory_human_after'] = client.info('memory').get('used_memory_human')
+        except RedisError as e:
+            logger.error(f"Redis migration error: {e}")
+            result['error'] = str(e)
+        
+        if result['bytes_before']:
+            result['saved_pct'] = round((1 - result['bytes_after'] / result['bytes_before']) * 100, 1)
+        logger.info(
+            f"🔁 Analysis encoding migration{' (dry run)' if dry_run else ''}: "
+            f"{result['rewritten']}/{result['scanned']} rewritten, "
+            f"{result['bytes_before']} → {result['bytes_after']} bytes"
+        )
+        return result
+    
+    def _migrate_batch(self, keys: List[str], dry_run: bool, result: Dict[str, Any]) -> None:
+        """Re-encode one SCAN batch with a single MGET and a single pipeline."""
+        values = self.binary_client.mget(keys)
+        pipe = self.binary_client.pipeline(transaction=False)
+        pending = 0
+        
+        for key, value in zip(keys, values):
+            result['scanned'] += 1
+            if value is None:
+                continue  # Expired or deleted since SCAN
+            if self.codec.is_current(value):
+                result['skipped'] += 1
+                continue
+            try:
+                encoded = self.codec.encode(self.codec.decode(value))
+            except ValueError as e:
+                logger.warning(f"Cannot migrate {key}: {e}")
+                result['failed'] += 1
+                continue
+            
+            result['rewritten'] += 1
+            result['bytes_before'] += len(value)
+            result['bytes_after'] += len(encoded)
+            if not dry_run:
+                # xx: don't resurrect a key deleted since MGET
+                pipe.set(key, encoded, keepttl=True, xx=True)
+                pending += 1
+        
+        if pending:
+            pipe.execute()
+    
     def get_stats(self) -> Dict[str, Any]:
         """
         Get Redis cache statistics.
@@ -272,44 +877,67 @@ class RedisCache:
         Returns:
             Dictionary with cache stats
         """
+        l1_stats = self.l1.get_stats()
+        pool_stats = self.connections.get_stats()
+        content_lookups = self.content_hits + self.content_misses
+        content_stats = {
+            'hits': self.content_hits,
+            'misses': self.content_misses,
+            'hit_rate': round(self.content_hits / content_lookups * 100, 2) if content_lookups else 0.0
+        }
+        no_lyrics_lookups = self.no_lyrics_hits + self.no_lyrics_misses
+        no_lyrics_stats = {
+            'hits': self.no_lyrics_hits,
+            'misses': self.no_lyrics_misses,
+            'hit_rate': round(self.no_lyrics_hits / no_lyrics_lookups * 100, 2) if no_lyrics_lookups else 0.0
+        }
         if self.client is None:
             return {
                 'connected': False,
-                'error': 'Redis connection failed'
+                'error': 'Redis connection failed',
+                'l1': l1_stats,
+                'content_dedupe': content_stats,
+                'no_lyrics': no_lyrics_stats,
+                'pool': pool_stats
             }
         
         try:
             info = self.client.info('stats')
             memory = self.client.info('memory')
             
-            # Count analysis keys
-            cursor = 0
-            analysis_count = 0
-            while True:
-                cursor, keys = self.client.scan(cursor, match="analysis:*", count=100)
-                analysis_count += len(keys)
-                if cursor == 0:
-                    break
+            # Count analysis keys from the per-model indexes
+            by_model = self.count_analyses()
             
             return {
                 'connected': True,
                 'total_keys': self.client.dbsize(),
-                'analysis_keys': analysis_count,
+                'analysis_keys': sum(by_model.values()),
+                'analysis_keys_by_model': by_model,
                 'used_memory_mb': round(memory.get('used_memory', 0) / 1024 / 1024, 2),
+                'used_memory_human': memory.get('used_memory_human'),
+                'codec': self.codec.name,
                 'hits': info.get('keyspace_hits', 0),
                 'misses': info.get('keyspace_misses', 0),
                 'hit_rate': round(
                     info.get('keyspace_hits', 0) / 
                     max(info.get('keyspace_hits', 0) + info.get('keyspace_misses', 0), 1) * 100,
                     2
-                )
+                ),
+                'l1': l1_stats,
+                'content_dedupe': content_stats,
+                'no_lyrics': no_lyrics_stats,
+                'pool': pool_stats
             }
             
         except RedisError as e:
             logger.error(f"Redis stats error: {e}")
             return {
                 'connected': False,
-                'error': str(e)
+                'error': str(e),
+                'l1': l1_stats,
+                'content_dedupe': content_stats,
+                'no_lyrics': no_lyrics_stats,
+                'pool': pool_stats
             }
     
     def health_check(self) -> bool:
@@ -324,7 +952,8 @@ class RedisCache:
         
         try:
             return self.client.ping()
-        except RedisError:
+        except RedisError as e:
+            self._on_redis_error(e)
             return False
 
 
@@ -0,0 +1,316 @@
+"""
+Shared Redis Connections
+
+One pooled connection manager per Redis URL, shared by every module that talks
+to Redis (RedisCache, the JSON helpers in app.utils.cache, the RQ queue and
+progress persistence) instead of each building its own client.
+
+- Blocking connection pools (one for decoded str responses, one for raw bytes
+  as RQ and the analysis codec need); callers wait for a free connection
+  rather than opening unbounded sockets
+- Health-checked reconnection: get_client() pings once, then trusts the pool
+  (redis-py re-checks idle connections every health_check_interval). After a
+  failure, or mark_unhealthy(), it returns None until the next probe is due
+- asyncio variant: async_client() hands out redis.asyncio clients from pools
+  kept per event loop (asyncio connections can't be shared across loops)
+- get_stats(): pool sizes, in-use/idle connections and reconnect counters
+
+Configuration (environment):
+- REDIS_URL / RQ_REDIS_URL: Default server (default redis://redis:6379/0)
+- REDIS_MAX_CONNECTIONS: Connections per pool (default 50)
+- REDIS_POOL_TIMEOUT: Seconds to wait for a free connection (default 5)
+- REDIS_RETRY_INTERVAL: Seconds between probes while unavailable (default 30)
+"""
+
+import logging
+import os
+import threading
+import time
+import weakref
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+import redis
+from redis.exceptions import RedisError
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # pragma: no cover - redis-py without asyncio support
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REDIS_URL = "redis://redis:6379/0"
+
+
+def _env_number(name: str, default, cast=int):
+    try:
+        return cast(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def resolve_redis_url() -> str:
+    """
+    Default Redis URL: Flask config, then environment, then the compose service.
+    """
+    try:
+        from flask import current_app
+
+        url = current_app.config.get("RQ_REDIS_URL") or current_app.config.get("REDIS_URL")
+        if url:
+            return url
+    except RuntimeError:
+        pass  # No application context
+    return os.environ.get("REDIS_URL") or os.environ.get("RQ_REDIS_URL", DEFAULT_REDIS_URL)
+
+
+def _mask_url(url: str) -> str:
+    parts = urlsplit(url)
+    if parts.password:
+        netloc = parts.netloc.replace(f":{parts.password}@", ":***@")
+        return urlunsplit(parts._replace(netloc=netloc))
+    return url
+
+
+class RedisConnectionManager:
+    """
+    Pooled, health-checked Redis clients for one server.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        max_connections: Optional[int] = None,
+        pool_timeout: Optional[float] = None,
+        retry_interval: Optional[float] = None,
+        socket_timeout: float = 5,
+        health_check_interval: int = 30
+    ):
+        """
+        Initialize connection manager (no connection is made until first use).
+
+        Args:
+            url: Redis URL
+            max_connections: Connections per pool (defaults to REDIS_MAX_CONNECTIONS or 50)
+            pool_timeout: Seconds to wait for a free connection (defaults to REDIS_POOL_TIMEOUT or 5)
+            retry_interval: Seconds between probes while Redis is down (defaults to REDIS_RETRY_INTERVAL or 30)
+            socket_timeout: Socket connect/read timeout in seconds
+            health_check_interval: Idle seconds after which a pooled connection is re-checked
+        """
+        self.url = url
+        self.max_connections = max_connections or _env_number('REDIS_MAX_CONNECTIONS', 50)
+        self.pool_timeout = pool_timeout if pool_timeout is not None else _env_number('REDIS_POOL_TIMEOUT', 5.0, float)
+        self.retry_interval = (retry_interval if retry_interval is not None
+                               else _env_number('REDIS_RETRY_INTERVAL', 30.0, float))
+        self._connection_kwargs = {
+            'socket_timeout': socket_timeout,
+            'socket_connect_timeout': socket_timeout,
+            'retry_on_timeout': True,
+            'health_check_interval': health_check_interval,
+        }
+
+        self._lock = threading.Lock()
+        self._probe_lock = threading.Lock()  # Held across the ping; one thread probes at a time
+        self._pools: Dict[bool, redis.BlockingConnectionPool] = {}
+        self._clients: Dict[bool, redis.Redis] = {}
+        self._async_pools: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()  # loop -> {decode: pool}
+
+        # Health state: None = not probed yet
+        self._healthy: Optional[bool] = None
+        self._next_probe_at = 0.0
+
+        # Metrics
+        self.probes = 0
+        self.failures = 0
+        self.reconnects = 0
+
+    def pool(self, decode_responses: bool = True) -> redis.BlockingConnectionPool:
+        """Get (or create) the shared sync pool."""
+        pool = self._pools.get(decode_responses)
+        if pool is None:
+            with self._lock:
+                pool = self._pools.get(decode_responses)
+                if pool is None:
+                    pool = self._pools[decode_responses] = redis.BlockingConnectionPool.from_url(
+                        self.url,
+                        max_connections=self.max_connections,
+                        timeout=self.pool_timeout,
+                        decode_responses=decode_responses,
+                        **self._connection_kwargs
+                    )
+        return pool
+
+    def client(self, decode_responses: bool = True) -> redis.Redis:
+        """
+        Get the shared client without a health check.
+
+        For holders that need a client object up front (e.g. RQ queues);
+        commands raise RedisError while the server is down.
+        """
+        client = self._clients.get(decode_responses)
+        if client is None:
+            pool = self.pool(decode_responses)
+            with self._lock:
+                client = self._clients.get(decode_responses)
+                if client is None:
+                    client = self._clients[decode_responses] = redis.Redis(connection_pool=pool)
+        return client
+
+    def get_client(self, decode_responses: bool = True) -> Optional[redis.Redis]:
+        """
+        Get the shared client if Redis is reachable.
+
+        Returns:
+            Client, or None while Redis is down (re-probed every retry_interval)
+        """
+        if self._healthy:
+            return self.client(decode_responses)
+        if not self._probe():
+            return None
+        return self.client(decode_responses)
+
+    def _probe(self) -> bool:
+        """Ping Redis unless a probe is not due yet; one thread probes at a time."""
+        if time.monotonic() < self._next_probe_at:
+            return False
+        with self._probe_lock:
+            if self._healthy:
+                return True
+            if time.monotonic() < self._next_probe_at:
+                return False
+            self.probes += 1
+            was_down = self._healthy is False
+            try:
+                self.client(True).ping()
+            except RedisError as e:
+                self.failures += 1
+                self._healthy = False
+                self._next_probe_at = time.monotonic() + self.retry_interval
+                logger.error(f"❌ Redis unavailable at {_mask_url(self.url)}: {e} "
+                             f"(retrying in {self.retry_interval:.0f}s)")
+                return False
+            self._healthy = True
+            if was_down:
+                self.reconnects += 1
+                logger.info(f"✅ Redis reconnected: {_mask_url(self.url)}")
+            else:
+                logger.info(f"✅ Redis connection established: {_mask_url(self.url)}")
+            return True
+
+    def mark_unhealthy(self, error: Optional[Exception] = None) -> None:
+        """
+        Report a connection failure seen by a caller.
+
+        get_client() returns None until the next probe succeeds, and idle
+        pooled connections are dropped so the probe reconnects from scratch.
+        """
+        with self._lock:
+            if self._healthy is False:
+                return
+            self._healthy = False
+            self.failures += 1
+            self._next_probe_at = time.monotonic() + self.retry_interval
+            pools = list(self._pools.values())
+        logger.warning(f"⚠️  Redis marked unavailable: {error or 'reported by caller'}")
+        for pool in pools:
+            pool.disconnect(inuse_connections=False)
+
+    @property
+    def healthy(self) -> Optional[bool]:
+        return self._healthy
+
+    def async_client(self, decode_responses: bool = True):
+        """
+        Get an asyncio client backed by a pool for the running event loop.
+
+        Returns:
+            redis.asyncio.Redis
+
+        Raises:
+            RuntimeError: Called outside a running event loop, or redis.asyncio unavailable
+        """
+        import asyncio
+
+        if aioredis is None:
+            raise RuntimeError("redis.asyncio is not available")
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            pools = self._async_pools.setdefault(loop, {})
+            pool = pools.get(decode_responses)
+            if pool is None:
+                pool = pools[decode_responses] = aioredis.BlockingConnectionPool.from_url(
+                    self.url,
+                    max_connections=self.max_connections,
+                    timeout=self.pool_timeout,
+                    decode_responses=decode_responses,
+                    **self._connection_kwargs
+                )
+        return aioredis.Redis(connection_pool=pool)
+
+    def close(self) -> None:
+        """Disconnect all sync pools (async pools close with their event loop)."""
+        with self._lock:
+            pools = list(self._pools.values())
+            self._pools.clear()
+            self._clients.clear()
+            self._healthy = None
+            self._next_probe_at = 0.0
+        for pool in pools:
+            pool.disconnect()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool and health metrics."""
+        with self._lock:
+            pools = dict(self._pools)
+            async_pools = [p for loop_pools in self._async_pools.values() for p in loop_pools.values()]
+
+        def pool_stats(pool) -> Dict[str, int]:
+            in_use = len(pool._get_in_use_connections())
+            idle = len(pool._get_free_connections())
+            return {'max_connections': pool.max_connections, 'in_use': in_use, 'idle': idle}
+
+        return {
+            'url': _mask_url(self.url),
+            'healthy': self._healthy,
+            'pools': {('decoded' if decode else 'binary'): pool_stats(pool) for decode, pool in pools.items()},
+            'async_pools': len(async_pools),
+            'async_in_use': sum(len(p._get_in_use_connections()) for p in async_pools),
+            'probes': self.probes,
+            'failures': self.failures,
+            'reconnects': self.reconnects,
+        }
+
+
+# Global connection managers, one per URL
+_managers: Dict[str, RedisConnectionManager] = {}
+_managers_lock = threading.Lock()
+
+
+def get_redis_manager(url: Optional[str] = None) -> RedisConnectionManager:
+    """
+    Get the shared connection manager for a Redis URL.
+
+    Args:
+        url: Redis URL (defaults to resolve_redis_url())
+
+    Returns:
+        RedisConnectionManager
+    """
+    url = url or resolve_redis_url()
+    manager = _managers.get(url)
+    if manager is None:
+        with _managers_lock:
+            manager = _managers.get(url)
+            if manager is None:
+                manager = _managers[url] = RedisConnectionManager(url)
+                logger.info(f"Redis connection pool created: {_mask_url(url)} "
+                            f"(max {manager.max_connections} connections)")
+    return manager
+
+
+def get_redis_pool_stats() -> Dict[str, Any]:
+    """Get stats for every connection manager in this process."""
+    with _managers_lock:
+        managers = list(_managers.values())
+    return {_mask_url(m.url): m.get_stats() for m in managers}
@@ -0,0 +1,218 @@
+"""
+On-disk LLM Response Cache
+
+Content-addressed store for chat completion response bodies. The key is a
+SHA-256 of the exact request payload (model, messages, sampling parameters),
+so re-running an eval or regression after a metrics-only change reuses every
+response instead of calling the model again, while any prompt, model,
+temperature or lyrics change is a clean miss.
+
+Entries are JSON files sharded by key prefix. Total size is bounded; the least
+recently used entries (by mtime, refreshed on every hit) are evicted first.
+Writes are atomic, so several processes can share one directory.
+
+Configuration (environment):
+- LLM_RESPONSE_CACHE_DIR: Cache directory (unset = disabled in the app)
+- LLM_RESPONSE_CACHE_MAX_MB: Size bound in megabytes (default 512)
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Request fields that change how the response is delivered, not what it says
+TRANSPORT_FIELDS = ("stream", "stream_options")
+
+
+def request_fingerprint(payload: Dict[str, Any]) -> str:
+    """
+    Hash a chat completions payload into a cache key.
+
+    Args:
+        payload: Request body as sent to /chat/completions
+
+    Returns:
+        Hex SHA-256 of the canonical JSON encoding
+    """
+    body = {k: v for k, v in payload.items() if k not in TRANSPORT_FIELDS}
+    canonical = json.dumps(body, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Size-bounded, content-addressed response cache on the local filesystem.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 512 * 1024 * 1024):
+        """
+        Initialize response cache.
+
+        Args:
+            directory: Cache directory (created if missing)
+            max_bytes: Evict least recently used entries above this total size
+        """
+        self.directory = os.path.abspath(os.path.expanduser(directory))
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self._index: Optional["OrderedDict[str, int]"] = None  # key -> size, oldest first
+        self._total_bytes = 0
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        os.makedirs(self.directory, exist_ok=True)
+        logger.info(f"💾 ResponseCache at {self.directory} (max {max_bytes // (1024 * 1024)} MB)")
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def _load_index(self) -> None:
+        """Scan the directory once, oldest entries first (caller holds the lock)."""
+        if self._index is not None:
+            return
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith(".json"):
+                    continue
+                try:
+                    st = os.stat(os.path.join(root, name))
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, name[:-5], st.st_size))
+        entries.sort()
+        self._index = OrderedDict((key, size) for _, key, size in entries)
+        self._total_bytes = sum(self._index.values())
+
+    def get(self, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Look up the response for a request payload.
+
+        Returns:
+            Cached response body, or None on a miss
+        """
+        key = request_fingerprint(payload)
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            os.utime(path)  # Mark as recently used
+        except (OSError, ValueError):
+            with self.lock:
+                self.misses += 1
+            return None
+
+        with self.lock:
+            self.hits += 1
+            if self._index is not None and key in self._index:
+                self._index.move_to_end(key)
+        return entry.get("response")
+
+    def set(self, payload: Dict[str, Any], response: Dict[str, Any]) -> None:
+        """
+        Store the response for a request payload, evicting old entries if needed.
+        """
+        key = request_fingerprint(payload)
+        path = self._path(key)
+        data = json.dumps(
+            {"created_at": time.time(), "model": payload.get("model"), "response": response},
+            ensure_ascii=False
+        ).encode("utf-8")
+
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Response cache write failed: {e}")
+            return
+
+        with self.lock:
+            self._load_index()
+            self._total_bytes += len(data) - self._index.pop(key, 0)
+            self._index[key] = len(data)
+            self._evict()
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until under max_bytes (caller holds the lock)."""
+        while self._total_bytes > self.max_bytes and len(self._index) > 1:
+            key, size = self._index.popitem(last=False)
+            self._total_bytes -= size
+            self.evictions += 1
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass  # Already evicted by another process
+
+    def clear(self) -> None:
+        """Remove every cached response."""
+        with self.lock:
+            self._load_index()
+            for key in list(self._index):
+                try:
+                    os.remove(self._path(key))
+                except OSError:
+                    pass
+            self._index.clear()
+            self._total_bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            self._load_index()
+            lookups = self.hits + self.misses
+            return {
+                'directory': self.directory,
+                'entries': len(self._index),
+                'size_bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'evictions': self.evictions,
+            }
+
+
+# Global response cache instance (only when LLM_RESPONSE_CACHE_DIR is set)
+_response_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """
+    Get the global response cache.
+
+    Returns:
+        ResponseCache for LLM_RESPONSE_CACHE_DIR, or None when it is not set
+    """
+    global _response_cache
+
+    if _response_cache is None:
+        directory = os.environ.get("LLM_RESPONSE_CACHE_DIR", "").strip()
+        if not directory:
+            return None
+        with _cache_lock:
+            if _response_cache is None:
+                try:
+                    max_mb = int(os.environ.get("LLM_RESPONSE_CACHE_MAX_MB", "512"))
+                except ValueError:
+                    max_mb = 512
+                try:
+                    _response_cache = ResponseCache(directory, max_bytes=max_mb * 1024 * 1024)
+                except OSError as e:
+                    logger.error(f"Response cache disabled, cannot use {directory}: {e}")
+                    return None
+
+    return _response_cache
@@ -0,0 +1,412 @@
+"""
+Single-Flight Request Coalescing
+
+Ensures identical song analyses run once even when many callers miss the
+cache at the same time.
+
+- In-process: the first thread for a key does the work; later threads wait
+  on its result.
+- Across RQ workers: the in-process leader takes a Redis lease
+  (SET NX PX). Workers that lose the race poll the Redis analysis cache for
+  the owner's result. Leases expire so a crashed owner cannot block others.
+- While the owner runs, its lease is renewed every third of the TTL, so
+  retries and backoff that outlast the TTL do not let a second worker take
+  over and repeat the API call. One renewer thread per group renews every
+  held lease (threads and coroutines alike), so concurrent misses don't add
+  threads. Renewal stops after max_hold seconds so a hung owner still
+  releases the key eventually.
+- do_async() gives the asyncio analysis engine the same behaviour: it shares
+  the in-process registry with do(), so threads and coroutines coalesce with
+  each other, and takes the same Redis lease. Blocking Redis calls run in the
+  loop's default executor.
+
+Without Redis, coalescing falls back to in-process only.
+
+Configuration (environment):
+- ANALYSIS_LEASE_TTL: Lease lifetime in seconds (default 180)
+- ANALYSIS_LEASE_MAX_HOLD: Seconds an owner may keep renewing its lease (default 600)
+"""
+
+import asyncio
+import copy
+import logging
+import os
+import threading
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+# Compare-and-delete so an owner never releases a lease it no longer holds
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+# Compare-and-extend so an owner only renews a lease it still holds
+_RENEW_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
+class _Call:
+    """An in-flight call that other threads can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class _HeldLease:
+    """A lease this process owns, kept alive by the renewer until released."""
+
+    def __init__(self, client, token: str, hold_until: float):
+        self.client = client
+        self.token = token
+        self.hold_until = hold_until
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key.
+    """
+
+    def __init__(
+        self,
+        redis_cache=None,
+        lease_ttl: float = 180.0,
+        max_hold: float = 600.0,
+        poll_interval: float = 0.25,
+        on_coalesced: Optional[Callable[[str], None]] = None
+    ):
+        """
+        Initialize single-flight group.
+
+        Args:
+            redis_cache: RedisCache used for cross-process leases (None for in-process only)
+            lease_ttl: Seconds before an unrenewed lease expires
+            max_hold: Seconds the owner keeps renewing its lease while fn runs
+            poll_interval: Seconds between checks while another worker holds the lease
+            on_coalesced: Callback invoked with 'in_process' or 'distributed' per coalesced call
+        """
+        self.redis_cache = redis_cache
+        self.lease_ttl = lease_ttl
+        self.max_hold = max_hold
+        self.poll_interval = poll_interval
+        self.on_coalesced = on_coalesced
+
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+
+        # Leases renewed by the shared renewer thread (started while any are held)
+        self._held: Dict[str, _HeldLease] = {}
+        self._held_changed = threading.Condition()
+        self._renewer: Optional[threading.Thread] = None
+
+    def do(
+        self,
+        key: str,
+        fn: Callable[[], Any],
+        peek: Optional[Callable[[], Any]] = None
+    ) -> Any:
+        """
+        Run fn once per key across concurrent callers.
+
+        Args:
+            key: Coalescing key
+            fn: Work to perform when this caller is the owner
+            peek: Returns another worker's published result, or None (used while waiting on a lease)
+
+        Returns:
+            Result of fn (waiters receive a copy of the owner's result)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            # The owner may wait out another worker's lease before running fn under its own
+            if call.done.wait(self._lease_span * 2):
+                self._record('in_process')
+                if call.error is not None:
+                    raise call.error
+                return copy.deepcopy(call.result)
+            logger.warning(f"⏳ Single-flight wait timed out for {key}; running independently")
+            return fn()
+
+        try:
+            call.result = self._run_with_lease(key, fn, peek)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    async def do_async(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[Any]],
+        peek: Optional[Callable[[], Awaitable[Any]]] = None
+    ) -> Any:
+        """
+        Coroutine variant of do().
+
+        Args:
+            key: Coalescing key
+            fn: Coroutine function performing the work when this caller is the owner
+            peek: Coroutine function returning another worker's published result, or None
+
+        Returns:
+            Result of fn (waiters receive a copy of the owner's result)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            # The owner may be a thread; poll its event instead of blocking the loop
+            deadline = time.monotonic() + self._lease_span * 2
+            while not call.done.is_set():
+                if time.monotonic() >= deadline:
+                    logger.warning(f"⏳ Single-flight wait timed out for {key}; running independently")
+                    return await fn()
+                await asyncio.sleep(self.poll_interval)
+            self._record('in_process')
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+
+        try:
+            call.result = await self._run_with_lease_async(key, fn, peek)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def in_flight(self) -> int:
+        """Number of keys currently being computed in this process."""
+        with self._lock:
+            return len(self._calls)
+
+    @property
+    def _lease_span(self) -> float:
+        """Longest a lease can be held: renewals for max_hold plus the final TTL."""
+        return self.max_hold + self.lease_ttl
+
+    def _run_with_lease(self, key: str, fn: Callable[[], Any], peek: Optional[Callable[[], Any]]) -> Any:
+        """Take the cross-process lease for key (or wait for its owner) and run fn."""
+        client = self.redis_cache.client if self.redis_cache is not None else None
+        if client is None:
+            return fn()
+
+        lease_key = f"singleflight:{key}"
+        deadline = time.monotonic() + self._lease_span
+
+        while True:
+            token = self._acquire_lease(client, lease_key)
+            if token is not None:
+                try:
+                    # The previous owner may have published just before we took over
+                    result = peek() if peek else None
+                    if result is not None:
+                        self._record('distributed')
+                        return result
+                    self._hold(client, lease_key, token)
+                    try:
+                        return fn()
+                    finally:
+                        self._unhold(lease_key, token)
+                finally:
+                    self._release_lease(client, lease_key, token)
+
+            result = peek() if peek else None
+            if result is not None:
+                self._record('distributed')
+                return result
+
+            if time.monotonic() >= deadline:
+                logger.warning(f"⏳ Lease wait timed out for {key}; running independently")
+                return fn()
+
+            time.sleep(self.poll_interval)
+
+    async def _run_with_lease_async(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[Any]],
+        peek: Optional[Callable[[], Awaitable[Any]]]
+    ) -> Any:
+        """Coroutine variant of _run_with_lease()."""
+        client = self.redis_cache.client if self.redis_cache is not None else None
+        if client is None:
+            return await fn()
+
+        loop = asyncio.get_running_loop()
+        lease_key = f"singleflight:{key}"
+        deadline = time.monotonic() + self._lease_span
+
+        while True:
+            token = await loop.run_in_executor(None, self._acquire_lease, client, lease_key)
+            if token is not None:
+                try:
+                    # The previous owner may have published just before we took over
+                    result = await peek() if peek else None
+                    if result is not None:
+                        self._record('distributed')
+                        return result
+                    self._hold(client, lease_key, token)
+                    try:
+                        return await fn()
+                    finally:
+                        self._unhold(lease_key, token)
+                finally:
+                    await loop.run_in_executor(None, self._release_lease, client, lease_key, token)
+
+            result = await peek() if peek else None
+            if result is not None:
+                self._record('distributed')
+                return result
+
+            if time.monotonic() >= deadline:
+                logger.warning(f"⏳ Lease wait timed out for {key}; running independently")
+                return await fn()
+
+            await asyncio.sleep(self.poll_interval)
+
+    def _acquire_lease(self, client, lease_key: str) -> Optional[str]:
+        """
+        Try to take the lease.
+
+        Returns:
+            Owner token, or None when another worker holds it. Redis errors
+            hand out a local token so work is never blocked by Redis.
+        """
+        token = uuid.uuid4().hex
+        try:
+            if client.set(lease_key, token, nx=True, px=int(self.lease_ttl * 1000)):
+                return token
+            return None
+        except RedisError as e:
+            logger.warning(f"Redis lease error: {e}")
+            return token
+
+    def _hold(self, client, lease_key: str, token: str) -> None:
+        """Have the renewer extend the lease every lease_ttl / 3 seconds until _unhold()."""
+        with self._held_changed:
+            self._held[lease_key] = _HeldLease(client, token, time.monotonic() + self.max_hold)
+            if self._renewer is None:
+                self._renewer = threading.Thread(
+                    target=self._renew_loop, name="singleflight-renewer", daemon=True
+                )
+                self._renewer.start()
+
+    def _unhold(self, lease_key: str, token: str) -> bool:
+        """Stop renewing the lease; False when it was no longer held under token."""
+        with self._held_changed:
+            held = self._held.get(lease_key)
+            if held is None or held.token != token:
+                return False
+            del self._held[lease_key]
+            if not self._held:
+                self._held_changed.notify()
+            return True
+
+    def _renew_loop(self) -> None:
+        """
+        Renew every held lease each lease_ttl / 3 seconds; exits once none are held.
+
+        A lease is dropped early once max_hold has passed or it is no longer ours
+        (it expired and another worker took it).
+        """
+        interval = max(self.lease_ttl / 3, 0.01)
+        ttl_ms = int(self.lease_ttl * 1000)
+        while True:
+            with self._held_changed:
+                deadline = time.monotonic() + interval
+                while self._held and (remaining := deadline - time.monotonic()) > 0:
+                    self._held_changed.wait(remaining)
+                if not self._held:
+                    self._renewer = None
+                    return
+                held = list(self._held.items())
+
+            now = time.monotonic()
+            for lease_key, lease in held:
+                if now >= lease.hold_until:
+                    if self._unhold(lease_key, lease.token):
+                        logger.warning(f"⏳ {lease_key} held past {self.max_hold:.0f}s; no longer renewing")
+                    continue
+                try:
+                    renewed = lease.client.eval(_RENEW_SCRIPT, 1, lease_key, lease.token, ttl_ms)
+                except RedisError as e:
+                    logger.warning(f"Redis lease renew error: {e}")
+                    continue
+                # A lease released since the snapshot isn't lost
+                if not renewed and self._unhold(lease_key, lease.token):
+                    logger.warning(f"⚠️  Lost Redis lease {lease_key}; another worker may run it too")
+
+    def _release_lease(self, client, lease_key: str, token: str) -> None:
+        try:
+            client.eval(_RELEASE_SCRIPT, 1, lease_key, token)
+        except RedisError as e:
+            logger.warning(f"Redis lease release error: {e}")
+
+    def _record(self, kind: str) -> None:
+        if self.on_coalesced is not None:
+            self.on_coalesced(kind)
+
+
+# Global single-flight group for song analyses
+_analysis_single_flight: Optional[SingleFlight] = None
+_single_flight_lock = threading.Lock()
+
+
+def get_analysis_single_flight() -> SingleFlight:
+    """Get the global single-flight group for song analyses."""
+    global _analysis_single_flight
+
+    if _analysis_single_flight is None:
+        with _single_flight_lock:
+            if _analysis_single_flight is None:
+                from app.utils.openai_rate_limiter import get_rate_limiter
+                from app.utils.redis_cache import get_redis_cache
+
+                try:
+                    lease_ttl = float(os.environ.get("ANALYSIS_LEASE_TTL", "180"))
+                except ValueError:
+                    lease_ttl = 180.0
+                try:
+                    max_hold = float(os.environ.get("ANALYSIS_LEASE_MAX_HOLD", "600"))
+                except ValueError:
+                    max_hold = 600.0
+
+                _analysis_single_flight = SingleFlight(
+                    redis_cache=get_redis_cache(),
+                    lease_ttl=lease_ttl,
+                    max_hold=max_hold,
+                    on_coalesced=get_rate_limiter().record_coalesced
+                )
+
+    return _analysis_single_flight
@@ -0,0 +1,184 @@
+"""
+LLM Token Ledger
+
+Accumulates the `usage` block of every chat completion per model:
+prompt tokens, cached prompt tokens (provider prefix-cache hits) and
+completion tokens. Batch API responses are tracked separately because
+they are billed at a discount.
+
+Counters live in Redis hashes so every RQ worker and web process share one
+ledger; without Redis they fall back to in-process counters.
+
+Keys:
+- token_ledger:{model}          (all-time totals)
+- token_ledger:{model}:{date}   (daily totals, expire after 90 days)
+- token_ledger_models           (set of models with counters, read instead of SCAN)
+"""
+
+import logging
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ('requests', 'prompt_tokens', 'cached_tokens', 'completion_tokens')
+DAILY_TTL = 90 * 86400
+MODELS_KEY = 'token_ledger_models'
+
+
+def parse_usage(data: Dict[str, Any]) -> Optional[Dict[str, int]]:
+    """
+    Extract token counts from a chat completion response body.
+
+    Returns:
+        Dict with prompt_tokens, cached_tokens and completion_tokens, or None if absent
+    """
+    usage = data.get('usage') if isinstance(data, dict) else None
+    if not isinstance(usage, dict):
+        return None
+    details = usage.get('prompt_tokens_details') or {}
+    return {
+        'prompt_tokens': int(usage.get('prompt_tokens') or 0),
+        'cached_tokens': int(details.get('cached_tokens') or 0),
+        'completion_tokens': int(usage.get('completion_tokens') or 0),
+    }
+
+
+class TokenLedger:
+    """
+    Per-model token accounting shared across processes via Redis.
+    """
+
+    def __init__(self, redis_cache=None):
+        """
+        Initialize token ledger.
+
+        Args:
+            redis_cache: RedisCache for shared counters (None for in-process only)
+        """
+        self.redis_cache = redis_cache
+        self.lock = threading.Lock()
+        # model -> day -> field -> count (in-process fallback)
+        self._local: Dict[str, Dict[str, Dict[str, int]]] = defaultdict(lambda: defaultdict(lambda: defaultdict(int)))
+
+    def record(self, model: str, usage: Optional[Dict[str, int]], batch: bool = False) -> None:
+        """
+        Add one response's usage to the ledger.
+
+        Args:
+            model: Model that served the request
+            usage: Output of parse_usage (ignored when None)
+            batch: Response came from the Batch API
+        """
+        if not usage:
+            return
+
+        prefix = 'batch_' if batch else ''
+        increments = {f'{prefix}requests': 1}
+        for field in FIELDS[1:]:
+            increments[f'{prefix}{field}'] = usage.get(field, 0)
+        day = datetime.now(timezone.utc).date().isoformat()
+
+        client = self.redis_cache.client if self.redis_cache is not None else None
+        if client is not None:
+            try:
+                pipe = client.pipeline(transaction=False)
+                for key in (f'token_ledger:{model}', f'token_ledger:{model}:{day}'):
+                    for field, amount in increments.items():
+                        pipe.hincrby(key, field, amount)
+                pipe.expire(f'token_ledger:{model}:{day}', DAILY_TTL)
+                pipe.sadd(MODELS_KEY, model)
+                pipe.execute()
+                return
+            except RedisError as e:
+                logger.warning(f"Token ledger Redis error, counting locally: {e}")
+
+        with self.lock:
+            for bucket in ('total', day):
+                for field, amount in increments.items():
+                    self._local[model][bucket][field] += amount
+
+    def get_totals(self) -> Dict[str, Dict[str, int]]:
+        """All-time token totals keyed by model."""
+        client = self.redis_cache.client if self.redis_cache is not None else None
+        if client is not None:
+            try:
+                models = sorted(client.smembers(MODELS_KEY))
+                pipe = client.pipeline(transaction=False)
+                for model in models:
+                    pipe.hgetall(f'token_ledger:{model}')
+                return {model: self._as_counts(counts) for model, counts in zip(models, pipe.execute())}
+            except RedisError as e:
+                logger.warning(f"Token ledger Redis error: {e}")
+
+        with self.lock:
+            return {model: self._as_counts(buckets['total']) for model, buckets in self._local.items()}
+
+    def get_daily(self, days: int = 30) -> List[Dict[str, Any]]:
+        """
+        Daily totals (all models) for the last `days` days, oldest first.
+
+        Returns:
+            List of {'date', 'by_model': {model: counts}}
+        """
+        today = datetime.now(timezone.utc).date()
+        dates = [(today - timedelta(days=offset)).isoformat() for offset in range(days - 1, -1, -1)]
+
+        by_day: Dict[str, Dict[str, Dict[str, int]]] = {d: {} for d in dates}
+        client = self.redis_cache.client if self.redis_cache is not None else None
+        if client is not None:
+            try:
+                models = sorted(client.smembers(MODELS_KEY))
+                pipe = client.pipeline(transaction=False)
+                keys = [(d, m) for d in dates for m in models]
+                for d, m in keys:
+                    pipe.hgetall(f'token_ledger:{m}:{d}')
+                for (d, m), counts in zip(keys, pipe.execute()):
+                    if counts:
+                        by_day[d][m] = self._as_counts(counts)
+                return [{'date': d, 'by_model': by_day[d]} for d in dates]
+            except RedisError as e:
+                logger.warning(f"Token ledger Redis error: {e}")
+
+        with self.lock:
+            for model, buckets in self._local.items():
+                for d in dates:
+                    if d in buckets:
+                        by_day[d][model] = self._as_counts(buckets[d])
+        return [{'date': d, 'by_model': by_day[d]} for d in dates]
+
+    def reset(self) -> None:
+        """Clear in-process counters (Redis counters are left untouched)."""
+        with self.lock:
+            self._local.clear()
+
+    @staticmethod
+    def _as_counts(raw: Dict[str, Any]) -> Dict[str, int]:
+        counts = {}
+        for prefix in ('', 'batch_'):
+            for field in FIELDS:
+                counts[f'{prefix}{field}'] = int(raw.get(f'{prefix}{field}', 0) or 0)
+        return counts
+
+
+# Global token ledger instance
+_token_ledger: Optional[TokenLedger] = None
+_ledger_lock = threading.Lock()
+
+
+def get_token_ledger() -> TokenLedger:
+    """Get the global token ledger instance."""
+    global _token_ledger
+
+    if _token_ledger is None:
+        with _ledger_lock:
+            if _token_ledger is None:
+                from app.utils.redis_cache import get_redis_cache
+
+                _token_ledger = TokenLedger(redis_cache=get_redis_cache())
+
+    return _token_ledger
@@ -0,0 +1,26 @@
+"""Add normalized-lyrics content_hash index to analysis_cache
+
+Revision ID: add_analysis_cache_content_hash
+Revises: add_analysis_quality
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_analysis_cache_content_hash'
+down_revision = 'add_analysis_quality'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Nullable: rows cached before this revision are indexed as they are rewritten
+    op.add_column('analysis_cache', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.create_index('idx_analysis_cache_content_model', 'analysis_cache', ['content_hash', 'model_version'])
+
+
+def downgrade():
+    op.drop_index('idx_analysis_cache_content_model', table_name='analysis_cache')
+    op.drop_column('analysis_cache', 'content_hash')
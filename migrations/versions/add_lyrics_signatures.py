@@ -0,0 +1,49 @@
+"""Add lyrics_signatures and lyrics_lsh_buckets for near-duplicate lookup
+
+Revision ID: add_lyrics_signatures
+Revises: add_analysis_cache_content_hash
+Create Date: 2026-10-16 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_lyrics_signatures'
+down_revision = 'add_analysis_cache_content_hash'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'lyrics_signatures',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('artist', sa.String(length=500), nullable=False),
+        sa.Column('title', sa.String(length=500), nullable=False),
+        sa.Column('lyrics_hash', sa.String(length=64), nullable=False),
+        sa.Column('signature', sa.LargeBinary(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('artist', 'title', 'lyrics_hash', name='uq_lyrics_signature_song')
+    )
+    op.create_index('idx_lyrics_signature_lyrics_hash', 'lyrics_signatures', ['lyrics_hash'])
+
+    op.create_table(
+        'lyrics_lsh_buckets',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('band_key', sa.String(length=32), nullable=False),
+        sa.Column('signature_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['signature_id'], ['lyrics_signatures.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_lyrics_lsh_buckets_band_key', 'lyrics_lsh_buckets', ['band_key'])
+    op.create_index('ix_lyrics_lsh_buckets_signature_id', 'lyrics_lsh_buckets', ['signature_id'])
+
+
+def downgrade():
+    op.drop_index('ix_lyrics_lsh_buckets_signature_id', table_name='lyrics_lsh_buckets')
+    op.drop_index('ix_lyrics_lsh_buckets_band_key', table_name='lyrics_lsh_buckets')
+    op.drop_table('lyrics_lsh_buckets')
+    op.drop_index('idx_lyrics_signature_lyrics_hash', table_name='lyrics_signatures')
+    op.drop_table('lyrics_signatures')
@@ -0,0 +1,73 @@
+"""Backfill near-duplicate MinHash signatures for existing LyricsCache rows.
+
+Computes a signature (and LSH buckets) for every cached lyrics row that is not
+indexed yet, so RouterAnalyzer can reuse analyses of near-identical lyrics
+(ANALYSIS_NEAR_DUPLICATE) for songs analyzed before the index existed.
+
+Idempotent and safe to run multiple times.
+
+Usage:
+    python scripts/backfill_lyrics_signatures.py
+    python scripts/backfill_lyrics_signatures.py --batch-size 1000 --limit 5000
+"""
+import argparse
+import os
+import sys
+import time
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--batch-size', type=int, default=500, help='LyricsCache rows per query/commit')
+    parser.add_argument('--limit', type=int, default=None, help='Stop after this many rows')
+    args = parser.parse_args()
+
+    os.environ.setdefault("FLASK_ENV", os.environ.get("FLASK_ENV", "production"))
+    from app import create_app
+    from app.models.models import LyricsCache
+    from app.services.analyzers.near_duplicate import NearDuplicateIndex, minhash_signature
+    from app.services.analyzers.router_analyzer import RouterAnalyzer
+
+    app = create_app(os.environ.get("FLASK_ENV", "production"), skip_db_init=True)
+    index = NearDuplicateIndex()
+    scanned = indexed = skipped = 0
+    started = time.time()
+
+    with app.app_context():
+        last_id = 0
+        while args.limit is None or scanned < args.limit:
+            batch_size = args.batch_size if args.limit is None else min(args.batch_size, args.limit - scanned)
+            # Keyset pagination keeps each query cheap on large tables
+            rows = (
+                LyricsCache.query.filter(LyricsCache.id > last_id)
+                .order_by(LyricsCache.id)
+                .limit(batch_size)
+                .all()
+            )
+            if not rows:
+                break
+            last_id = rows[-1].id
+            scanned += len(rows)
+
+            entries = []
+            for row in rows:
+                signature = minhash_signature(row.lyrics)
+                if signature is None:
+                    skipped += 1
+                    continue
+                entries.append((row.artist, row.title, RouterAnalyzer._lyrics_hash(row.lyrics), signature))
+            indexed += index.add_many(entries)
+            print(f"  scanned {scanned}, indexed {indexed}, skipped {skipped} (no lyrics)")
+
+    print(
+        f"Backfill completed in {time.time() - started:.1f}s. scanned={scanned}, "
+        f"indexed={indexed}, already_indexed={scanned - indexed - skipped}, skipped={skipped}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
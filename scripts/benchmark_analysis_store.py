@@ -0,0 +1,103 @@
+"""
+Microbenchmark: analyzer database-cache overhead per song
+
+Compares the legacy pattern (create_app() for the cache lookup and again for
+the cache write) against AnalysisStore, which reuses the shared worker app and
+its connection pool. Runs against a throwaway SQLite database so it needs no
+external services.
+
+Usage:
+    python scripts/benchmark_analysis_store.py --songs 200
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+logging.basicConfig(level=logging.WARNING, format='%(asctime)s [%(levelname)s] %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def _legacy_round_trip(i: int, model: str) -> None:
+    """One cache miss + write the way RouterAnalyzer used to do it."""
+    from app import create_app
+    from app.models.models import AnalysisCache
+
+    app = create_app()
+    with app.app_context():
+        AnalysisCache.find_cached_analysis('Bench Artist', f'Legacy {i}', f'{i:064x}')
+
+    app = create_app()
+    with app.app_context():
+        AnalysisCache.cache_analysis(
+            artist='Bench Artist',
+            title=f'Legacy {i}',
+            lyrics_hash=f'{i:064x}',
+            analysis_result={'score': 80, 'verdict': 'context_required'},
+            model_version=model
+        )
+
+
+def _store_round_trip(store, i: int, model: str) -> None:
+    """One cache miss + write through AnalysisStore."""
+    store.find('Bench Artist', f'Store {i}', f'{i:064x}')
+    store.save('Bench Artist', f'Store {i}', f'{i:064x}',
+               {'score': 80, 'verdict': 'context_required'}, model)
+
+
+def run(num_songs: int) -> dict:
+    from app.extensions import db
+    from app.services.analyzers.analysis_store import AnalysisStore
+    from app.utils.app_context import get_worker_app
+
+    model = 'benchmark-model'
+
+    # Create schema once (also warms the worker app)
+    with get_worker_app().app_context():
+        db.create_all()
+
+    start = time.perf_counter()
+    for i in range(num_songs):
+        _legacy_round_trip(i, model)
+    legacy_elapsed = time.perf_counter() - start
+
+    store = AnalysisStore()
+    start = time.perf_counter()
+    for i in range(num_songs):
+        _store_round_trip(store, i, model)
+    store_elapsed = time.perf_counter() - start
+
+    legacy_ms = legacy_elapsed / num_songs * 1000
+    store_ms = store_elapsed / num_songs * 1000
+    return {
+        'songs': num_songs,
+        'legacy_ms_per_song': round(legacy_ms, 3),
+        'store_ms_per_song': round(store_ms, 3),
+        'speedup': round(legacy_ms / max(store_ms, 1e-9), 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--songs', type=int, default=200, help='Number of simulated cache misses')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        results = run(args.songs)
+
+    print("Analyzer database-cache overhead (lookup + write per song)")
+    print(f"  songs:          {results['songs']}")
+    print(f"  create_app():   {results['legacy_ms_per_song']:.3f} ms/song")
+    print(f"  AnalysisStore:  {results['store_ms_per_song']:.3f} ms/song")
+    print(f"  speedup:        {results['speedup']}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark: prompt tokens saved by lyrics preprocessing
+
+Runs every song in an eval JSONL file through LyricsPreprocessor and reports
+original vs. prepared lyrics tokens per song. With --analyze it also sends
+both versions to the configured model (bypassing all caches) and reports
+whether the verdicts agree. That mode needs OPENAI_API_KEY.
+
+Usage:
+    python scripts/benchmark_lyrics_preprocessing.py
+    python scripts/benchmark_lyrics_preprocessing.py --input scripts/eval/test_set_eval_format.jsonl
+    python scripts/benchmark_lyrics_preprocessing.py --analyze --limit 20
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+logging.basicConfig(level=logging.WARNING, format='%(asctime)s [%(levelname)s] %(message)s')
+logger = logging.getLogger(__name__)
+
+DEFAULT_INPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'eval', 'songs_eval.jsonl')
+
+
+def load_songs(path: str, limit: int = None) -> list:
+    songs = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            obj = json.loads(line)
+            if obj.get('lyrics'):
+                songs.append(obj)
+    return songs[:limit] if limit else songs
+
+
+def _verdict(analyzer, title: str, artist: str, lyrics: str) -> str:
+    """Uncached single call with the given lyrics (already preprocessed or raw)."""
+    url, payload, headers = analyzer._build_request(title, artist, lyrics)
+    resp = analyzer.http_client.post(url, json=payload, headers=headers, timeout=analyzer.timeout)
+    resp.raise_for_status()
+    return analyzer._process_response(resp.json()).get('verdict')
+
+
+def run(songs: list, max_tokens: int, analyze: bool) -> dict:
+    from app.services.analyzers.lyrics_preprocessor import LyricsPreprocessor
+
+    preprocessor = LyricsPreprocessor(max_tokens=max_tokens)
+    passthrough = LyricsPreprocessor(enabled=False)
+    analyzer = None
+    if analyze:
+        from app.services.analyzers.router_analyzer import RouterAnalyzer
+        analyzer = RouterAnalyzer()
+
+    rows = []
+    for song in songs:
+        prepared = preprocessor.prepare(song['lyrics'])
+        row = {
+            'id': song.get('id') or song.get('title'),
+            'title': song.get('title', ''),
+            **prepared.to_dict(),
+        }
+        if analyzer is not None:
+            analyzer.lyrics_preprocessor = passthrough
+            row['verdict_raw'] = _verdict(analyzer, song['title'], song['artist'], song['lyrics'])
+            analyzer.lyrics_preprocessor = preprocessor
+            row['verdict_prepared'] = _verdict(analyzer, song['title'], song['artist'], song['lyrics'])
+        rows.append(row)
+
+    summary = preprocessor.get_stats()
+    if analyzer is not None:
+        summary['verdicts_changed'] = sum(1 for r in rows if r['verdict_raw'] != r['verdict_prepared'])
+    return {'rows': rows, 'summary': summary}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--input', default=DEFAULT_INPUT, help='Eval JSONL with title/artist/lyrics')
+    parser.add_argument('--max-tokens', type=int, default=2000, help='Lyrics token budget')
+    parser.add_argument('--limit', type=int, default=None, help='Only the first N songs')
+    parser.add_argument('--analyze', action='store_true', help='Compare model verdicts (calls the API)')
+    parser.add_argument('--per-song', action='store_true', help='Print a row per song')
+    args = parser.parse_args()
+
+    results = run(load_songs(args.input, args.limit), args.max_tokens, args.analyze)
+    summary = results['summary']
+
+    if args.per_song:
+        for row in results['rows']:
+            line = (f"  {str(row['id'])[:24]:24} {row['original_tokens']:6} → {row['prepared_tokens']:6} "
+                    f"(-{row['tokens_saved']}, {row['repeats_collapsed']} repeats, {row['truncated_lines']} truncated)")
+            if 'verdict_raw' in row:
+                line += f"  {row['verdict_raw']} / {row['verdict_prepared']}"
+            print(line)
+
+    print(f"Lyrics preprocessing ({os.path.basename(args.input)}, tokenizer: {summary['tokenizer']})")
+    print(f"  songs:           {summary['total_songs']}")
+    print(f"  original tokens: {summary['total_original_tokens']}")
+    print(f"  prepared tokens: {summary['total_prepared_tokens']}")
+    print(f"  saved:           {summary['total_tokens_saved']} ({summary['savings_rate']:.1%})")
+    print(f"  truncated songs: {summary['total_truncated']}")
+    if 'verdicts_changed' in summary:
+        print(f"  verdicts changed: {summary['verdicts_changed']}")
+
+
+if __name__ == '__main__':
+    main()
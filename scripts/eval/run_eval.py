@@ -3,6 +3,7 @@ import asyncio
 import csv
 import json
 import os
+import sys
 import time
 from dataclasses import dataclass
 from typing import Any, Dict, List, Optional
@@ -10,6 +11,15 @@ from typing import Any, Dict, List, Optional
 import httpx
 import numpy as np
 
+# Repository root on the path for the shared response cache
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.utils.response_cache import ResponseCache  # noqa: E402
+
+DEFAULT_CACHE_DIR = os.environ.get("LLM_RESPONSE_CACHE_DIR") or os.path.join(
+    os.path.expanduser("~"), ".cache", "christian-cleanup", "llm_responses"
+)
+
 
 @dataclass
 class EvalItem:
@@ -207,6 +217,7 @@ async def call_openai(
     model: str,
     messages: List[Dict[str, str]],
     timeout_s: float,
+    cache: Optional[ResponseCache] = None,
 ) -> Dict[str, Any]:
     url = base_url.rstrip("/") + "/chat/completions"
     payload = {
@@ -219,9 +230,13 @@ async def call_openai(
     if not model.startswith("ft:"):
         payload["top_p"] = float(os.environ.get("LLM_TOP_P", "0.9"))
     
-    resp = await client.post(url, json=payload, timeout=timeout_s)
-    resp.raise_for_status()
-    data = resp.json()
+    data = await asyncio.to_thread(cache.get, payload) if cache else None
+    if data is None:
+        resp = await client.post(url, json=payload, timeout=timeout_s)
+        resp.raise_for_status()
+        data = resp.json()
+        if cache:
+            await asyncio.to_thread(cache.set, payload, data)
     content = data.get("choices", [{}])[0].get("message", {}).get("content", "{}")
     # Try to parse largest JSON
     try:
@@ -332,7 +347,12 @@ def map_score_to_verdict(score: float) -> str:
     return "avoid_formation"
 
 
-async def run_eval(input_path: str, out_dir: str, local: bool = False) -> None:
+async def run_eval(
+    input_path: str,
+    out_dir: str,
+    local: bool = False,
+    cache: Optional[ResponseCache] = None,
+) -> None:
     items = load_jsonl(input_path)
     base_url = os.environ.get("LLM_API_BASE_URL", "http://localhost:8000/v1")
     model = os.environ.get("LLM_MODEL", "Qwen/Qwen2.5-14B-Instruct-AWQ")
@@ -358,7 +378,7 @@ async def run_eval(input_path: str, out_dir: str, local: bool = False) -> None:
 
         async def _bounded_call(msgs: List[Dict[str, str]]):
             async with semaphore:
-                return await call_openai(client, base_url, model, msgs, timeout_s)
+                return await call_openai(client, base_url, model, msgs, timeout_s, cache=cache)
 
         # Set up authentication headers for OpenAI API
         headers = {}
@@ -472,6 +492,9 @@ async def run_eval(input_path: str, out_dir: str, local: bool = False) -> None:
         "flags_f1": round(float(f1), 3),
         "scripture_jaccard": round(jaccard_avg, 3),
     }
+    if cache:
+        stats = cache.get_stats()
+        summary["response_cache"] = {k: stats[k] for k in ("hits", "misses", "hit_rate")}
 
     # Write JSON summary
     with open(os.path.join(out_dir, "summary.json"), "w", encoding="utf-8") as f:
@@ -608,8 +631,13 @@ def main():
     parser.add_argument("--out", required=True)
     # Router-only: local path removed; keep flag for compatibility but ignore
     parser.add_argument("--local", action="store_true")
+    # Responses are replayed for byte-identical requests (same prompt, model, sampling, lyrics)
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    parser.add_argument("--cache-max-mb", type=int, default=int(os.environ.get("LLM_RESPONSE_CACHE_MAX_MB", "2048")))
+    parser.add_argument("--no-cache", action="store_true", help="Always call the model")
     args = parser.parse_args()
-    asyncio.run(run_eval(args.input, args.out, local=False))
+    cache = None if args.no_cache else ResponseCache(args.cache_dir, max_bytes=args.cache_max_mb * 1024 * 1024)
+    asyncio.run(run_eval(args.input, args.out, local=False, cache=cache))
 
 
 if __name__ == "__main__":
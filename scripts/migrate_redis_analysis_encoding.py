@@ -0,0 +1,66 @@
+"""
+Rewrite Redis analysis entries in the compact codec format
+
+Scans analysis:* keys and re-encodes entries stored as legacy JSON text (or
+with a previous ANALYSIS_CODEC / ANALYSIS_COMPRESSION setting) using the
+current codec. TTLs are preserved. Safe to run while the app is serving:
+readers understand both formats, and re-running skips migrated keys.
+
+--rebuild-index adds entries written before the per-model indexes existed
+(used by stats and flush_by_model_version) to those indexes instead.
+
+Usage:
+    python scripts/migrate_redis_analysis_encoding.py --dry-run
+    python scripts/migrate_redis_analysis_encoding.py
+    ANALYSIS_CODEC=orjson ANALYSIS_COMPRESSION=zlib python scripts/migrate_redis_analysis_encoding.py
+    python scripts/migrate_redis_analysis_encoding.py --rebuild-index gpt-4o-mini
+"""
+
+import argparse
+import logging
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--batch-size', type=int, default=500, help='Keys per SCAN/MGET/pipeline batch')
+    parser.add_argument('--dry-run', action='store_true', help='Report savings without rewriting keys')
+    parser.add_argument('--rebuild-index', nargs='+', metavar='MODEL_VERSION',
+                        help='Index existing entries of these model versions instead of migrating')
+    args = parser.parse_args()
+
+    from app.utils.redis_cache import get_redis_cache
+
+    if args.rebuild_index:
+        cache = get_redis_cache()
+        if cache.client is None:
+            print("❌ Redis not available")
+            return 1
+        for model_version in args.rebuild_index:
+            indexed = cache.rebuild_analysis_index(model_version, batch_size=args.batch_size)
+            print(f"  {model_version}: {indexed} keys indexed")
+        return 0
+
+    result = get_redis_cache().migrate_analysis_encoding(batch_size=args.batch_size, dry_run=args.dry_run)
+    if 'error' in result and 'scanned' not in result:
+        print(f"❌ {result['error']}")
+        return 1
+
+    print(f"Analysis encoding migration → {result['codec']}{' (dry run)' if args.dry_run else ''}")
+    print(f"  scanned:    {result['scanned']}")
+    print(f"  rewritten:  {result['rewritten']}")
+    print(f"  skipped:    {result['skipped']} (already current)")
+    print(f"  failed:     {result['failed']}")
+    print(f"  bytes:      {result['bytes_before']} → {result['bytes_after']} ({result.get('saved_pct', 0.0)}% saved)")
+    print(f"  used_memory_human: {result.get('used_memory_human_before')} → {result.get('used_memory_human_after')}")
+    return 1 if result.get('error') else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,75 @@
+"""
+Warm the analysis cache for a model before switching OPENAI_MODEL to it
+
+Pre-analyzes the most popular songs (by users and playlists containing them)
+under the new model at background rate limiter priority. Results are staged
+in Redis; the database keeps the live model's rows until the switch.
+
+Rollout:
+    1. python scripts/warm_analysis_cache.py --model NEW_MODEL --limit 2000
+       (or --enqueue to run it on an RQ worker)
+    2. python scripts/warm_analysis_cache.py --model NEW_MODEL --limit 2000 --report
+       and flip OPENAI_MODEL once coverage is high enough
+    3. python scripts/warm_analysis_cache.py --model NEW_MODEL --limit 2000 --promote
+       to copy the staged analyses into the database
+"""
+
+import argparse
+import logging
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
+
+
+def _print_coverage(coverage: dict) -> None:
+    print(f"Warm-cache coverage for {coverage['model']}")
+    print(f"  songs:      {coverage['warm_songs']}/{coverage['songs']} ({coverage['coverage_percent']}%)")
+    print(f"  placements: {coverage['warm_placements']}/{coverage['placements']} "
+          f"({coverage['placement_coverage_percent']}%)")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', required=True, help='Model about to replace OPENAI_MODEL')
+    parser.add_argument('--limit', type=int, default=500, help='Number of popular songs to warm')
+    parser.add_argument('--concurrency', type=int, default=4, help='Songs analyzed in parallel')
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--report', action='store_true', help='Only report coverage')
+    mode.add_argument('--promote', action='store_true', help='Copy staged analyses into the database')
+    mode.add_argument('--enqueue', action='store_true', help='Run warming as a background RQ job')
+    args = parser.parse_args()
+
+    if args.enqueue:
+        from app.queue import enqueue_cache_warming
+
+        job_id = enqueue_cache_warming(args.model, limit=args.limit, concurrency=args.concurrency)
+        print(f"Queued cache warming job {job_id}")
+        return 0
+
+    from app import create_app
+    from app.services.cache_warming import (
+        get_warm_coverage,
+        promote_warm_analyses,
+        warm_analysis_cache,
+    )
+
+    app = create_app(os.environ.get("FLASK_ENV", "production"), skip_db_init=True)
+    with app.app_context():
+        if args.report:
+            _print_coverage(get_warm_coverage(args.model, limit=args.limit))
+        elif args.promote:
+            print(f"Promoted {promote_warm_analyses(args.model, limit=args.limit)} analyses")
+        else:
+            summary = warm_analysis_cache(args.model, limit=args.limit, concurrency=args.concurrency)
+            print(f"  analyzed: {summary['analyzed']}, reused: {summary['reused']}, "
+                  f"failed: {summary['failed']}, already warm: {summary['already_warm']}")
+            _print_coverage(summary['coverage'])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,6 +4,7 @@ Pytest configuration and shared fixtures
 
 import os
 from datetime import datetime, timezone
+from unittest.mock import Mock
 
 import pytest
 
@@ -246,3 +247,45 @@ def auth(client, db_session):
     """Authentication helper fixture"""
     return AuthActions(client, db_session)
 
+
+class _Pipeline:
+    """Queues commands against the client double and runs them on execute()."""
+
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.commands.append((getattr(self.client, name), args, kwargs))
+
+    def execute(self):
+        return [command(*args, **kwargs) for command, args, kwargs in self.commands]
+
+
+@pytest.fixture
+def redis_client():
+    """Redis client double holding string values, sorted sets and sets."""
+    store, zsets, sets = {}, {}, {}
+    client = Mock()
+    client.get.side_effect = store.get
+    client.mget.side_effect = lambda keys: [store.get(k) for k in keys]
+    client.setex.side_effect = lambda key, ttl, value: store.__setitem__(key, value)
+    client.set.side_effect = lambda key, value, **kwargs: store.__setitem__(key, value)
+    client.delete.side_effect = lambda *keys: sum(
+        1 for k in keys if store.pop(k, None) is not None or zsets.pop(k, None) is not None)
+    client.scan.side_effect = lambda cursor, match, count: (0, [k for k in store if k.startswith(match[:-1])])
+    client.zadd.side_effect = lambda key, mapping: zsets.setdefault(key, {}).update(mapping)
+    client.zrem.side_effect = lambda key, *members: sum(
+        1 for m in members if zsets.get(key, {}).pop(m, None) is not None)
+    client.zrange.side_effect = lambda key, start, end: sorted(zsets.get(key, {}), key=zsets[key].get)[start:end + 1]
+    client.zremrangebyscore.side_effect = lambda key, low, high: sum(
+        1 for m, score in list(zsets.get(key, {}).items()) if score <= high and zsets[key].pop(m))
+    client.zcard.side_effect = lambda key: len(zsets.get(key, {}))
+    client.sadd.side_effect = lambda key, *members: sets.setdefault(key, set()).update(members)
+    client.smembers.side_effect = lambda key: set(sets.get(key, set()))
+    client.sismember.side_effect = lambda key, member: member in sets.get(key, set())
+    client.pipeline.side_effect = lambda transaction=True: _Pipeline(client)
+    client.info.return_value = {}
+    client.dbsize.return_value = 0
+    client.store, client.zsets, client.sets = store, zsets, sets
+    return client
@@ -0,0 +1,137 @@
+"""
+Integration tests for Batch API analysis mode (local file backend)
+"""
+
+import json
+
+import pytest
+
+from app.extensions import db
+from app.models.models import AnalysisCache, AnalysisResult, Song
+from app.services.analyzers.batch_backend import LocalFileBatchBackend
+from app.services.unified_analysis_service import UnifiedAnalysisService
+
+
+def _responder(body):
+    """Return a canned chat completion that echoes the song title into the analysis."""
+    user_message = body['messages'][1]['content']
+    return {
+        'choices': [{
+            'message': {
+                'content': json.dumps({
+                    'score': 91,
+                    'verdict': 'freely_listen',
+                    'themes_positive': [{'theme': 'Grace', 'points': 10, 'scripture': 'Ephesians 2:8'}],
+                    'analysis': user_message.splitlines()[0],
+                })
+            }
+        }]
+    }
+
+
+@pytest.fixture
+def songs(db_session):
+    rows = [
+        Song(spotify_id=f'batch_{i}', title=f'Hymn {i}', artist='Choir',
+             lyrics=f'Holy holy holy verse {i} Lord God Almighty')
+        for i in range(3)
+    ]
+    rows.append(Song(spotify_id='batch_nolyrics', title='Interlude', artist='Choir', lyrics=''))
+    db_session.add_all(rows)
+    db_session.commit()
+    return rows
+
+
+class TestBatchAnalysis:
+    """Test submit → poll → ingest"""
+
+    def test_batch_round_trip(self, app, songs, tmp_path):
+        """Test songs are analyzed through a batch and stored in both tables"""
+        service = UnifiedAnalysisService()
+        backend = LocalFileBatchBackend(str(tmp_path), responder=_responder)
+
+        batch_id = service.submit_batch_analysis(backend=backend)
+        status = service.wait_for_batch(batch_id, backend=backend, poll_interval=0)
+        summary = service.ingest_batch_results(batch_id, backend=backend)
+
+        assert status['status'] == 'completed'
+        assert summary['ingested'] == 3
+        assert AnalysisCache.query.count() == 3
+
+        results = AnalysisResult.query.filter_by(status='completed').all()
+        assert len(results) == 3
+        assert all(r.score == 91 and r.verdict == 'freely_listen' for r in results)
+        assert results[0].explanation.startswith('Song: Hymn')
+
+        # Analyzed songs are no longer candidates
+        assert service.get_batch_candidates() == []
+
+    def test_batch_requests_use_system_prompt(self, app, songs):
+        """Test JSONL lines carry the analyzer's system prompt and song lyrics"""
+        service = UnifiedAnalysisService()
+
+        lines = service.build_batch_requests(songs)
+
+        assert len(lines) == 3  # Song without lyrics is skipped
+        line = lines[0]
+        assert line['url'] == '/v1/chat/completions'
+        assert line['custom_id'].startswith(f'song-{songs[0].id}-')
+        assert 'Christian Framework v3.1' in line['body']['messages'][0]['content']
+        assert 'Holy holy holy' in line['body']['messages'][1]['content']
+
+    def test_failed_and_stale_lines_are_skipped(self, app, songs, tmp_path):
+        """Test error lines and songs whose lyrics changed are not ingested"""
+        service = UnifiedAnalysisService()
+
+        def flaky_responder(body):
+            if 'Hymn 0' in body['messages'][1]['content']:
+                raise RuntimeError('model overloaded')
+            return _responder(body)
+
+        backend = LocalFileBatchBackend(str(tmp_path), responder=flaky_responder)
+        batch_id = service.submit_batch_analysis(backend=backend)
+        status = service.wait_for_batch(batch_id, backend=backend, poll_interval=0)
+
+        songs[1].lyrics = 'Completely rewritten lyrics for this hymn'
+        db.session.commit()
+
+        summary = service.ingest_batch_results(batch_id, backend=backend)
+
+        assert status['request_counts']['failed'] == 1
+        assert summary == {'batch_id': batch_id, 'ingested': 1, 'failed': 1, 'stale': 1}
+        assert AnalysisResult.query.count() == 1
+
+    def test_songs_without_title_or_artist_are_skipped(self, app, songs):
+        """Test blank titles or artists don't abort candidate collection"""
+        db.session.add_all([
+            Song(spotify_id='batch_noartist', title='Hymn', artist='', lyrics='Holy holy holy Lord God'),
+            Song(spotify_id='batch_notitle', title='  ', artist='Choir', lyrics='Holy holy holy Lord God'),
+        ])
+        db.session.commit()
+        service = UnifiedAnalysisService()
+
+        candidates = service.get_batch_candidates(include_completed=True)
+
+        assert {song.spotify_id for song in candidates} == {'batch_0', 'batch_1', 'batch_2'}
+
+    def test_reanalysis_candidates_skip_current_model_across_pages(self, app, songs):
+        """Test songs cached under the current model are skipped and the limit spans pages"""
+        from app.services.analyzer_cache import get_shared_analyzer
+
+        router = get_shared_analyzer()
+        AnalysisCache.cache_analysis('Choir', 'Hymn 0', router._lyrics_hash(songs[0].lyrics), {}, router.model)
+        AnalysisCache.cache_analysis('Choir', 'Hymn 1', router._lyrics_hash(songs[1].lyrics), {}, 'old-model')
+        db.session.commit()
+        service = UnifiedAnalysisService()
+
+        candidates = service.get_batch_candidates(limit=1, include_completed=True, page_size=1)
+        assert [song.id for song in candidates] == [songs[1].id]
+        assert service.get_batch_candidates(limit=5) == songs[:3]
+
+    def test_nothing_to_submit(self, app, tmp_path):
+        """Test no batch is created when every song is analyzed"""
+        service = UnifiedAnalysisService()
+        backend = LocalFileBatchBackend(str(tmp_path), responder=_responder)
+
+        assert service.submit_batch_analysis(backend=backend) is None
+        assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,149 @@
+"""
+Integration tests for warming the analysis cache ahead of a model rollout
+"""
+
+import json
+from datetime import datetime, timedelta, timezone
+from unittest.mock import Mock
+
+import pytest
+
+from app.models.models import AnalysisCache, Playlist, PlaylistSong, Song, User
+from app.services.analyzers.analysis_store import AnalysisStore
+from app.services.analyzers.router_analyzer import RouterAnalyzer
+from app.services.cache_warming import (
+    get_warm_coverage,
+    promote_warm_analyses,
+    rank_popular_songs,
+    warm_analysis_cache,
+)
+from app.utils.llm_router import LLMEndpoint, LLMRouter
+from app.utils.openai_rate_limiter import OpenAIRateLimiter, background_priority
+from app.utils.redis_cache import RedisCache
+from app.utils.single_flight import SingleFlight
+
+NEW_MODEL = 'ft:gpt-4o-mini:christian-discernment-v2'
+
+
+@pytest.fixture
+def catalog(db_session):
+    """Three songs in 3, 2 and 1 users' playlists, plus one without lyrics."""
+    users = [
+        User(spotify_id=f'warm_user_{i}', display_name=f'User {i}', email=f'warm{i}@example.com',
+             access_token='token', refresh_token='refresh',
+             token_expiry=datetime.now(timezone.utc) + timedelta(hours=1))
+        for i in range(3)
+    ]
+    db_session.add_all(users)
+    db_session.flush()
+    playlists = [Playlist(spotify_id=f'warm_pl_{i}', name=f'Worship {i}', owner_id=user.id)
+                 for i, user in enumerate(users)]
+    songs = [
+        Song(spotify_id=f'warm_song_{i}', title=f'Hymn {i}', artist='Choir',
+             lyrics=f'Holy holy holy verse {i} Lord God Almighty')
+        for i in range(3)
+    ]
+    songs.append(Song(spotify_id='warm_nolyrics', title='Interlude', artist='Choir', lyrics=''))
+    db_session.add_all(playlists + songs)
+    db_session.flush()
+    placements = [(0, 0), (1, 0), (2, 0), (0, 1), (1, 1), (0, 2), (0, 3), (1, 3), (2, 3)]
+    db_session.add_all([
+        PlaylistSong(playlist_id=playlists[p].id, song_id=songs[s].id, track_position=s)
+        for p, s in placements
+    ])
+    db_session.commit()
+    return songs
+
+
+@pytest.fixture
+def redis_cache(redis_client, monkeypatch):
+    cache = RedisCache(l1_max_entries=0)
+    cache._client = redis_client
+    cache._binary_client = redis_client
+    monkeypatch.setattr('app.services.cache_warming.get_redis_cache', lambda: cache)
+    return cache
+
+
+@pytest.fixture
+def analyzer(app, redis_cache):
+    response = Mock()
+    response.json.return_value = {
+        'model': NEW_MODEL,
+        'choices': [{'message': {'content': json.dumps({'score': 90, 'verdict': 'freely_listen'})}}]
+    }
+    analyzer = RouterAnalyzer(model=NEW_MODEL)
+    analyzer.redis_cache = redis_cache
+    analyzer.analysis_store = AnalysisStore()
+    analyzer.single_flight = SingleFlight()
+    analyzer.http_client = Mock(post=Mock(return_value=response))
+    return analyzer
+
+
+class TestCacheWarming:
+    """Test popular songs are staged under the new model without touching live rows"""
+
+    def test_ranked_by_users_then_playlists(self, catalog):
+        ranked = rank_popular_songs(limit=10)
+
+        assert [song.title for song in ranked] == ['Hymn 0', 'Hymn 1', 'Hymn 2']
+        assert (ranked[0].users, ranked[0].playlists) == (3, 3)
+
+    def test_warm_stages_in_redis_then_promotes(self, catalog, analyzer):
+        live = analyzer._lyrics_hash(catalog[0].lyrics)
+        AnalysisCache.cache_analysis('Choir', 'Hymn 0', live, {'score': 70}, 'live-model')
+
+        assert get_warm_coverage(NEW_MODEL, limit=2)['coverage_percent'] == 0.0
+        summary = warm_analysis_cache(NEW_MODEL, limit=2, analyzer=analyzer)
+
+        assert summary['analyzed'] == 2
+        assert analyzer.http_client.post.call_count == 2
+        coverage = get_warm_coverage(NEW_MODEL, limit=3)
+        assert (coverage['warm_songs'], coverage['warm_placements'], coverage['placements']) == (2, 5, 6)
+        # The live model's row is untouched until the switch
+        assert AnalysisCache.find_cached_analysis('Choir', 'Hymn 0', live).model_version == 'live-model'
+
+        assert promote_warm_analyses(NEW_MODEL, limit=3) == 2
+        assert AnalysisCache.find_cached_analysis('Choir', 'Hymn 0', live).model_version == NEW_MODEL
+        assert warm_analysis_cache(NEW_MODEL, limit=2, analyzer=analyzer)['already_warm'] == 2
+
+    def test_endpoint_overriding_the_model_is_not_used(self, catalog, analyzer):
+        """Test warming skips endpoints answering with another model, and fails without one"""
+        analyzer.llm_router = LLMRouter([
+            LLMEndpoint('old', 'http://old.test/v1', model='live-model'),
+            LLMEndpoint('new', 'http://new.test/v1'),
+        ])
+
+        assert warm_analysis_cache(NEW_MODEL, limit=2, analyzer=analyzer)['analyzed'] == 2
+        calls = analyzer.http_client.post.call_args_list
+        assert {call.args[0] for call in calls} == {'http://new.test/v1/chat/completions'}
+        assert {call.kwargs['json']['model'] for call in calls} == {NEW_MODEL}
+
+        analyzer.llm_router = LLMRouter([LLMEndpoint('old', 'http://old.test/v1', model='live-model')])
+        with pytest.raises(ValueError):
+            warm_analysis_cache(NEW_MODEL, limit=3, analyzer=analyzer)
+
+    def test_result_keyed_on_the_model_that_answered(self, catalog, analyzer, redis_cache):
+        analyzer.persist_to_database = False
+        analyzer.llm_router = LLMRouter([LLMEndpoint('old', 'http://old.test/v1', model='live-model')])
+        song = catalog[0]
+
+        analyzer.analyze_song(song.title, song.artist, song.lyrics)
+
+        lyrics_hash = analyzer._lyrics_hash(song.lyrics)
+        assert redis_cache.get_analysis('Choir', 'Hymn 0', lyrics_hash, 'live-model') is not None
+        assert redis_cache.get_analysis('Choir', 'Hymn 0', lyrics_hash, NEW_MODEL) is None
+
+
+class TestBackgroundPriority:
+    """Test background requests leave the reserve for interactive ones"""
+
+    def test_background_stops_at_reserve(self):
+        limiter = OpenAIRateLimiter(max_rpm=60, max_concurrent=4, background_reserve=0.5)
+
+        with background_priority():
+            assert limiter.try_acquire() == 0.0
+            assert limiter.try_acquire() == 0.0
+            assert limiter.try_acquire() > 0  # 2 of 4 slots reserved
+
+        assert limiter.try_acquire() == 0.0
+        assert limiter.get_metrics()['background_requests'] == 2
@@ -0,0 +1,71 @@
+"""
+Integration tests for prefetching lyrics after playlist sync
+"""
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import Mock, patch
+
+from app.models.models import LyricsCache, Song
+from app.services.lyrics_prefetch import prefetch_lyrics
+from app.services.unified_analysis_service import UnifiedAnalysisService
+from app.utils.lyrics_config import LyricsFetcherConfig
+
+LYRICS = "Holy holy holy Lord God Almighty\nEarly in the morning our song shall rise to Thee"
+
+
+def _fetcher(lyrics_by_title):
+    fetcher = Mock(providers=[], config=LyricsFetcherConfig())
+    fetcher.fetch_lyrics_bulk.side_effect = lambda pairs, **kwargs: [lyrics_by_title.get(t) for t, _ in pairs]
+    return fetcher
+
+
+class TestLyricsPrefetch:
+    """Test lyrics are stored before analysis needs them"""
+
+    def test_prefetch_fills_lyrics(self, app, db_session):
+        songs = [
+            Song(spotify_id='pf_1', title='Holy Holy Holy', artist='Choir'),
+            Song(spotify_id='pf_2', title='Holy Holy Holy', artist='Choir'),  # Another release
+            Song(spotify_id='pf_3', title='Cached', artist='Choir'),
+            Song(spotify_id='pf_4', title='Known Missing', artist='Choir'),
+            Song(spotify_id='pf_5', title='Has Lyrics', artist='Choir', lyrics=LYRICS),
+        ]
+        db_session.add_all(songs)
+        LyricsCache.cache_lyrics('choir', 'cached', LYRICS, 'LRCLibProvider')
+        LyricsCache.cache_lyrics('choir', 'known missing', '', 'negative_cache')
+        fetcher = _fetcher({'Holy Holy Holy': LYRICS})
+
+        summary = prefetch_lyrics(songs, fetcher=fetcher)
+
+        assert summary == {'from_cache': 1, 'fetched': 2, 'not_found': 0, 'skipped_negative': 1, 'failed': 0}
+        assert fetcher.fetch_lyrics_bulk.call_args[0][0] == [('Holy Holy Holy', 'Choir')]
+        assert {song.lyrics for song in songs[:3]} == {LYRICS}
+        assert Song.query.filter_by(spotify_id='pf_2').one().lyrics == LYRICS
+
+    def test_stale_negative_is_retried(self, app, db_session):
+        song = Song(spotify_id='pf_stale', title='Retry Me', artist='Choir')
+        db_session.add(song)
+        row = LyricsCache.cache_lyrics('choir', 'retry me', '', 'negative_cache')
+        row.retrieved_at = datetime.now(timezone.utc) - timedelta(days=30)
+        db_session.commit()
+
+        summary = prefetch_lyrics([song], fetcher=_fetcher({}))
+
+        assert summary['not_found'] == 1
+
+    def test_analysis_reads_local_lyrics(self, app, db_session, monkeypatch):
+        monkeypatch.setenv('LYRICS_PREFETCH', 'true')
+        song = Song(spotify_id='pf_local', title='Prefetched', artist='Choir')
+        db_session.add(song)
+        db_session.commit()
+        LyricsCache.cache_lyrics('choir', 'prefetched', LYRICS, 'LRCLibProvider')
+        service = UnifiedAnalysisService()
+        service.lyrics_fetcher = Mock()
+        router = Mock(analyze_song=Mock(return_value={'score': 90, 'verdict': 'freely_listen'}))
+
+        with patch('app.services.unified_analysis_service.is_analyzer_ready', return_value=True), \
+                patch('app.services.unified_analysis_service.get_shared_analyzer', return_value=router):
+            service.analyze_song_complete(song, force=True)
+
+        service.lyrics_fetcher.fetch_lyrics_with_status.assert_not_called()
+        assert router.analyze_song.call_args[0][2] == LYRICS
@@ -0,0 +1,140 @@
+"""
+Unit tests for the Redis analysis codec and encoding migration
+"""
+
+import json
+import zlib
+from unittest.mock import Mock
+
+import pytest
+
+from app.utils.analysis_codec import (
+    COMPRESSORS,
+    FORMAT_VERSION,
+    LEGACY_JSON_PREFIX,
+    SERIALIZERS,
+    AnalysisCodec,
+    CodecError,
+)
+from app.utils.redis_cache import RedisCache
+
+ANALYSIS = {
+    'score': 92,
+    'verdict': 'freely_listen',
+    'analysis': 'A hymn of grace and redemption. ' * 40,
+    'themes_positive': [{'theme': 'Grace', 'points': 10, 'scripture': 'Eph 2:8'}],
+    'concerns': [],
+}
+
+
+class TestAnalysisCodec:
+    """Test encoding, compression and format detection"""
+
+    @pytest.mark.parametrize('serializer', ['json', 'orjson'])
+    @pytest.mark.parametrize('compression', ['none', 'zlib'])
+    def test_round_trip(self, serializer, compression):
+        codec = AnalysisCodec(serializer=serializer, compression=compression, compress_threshold=256)
+
+        encoded = codec.encode(ANALYSIS)
+
+        assert encoded[0] == FORMAT_VERSION
+        assert codec.decode(encoded) == ANALYSIS
+        assert codec.is_current(encoded)
+
+    def test_compression_shrinks_large_entries(self):
+        legacy = json.dumps(ANALYSIS).encode()
+
+        encoded = AnalysisCodec(serializer='json', compression='zlib').encode(ANALYSIS)
+
+        assert len(encoded) < len(legacy) / 3
+        assert zlib.decompress(encoded[2:])  # Payload after the 2-byte header
+
+    def test_sized_reports_uncompressed_size(self):
+        codec = AnalysisCodec(serializer='json', compression='zlib')
+
+        encoded, size = codec.encode_sized(ANALYSIS)
+
+        assert size > len(encoded) * 3
+        assert codec.decode_sized(encoded) == (ANALYSIS, size)
+        legacy = json.dumps(ANALYSIS).encode()
+        assert codec.decode_sized(legacy)[1] == len(legacy)
+
+    def test_small_entries_not_compressed(self):
+        codec = AnalysisCodec(serializer='json', compression='zlib', compress_threshold=512)
+
+        encoded = codec.encode({'score': 1})
+
+        assert encoded[1] & 0x0F == 0
+        assert codec.decode(encoded) == {'score': 1}
+
+    def test_reads_legacy_and_other_codec_entries(self):
+        """Test old JSON text and entries from another codec setting stay readable"""
+        codec = AnalysisCodec(serializer='json', compression='none')
+        other = AnalysisCodec(serializer='orjson', compression='zlib', compress_threshold=0).encode(ANALYSIS)
+
+        assert codec.decode(json.dumps(ANALYSIS)) == ANALYSIS
+        assert codec.decode(other) == ANALYSIS
+        assert not codec.is_current(json.dumps(ANALYSIS).encode())
+        assert not codec.is_current(other)
+
+    def test_framed_entries_never_look_like_legacy_json(self):
+        """Test the version byte comes first and can never be '{'"""
+        assert FORMAT_VERSION != LEGACY_JSON_PREFIX[0]
+        for serializer in SERIALIZERS:
+            for compression in COMPRESSORS:
+                codec = AnalysisCodec(serializer=serializer, compression=compression, compress_threshold=0)
+                encoded = codec.encode(ANALYSIS)
+                assert encoded[0] == FORMAT_VERSION
+                assert encoded[:1] != LEGACY_JSON_PREFIX
+
+    def test_corrupt_entry(self):
+        codec = AnalysisCodec(serializer='json', compression='zlib')
+
+        with pytest.raises(CodecError):
+            codec.decode(bytes((FORMAT_VERSION, 0x01)) + b'not zlib')
+        with pytest.raises(CodecError):
+            codec.decode(b'\x09garbage')
+
+    def test_unknown_names_rejected(self):
+        with pytest.raises(ValueError):
+            AnalysisCodec(serializer='pickle')
+
+
+class TestEncodingMigration:
+    """Test RedisCache.migrate_analysis_encoding"""
+
+    @pytest.fixture
+    def cache(self):
+        codec = AnalysisCodec(serializer='orjson', compression='zlib')
+        store = {
+            'analysis:m1:a:legacy:h1': json.dumps(ANALYSIS).encode(),
+            'analysis:m1:a:current:h2': codec.encode(ANALYSIS),
+            'analysis:m1:a:broken:h3': b'\x09garbage',
+        }
+        client = Mock()
+        client.scan.return_value = (0, list(store))
+        client.mget.side_effect = lambda keys: [store.get(k) for k in keys]
+        client.info.return_value = {'used_memory_human': '1.00M'}
+        cache = RedisCache(l1_max_entries=0, codec=codec)
+        cache._client = client
+        cache._binary_client = client
+        return cache
+
+    def test_migrate_rewrites_legacy_entries(self, cache):
+        pipe = cache.binary_client.pipeline.return_value
+
+        result = cache.migrate_analysis_encoding()
+
+        assert (result['scanned'], result['rewritten'], result['skipped'], result['failed']) == (3, 1, 1, 1)
+        assert result['bytes_after'] < result['bytes_before']
+        assert result['saved_pct'] > 50
+        key, value = pipe.set.call_args[0]
+        assert key == 'analysis:m1:a:legacy:h1'
+        assert pipe.set.call_args[1] == {'keepttl': True, 'xx': True}
+        assert cache.codec.decode(value) == ANALYSIS
+
+    def test_dry_run_writes_nothing(self, cache):
+        result = cache.migrate_analysis_encoding(dry_run=True)
+
+        assert result['rewritten'] == 1
+        cache.binary_client.pipeline.return_value.set.assert_not_called()
@@ -0,0 +1,187 @@
+"""
+Unit tests for AsyncRouterAnalyzer (asyncio + httpx)
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import Mock
+
+import pytest
+
+from app.services.analyzers import AsyncRouterAnalyzer
+from app.utils.circuit_breaker import get_openai_circuit_breaker
+from app.utils.single_flight import SingleFlight
+
+ANALYSIS = {
+    "score": 88,
+    "verdict": "freely_listen",
+    "formation_risk": "very_low",
+    "themes_positive": [{"theme": "Grace", "points": 10, "scripture": "Ephesians 2:8"}],
+    "analysis": "Grace-centered worship",
+}
+
+
+class _SlowChatHandler(BaseHTTPRequestHandler):
+    """Chat-completions stub that tracks peak concurrency."""
+    protocol_version = 'HTTP/1.1'
+    delay = 0.2
+    status = 200
+    in_flight = 0
+    peak = 0
+    calls = 0
+    lock = threading.Lock()
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        self.rfile.read(length)
+        cls = type(self)
+        with cls.lock:
+            cls.calls += 1
+            cls.in_flight += 1
+            cls.peak = max(cls.peak, cls.in_flight)
+        time.sleep(cls.delay)
+        with cls.lock:
+            cls.in_flight -= 1
+
+        body = json.dumps({'choices': [{'message': {'content': json.dumps(ANALYSIS)}}]}).encode()
+        self.send_response(cls.status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server(monkeypatch):
+    _SlowChatHandler.status = 200
+    _SlowChatHandler.in_flight = 0
+    _SlowChatHandler.peak = 0
+    _SlowChatHandler.calls = 0
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _SlowChatHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setenv('LLM_API_BASE_URL', f"http://127.0.0.1:{server.server_address[1]}")
+    get_openai_circuit_breaker().reset()
+    yield _SlowChatHandler
+    server.shutdown()
+    server.server_close()
+    get_openai_circuit_breaker().reset()
+
+
+@pytest.fixture
+def analyzer(stub_server):
+    analyzer = AsyncRouterAnalyzer()
+    analyzer.redis_cache = Mock(get_analysis=Mock(return_value=None), _make_key=lambda *parts: ':'.join(parts))
+    analyzer.analysis_store = Mock(find=Mock(return_value=None))
+    analyzer.single_flight = SingleFlight()
+    yield analyzer
+    analyzer.close()
+
+
+def _songs(n):
+    return [
+        {'title': f'Song {i}', 'artist': 'Artist', 'lyrics': f'Amazing grace verse number {i}'}
+        for i in range(n)
+    ]
+
+
+class TestAsyncRouterAnalyzer:
+    """Test concurrent analysis on one event loop"""
+
+    async def test_analyze_many_runs_requests_concurrently(self, analyzer, stub_server):
+        """Test requests overlap up to the rate limiter's concurrency"""
+        songs = _songs(20)
+
+        start = time.perf_counter()
+        results = await analyzer.analyze_many(songs)
+        elapsed = time.perf_counter() - start
+
+        assert len(results) == 20
+        assert stub_server.calls == 20
+        assert 1 < stub_server.peak <= analyzer.max_in_flight
+        # 20 sequential calls would take 20 * 0.2s
+        assert elapsed < 20 * stub_server.delay / 2
+        assert analyzer.rate_limiter.get_metrics()['active_requests'] == 0
+
+    async def test_output_matches_sync_normalization(self, analyzer):
+        """Test results use the same schema as RouterAnalyzer._normalize_output"""
+        results = await analyzer.analyze_many(_songs(2))
+
+        expected = analyzer._normalize_output(ANALYSIS)
+        for result in results:
+            assert {k: result[k] for k in expected} == expected
+            assert result['analysis_quality'] == 'full'
+            assert result['cache_hit'] is False
+        assert analyzer.analysis_store.save.call_count == 2
+
+    async def test_results_preserve_input_order(self, analyzer):
+        """Test instrumental and analyzed songs come back in input order"""
+        songs = [
+            {'title': 'Intro (Instrumental)', 'artist': 'Artist', 'lyrics': ''},
+            *_songs(1),
+        ]
+
+        results = await analyzer.analyze_many(songs)
+
+        assert results[0].get('instrumental') is True
+        assert results[1]['score'] == 88
+
+    async def test_duplicate_songs_in_batch_share_one_call(self, analyzer, stub_server):
+        """Test identical songs in one batch are analyzed once"""
+        before = analyzer.rate_limiter.get_metrics()['coalesced_in_process']
+
+        results = await analyzer.analyze_many(_songs(1) * 4)
+
+        assert stub_server.calls == 1
+        assert len(results) == 4
+        assert all(r['score'] == 88 for r in results)
+        assert analyzer.rate_limiter.get_metrics()['coalesced_in_process'] - before == 3
+
+    async def test_cache_hit_skips_api(self, analyzer, stub_server):
+        """Test Redis hits are returned without an HTTP call"""
+        analyzer.redis_cache.get_analysis.return_value = dict(ANALYSIS)
+
+        results = await analyzer.analyze_many(_songs(3))
+
+        assert stub_server.calls == 0
+        assert all(r['analysis_quality'] == 'cached' for r in results)
+
+    async def test_open_circuit_returns_degraded(self, analyzer, stub_server):
+        """Test server errors trip the shared breaker and later songs fail fast"""
+        stub_server.status = 500
+        stub_server.delay = 0
+        threshold = analyzer.circuit_breaker.failure_threshold
+
+        try:
+            first = await analyzer.analyze_many(_songs(threshold))
+            calls_after_first = stub_server.calls
+            second = await analyzer.analyze_many(_songs(3))
+        finally:
+            stub_server.delay = 0.2
+
+        assert all(r['analysis_quality'] == 'degraded' for r in first + second)
+        assert analyzer.circuit_breaker.get_state()['state'] == 'open'
+        assert calls_after_first == threshold
+        assert stub_server.calls == threshold
+
+    async def test_waits_for_other_workers_lease(self, analyzer, stub_server):
+        """Test a song whose lease another worker holds reuses its published result"""
+        published = threading.Event()
+        analyzer.redis_cache.get_analysis.side_effect = (
+            lambda *args, **kwargs: dict(ANALYSIS) if published.is_set() else None
+        )
+        lease_client = Mock(set=Mock(return_value=None))  # Another worker holds every lease
+        analyzer.single_flight = SingleFlight(redis_cache=Mock(client=lease_client), poll_interval=0.01)
+        threading.Timer(0.1, published.set).start()
+
+        results = await analyzer.analyze_many(_songs(1))
+
+        assert stub_server.calls == 0
+        assert results[0]['score'] == 88
+        assert results[0]['analysis_quality'] == 'cached'
+        lease_client.set.assert_called()
@@ -0,0 +1,176 @@
+"""
+Unit tests for batched analysis cache lookups (Redis MGET + one database query)
+"""
+
+import json
+from unittest.mock import Mock, patch
+
+import pytest
+
+from app.models.models import AnalysisCache, AnalysisResult, Song
+from app.services.analyzers.router_analyzer import RouterAnalyzer
+from app.utils.redis_cache import RedisCache
+
+ANALYSIS = {'score': 90, 'verdict': 'freely_listen', 'analysis': 'Worship', 'concerns': []}
+LYRICS = 'Amazing grace how sweet the sound that saved a wretch like me'
+
+
+@pytest.fixture
+def redis_client():
+    store = {}
+    client = Mock()
+    client.mget.side_effect = lambda keys: [store.get(k) for k in keys]
+    client.store = store
+    return client
+
+
+@pytest.fixture
+def cache(redis_client):
+    cache = RedisCache(l1_max_entries=0)
+    cache._client = redis_client
+    cache._binary_client = redis_client
+    return cache
+
+
+class TestRedisBulk:
+    """Test RedisCache multi-get and pipelined writes"""
+
+    def test_get_analyses_bulk_single_mget(self, cache, redis_client):
+        """Test hits and misses are resolved with one MGET"""
+        hit = ('Artist', 'Hit', 'h1', 'm1')
+        miss = ('Artist', 'Miss', 'h2', 'm1')
+        redis_client.store[cache._make_key(*hit)] = json.dumps(ANALYSIS)
+
+        found = cache.get_analyses_bulk([hit, miss, hit])
+
+        assert list(found) == [hit]
+        assert found[hit]['cache_source'] == 'redis'
+        redis_client.mget.assert_called_once()
+        assert len(redis_client.mget.call_args[0][0]) == 2
+
+    def test_get_analyses_bulk_chunks(self, cache, redis_client):
+        keys = [('Artist', f'Song {i}', f'h{i}', 'm1') for i in range(5)]
+
+        cache.get_analyses_bulk(keys, chunk_size=2)
+
+        assert redis_client.mget.call_count == 3
+
+    def test_set_analyses_bulk_pipelines(self, cache, redis_client):
+        """Test bulk writes and their index entries go through one MULTI pipeline"""
+        pipe = redis_client.pipeline.return_value
+
+        written = cache.set_analyses_bulk([(('A', 'T1', 'h1', 'm1'), dict(ANALYSIS, cache_hit=True)),
+                                           (('A', 'T2', 'h2', 'm1'), ANALYSIS)])
+
+        assert written == 2
+        redis_client.pipeline.assert_called_once_with(transaction=True)
+        assert pipe.setex.call_count == 2
+        assert pipe.zadd.call_args[0][0] == 'analysis_index:m1'
+        assert 'cache_hit' not in cache.codec.decode(pipe.setex.call_args_list[0][0][2])
+        pipe.execute.assert_called_once()
+
+
+class TestAnalysisCacheBulk:
+    """Test AnalysisCache.find_cached_bulk"""
+
+    def test_find_cached_bulk(self, db_session):
+        """Test exact (artist, title, hash) matches only, whitespace-insensitive"""
+        for title, lyrics_hash in (('One', 'h1'), ('Two', 'h2'), ('Other', 'h1')):
+            db_session.add(AnalysisCache(artist='Artist', title=title, lyrics_hash=lyrics_hash,
+                                         analysis_result=ANALYSIS, model_version='m1'))
+        db_session.commit()
+
+        found = AnalysisCache.find_cached_bulk([(' Artist ', 'One', 'h1'), ('Artist', 'Two', 'h2'),
+                                                ('Artist', 'Three', 'h3')], chunk_size=1)
+
+        assert set(found) == {('Artist', 'One', 'h1'), ('Artist', 'Two', 'h2')}
+
+
+class TestRouterBulkLookup:
+    """Test RouterAnalyzer partitions songs with two round trips"""
+
+    def test_lookup_cached_bulk(self):
+        analyzer = RouterAnalyzer()
+        model = analyzer.model
+        songs = [('Redis Song', 'Artist', LYRICS + ' 1'), ('Db Song', 'Artist', LYRICS + ' 2'),
+                 ('Old Model', 'Artist', LYRICS + ' 3'), ('New Song', 'Artist', LYRICS + ' 4'),
+                 ('Instrumental', 'Artist', '')]
+        keys = [(artist, title, analyzer._lyrics_hash(lyrics)) for title, artist, lyrics in songs]
+        analyzer.redis_cache = Mock()
+        analyzer.redis_cache.get_analyses_bulk.return_value = {keys[0] + (model,): dict(ANALYSIS, score=91)}
+        analyzer.analysis_store = Mock()
+        analyzer.analysis_store.find_bulk.return_value = {keys[1]: (dict(ANALYSIS, score=80), model),
+                                                          keys[2]: (ANALYSIS, 'old-model')}
+
+        hits = analyzer.lookup_cached_bulk(songs)
+
+        assert set(hits) == {0, 1}
+        assert hits[0]['score'] == 91 and hits[1]['score'] == 80
+        assert hits[1]['cache_source'] == 'database'
+        assert all(h['analysis_quality'] == 'cached' for h in hits.values())
+        assert list(analyzer.analysis_store.find_bulk.call_args[0][0]) == keys[1:4]
+        backfilled = dict(analyzer.redis_cache.set_analyses_bulk.call_args[0][0])
+        assert list(backfilled) == [keys[1] + (model,)]
+
+
+class TestPlaylistPartition:
+    """Test the playlist pipeline stores cache hits before scheduling LLM calls"""
+
+    def test_cached_songs_stored_without_analysis(self, app, db_session):
+        from app.services.unified_analysis_service import (
+            UnifiedAnalysisService,
+            _partition_cached_analyses,
+        )
+
+        songs = [Song(spotify_id=f'bulk_{i}', title=f'Song {i}', artist='Artist', lyrics=LYRICS) for i in range(3)]
+        songs.append(Song(spotify_id='bulk_nolyrics', title='No Lyrics', artist='Artist'))
+        db_session.add_all(songs)
+        db_session.commit()
+        router = Mock()
+        router.lookup_cached_bulk.return_value = {0: dict(ANALYSIS, score=88), 2: dict(ANALYSIS, score=70)}
+
+        with patch('app.services.unified_analysis_service.get_shared_analyzer', return_value=router):
+            cached, pending = _partition_cached_analyses(songs)
+        stored = UnifiedAnalysisService().apply_cached_analyses(cached)
+
+        assert [s.id for s in pending] == [songs[1].id, songs[3].id]
+        assert len(router.lookup_cached_bulk.call_args[0][0]) == 3
+        assert stored == 2
+        results = {r.song_id: r for r in AnalysisResult.query.all()}
+        assert results[songs[0].id].score == 88 and results[songs[0].id].status == 'completed'
+        assert results[songs[2].id].score == 70
+        assert songs[1].id not in results
+
+
+class TestAsyncEngineStage:
+    """Test songs the async engine analyzed never reach the per-song pipeline"""
+
+    def test_engine_results_stored_and_skipped(self, app, db_session, sample_playlist, sample_user):
+        from app.models.models import PlaylistSong
+        from app.services.unified_analysis_service import (
+            UnifiedAnalysisService,
+            analyze_playlist_async,
+        )
+
+        songs = [Song(spotify_id=f'engine_{i}', title=f'Song {i}', artist='Artist', lyrics=LYRICS) for i in range(2)]
+        songs.append(Song(spotify_id='engine_nolyrics', title='No Lyrics', artist='Artist'))
+        db_session.add_all(songs)
+        db_session.commit()
+        for position, song in enumerate(songs):
+            db_session.add(PlaylistSong(playlist_id=sample_playlist.id, song_id=song.id, track_position=position))
+        db_session.commit()
+        engine_results = {songs[0].id: dict(ANALYSIS, score=88),
+                          songs[1].id: dict(ANALYSIS, score=50, analysis_quality='degraded')}
+
+        with patch('app.services.unified_analysis_service._partition_cached_analyses',
+                   side_effect=lambda pending: ({}, pending)), \
+                patch('app.services.unified_analysis_service._prefetch_router_analyses', return_value=engine_results), \
+                patch.object(UnifiedAnalysisService, 'analyze_song') as analyze_song, \
+                patch.object(UnifiedAnalysisService, '_schedule_degraded_retry') as retry, \
+                patch('rq.get_current_job', return_value=None):
+            result = analyze_playlist_async(sample_playlist.id, sample_user.id)
+
+        assert [call.args[0] for call in analyze_song.call_args_list] == [songs[2].id]
+        retry.assert_called_once_with(songs[1].id, delay_seconds=300)
+        assert result['analyzed'] == 3
+        assert AnalysisResult.query.filter_by(song_id=songs[0].id).one().score == 88
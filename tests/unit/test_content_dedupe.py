@@ -0,0 +1,102 @@
+"""
+Unit tests for reusing analyses of identical lyrics across artist/title variants
+"""
+
+from unittest.mock import Mock
+
+import pytest
+
+from app.models.models import AnalysisCache
+from app.services.analyzers.analysis_store import AnalysisStore
+from app.services.analyzers.lyrics_preprocessor import lyrics_content_hash, normalize_lyrics
+from app.services.analyzers.router_analyzer import RouterAnalyzer
+from app.utils.redis_cache import RedisCache
+from app.utils.single_flight import SingleFlight
+
+ANALYSIS = {'score': 93, 'verdict': 'freely_listen', 'concerns': []}
+LYRICS = "What a beautiful Name it is\nThe Name of Jesus Christ my King\nWhat a beautiful Name it is"
+LRC_LYRICS = (
+    "[ar:Hillsong UNITED]\n"
+    "[00:12.10]What a beautiful name it is,\n"
+    "[Chorus]\n"
+    "[00:15.42]The name of Jesus Christ, my King!\n"
+    "[00:19.03]what a   beautiful name it is"
+)
+
+
+class TestLyricsContentHash:
+    """Test normalization ignores formatting but not wording"""
+
+    def test_formatting_variants_match(self):
+        assert normalize_lyrics(LRC_LYRICS) == normalize_lyrics(LYRICS)
+        assert lyrics_content_hash(LRC_LYRICS) == lyrics_content_hash(LYRICS)
+
+    def test_different_wording_differs(self):
+        assert lyrics_content_hash(LYRICS.replace('beautiful', 'wonderful')) != lyrics_content_hash(LYRICS)
+        assert lyrics_content_hash('[00:01.00]\n[Intro]') is None
+
+
+class TestRedisContentPointer:
+    """Test the content pointer resolves to the analysis stored with it"""
+
+    def test_pointer_written_with_entry(self, redis_client):
+        cache = RedisCache(l1_max_entries=0)
+        cache._client = redis_client
+        cache._binary_client = redis_client
+        content_hash = lyrics_content_hash(LYRICS)
+
+        cache.set_analysis('Hillsong Worship', 'What A Beautiful Name', 'h1', 'm1', ANALYSIS,
+                           content_hash=content_hash)
+
+        assert cache.get_analysis_by_content(content_hash, 'm1')['score'] == 93
+        assert cache.get_analysis_by_content(content_hash, 'm2') is None
+        assert cache.get_stats()['content_dedupe'] == {'hits': 1, 'misses': 1, 'hit_rate': 50.0}
+
+
+class TestAnalyzerContentDedupe:
+    """Test the analyzer reuses an exact-lyrics match instead of calling the API"""
+
+    @pytest.fixture
+    def analyzer(self, app):
+        analyzer = RouterAnalyzer()
+        analyzer.content_dedupe = True
+        analyzer.redis_cache = Mock(get_analysis=Mock(return_value=None),
+                                    get_analysis_by_content=Mock(return_value=None),
+                                    _make_key=lambda *parts: ':'.join(parts))
+        analyzer.analysis_store = AnalysisStore()
+        analyzer.single_flight = SingleFlight()
+        analyzer.http_client = Mock(post=Mock(side_effect=AssertionError('API called')))
+        return analyzer
+
+    def test_variant_reuses_database_analysis(self, analyzer, db_session):
+        original_hash = analyzer._lyrics_hash(LYRICS)
+        analyzer._store_cached('What A Beautiful Name', 'Hillsong Worship', original_hash, ANALYSIS,
+                               lyrics_content_hash(LYRICS))
+
+        result = analyzer.analyze_song('What A Beautiful Name (Live)', 'Hillsong UNITED', LRC_LYRICS)
+
+        assert result['score'] == 93
+        assert result['cache_source'] == 'content'
+        variant = AnalysisCache.find_cached_analysis('Hillsong UNITED', 'What A Beautiful Name (Live)',
+                                                     analyzer._lyrics_hash(LRC_LYRICS))
+        assert variant.content_hash == lyrics_content_hash(LYRICS)
+        assert 'cache_source' not in variant.analysis_result
+        assert AnalysisCache.get_cache_stats()['dedupe']['deduplicated_fraction'] == 0.5
+
+    def test_other_model_version_not_reused(self, analyzer, db_session):
+        AnalysisCache.cache_analysis('Hillsong Worship', 'What A Beautiful Name', 'h1', ANALYSIS,
+                                     'old-model', content_hash=lyrics_content_hash(LYRICS))
+
+        assert analyzer._lookup_by_content('Title', 'Artist', 'h2', lyrics_content_hash(LYRICS)) is None
+
+    def test_bulk_lookup_reuses_by_content(self, analyzer, db_session):
+        AnalysisCache.cache_analysis('Hillsong Worship', 'What A Beautiful Name', 'h1', ANALYSIS,
+                                     analyzer.model, content_hash=lyrics_content_hash(LYRICS))
+        analyzer.redis_cache.get_analyses_bulk.return_value = {}
+
+        hits = analyzer.lookup_cached_bulk([('Live', 'Hillsong UNITED', LRC_LYRICS),
+                                            ('Other', 'Artist', LYRICS + ' forever')])
+
+        assert list(hits) == [0]
+        assert hits[0]['cache_source'] == 'content'
+        assert AnalysisCache.query.count() == 2
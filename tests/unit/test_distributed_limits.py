@@ -0,0 +1,146 @@
+"""
+Unit tests for the Redis-backed rate limiter and circuit breaker
+"""
+
+from unittest.mock import Mock
+
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.utils.circuit_breaker import (
+    CircuitBreaker,
+    CircuitBreakerOpenError,
+    CircuitState,
+    RedisCircuitBreaker,
+    create_circuit_breaker,
+)
+from app.utils.openai_rate_limiter import OpenAIRateLimiter, RedisRateLimiter, create_rate_limiter
+
+
+def _manager(client):
+    return Mock(get_client=Mock(return_value=client))
+
+
+class TestRedisRateLimiter:
+    """Test the shared token bucket and slot semaphore"""
+
+    def test_denied_returns_wait_from_script(self):
+        client = Mock(eval=Mock(return_value=[0, 1500]))
+        limiter = RedisRateLimiter(max_rpm=60, max_concurrent=2, redis_manager=_manager(client))
+
+        assert limiter.try_acquire() == 1.5
+        assert limiter.get_metrics()['active_requests'] == 0
+
+    def test_granted_slot_released_in_redis(self):
+        client = Mock(eval=Mock(return_value=[1, 0]))
+        limiter = RedisRateLimiter(max_rpm=60, max_concurrent=2, name='test', redis_manager=_manager(client))
+
+        assert limiter.try_acquire() == 0.0
+        keys = client.eval.call_args[0][2:4]
+        holder = client.eval.call_args[0][7]
+        assert keys == ('ratelimit:test:tat', 'ratelimit:test:slots')
+
+        limiter.release()
+        client.zrem.assert_called_once_with('ratelimit:test:slots', holder)
+        assert limiter.get_metrics()['active_requests'] == 0
+
+    def test_release_frees_the_callers_own_slot(self):
+        client = Mock(eval=Mock(return_value=[1, 0]))
+        limiter = RedisRateLimiter(max_rpm=60, max_concurrent=2, name='test', redis_manager=_manager(client))
+
+        first = limiter.acquire()
+        second = limiter.acquire()
+        assert first != second
+
+        limiter.release(first)
+        client.zrem.assert_called_once_with('ratelimit:test:slots', first)
+        limiter.release(second)
+        client.zrem.assert_called_with('ratelimit:test:slots', second)
+
+    def test_fallback_release_keeps_redis_slot(self):
+        client = Mock(eval=Mock(side_effect=[[1, 0], RedisConnectionError('down')]))
+        limiter = RedisRateLimiter(max_rpm=60, max_concurrent=2, name='test', redis_manager=_manager(client))
+
+        shared = limiter.acquire()
+        local = limiter.acquire()
+
+        limiter.release(local)
+        client.zrem.assert_not_called()
+        limiter.release(shared)
+        client.zrem.assert_called_once_with('ratelimit:test:slots', shared)
+
+    def test_falls_back_to_local_limits(self):
+        client = Mock(eval=Mock(side_effect=RedisConnectionError('down')))
+        manager = _manager(client)
+        limiter = RedisRateLimiter(max_rpm=60, max_concurrent=1, redis_manager=manager)
+
+        assert limiter.try_acquire() == 0.0
+        assert limiter.try_acquire() > 0  # Local semaphore still enforced
+        manager.mark_unhealthy.assert_called()
+
+        limiter.release()
+        client.zrem.assert_not_called()
+        assert limiter.get_metrics()['fallback_acquires'] == 1
+
+    def test_factory_respects_flag(self, monkeypatch):
+        monkeypatch.delenv('LLM_DISTRIBUTED_LIMITS', raising=False)
+        assert type(create_rate_limiter('x')) is OpenAIRateLimiter
+        assert type(create_circuit_breaker('x')) is CircuitBreaker
+
+
+class TestRedisCircuitBreaker:
+    """Test breaker transitions come from the shared state"""
+
+    def test_open_elsewhere_fails_fast(self):
+        client = Mock(eval=Mock(return_value='open'))
+        breaker = RedisCircuitBreaker(name='shared', redis_manager=_manager(client))
+        func = Mock()
+
+        with pytest.raises(CircuitBreakerOpenError):
+            breaker.call(func)
+        func.assert_not_called()
+        assert breaker.state == CircuitState.OPEN
+
+    def test_failure_opens_for_all_workers(self):
+        client = Mock(eval=Mock(side_effect=['closed', ['open', 5, 1, '1000.000000']]))
+        breaker = RedisCircuitBreaker(name='shared', redis_manager=_manager(client))
+
+        with pytest.raises(ValueError):
+            breaker.call(Mock(side_effect=ValueError('boom')))
+
+        assert client.eval.call_args[0][1:3] == (1, 'circuit:shared')
+        assert (breaker.state, breaker.failure_count) == (CircuitState.OPEN, 5)
+
+    def test_half_open_success_closes(self):
+        client = Mock(eval=Mock(side_effect=['half_open_entered', ['closed', 2]]))
+        breaker = RedisCircuitBreaker(name='shared', redis_manager=_manager(client))
+
+        assert breaker.call(lambda: 'ok') == 'ok'
+        assert breaker.state == CircuitState.CLOSED
+
+    def test_transitions_use_the_redis_clock(self, monkeypatch):
+        """Test a worker whose clock runs an hour fast neither stamps nor times the circuit"""
+        client = Mock(eval=Mock(side_effect=['closed', ['open', 5, 1, '1000.500000']]))
+        client.hgetall.return_value = {'state': 'open', 'failures': '5', 'last_failure': '1000.500000'}
+        client.time.return_value = (1030, 500000)
+        monkeypatch.setattr('app.utils.circuit_breaker.time.time', lambda: 1000.5 + 3600)
+        breaker = RedisCircuitBreaker(name='shared', recovery_timeout=60, redis_manager=_manager(client))
+
+        with pytest.raises(ValueError):
+            breaker.call(Mock(side_effect=ValueError('boom')))
+
+        assert breaker.last_failure_time == 1000.5
+        # No client timestamp is passed to the scripts
+        assert [call.args[3:] for call in client.eval.call_args_list] == [(60, 86400), (5, 86400)]
+        assert not breaker.allows_requests()  # 30s on the Redis clock
+        client.time.return_value = (1061, 0)
+        assert breaker.allows_requests()
+
+    def test_local_state_without_redis(self):
+        breaker = RedisCircuitBreaker(failure_threshold=1, name='shared', redis_manager=_manager(None))
+
+        with pytest.raises(ValueError):
+            breaker.call(Mock(side_effect=ValueError('boom')))
+
+        assert breaker.state == CircuitState.OPEN
+        assert not breaker.allows_requests()
@@ -0,0 +1,104 @@
+"""
+Unit tests for the pooled LLM HTTP client
+"""
+
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import pytest
+
+from app.utils.llm_http import LLMHttpClient
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """Minimal chat-completions stub that records client ports."""
+    protocol_version = 'HTTP/1.1'
+    client_ports = set()
+    lock = threading.Lock()
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        self.rfile.read(length)
+        with self.lock:
+            self.client_ports.add(self.client_address[1])
+        body = json.dumps({'choices': [{'message': {'content': '{}'}}]}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    _StubHandler.client_ports = set()
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+class TestLLMHttpClient:
+    """Test connection reuse and pool statistics"""
+
+    def test_sequential_requests_reuse_connection(self, stub_server):
+        """Test keep-alive reuses a single connection"""
+        client = LLMHttpClient(pool_size=4, keepalive_expiry=30)
+        try:
+            for _ in range(5):
+                resp = client.post(f"{stub_server}/chat/completions", json={'model': 'm'})
+                resp.raise_for_status()
+        finally:
+            client.close()
+
+        assert len(_StubHandler.client_ports) == 1
+
+    def test_keepalive_disabled_opens_new_connections(self, stub_server):
+        """Test keepalive_expiry=0 closes connections after each request"""
+        client = LLMHttpClient(pool_size=4, keepalive_expiry=0)
+        try:
+            for _ in range(3):
+                client.post(f"{stub_server}/chat/completions", json={}).raise_for_status()
+        finally:
+            client.close()
+
+        assert len(_StubHandler.client_ports) == 3
+
+    def test_concurrent_requests_bounded_by_pool(self, stub_server):
+        """Test concurrent callers never open more connections than the pool allows"""
+        client = LLMHttpClient(pool_size=3, keepalive_expiry=30)
+        try:
+            with ThreadPoolExecutor(max_workers=10) as executor:
+                list(executor.map(
+                    lambda _: client.post(f"{stub_server}/chat/completions", json={}).status_code,
+                    range(30)
+                ))
+            stats = client.get_stats()
+        finally:
+            client.close()
+
+        assert len(_StubHandler.client_ports) <= 3
+        assert stats['total_requests'] == 30
+        assert stats['in_flight'] == 0
+        assert stats['open_connections'] <= 3
+        assert stats['peak_in_flight'] <= 3
+
+    def test_stats_without_pool_internals(self):
+        """Test get_stats falls back to its own counters when httpx internals change"""
+        client = LLMHttpClient(pool_size=2)
+        try:
+            with patch.object(client._client, '_transport', object()):
+                stats = client.get_stats()
+        finally:
+            client.close()
+
+        assert stats['available_slots'] == 2
+        assert 'open_connections' not in stats
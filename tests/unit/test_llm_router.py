@@ -0,0 +1,301 @@
+"""
+Unit tests for the multi-endpoint LLM router (local stub servers)
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import Mock
+
+import httpx
+import pytest
+
+import app.utils.llm_http as llm_http_module
+import app.utils.llm_router as llm_router_module
+from app.services.analyzers.async_router_analyzer import AsyncRouterAnalyzer
+from app.services.analyzers.router_analyzer import RouterAnalyzer
+from app.utils.circuit_breaker import CircuitBreaker
+from app.utils.llm_http import LLMHttpClient, get_llm_http_client
+from app.utils.llm_router import LLMEndpoint, LLMRouter, NoHealthyEndpointError, get_llm_router
+from app.utils.openai_rate_limiter import OpenAIRateLimiter
+from app.utils.single_flight import SingleFlight
+
+ANALYSIS = {"score": 81, "verdict": "freely_listen", "analysis": "Hopeful worship"}
+
+
+def _make_handler(delay=0.0, status=200):
+    """Chat-completions stub recording calls and requested models."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        calls = 0
+        models = []
+        lock = threading.Lock()
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+            cls = type(self)
+            with cls.lock:
+                cls.calls += 1
+                cls.models.append(body.get('model'))
+            time.sleep(cls.delay)
+            payload = json.dumps({'model': body.get('model'),
+                                  'choices': [{'message': {'content': json.dumps(ANALYSIS)}}]}).encode()
+            self.send_response(cls.status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    Handler.delay = delay
+    Handler.status = status
+    return Handler
+
+
+@pytest.fixture
+def stub_servers():
+    """Start stub servers on demand; returns a factory -> (base_url, handler)."""
+    servers = []
+
+    def start(delay=0.0, status=200):
+        handler = _make_handler(delay, status)
+        server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_address[1]}/v1", handler
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def http_client():
+    client = LLMHttpClient(pool_size=8)
+    yield client
+    client.close()
+
+
+def _send(http_client):
+    def send(endpoint):
+        resp = http_client.post(endpoint.chat_url, json=endpoint.prepare_payload({'model': 'default'}),
+                                headers=endpoint.headers, timeout=5)
+        resp.raise_for_status()
+        return resp.json()
+    return send
+
+
+def _endpoint(name, base_url, **kwargs):
+    return LLMEndpoint(name, base_url, api_key='k',
+                       circuit_breaker=CircuitBreaker(failure_threshold=2, recovery_timeout=60, name=name),
+                       **kwargs)
+
+
+class TestEndpointSelection:
+    """Test EWMA latency routing and per-endpoint circuit breakers"""
+
+    def test_prefers_lowest_ewma_latency(self, stub_servers, http_client):
+        """Test traffic settles on the faster backend after both are probed"""
+        slow_url, slow = stub_servers(delay=0.15)
+        fast_url, fast = stub_servers(delay=0.0)
+        router = LLMRouter([_endpoint('slow', slow_url), _endpoint('fast', fast_url)])
+
+        for _ in range(10):
+            _, endpoint = router.execute(_send(http_client))
+
+        assert endpoint.name == 'fast'
+        assert slow.calls == 1  # Probed once, never chosen again
+        assert fast.calls == 9
+        stats = {s['name']: s for s in router.get_stats()['endpoints']}
+        assert stats['slow']['ewma_latency_ms'] > stats['fast']['ewma_latency_ms']
+
+    def test_failing_endpoint_is_isolated(self, stub_servers, http_client):
+        """Test one backend's failures open only its own breaker"""
+        bad_url, bad = stub_servers(status=500)
+        good_url, good = stub_servers()
+        bad_endpoint = _endpoint('bad', bad_url)
+        router = LLMRouter([bad_endpoint, _endpoint('good', good_url)])
+
+        for _ in range(2):
+            with pytest.raises(httpx.HTTPStatusError):
+                router.execute(_send(http_client))
+            bad_endpoint.ewma_latency = None  # Keep it first in line until the breaker opens
+
+        for _ in range(5):
+            _, endpoint = router.execute(_send(http_client))
+            assert endpoint.name == 'good'
+
+        assert bad.calls == 2
+        assert bad_endpoint.get_stats()['circuit'] == 'open'
+        assert router.has_available()
+
+    def test_all_endpoints_open(self, stub_servers):
+        """Test a clear error when no endpoint is healthy"""
+        url, _ = stub_servers()
+        endpoint = _endpoint('only', url)
+        endpoint.circuit_breaker._on_failure()
+        endpoint.circuit_breaker._on_failure()
+        router = LLMRouter([endpoint])
+
+        assert not router.has_available()
+        with pytest.raises(NoHealthyEndpointError):
+            router.execute(lambda e: None)
+
+
+class TestHedging:
+    """Test hedged requests past the p95 latency"""
+
+    def test_hedge_wins_when_primary_stalls(self, stub_servers, http_client):
+        """Test a second backend answers when the primary exceeds its p95"""
+        stalled_url, stalled = stub_servers(delay=0.6)
+        backup_url, backup = stub_servers(delay=0.0)
+        primary = _endpoint('primary', stalled_url)
+        secondary = _endpoint('secondary', backup_url)
+        for _ in range(llm_router_module.MIN_P95_SAMPLES):
+            primary.record_success(0.02)  # History says the primary is fast
+        secondary.record_success(0.05)
+        router = LLMRouter([primary, secondary], hedge=True, hedge_min_delay=0.05)
+
+        start = time.perf_counter()
+        data, endpoint = router.execute(_send(http_client))
+        elapsed = time.perf_counter() - start
+
+        assert endpoint is secondary
+        assert data['choices'][0]['message']['content'] == json.dumps(ANALYSIS)
+        assert elapsed < 0.5
+        assert stalled.calls == 1 and backup.calls == 1
+        assert secondary.hedges_sent == 1 and secondary.hedges_won == 1
+
+    async def test_async_hedge_wins_when_primary_stalls(self, stub_servers):
+        """Test execute_async hedges like execute and cancels the slower request"""
+        stalled_url, stalled = stub_servers(delay=0.6)
+        backup_url, backup = stub_servers(delay=0.0)
+        primary = _endpoint('primary', stalled_url)
+        secondary = _endpoint('secondary', backup_url)
+        for _ in range(llm_router_module.MIN_P95_SAMPLES):
+            primary.record_success(0.02)
+        secondary.record_success(0.05)
+        router = LLMRouter([primary, secondary], hedge=True, hedge_min_delay=0.05)
+
+        async with httpx.AsyncClient() as client:
+            async def send(endpoint):
+                resp = await client.post(endpoint.chat_url, json=endpoint.prepare_payload({'model': 'default'}),
+                                         headers=endpoint.headers, timeout=5)
+                resp.raise_for_status()
+                return resp.json()
+
+            data, endpoint = await router.execute_async(send)
+
+        assert endpoint is secondary
+        assert data['choices'][0]['message']['content'] == json.dumps(ANALYSIS)
+        assert secondary.hedges_sent == 1 and secondary.hedges_won == 1
+        assert primary.rate_limiter.active_requests == 0
+
+    def test_no_hedge_without_history(self, stub_servers, http_client):
+        """Test only one request is sent until latency history exists"""
+        url_a, a = stub_servers(delay=0.1)
+        url_b, b = stub_servers()
+        router = LLMRouter([_endpoint('a', url_a), _endpoint('b', url_b)], hedge=True, hedge_min_delay=0.01)
+
+        router.execute(_send(http_client))
+
+        assert a.calls + b.calls == 1
+
+
+class TestAnalyzerRouting:
+    """Test RouterAnalyzer sends through the endpoint pool"""
+
+    def test_analyze_song_uses_endpoint_model(self, stub_servers):
+        """Test the chosen endpoint's model replaces the default one"""
+        url, handler = stub_servers()
+        analyzer = RouterAnalyzer()
+        analyzer.redis_cache = Mock(client=None, get_analysis=Mock(return_value=None),
+                                    _make_key=Mock(return_value='analysis:router-test'))
+        analyzer.analysis_store = Mock(find=Mock(return_value=None))
+        analyzer.single_flight = SingleFlight()
+        analyzer.llm_router = LLMRouter([_endpoint('vllm', url, model='christian-discernment')])
+
+        result = analyzer.analyze_song('Song', 'Artist', 'Lyrics long enough to analyze')
+
+        assert result['score'] == 81
+        assert handler.models == ['christian-discernment']
+
+    async def test_async_engine_uses_router_endpoints(self, stub_servers):
+        """Test the async engine picks endpoints through the router, with their limiters"""
+        fast_url, fast = stub_servers()
+        slow_url, slow = stub_servers(delay=0.2)
+        fast_endpoint = _endpoint('vllm', fast_url, model='christian-discernment',
+                                  rate_limiter=OpenAIRateLimiter(max_concurrent=3))
+        slow_endpoint = _endpoint('openai', slow_url, rate_limiter=OpenAIRateLimiter(max_concurrent=2))
+        slow_endpoint.record_success(5.0)  # Known to be slow
+        fast_endpoint.record_success(0.01)
+        analyzer = AsyncRouterAnalyzer()
+        analyzer.redis_cache = Mock(client=None, get_analysis=Mock(return_value=None),
+                                    _make_key=lambda *parts: ':'.join(parts))
+        analyzer.analysis_store = Mock(find=Mock(return_value=None))
+        analyzer.single_flight = SingleFlight()
+        analyzer.llm_router = LLMRouter([slow_endpoint, fast_endpoint])
+        analyzer.max_in_flight = analyzer.llm_router.max_concurrent()
+        try:
+            results = await analyzer.analyze_many([
+                {'title': 'Song', 'artist': 'Artist', 'lyrics': 'Lyrics long enough to analyze'}
+            ])
+        finally:
+            analyzer.close()
+
+        assert results[0]['score'] == 81
+        assert fast.models == ['christian-discernment'] and slow.calls == 0
+        assert fast_endpoint.total_requests == 2
+        assert analyzer.max_in_flight == 5
+
+    def test_default_single_endpoint_shares_global_breaker(self):
+        """Test without LLM_ENDPOINTS the analyzer keeps one endpoint on the global limiter/breaker"""
+        analyzer = RouterAnalyzer()
+
+        endpoint = analyzer.llm_router.primary
+        assert len(analyzer.llm_router.endpoints) == 1
+        assert endpoint.circuit_breaker is analyzer.circuit_breaker
+        assert endpoint.rate_limiter is analyzer.rate_limiter
+        assert endpoint.chat_url == analyzer._chat_url
+
+    def test_endpoints_from_environment(self, monkeypatch):
+        """Test LLM_ENDPOINTS builds a router with per-endpoint limiters"""
+        monkeypatch.setattr(llm_router_module, '_llm_router', None)
+        monkeypatch.setenv('RUNPOD_KEY', 'secret')
+        monkeypatch.setenv('LLM_HEDGE', 'true')
+        monkeypatch.setenv('LLM_ENDPOINTS', json.dumps([
+            {'name': 'openai', 'base_url': 'https://api.openai.com/v1', 'api_key_env': 'OPENAI_API_KEY'},
+            {'name': 'runpod', 'base_url': 'https://pod/v1', 'api_key_env': 'RUNPOD_KEY',
+             'model': 'local-model', 'max_concurrent': 4},
+        ]))
+
+        router = get_llm_router()
+
+        assert router.hedge is True
+        assert [e.name for e in router.endpoints] == ['openai', 'runpod']
+        assert router.endpoints[1].headers['Authorization'] == 'Bearer secret'
+        assert router.endpoints[1].rate_limiter.max_concurrent == 4
+        assert router.endpoints[0].circuit_breaker is not router.endpoints[1].circuit_breaker
+
+    def test_http_pool_fits_every_endpoint(self, monkeypatch):
+        """Test the shared HTTP pool is sized to the endpoints' combined concurrency"""
+        monkeypatch.setattr(llm_router_module, '_llm_router', None)
+        monkeypatch.setattr(llm_http_module, '_llm_http_client', None)
+        monkeypatch.delenv('LLM_HTTP_POOL_SIZE', raising=False)
+        monkeypatch.setenv('LLM_ENDPOINTS', json.dumps([
+            {'name': 'a', 'base_url': 'https://a/v1', 'max_concurrent': 6},
+            {'name': 'b', 'base_url': 'https://b/v1', 'max_concurrent': 16},
+        ]))
+
+        client = get_llm_http_client()
+        try:
+            assert client.pool_size == 22
+        finally:
+            client.close()
+            monkeypatch.setattr(llm_http_module, '_llm_http_client', None)
+            monkeypatch.setattr(llm_router_module, '_llm_router', None)
@@ -0,0 +1,107 @@
+"""
+Unit tests for the background LyricsCache writer
+"""
+
+import threading
+import time
+from unittest.mock import patch
+
+from app.models.models import LyricsCache
+from app.utils.lyrics.cache_writer import LyricsCacheWriter
+from app.utils.lyrics.lyrics_fetcher import LyricsFetcher
+from app.utils.lyrics_config import LyricsFetcherConfig
+
+LYRICS = "Amazing grace how sweet the sound that saved a wretch like me"
+
+
+def _wait_for(condition, timeout=2.0):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+class TestUpsertMany:
+    """Test the single-statement upsert"""
+
+    def test_inserts_and_updates_in_one_commit(self, app, db_session):
+        LyricsCache.cache_lyrics('choir', 'existing', '', 'negative_cache')
+
+        with patch.object(db_session, 'commit', wraps=db_session.commit) as commit:
+            written = LyricsCache.upsert_many([
+                {'artist': 'choir', 'title': 'existing', 'lyrics': LYRICS, 'source': 'LRCLibProvider'},
+                {'artist': 'choir', 'title': 'new', 'lyrics': None, 'source': 'negative_cache'},
+                {'artist': 'choir', 'title': 'new', 'lyrics': LYRICS, 'source': 'GeniusProvider'},
+            ])
+
+        assert written == 2
+        assert commit.call_count == 1
+        assert LyricsCache.find_cached_lyrics('choir', 'existing').source == 'LRCLibProvider'
+        assert LyricsCache.find_cached_lyrics('choir', 'new').lyrics == LYRICS
+        assert LyricsCache.query.count() == 2
+
+
+class TestLyricsCacheWriter:
+    """Test writes are coalesced and flushed off the calling thread"""
+
+    def test_coalesces_and_flushes(self, app, db_session):
+        writer = LyricsCacheWriter(batch_size=50, flush_interval=60)
+        writer.submit('choir', 'song', '', 'negative_cache')
+        writer.submit('choir', 'song', LYRICS, 'LRCLibProvider')
+
+        assert writer.pending('choir', 'song')['lyrics'] == LYRICS
+        assert writer.flush(timeout=5)
+
+        assert LyricsCache.find_cached_lyrics('choir', 'song').lyrics == LYRICS
+        stats = writer.get_stats()
+        assert (stats['coalesced'], stats['written'], stats['batches'], stats['pending']) == (1, 1, 1, 0)
+        writer.close()
+
+    def test_submit_never_waits_for_the_database(self, app, db_session):
+        release = threading.Event()
+        writer = LyricsCacheWriter(batch_size=1, flush_interval=60)
+
+        with patch.object(LyricsCache, 'upsert_many', side_effect=lambda rows: release.wait(5) and len(rows)):
+            writer.submit('choir', 'first', LYRICS, 'LRCLibProvider')
+            assert _wait_for(lambda: writer.pending('choir', 'first') is not None and writer.get_stats()['pending'] == 0)
+
+            start = time.time()
+            assert writer.submit('choir', 'second', LYRICS, 'LRCLibProvider')
+            assert time.time() - start < 0.05
+            assert writer.flush(timeout=0.05) is False  # First batch still being written
+
+            release.set()
+            assert writer.flush(timeout=5)
+
+        assert writer.get_stats()['written'] == 2
+        writer.close()
+
+    def test_close_writes_pending_rows(self, app, db_session):
+        writer = LyricsCacheWriter(batch_size=50, flush_interval=60)
+        writer.submit('choir', 'last words', LYRICS, 'LRCLibProvider')
+
+        writer.close()
+
+        assert LyricsCache.find_cached_lyrics('choir', 'last words') is not None
+        assert writer.submit('choir', 'too late', LYRICS, 'LRCLibProvider') is False
+
+
+class TestFetcherUsesWriter:
+    """Test LyricsFetcher queues cache writes and reads its own pending writes"""
+
+    def test_queued_write_visible_before_flush(self, app, db_session):
+        fetcher = LyricsFetcher(config=LyricsFetcherConfig(log_rate_limit_events=False))
+        fetcher._cache_writer = LyricsCacheWriter(batch_size=50, flush_interval=60)
+        key = fetcher._get_cache_key('Holy Holy Holy', 'Choir')
+
+        fetcher._add_to_cache_batch(key, None)
+
+        assert LyricsCache.find_cached_lyrics('choir', 'holy holy holy') is None
+        assert fetcher._get_from_cache(key) is None
+
+        fetcher._add_to_cache_batch(key, LYRICS)
+        assert fetcher._get_from_cache(key) == LYRICS
+
+        fetcher.flush_cache_batch()
+        assert LyricsCache.find_cached_lyrics('choir', 'holy holy holy').lyrics == LYRICS
+        fetcher._cache_writer.close()
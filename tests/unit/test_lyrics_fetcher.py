@@ -2,11 +2,13 @@
 Unit tests for LyricsFetcher
 """
 
-from unittest.mock import Mock, patch
+import time
+from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 
-from app.utils.lyrics.lyrics_fetcher import LyricsFetcher
+from app.utils.lyrics.lyrics_fetcher import LyricsFetcher, LyricsProvider
+from app.utils.lyrics_config import LyricsFetcherConfig
 
 
 class TestLyricsFetcherInitialization:
@@ -91,3 +93,214 @@ class TestLyricsFetching:
             # Should return None or empty string
             assert lyrics is None or lyrics == ''
 
+
+
+class _FakeProvider(LyricsProvider):
+    def __init__(self, name, lyrics, delay=0.0, requires_api_key=False):
+        self.name = name
+        self.lyrics = lyrics
+        self.delay = delay
+        self.requires_api_key = requires_api_key
+        self.calls = 0
+
+    def fetch_lyrics(self, artist, title):
+        self.calls += 1
+        time.sleep(self.delay)
+        if isinstance(self.lyrics, Exception):
+            raise self.lyrics
+        return self.lyrics
+
+    def get_provider_name(self):
+        return self.name
+
+
+GOOD = "Amazing grace how sweet the sound\nThat saved a wretch like me\nI once was lost"
+
+
+class TestFetchStatus:
+    """Test only complete provider answers count as a definitive miss"""
+
+    def _fetcher(self, *providers):
+        fetcher = LyricsFetcher(config=LyricsFetcherConfig(use_cache=False, log_rate_limit_events=False))
+        fetcher.providers = list(providers)
+        fetcher.provider_stats = {}
+        return fetcher
+
+    def test_all_providers_answered(self):
+        fetcher = self._fetcher(_FakeProvider('A', None), _FakeProvider('B', None))
+        assert fetcher.fetch_lyrics_with_status('Selah', 'Choir') == (None, True)
+
+    def test_provider_failure_is_not_definitive(self):
+        fetcher = self._fetcher(_FakeProvider('A', None), _FakeProvider('B', TimeoutError('slow')))
+        assert fetcher.fetch_lyrics_with_status('Selah', 'Choir') == (None, False)
+
+    def test_provider_timeout_raises(self):
+        import requests
+
+        from app.utils.lyrics.exceptions import LyricsProviderException
+        from app.utils.lyrics.lyrics_fetcher import LRCLibProvider
+
+        with patch('app.utils.lyrics.lyrics_fetcher.get_lyrics_http_session') as session, \
+                patch('app.utils.retry.time.sleep'):
+            session.return_value.get.side_effect = requests.exceptions.Timeout('slow')
+            with pytest.raises(LyricsProviderException):
+                LRCLibProvider().fetch_lyrics('Choir', 'Selah')
+
+
+class TestProviderRacing:
+    """Test concurrent provider racing"""
+
+    def _fetcher(self, *providers, grace=0.05):
+        fetcher = LyricsFetcher(config=LyricsFetcherConfig(
+            use_cache=False, provider_racing=True, race_grace_period=grace, log_rate_limit_events=False
+        ))
+        fetcher.providers = list(providers)
+        fetcher.provider_stats = {}
+        return fetcher
+
+    def test_fast_provider_wins_over_slow_miss(self):
+        slow = _FakeProvider('Slow', None, delay=0.5)
+        fast = _FakeProvider('Fast', GOOD, delay=0.0)
+        fetcher = self._fetcher(slow, fast)
+
+        start = time.time()
+        assert fetcher.fetch_lyrics('Amazing Grace', 'John Newton') == GOOD
+        assert time.time() - start < 0.4
+        stats = fetcher.get_provider_stats()['Fast']
+        assert stats['race_wins'] == 1
+        assert stats['avg_race_time_saved'] > 0
+
+    def test_priority_breaks_ties_within_grace(self):
+        first = _FakeProvider('First', GOOD + ' (first)', delay=0.02)
+        second = _FakeProvider('Second', GOOD, delay=0.0)
+        fetcher = self._fetcher(first, second, grace=0.5)
+
+        assert fetcher.fetch_lyrics('Amazing Grace', 'John Newton').endswith('(first)')
+
+    def test_short_result_does_not_end_race_and_keyed_provider_is_fallback(self):
+        stub = _FakeProvider('Stub', 'Instrumental', delay=0.0)
+        miss = _FakeProvider('Miss', None, delay=0.0)
+        genius = _FakeProvider('Genius', GOOD, requires_api_key=True)
+        fetcher = self._fetcher(stub, miss, genius)
+
+        assert fetcher.fetch_lyrics('Amazing Grace', 'John Newton') == GOOD
+        assert genius.calls == 1
+
+        genius.lyrics = None
+        assert fetcher.fetch_lyrics('Amazing Grace', 'John Newton') == 'Instrumental'
+
+    def test_cache_source_is_race_winner(self):
+        """Test the cached entry names the provider that won, not an earlier success"""
+        slow = _FakeProvider('Slow', GOOD, delay=0.5)
+        fast = _FakeProvider('Fast', GOOD, delay=0.0)
+        fetcher = self._fetcher(slow, fast)
+        fetcher.provider_stats['Slow'] = {'attempts': 3, 'successes': 3, 'race_wins': 3, 'race_time_saved': 0.0}
+        fetcher.config.use_cache = True
+        fetcher._get_from_cache = Mock(return_value=None)
+        fetcher._store_in_cache = Mock()
+
+        assert fetcher.fetch_lyrics('Amazing Grace', 'John Newton') == GOOD
+        assert fetcher._store_in_cache.call_args.kwargs['source'] == 'Fast'
+
+    def test_racer_waiting_on_rate_limit_takes_no_token_after_race(self):
+        """Test a racer still waiting for a token when the race ends neither calls out nor spends one"""
+        from app.utils.lyrics.lyrics_fetcher import TokenBucket
+
+        winner = _FakeProvider('Winner', GOOD, delay=0.0)
+        throttled = _FakeProvider('Throttled', GOOD, delay=0.0)
+        fetcher = self._fetcher(winner, throttled)
+        fetcher.token_bucket = TokenBucket(capacity=1, refill_rate=5.0)  # Second token after 0.2s
+
+        assert fetcher.fetch_lyrics('Amazing Grace', 'John Newton') == GOOD
+        time.sleep(0.3)
+
+        assert throttled.calls == 0
+        assert fetcher.get_provider_stats()['Throttled']['attempts'] == 0
+        assert fetcher.token_bucket.get_available_tokens() == 1
+
+    def test_stats_updates_are_not_lost_across_threads(self):
+        """Test concurrent racers' stat updates all land"""
+        from concurrent.futures import ThreadPoolExecutor
+
+        provider = _FakeProvider('A', GOOD)
+        fetcher = self._fetcher(provider)
+
+        def bump(_):
+            for _ in range(200):
+                fetcher._bump_stat(provider, 'attempts')
+                fetcher._bump_stat(provider, 'race_time_saved', 0.5)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(bump, range(8)))
+
+        assert fetcher.provider_stats['A']['attempts'] == 1600
+        assert fetcher.provider_stats['A']['race_time_saved'] == 800.0
+
+
+class TestFetchLyricsMany:
+    """Test the async bulk entry point"""
+
+    def _fetcher(self, *providers, **config):
+        fetcher = LyricsFetcher(config=LyricsFetcherConfig(use_cache=False, log_rate_limit_events=False, **config))
+        fetcher.providers = list(providers)
+        fetcher.provider_stats = {}
+        return fetcher
+
+    def test_results_in_order_and_duplicates_fetched_once(self):
+        miss = _FakeProvider('Miss', None)
+        hit = _FakeProvider('Hit', GOOD)
+        fetcher = self._fetcher(miss, hit)
+        pairs = [('Amazing Grace', 'John Newton'), ('', 'Nobody'), ('amazing grace', 'john newton')]
+
+        assert fetcher.fetch_lyrics_bulk(pairs) == [GOOD, None, GOOD]
+        assert (miss.calls, hit.calls) == (1, 1)
+        assert fetcher.get_provider_stats()['Hit']['successes'] == 1
+
+    def test_respects_token_bucket(self):
+        fetcher = self._fetcher(_FakeProvider('Hit', GOOD), token_bucket_capacity=1, token_bucket_refill_rate=20.0)
+
+        start = time.time()
+        fetcher.fetch_lyrics_bulk([(f'Song {i}', 'Choir') for i in range(3)])
+        assert time.time() - start >= 0.08  # Two of three requests waited for a token
+
+    def test_rate_limit_wait_capped(self):
+        fetcher = self._fetcher(
+            _FakeProvider('Hit', GOOD), token_bucket_capacity=1, token_bucket_refill_rate=0.01, rate_limit_max_wait=0.05
+        )
+
+        start = time.time()
+        assert fetcher.fetch_lyrics_bulk([('Song 1', 'Choir'), ('Song 2', 'Choir')]) == [GOOD, None]
+        assert time.time() - start < 1.0
+
+    def test_cache_read_honors_negative_and_queued_entries(self, app, db_session):
+        from datetime import datetime, timedelta, timezone
+
+        from app.models.models import LyricsCache
+        from app.utils.lyrics.cache_writer import LyricsCacheWriter
+
+        provider = _FakeProvider('Hit', GOOD)
+        fetcher = self._fetcher(provider)
+        fetcher.config.use_cache = True
+        fetcher._cache_writer = LyricsCacheWriter(batch_size=50, flush_interval=60)
+        LyricsCache.cache_lyrics('choir', 'known missing', '', 'negative_cache')
+        stale = LyricsCache.cache_lyrics('choir', 'retry me', '', 'negative_cache')
+        stale.retrieved_at = datetime.now(timezone.utc) - timedelta(days=30)
+        db_session.commit()
+        fetcher._cache_writer.submit('choir', 'queued', 'Queued lyrics line one\nline two', 'LRCLibProvider')
+
+        results = fetcher.fetch_lyrics_bulk([('Known Missing', 'Choir'), ('Retry Me', 'Choir'), ('Queued', 'Choir')])
+
+        assert results == [None, GOOD, 'Queued lyrics line one\nline two']
+        assert provider.calls == 1  # Only the expired negative entry was fetched again
+        fetcher._cache_writer.close()
+
+    async def test_lrclib_async_parses_shared_client_response(self):
+        import httpx
+
+        from app.utils.lyrics.lyrics_fetcher import LRCLibProvider
+
+        response = httpx.Response(200, json=[{'plainLyrics': GOOD}], request=httpx.Request('GET', 'https://lrclib.net'))
+        http = Mock(get=AsyncMock(return_value=response))
+
+        assert await LRCLibProvider().fetch_lyrics_async(http, 'John Newton', 'Amazing Grace (Live)') == GOOD
+        assert http.get.call_args.kwargs['params'] == {'artist_name': 'John Newton', 'track_name': 'Amazing Grace'}
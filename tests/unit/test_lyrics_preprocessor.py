@@ -0,0 +1,112 @@
+"""
+Unit tests for lyrics preprocessing before analysis
+"""
+
+from app.services.analyzers import lyrics_preprocessor
+from app.services.analyzers.lyrics_preprocessor import (
+    LyricsPreprocessor,
+    count_tokens,
+    get_lyrics_preprocessor,
+)
+from app.services.analyzers.router_analyzer import RouterAnalyzer
+
+CHORUS = "Holy holy holy\nLord God Almighty\nEarly in the morning\nOur song shall rise to Thee"
+
+
+class TestLyricsPreprocessor:
+    """Test timestamp stripping, repeat collapsing and the token budget"""
+
+    def test_strips_lrc_leftovers(self):
+        """Test millisecond timestamps, word timings and metadata tags are removed"""
+        lyrics = "[ar:Choir]\n[ti:Hymn]\n[00:01.123]Amazing grace\n[00:04.50]<00:04.50>How <00:05.10>sweet the sound"
+
+        prepared = LyricsPreprocessor().prepare(lyrics)
+
+        assert prepared.text == "Amazing grace\nHow sweet the sound"
+        assert prepared.timestamps_stripped == 6
+
+    def test_collapses_repeated_chorus_without_blank_lines(self):
+        """Test a chorus repeated inline is kept once with a repetition count"""
+        lyrics = "\n".join([CHORUS, "Verse one line", "Verse one again", CHORUS, "Bridge line", CHORUS.upper()])
+
+        prepared = LyricsPreprocessor().prepare(lyrics)
+
+        assert prepared.text.count("Lord God Almighty") == 1
+        assert "[repeated x3]" in prepared.text
+        assert "Bridge line" in prepared.text
+        assert prepared.repeats_collapsed == 2
+        assert prepared.prepared_tokens < prepared.original_tokens
+
+    def test_collapses_repeated_stanza_and_header(self):
+        """Test repeated [Chorus] sections drop both the header and the lines"""
+        lyrics = f"[Chorus]\n{CHORUS}\n\n[Verse 2]\nNew words here\nMore new words\n\n[Chorus]\n{CHORUS}"
+
+        text = LyricsPreprocessor().prepare(lyrics).text
+
+        assert text.count("[Chorus]") == 1
+        assert text.endswith("More new words")
+
+    def test_folds_consecutive_identical_lines(self):
+        """Test a run of one line becomes "line (xN)" """
+        prepared = LyricsPreprocessor().prepare("Hallelujah\nHallelujah\nhallelujah!\nAmen")
+
+        assert prepared.text == "Hallelujah (x3)\nAmen"
+
+    def test_token_budget_truncates_at_line_boundary(self):
+        """Test lyrics over budget are cut between lines with a marker"""
+        lyrics = "\n".join(f"Unique line number {i} with some words" for i in range(200))
+
+        prepared = LyricsPreprocessor(max_tokens=100).prepare(lyrics)
+
+        assert prepared.prepared_tokens <= 100
+        assert prepared.truncated_lines > 0
+        assert prepared.text.startswith("Unique line number 0 with some words\n")
+        assert prepared.text.endswith(f"[... {prepared.truncated_lines} more lines truncated]")
+
+    def test_disabled_passes_through(self):
+        """Test lyrics are untouched when preprocessing is disabled"""
+        lyrics = f"{CHORUS}\n{CHORUS}"
+
+        prepared = LyricsPreprocessor(enabled=False).prepare(lyrics)
+
+        assert prepared.text == lyrics
+        assert prepared.tokens_saved == 0
+
+    def test_stats_accumulate(self):
+        """Test savings are tracked across songs"""
+        preprocessor = LyricsPreprocessor()
+        preprocessor.prepare(f"{CHORUS}\n{CHORUS}")
+        preprocessor.prepare("Short unique song")
+
+        stats = preprocessor.get_stats()
+
+        assert stats['total_songs'] == 2
+        assert stats['total_tokens_saved'] == stats['total_original_tokens'] - stats['total_prepared_tokens']
+        assert stats['total_tokens_saved'] > 0
+        assert count_tokens("") == 0
+
+    def test_global_preprocessor_off_by_default(self, monkeypatch):
+        """Test prompts are unchanged unless LYRICS_PREPROCESS opts in"""
+        monkeypatch.delenv('LYRICS_PREPROCESS', raising=False)
+        monkeypatch.setattr(lyrics_preprocessor, '_lyrics_preprocessor', None)
+
+        assert get_lyrics_preprocessor().enabled is False
+
+        monkeypatch.setattr(lyrics_preprocessor, '_lyrics_preprocessor', None)
+        monkeypatch.setenv('LYRICS_PREPROCESS', 'true')
+        assert get_lyrics_preprocessor().enabled is True
+
+
+class TestAnalyzerPreprocessing:
+    """Test the analyzer prompts with preprocessed lyrics"""
+
+    def test_build_request_uses_prepared_lyrics(self):
+        """Test the user message carries collapsed lyrics"""
+        analyzer = RouterAnalyzer()
+        analyzer.lyrics_preprocessor = LyricsPreprocessor()
+
+        _, payload, _ = analyzer._build_request('Hymn', 'Choir', f"[00:01.000]{CHORUS}\n{CHORUS}")
+
+        user = payload['messages'][-1]['content']
+        assert user.count('Lord God Almighty') == 1
+        assert '[00:01.000]' not in user
@@ -0,0 +1,120 @@
+"""
+Unit tests for lyrics rate limiting under concurrent fetches
+"""
+
+import threading
+import time
+
+from app.utils.lyrics.lyrics_fetcher import (
+    RATE_LIMITED,
+    LyricsFetcher,
+    RateLimitTracker,
+    TokenBucket,
+)
+from app.utils.lyrics_config import LyricsFetcherConfig, parse_provider_rates
+
+
+def _hammer(try_acquire, threads=16, attempts=20):
+    """Call try_acquire from many threads at once; return the number of grants."""
+    grants = []
+    barrier = threading.Barrier(threads)
+
+    def worker():
+        barrier.wait()
+        grants.extend(1 for _ in range(attempts) if try_acquire() == 0.0)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return len(grants)
+
+
+class TestLimiterConcurrency:
+    """Test limiters never grant more than their budget across threads"""
+
+    def test_token_bucket_never_overdraws(self):
+        bucket = TokenBucket(capacity=50, refill_rate=0.001)
+
+        assert _hammer(bucket.try_acquire) == 50
+        assert bucket.get_available_tokens() == 0
+
+    def test_tracker_never_exceeds_window(self):
+        tracker = RateLimitTracker(window_size=60, max_requests=30)
+
+        assert _hammer(tracker.try_acquire) == 30
+        assert tracker.get_current_request_count() == 30
+
+    def test_fetcher_grants_all_limits_together(self):
+        fetcher = LyricsFetcher(config=LyricsFetcherConfig(
+            use_cache=False,
+            log_rate_limit_events=False,
+            token_bucket_capacity=40,
+            token_bucket_refill_rate=0.001,
+            rate_limit_max_requests=100,
+            provider_rate_limits={"GeniusProvider": 0.001},
+        ))
+        fetcher.provider_buckets["GeniusProvider"] = TokenBucket(capacity=5, refill_rate=0.001)
+
+        assert _hammer(lambda: fetcher._try_acquire_rate_limit("GeniusProvider")) == 5
+        assert _hammer(lambda: fetcher._try_acquire_rate_limit("LRCLibProvider")) == 35
+        # Denied attempts took nothing from the other limiters
+        assert fetcher.rate_tracker.get_current_request_count() == 40
+
+
+class TestBoundedWaits:
+    """Test acquire(timeout) and the fetcher's wait budget"""
+
+    def test_try_acquire_reports_wait_without_sleeping(self):
+        bucket = TokenBucket(capacity=1, refill_rate=2.0)
+        assert bucket.try_acquire() == 0.0
+
+        start = time.time()
+        wait = bucket.try_acquire()
+
+        assert 0 < wait <= 0.5
+        assert time.time() - start < 0.05
+
+    def test_acquire_gives_up_before_deadline(self):
+        bucket = TokenBucket(capacity=1, refill_rate=0.01)
+        bucket.try_acquire()
+
+        start = time.time()
+        assert bucket.acquire(timeout=1.0) is False
+        assert time.time() - start < 0.1
+
+    def test_acquire_more_than_capacity_fails_fast(self):
+        bucket = TokenBucket(capacity=2, refill_rate=1.0)
+
+        start = time.time()
+        assert bucket.acquire(tokens=3) is False
+        assert time.time() - start < 0.05
+        assert bucket.acquire(tokens=2) is True
+
+    def test_acquire_waits_for_refill(self):
+        tracker = RateLimitTracker(window_size=1, max_requests=1)
+        tracker.try_acquire()
+
+        assert tracker.acquire(timeout=2.0) is True
+
+    def test_rate_limited_provider_skipped_and_not_negative_cached(self):
+        fetcher = LyricsFetcher(config=LyricsFetcherConfig(
+            use_cache=False,
+            log_rate_limit_events=False,
+            rate_limit_max_wait=0.0,
+            token_bucket_capacity=1,
+            token_bucket_refill_rate=0.001,
+        ))
+        fetcher.token_bucket.try_acquire()
+        fetcher._add_to_cache = lambda *args, **kwargs: (_ for _ in ()).throw(AssertionError("cached"))
+
+        lyrics, errors, _ = fetcher._fetch_sequentially(fetcher.providers[:1], "Song", "Artist")
+
+        assert lyrics is None
+        assert errors and errors[0].endswith(RATE_LIMITED)
+
+    def test_provider_rates_parsed_from_env_format(self):
+        rates = parse_provider_rates("GeniusProvider=1, LRCLibProvider=x,=3")
+
+        assert rates == {"GeniusProvider": 1.0}
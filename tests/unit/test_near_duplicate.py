@@ -0,0 +1,104 @@
+"""
+Unit tests for reusing analyses of near-duplicate lyrics (MinHash/LSH)
+"""
+
+from unittest.mock import Mock
+
+import pytest
+
+from app.models.models import AnalysisCache, LyricsSignature
+from app.services.analyzers.analysis_store import AnalysisStore
+from app.services.analyzers.near_duplicate import (
+    NearDuplicateIndex,
+    estimate_jaccard,
+    minhash_signature,
+)
+from app.services.analyzers.router_analyzer import RouterAnalyzer
+from app.utils.single_flight import SingleFlight
+
+ANALYSIS = {'score': 88, 'verdict': 'freely_listen', 'concerns': []}
+ALBUM_LYRICS = "\n".join([
+    "Amazing grace how sweet the sound that saved a wretch like me",
+    "I once was lost but now am found was blind but now I see",
+    "Twas grace that taught my heart to fear and grace my fears relieved",
+    "How precious did that grace appear the hour I first believed",
+    "My chains are gone I've been set free my God my Savior has ransomed me",
+    "And like a flood His mercy reigns unending love amazing grace",
+    "The Lord has promised good to me His word my hope secures",
+    "He will my shield and portion be as long as life endures",
+    "My chains are gone I've been set free my God my Savior has ransomed me",
+    "And like a flood His mercy reigns unending love amazing grace",
+])
+# Radio edit: one verse line dropped, different punctuation and casing
+RADIO_EDIT = ALBUM_LYRICS.replace(
+    "He will my shield and portion be as long as life endures\n", ""
+).upper().replace("GRACE", "grace,")
+OTHER_LYRICS = "\n".join([
+    "Oceans you call me out upon the waters the great unknown where feet may fail",
+    "And there I find you in the mystery in oceans deep my faith will stand",
+    "Spirit lead me where my trust is without borders let me walk upon the waters",
+])
+
+
+class TestMinHash:
+    """Test signatures estimate shingle-set similarity"""
+
+    def test_radio_edit_is_similar(self):
+        assert estimate_jaccard(minhash_signature(ALBUM_LYRICS), minhash_signature(RADIO_EDIT)) >= 0.8
+
+    def test_different_song_is_not(self):
+        assert estimate_jaccard(minhash_signature(ALBUM_LYRICS), minhash_signature(OTHER_LYRICS)) < 0.2
+        assert minhash_signature('[00:01.00]\n[Intro]') is None
+
+
+class TestNearDuplicateIndex:
+    """Test the LSH tables return indexed neighbours above the threshold"""
+
+    def test_find_returns_neighbour(self, db_session):
+        index = NearDuplicateIndex(threshold=0.8)
+        assert index.add('Chris Tomlin', 'Amazing Grace (My Chains Are Gone)', 'h1', ALBUM_LYRICS)
+        assert not index.add('Chris Tomlin', 'Amazing Grace (My Chains Are Gone)', 'h1', ALBUM_LYRICS)
+        index.add('Hillsong UNITED', 'Oceans', 'h2', OTHER_LYRICS)
+
+        matches = index.find(RADIO_EDIT)
+
+        assert [m.lyrics_hash for m in matches] == ['h1']
+        assert matches[0].similarity >= 0.8
+        assert LyricsSignature.query.count() == 2
+        assert index.get_stats()['matches'] == 1
+
+
+class TestAnalyzerNearDuplicate:
+    """Test the analyzer reuses a near-duplicate's analysis instead of calling the API"""
+
+    @pytest.fixture
+    def analyzer(self, app):
+        analyzer = RouterAnalyzer()
+        analyzer.near_duplicates = NearDuplicateIndex(threshold=0.8)
+        analyzer.redis_cache = Mock(get_analysis=Mock(return_value=None),
+                                    _make_key=lambda *parts: ':'.join(parts))
+        analyzer.analysis_store = AnalysisStore()
+        analyzer.single_flight = SingleFlight()
+        analyzer.http_client = Mock(post=Mock(side_effect=AssertionError('API called')))
+        return analyzer
+
+    def test_radio_edit_reuses_album_analysis(self, analyzer, db_session):
+        album_hash = analyzer._lyrics_hash(ALBUM_LYRICS)
+        analyzer._store_cached('Amazing Grace (My Chains Are Gone)', 'Chris Tomlin', album_hash, ANALYSIS,
+                               lyrics=ALBUM_LYRICS)
+
+        result = analyzer.analyze_song('Amazing Grace (Radio Edit)', 'Chris Tomlin', RADIO_EDIT)
+
+        assert result['score'] == 88
+        assert result['cache_source'] == 'near_duplicate'
+        assert result['near_duplicate_of']['title'] == 'Amazing Grace (My Chains Are Gone)'
+        edit = AnalysisCache.find_cached_analysis('Chris Tomlin', 'Amazing Grace (Radio Edit)',
+                                                  analyzer._lyrics_hash(RADIO_EDIT))
+        assert 'near_duplicate_of' not in edit.analysis_result
+        assert LyricsSignature.query.count() == 1  # Reused results are not indexed
+
+    def test_other_model_version_not_reused(self, analyzer, db_session):
+        AnalysisCache.cache_analysis('Chris Tomlin', 'Amazing Grace', 'h1', ANALYSIS, 'old-model')
+        analyzer.near_duplicates.add('Chris Tomlin', 'Amazing Grace', 'h1', ALBUM_LYRICS)
+
+        assert analyzer._lookup_near_duplicate('Radio Edit', 'Chris Tomlin', 'h2', RADIO_EDIT) is None
@@ -0,0 +1,127 @@
+"""
+Unit tests for the cached instrumental / no-lyrics verdict tier
+"""
+
+from unittest.mock import Mock, patch
+
+import pytest
+
+from app.models.models import AnalysisResult, Song
+from app.services.unified_analysis_service import UnifiedAnalysisService, _partition_cached_analyses
+from app.utils.redis_cache import RedisCache
+
+VERDICT = {
+    'score': 85,
+    'verdict': 'freely_listen',
+    'formation_risk': 'very_low',
+    'concerns': [],
+    'analysis': 'Instrumental track',
+    'instrumental': True,
+}
+
+
+def _no_lyrics_router():
+    return Mock(analyze_song=Mock(return_value=dict(VERDICT, instrumental=False, no_lyrics=True, score=50)))
+
+
+@pytest.fixture
+def cache(redis_client):
+    cache = RedisCache(l1_max_entries=0, no_lyrics_ttl=3600)
+    cache._client = redis_client
+    cache._binary_client = redis_client
+    return cache
+
+
+class TestRedisNoLyrics:
+    """Test verdicts are stored per spotify_id with their own TTL"""
+
+    def test_round_trip_with_short_ttl(self, cache, redis_client):
+        assert cache.set_no_lyrics('sp_1', dict(VERDICT, cache_hit=True))
+
+        found = cache.get_no_lyrics_bulk(['sp_1', 'sp_2', None])
+
+        assert list(found) == ['sp_1']
+        assert found['sp_1']['cache_source'] == 'no_lyrics'
+        assert redis_client.setex.call_args[0][:2] == ('no_lyrics:sp_1', 3600)
+        assert cache.get_stats()['no_lyrics'] == {'hits': 1, 'misses': 1, 'hit_rate': 50.0}
+
+
+class TestServiceNoLyrics:
+    """Test reanalysis skips lyrics providers and the analyzer for known no-lyrics tracks"""
+
+    def test_cached_verdict_skips_fetch_and_analyzer(self, app, db_session, cache):
+        song = Song(spotify_id='sp_instrumental', title='Selah (Interlude)', artist='Choir')
+        db_session.add(song)
+        db_session.commit()
+        cache.set_no_lyrics(song.spotify_id, VERDICT)
+        service = UnifiedAnalysisService()
+        service.lyrics_fetcher = Mock()
+
+        with patch('app.services.unified_analysis_service.get_redis_cache', return_value=cache), \
+                patch('app.services.unified_analysis_service.get_shared_analyzer') as analyzer:
+            result = service.analyze_song_complete(song)
+
+        assert result['score'] == 85
+        service.lyrics_fetcher.fetch_lyrics_with_status.assert_not_called()
+        analyzer.assert_not_called()
+
+    def test_forced_reanalysis_asks_providers_again(self, app, db_session, cache):
+        song = Song(spotify_id='sp_retry', title='Selah (Interlude)', artist='Choir')
+        db_session.add(song)
+        db_session.commit()
+        cache.set_no_lyrics(song.spotify_id, VERDICT)
+        service = UnifiedAnalysisService()
+        service.lyrics_fetcher = Mock(fetch_lyrics_with_status=Mock(return_value=(None, True)))
+
+        with patch('app.services.unified_analysis_service.get_redis_cache', return_value=cache), \
+                patch('app.services.unified_analysis_service.get_shared_analyzer', side_effect=RuntimeError('down')), \
+                patch('app.services.unified_analysis_service.is_analyzer_ready', return_value=False):
+            service.analyze_song_complete(song, force=True)
+
+        service.lyrics_fetcher.fetch_lyrics_with_status.assert_called_once()
+
+    def test_verdict_cached_after_definitive_miss(self, app, db_session, cache):
+        song = Song(spotify_id='sp_unknown', title='Untitled', artist='Choir')
+        db_session.add(song)
+        db_session.commit()
+        service = UnifiedAnalysisService()
+        service.lyrics_fetcher = Mock(fetch_lyrics_with_status=Mock(return_value=(None, True)))
+
+        with patch('app.services.unified_analysis_service.get_redis_cache', return_value=cache), \
+                patch('app.services.unified_analysis_service.is_analyzer_ready', return_value=True), \
+                patch('app.services.unified_analysis_service.get_shared_analyzer', return_value=_no_lyrics_router()):
+            service.analyze_song_complete(song, force=True)
+
+        assert cache.get_no_lyrics('sp_unknown')['no_lyrics'] is True
+
+    def test_no_verdict_cached_after_transient_failure(self, app, db_session, cache):
+        songs = [Song(spotify_id=f'sp_outage_{i}', title=f'Song {i}', artist='Choir') for i in range(2)]
+        db_session.add_all(songs)
+        db_session.commit()
+        service = UnifiedAnalysisService()
+        outcomes = [TimeoutError('provider outage'), (None, False)]  # Raised / rate-limit skipped
+        service.lyrics_fetcher = Mock(fetch_lyrics_with_status=Mock(side_effect=outcomes))
+
+        with patch('app.services.unified_analysis_service.get_redis_cache', return_value=cache), \
+                patch('app.services.unified_analysis_service.is_analyzer_ready', return_value=True), \
+                patch('app.services.unified_analysis_service.get_shared_analyzer', return_value=_no_lyrics_router()):
+            for song in songs:
+                service.analyze_song_complete(song, force=True)
+
+        assert cache.get_no_lyrics_bulk(['sp_outage_0', 'sp_outage_1']) == {}
+
+    def test_partition_serves_no_lyrics_songs_from_cache(self, app, db_session, cache):
+        songs = [Song(spotify_id=f'sp_silent_{i}', title=f'Interlude {i}', artist='Choir') for i in range(2)]
+        db_session.add_all(songs)
+        db_session.commit()
+        cache.set_no_lyrics('sp_silent_0', VERDICT)
+
+        with patch('app.services.unified_analysis_service.get_redis_cache', return_value=cache), \
+                patch('app.services.unified_analysis_service.get_shared_analyzer') as analyzer:
+            cached, pending = _partition_cached_analyses(songs)
+        UnifiedAnalysisService().apply_cached_analyses(cached)
+
+        assert list(cached) == [songs[0].id]
+        assert pending == [songs[1]]
+        analyzer.assert_not_called()
+        assert AnalysisResult.query.filter_by(song_id=songs[0].id).one().score == 85
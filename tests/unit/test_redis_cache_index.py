@@ -0,0 +1,75 @@
+"""
+Unit tests for the per-model secondary indexes of RedisCache
+"""
+
+import json
+import time
+
+import pytest
+
+from app.utils.redis_cache import MODELS_KEY, RedisCache
+
+ANALYSIS = {'score': 88, 'verdict': 'freely_listen', 'concerns': []}
+
+
+@pytest.fixture
+def cache(redis_client):
+    cache = RedisCache(l1_max_entries=0)
+    cache._client = redis_client
+    cache._binary_client = redis_client
+    return cache
+
+
+class TestAnalysisIndex:
+    """Test stats and flushes read the indexes instead of scanning the keyspace"""
+
+    def test_writes_and_deletes_maintain_index(self, cache, redis_client):
+        cache.set_analysis('Artist', 'One', 'h1', 'm1', ANALYSIS, ttl=60)
+        cache.set_analyses_bulk([(('Artist', 'Two', 'h2', 'm2'), ANALYSIS)])
+        cache.delete_analysis('Artist', 'One', 'h1', 'm1')
+
+        assert redis_client.sets[MODELS_KEY] == {'m1', 'm2'}
+        assert redis_client.zsets['analysis_index:m1'] == {}
+        assert list(redis_client.zsets['analysis_index:m2']) == [cache._make_key('Artist', 'Two', 'h2', 'm2')]
+
+    def test_stats_count_per_model_and_prune_expired(self, cache, redis_client):
+        """Test counts come from ZCARD and expired members are dropped"""
+        for i in range(3):
+            cache.set_analysis('Artist', f'Song {i}', f'h{i}', 'm1', ANALYSIS)
+        cache.set_analysis('Artist', 'Other', 'h9', 'm2', ANALYSIS)
+        expired = cache._make_key('Artist', 'Song 0', 'h0', 'm1')
+        redis_client.zsets['analysis_index:m1'][expired] = time.time() - 1
+
+        stats = cache.get_stats()
+
+        assert stats['analysis_keys_by_model'] == {'m1': 2, 'm2': 1}
+        assert stats['analysis_keys'] == 3
+        assert expired not in redis_client.zsets['analysis_index:m1']
+        redis_client.scan.assert_not_called()
+
+    def test_flush_walks_index_only(self, cache, redis_client):
+        for i in range(5):
+            cache.set_analysis('Artist', f'Song {i}', f'h{i}', 'm1', ANALYSIS)
+        cache.set_analysis('Artist', 'Keep', 'hk', 'm2', ANALYSIS)
+
+        assert cache.flush_by_model_version('m1') == 5
+
+        redis_client.scan.assert_not_called()
+        assert list(redis_client.store) == [cache._make_key('Artist', 'Keep', 'hk', 'm2')]
+        assert not redis_client.zsets['analysis_index:m1']
+        assert json.loads(redis_client.publish.call_args[0][1])['prefix'] == 'analysis:m1:'
+
+    def test_unindexed_model_falls_back_to_scan_and_rebuilds(self, cache, redis_client):
+        """Test entries written before the index existed can be flushed and re-indexed"""
+        legacy = [cache._make_key('Artist', f'Old {i}', f'h{i}', 'm0') for i in range(2)]
+        for key in legacy:
+            redis_client.store[key] = json.dumps(ANALYSIS)
+        redis_client.ttl.return_value = 120
+
+        assert cache.rebuild_analysis_index('m0') == 2
+        assert set(redis_client.zsets['analysis_index:m0']) == set(legacy)
+        assert cache.count_analyses() == {'m0': 2}
+
+        redis_client.sets[MODELS_KEY].clear()
+        assert cache.flush_by_model_version('m0') == 2
+        redis_client.scan.assert_called()
@@ -0,0 +1,170 @@
+"""
+Unit tests for the in-process L1 tier of RedisCache
+"""
+
+import json
+import time
+
+import pytest
+from redis.exceptions import RedisError
+
+from app.utils.local_cache import LocalLRUCache
+from app.utils.redis_cache import L1_INVALIDATION_CHANNEL, RedisCache
+
+ANALYSIS = {'score': 97, 'verdict': 'freely_listen', 'themes_positive': [{'theme': 'Worship'}]}
+
+
+class TestLocalLRUCache:
+    """Test entry/byte bounds, LRU order and TTL"""
+
+    def test_entry_bound_evicts_least_recently_used(self):
+        cache = LocalLRUCache(max_entries=2, max_bytes=1000, ttl=60)
+        cache.set('a', 1, 10)
+        cache.set('b', 2, 10)
+        cache.get('a')
+        cache.set('c', 3, 10)
+
+        assert cache.get('b') is None
+        assert cache.get('a') == 1 and cache.get('c') == 3
+        assert cache.get_stats()['evictions'] == 1
+
+    def test_byte_bound_and_oversized_values(self):
+        cache = LocalLRUCache(max_entries=10, max_bytes=100, ttl=60)
+        cache.set('a', 1, 60)
+        cache.set('b', 2, 60)
+        cache.set('huge', 3, 500)
+
+        assert cache.get('a') is None
+        assert cache.get('huge') is None
+        assert cache.get_stats()['size_bytes'] == 60
+
+    def test_entries_expire(self):
+        cache = LocalLRUCache(max_entries=10, max_bytes=1000, ttl=0.01)
+        cache.set('a', 1, 10)
+        time.sleep(0.02)
+
+        assert cache.get('a') is None
+        assert cache.get_stats()['entries'] == 0
+
+
+@pytest.fixture
+def cache(redis_client):
+    cache = RedisCache(l1_max_entries=100, l1_max_bytes=1024 * 1024, l1_ttl=60)
+    cache._client = redis_client
+    cache._binary_client = redis_client
+    return cache
+
+
+def _message(**payload):
+    return {'type': 'message', 'channel': L1_INVALIDATION_CHANNEL, 'data': json.dumps(payload)}
+
+
+class TestRedisCacheL1:
+    """Test RedisCache serves hot analyses from process memory"""
+
+    def test_hot_key_served_from_l1(self, cache, redis_client):
+        """Test repeat reads skip Redis and callers can't corrupt the cached copy"""
+        cache.set_analysis('Chris Tomlin', 'How Great Is Our God', 'h1', 'm1', ANALYSIS)
+        redis_client.get.reset_mock()
+
+        first = cache.get_analysis('Chris Tomlin', 'How Great Is Our God', 'h1', 'm1')
+        first['analysis_quality'] = 'cached'
+        second = cache.get_analysis('Chris Tomlin', 'How Great Is Our God', 'h1', 'm1')
+
+        redis_client.get.assert_not_called()
+        assert second['cache_source'] == 'l1'
+        assert 'analysis_quality' not in second
+        redis_client.pubsub.return_value.subscribe.assert_called_once()
+        stats = cache.get_stats()['l1']
+        assert stats['hits'] == 2 and stats['misses'] == 0
+
+    def test_redis_hit_populates_l1(self, cache, redis_client):
+        """Test a value written by another process is cached locally after one Redis read"""
+        key = cache._make_key('Artist', 'Song', 'h2', 'm1')
+        redis_client.store[key] = json.dumps(ANALYSIS)
+
+        assert cache.get_analysis('Artist', 'Song', 'h2', 'm1')['cache_source'] == 'redis'
+        assert cache.get_analysis('Artist', 'Song', 'h2', 'm1')['cache_source'] == 'l1'
+        assert redis_client.get.call_count == 1
+
+    def test_l1_counts_uncompressed_size(self, cache, redis_client):
+        """Test ANALYSIS_L1_MAX_MB bounds decoded sizes, not compressed Redis sizes"""
+        big = dict(ANALYSIS, analysis='A hymn of grace and redemption. ' * 200)
+        cache.set_analysis('Artist', 'Big Song', 'h4', 'm1', big)
+        key = cache._make_key('Artist', 'Big Song', 'h4', 'm1')
+        cache.l1.clear()
+
+        cache.get_analysis('Artist', 'Big Song', 'h4', 'm1')
+
+        assert cache.l1.get_stats()['size_bytes'] >= len(big['analysis'])
+        assert cache.l1.get_stats()['size_bytes'] > len(redis_client.store[key])
+
+    def test_delete_publishes_invalidation(self, cache, redis_client):
+        """Test delete_analysis drops the local copy and notifies other processes"""
+        cache.set_analysis('Artist', 'Song', 'h3', 'm1', ANALYSIS)
+        redis_client.publish.reset_mock()
+
+        cache.delete_analysis('Artist', 'Song', 'h3', 'm1')
+
+        assert cache.get_analysis('Artist', 'Song', 'h3', 'm1') is None
+        channel, data = redis_client.publish.call_args[0]
+        assert channel == L1_INVALIDATION_CHANNEL
+        assert json.loads(data)['key'] == cache._make_key('Artist', 'Song', 'h3', 'm1')
+
+    def test_remote_flush_invalidates_prefix(self, cache, redis_client):
+        """Test a flush from another process drops only that model version"""
+        cache.set_analysis('Artist', 'Old', 'h4', 'm1', ANALYSIS)
+        cache.set_analysis('Artist', 'New', 'h5', 'm2', ANALYSIS)
+        redis_client.store.clear()  # Another process flushed Redis
+
+        cache._on_invalidation(_message(prefix='analysis:m1:', origin='other-worker'))
+
+        assert cache.get_analysis('Artist', 'Old', 'h4', 'm1') is None
+        assert cache.get_analysis('Artist', 'New', 'h5', 'm2')['cache_source'] == 'l1'
+
+    def test_flush_by_model_version(self, cache, redis_client):
+        """Test a local flush clears L1 for the version and publishes the prefix"""
+        cache.set_analysis('Artist', 'Song', 'h6', 'm1', ANALYSIS)
+
+        assert cache.flush_by_model_version('m1') == 1
+
+        assert cache.get_analysis('Artist', 'Song', 'h6', 'm1') is None
+        assert json.loads(redis_client.publish.call_args[0][1])['prefix'] == 'analysis:m1:'
+
+    def test_invalidation_during_read_skips_l1_fill(self, cache, redis_client):
+        """Test a value read before a concurrent invalidation is not written back into L1"""
+        key = cache._make_key('Artist', 'Song', 'h9', 'm1')
+        redis_client.store[key] = json.dumps(ANALYSIS)
+        cache._l1_ready(redis_client)
+
+        def get_then_invalidate(k):
+            value = redis_client.store.get(k)
+            # Another process updates the entry while our GET is in flight
+            redis_client.store[k] = json.dumps(dict(ANALYSIS, score=10))
+            cache._on_invalidation(_message(key=k, origin='other-worker'))
+            return value
+
+        redis_client.get.side_effect = get_then_invalidate
+        assert cache.get_analysis('Artist', 'Song', 'h9', 'm1')['cache_source'] == 'redis'
+        assert cache.l1.get(key) is None
+
+        redis_client.get.side_effect = redis_client.store.get
+        fresh = cache.get_analysis('Artist', 'Song', 'h9', 'm1')
+        assert fresh['cache_source'] == 'redis' and fresh['score'] == 10
+
+    def test_own_messages_ignored(self, cache):
+        """Test our own set_analysis invalidation does not evict the fresh entry"""
+        cache.set_analysis('Artist', 'Song', 'h7', 'm1', ANALYSIS)
+        key = cache._make_key('Artist', 'Song', 'h7', 'm1')
+
+        cache._on_invalidation(_message(key=key, origin=cache._instance_id))
+
+        assert cache.get_analysis('Artist', 'Song', 'h7', 'm1')['cache_source'] == 'l1'
+
+    def test_no_l1_without_pubsub(self, cache, redis_client):
+        """Test L1 stays off when invalidations can't be received"""
+        redis_client.pubsub.side_effect = RedisError('pubsub unavailable')
+        cache.set_analysis('Artist', 'Song', 'h8', 'm1', ANALYSIS)
+
+        assert cache.get_analysis('Artist', 'Song', 'h8', 'm1')['cache_source'] == 'redis'
+        assert cache.get_stats()['l1']['entries'] == 0
@@ -0,0 +1,90 @@
+"""
+Unit tests for the shared pooled Redis connection manager
+"""
+
+import asyncio
+from unittest.mock import patch
+
+import redis
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.utils.redis_pool import RedisConnectionManager, get_redis_manager
+
+URL = 'redis://:secret@127.0.0.1:1/0'  # Nothing listens on port 1
+
+
+class TestRedisConnectionManager:
+    """Test one health-checked pool is shared instead of a client per call"""
+
+    def test_client_reused_after_single_ping(self):
+        manager = RedisConnectionManager(URL)
+
+        with patch.object(redis.Redis, 'ping', return_value=True) as ping:
+            first = manager.get_client()
+            second = manager.get_client()
+
+        assert first is second
+        assert ping.call_count == 1
+        assert first.connection_pool is manager.pool(True)
+        assert manager.client(decode_responses=False).connection_pool is not first.connection_pool
+
+    def test_unavailable_redis_reprobed_after_interval(self):
+        """Test failures are cached for retry_interval, then a probe reconnects"""
+        manager = RedisConnectionManager(URL, retry_interval=60)
+
+        assert manager.get_client() is None
+        with patch.object(redis.Redis, 'ping', return_value=True) as ping:
+            assert manager.get_client() is None  # Probe not due yet
+            ping.assert_not_called()
+
+            manager._next_probe_at = 0.0
+            assert manager.get_client() is not None
+
+        stats = manager.get_stats()
+        assert stats['healthy'] is True
+        assert stats['failures'] == 1 and stats['reconnects'] == 1
+        assert 'secret' not in stats['url']
+
+    def test_mark_unhealthy_stops_handing_out_clients(self):
+        manager = RedisConnectionManager(URL, retry_interval=60)
+        with patch.object(redis.Redis, 'ping', return_value=True):
+            manager.get_client()
+
+        manager.mark_unhealthy(RedisConnectionError('connection reset'))
+
+        assert manager.get_client() is None
+        assert manager.client() is not None  # Unchecked client for holders like RQ
+
+    def test_async_pools_per_event_loop(self):
+        manager = RedisConnectionManager(URL)
+
+        async def pools():
+            return manager.async_client().connection_pool, manager.async_client().connection_pool
+
+        first_a, first_b = asyncio.run(pools())
+        second_a, _ = asyncio.run(pools())
+
+        assert first_a is first_b
+        assert second_a is not first_a
+
+    def test_managers_shared_per_url(self):
+        assert get_redis_manager(URL) is get_redis_manager(URL)
+        assert get_redis_manager(URL) is not get_redis_manager('redis://127.0.0.1:1/1')
+
+
+class TestCacheHelpers:
+    """Test app.utils.cache no longer builds and pings a client per call"""
+
+    def test_json_helpers_use_shared_client(self):
+        from app.utils import cache
+
+        manager = RedisConnectionManager(URL)
+        with patch('app.utils.cache.get_redis_manager', return_value=manager), \
+                patch.object(redis.Redis, 'ping', return_value=True) as ping, \
+                patch.object(redis.Redis, 'get', return_value='{"ok": true}'), \
+                patch.object(redis.Redis, 'set') as set_:
+            cache.cache_set_json('k', {'ok': True})
+            assert cache.cache_get_json('k') == {'ok': True}
+
+        assert ping.call_count == 1
+        set_.assert_called_once_with('k', '{"ok": true}', ex=60)
@@ -0,0 +1,149 @@
+"""
+Unit tests for the on-disk LLM response cache
+"""
+
+import json
+import os
+from unittest.mock import Mock
+
+import httpx
+import pytest
+
+from app.services.analyzers.router_analyzer import RouterAnalyzer
+from app.utils.llm_http import LLMHttpClient
+from app.utils.llm_router import LLMEndpoint, LLMRouter
+from app.utils.response_cache import ResponseCache, request_fingerprint
+from app.utils.single_flight import SingleFlight
+from app.utils.token_ledger import TokenLedger
+
+PAYLOAD = {
+    'model': 'gpt-4o-mini',
+    'temperature': 0.2,
+    'max_tokens': 2000,
+    'messages': [{'role': 'system', 'content': 'Analyze'}, {'role': 'user', 'content': 'Amazing grace'}],
+}
+RESPONSE = {
+    'model': 'gpt-4o-mini',
+    'choices': [{'message': {'content': json.dumps({'score': 95, 'verdict': 'freely_listen'})}}],
+    'usage': {'prompt_tokens': 800, 'completion_tokens': 100},
+}
+
+
+class TestRequestFingerprint:
+    """Test cache keys depend only on what the model sees"""
+
+    def test_key_order_and_transport_fields_ignored(self):
+        """Test reordered keys and stream flags hash the same"""
+        reordered = dict(reversed(list(PAYLOAD.items())))
+        streamed = dict(PAYLOAD, stream=True, stream_options={'include_usage': True})
+
+        assert request_fingerprint(reordered) == request_fingerprint(PAYLOAD)
+        assert request_fingerprint(streamed) == request_fingerprint(PAYLOAD)
+
+    def test_sampling_and_lyrics_change_key(self):
+        """Test temperature or message changes produce a different key"""
+        warmer = dict(PAYLOAD, temperature=0.7)
+        edited = dict(PAYLOAD, messages=[PAYLOAD['messages'][0], {'role': 'user', 'content': 'Amazing grace!'}])
+
+        assert request_fingerprint(warmer) != request_fingerprint(PAYLOAD)
+        assert request_fingerprint(edited) != request_fingerprint(PAYLOAD)
+
+
+class TestResponseCache:
+    """Test storage and LRU eviction"""
+
+    def test_round_trip_and_stats(self, tmp_path):
+        """Test a stored response is replayed, and hits survive a new instance"""
+        cache = ResponseCache(str(tmp_path))
+        assert cache.get(PAYLOAD) is None
+
+        cache.set(PAYLOAD, RESPONSE)
+
+        assert cache.get(PAYLOAD) == RESPONSE
+        assert ResponseCache(str(tmp_path)).get(PAYLOAD) == RESPONSE
+        stats = cache.get_stats()
+        assert stats['entries'] == 1
+        assert stats['hits'] == 1 and stats['misses'] == 1
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        """Test the size bound drops the entry not read most recently"""
+        payloads = [dict(PAYLOAD, temperature=t) for t in (0.1, 0.2, 0.3)]
+        entry_size = len(json.dumps({'created_at': 0.0, 'model': 'gpt-4o-mini', 'response': RESPONSE}))
+        cache = ResponseCache(str(tmp_path), max_bytes=int(entry_size * 2.5))
+
+        cache.set(payloads[0], RESPONSE)
+        cache.set(payloads[1], RESPONSE)
+        cache.get(payloads[0])  # Now payloads[1] is the oldest
+        cache.set(payloads[2], RESPONSE)
+
+        assert cache.get(payloads[1]) is None
+        assert cache.get(payloads[0]) == RESPONSE
+        assert cache.get(payloads[2]) == RESPONSE
+        assert cache.get_stats()['evictions'] == 1
+
+    def test_index_rebuilt_from_disk(self, tmp_path):
+        """Test a new process sees existing entries and clear() removes them"""
+        ResponseCache(str(tmp_path)).set(PAYLOAD, RESPONSE)
+
+        cache = ResponseCache(str(tmp_path))
+        assert cache.get_stats()['entries'] == 1
+        cache.clear()
+
+        assert cache.get(PAYLOAD) is None
+        assert not any(name.endswith('.json') for _, _, files in os.walk(tmp_path) for name in files)
+
+
+class TestAnalyzerResponseCache:
+    """Test RouterAnalyzer replays identical requests from disk"""
+
+    @pytest.fixture
+    def analyzer(self, tmp_path):
+        analyzer = RouterAnalyzer()
+        analyzer.response_cache = ResponseCache(str(tmp_path))
+        analyzer.token_ledger = TokenLedger()
+        analyzer.redis_cache = Mock(client=None, get_analysis=Mock(return_value=None),
+                                    _make_key=Mock(return_value='analysis:response-cache-test'))
+        analyzer.analysis_store = Mock(find=Mock(return_value=None))
+        analyzer.single_flight = SingleFlight()
+        return analyzer
+
+    def test_second_run_skips_api(self, analyzer):
+        """Test the second identical analysis makes no HTTP call and books no tokens"""
+        calls = []
+
+        def handler(request):
+            calls.append(json.loads(request.content))
+            return httpx.Response(200, json=RESPONSE)
+
+        http_client = LLMHttpClient(pool_size=2)
+        http_client._client = httpx.Client(transport=httpx.MockTransport(handler))
+        analyzer.http_client = http_client
+
+        first = analyzer.analyze_song('Amazing Grace', 'John Newton', 'Amazing grace how sweet the sound')
+        second = analyzer.analyze_song('Amazing Grace', 'John Newton', 'Amazing grace how sweet the sound')
+
+        assert len(calls) == 1
+        assert first['score'] == second['score'] == 95
+        assert analyzer.response_cache.get_stats()['hits'] == 1
+        assert analyzer.token_ledger.get_totals()['gpt-4o-mini']['prompt_tokens'] == 800
+
+    def test_keyed_on_the_request_as_sent(self, analyzer):
+        """Test an endpoint's model override is part of the fingerprint"""
+        calls = []
+
+        def handler(request):
+            calls.append(json.loads(request.content))
+            return httpx.Response(200, json=RESPONSE)
+
+        http_client = LLMHttpClient(pool_size=2)
+        http_client._client = httpx.Client(transport=httpx.MockTransport(handler))
+        analyzer.http_client = http_client
+        analyzer.llm_router = LLMRouter([LLMEndpoint('vllm', 'http://vllm.test/v1', model='christian-discernment')])
+
+        analyzer.analyze_song('Amazing Grace', 'John Newton', 'Amazing grace how sweet the sound')
+        analyzer.analyze_song('Amazing Grace', 'John Newton', 'Amazing grace how sweet the sound')
+
+        assert len(calls) == 1
+        assert calls[0]['model'] == 'christian-discernment'
+        assert analyzer.response_cache.get(calls[0]) is not None
+        assert analyzer.response_cache.get(dict(calls[0], model=analyzer.model)) is None
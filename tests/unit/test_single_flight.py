@@ -0,0 +1,314 @@
+"""
+Unit tests for single-flight request coalescing
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock, patch
+
+import pytest
+
+from app.services.analyzers.router_analyzer import RouterAnalyzer
+from app.utils.single_flight import SingleFlight
+
+
+class _FakeRedis:
+    """Just enough of redis.Redis for leases: SET NX PX, GET and the release/renew scripts."""
+
+    def __init__(self):
+        self.store = {}
+        self.lock = threading.Lock()
+
+    def _live(self, key):
+        entry = self.store.get(key)
+        if entry and entry[1] is not None and entry[1] <= time.monotonic():
+            del self.store[key]
+            return None
+        return entry
+
+    def set(self, key, value, nx=False, px=None):
+        with self.lock:
+            if nx and self._live(key):
+                return None
+            expires = time.monotonic() + px / 1000 if px else None
+            self.store[key] = (value, expires)
+            return True
+
+    def get(self, key):
+        with self.lock:
+            entry = self._live(key)
+            return entry[0] if entry else None
+
+    def eval(self, script, numkeys, key, token, *args):
+        with self.lock:
+            entry = self._live(key)
+            if not entry or entry[0] != token:
+                return 0
+            if args:  # Renew: pexpire
+                self.store[key] = (token, time.monotonic() + int(args[0]) / 1000)
+            else:
+                del self.store[key]
+            return 1
+
+
+class TestSingleFlightInProcess:
+    """Test coalescing between threads of one process"""
+
+    def test_concurrent_callers_share_one_call(self):
+        """Test only the first caller runs fn; the rest get its result"""
+        coalesced = []
+        flight = SingleFlight(on_coalesced=coalesced.append)
+        calls = []
+
+        def work():
+            calls.append(1)
+            time.sleep(0.2)
+            return {'score': 90}
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda _: flight.do('k', work), range(8)))
+
+        assert len(calls) == 1
+        assert all(r == {'score': 90} for r in results)
+        assert coalesced == ['in_process'] * 7
+        assert flight.in_flight() == 0
+
+    def test_waiters_get_independent_copies(self):
+        """Test mutating one caller's result does not leak into another's"""
+        flight = SingleFlight()
+        started = threading.Event()
+
+        def work():
+            started.set()
+            time.sleep(0.1)
+            return {'score': 90}
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            first = executor.submit(flight.do, 'k', work)
+            started.wait()
+            second = executor.submit(flight.do, 'k', work)
+            a, b = first.result(), second.result()
+
+        a['score'] = 0
+        assert b['score'] == 90
+
+    def test_owner_error_propagates_to_waiters(self):
+        """Test waiters see the owner's exception"""
+        flight = SingleFlight()
+        started = threading.Event()
+
+        def work():
+            started.set()
+            time.sleep(0.1)
+            raise RuntimeError('boom')
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            first = executor.submit(flight.do, 'k', work)
+            started.wait()
+            second = executor.submit(flight.do, 'k', work)
+            for future in (first, second):
+                with pytest.raises(RuntimeError, match='boom'):
+                    future.result()
+
+
+class TestSingleFlightDistributed:
+    """Test Redis leases across workers"""
+
+    def test_waits_for_lease_owner_result(self):
+        """Test a worker that loses the lease reuses the owner's published result"""
+        redis_client = _FakeRedis()
+        redis_client.set('singleflight:k', 'other-worker', nx=True, px=10000)
+        coalesced = []
+        flight = SingleFlight(
+            redis_cache=Mock(client=redis_client), poll_interval=0.01, on_coalesced=coalesced.append
+        )
+        peeks = iter([None, None, {'score': 77}])
+        work = Mock(return_value={'score': 1})
+
+        result = flight.do('k', work, peek=lambda: next(peeks))
+
+        assert result == {'score': 77}
+        work.assert_not_called()
+        assert coalesced == ['distributed']
+
+    def test_expired_lease_is_taken_over(self):
+        """Test a crashed owner's lease expires and the waiter does the work"""
+        redis_client = _FakeRedis()
+        redis_client.set('singleflight:k', 'crashed-worker', nx=True, px=50)
+        flight = SingleFlight(redis_cache=Mock(client=redis_client), poll_interval=0.01)
+
+        result = flight.do('k', lambda: {'score': 60}, peek=lambda: None)
+
+        assert result == {'score': 60}
+        # Lease released after the work completes
+        assert redis_client.get('singleflight:k') is None
+
+    def test_owner_releases_only_its_own_lease(self):
+        """Test releasing after expiry does not delete a newer owner's lease"""
+        redis_client = _FakeRedis()
+        flight = SingleFlight(redis_cache=Mock(client=redis_client), lease_ttl=0.05)
+
+        def work():
+            redis_client.store.pop('singleflight:k')  # Our lease expired and another worker took it
+            redis_client.set('singleflight:k', 'new-owner', nx=True, px=10000)
+            time.sleep(0.1)  # Heartbeats must not renew the new owner's lease
+            return {'score': 50}
+
+        flight.do('k', work, peek=lambda: None)
+
+        assert redis_client.get('singleflight:k') == 'new-owner'
+
+    def test_lease_renewed_while_owner_runs(self):
+        """Test work that outlasts the lease TTL keeps the lease, so no second worker runs it"""
+        redis_client = _FakeRedis()
+        flight = SingleFlight(redis_cache=Mock(client=redis_client), lease_ttl=0.06)
+        other_worker_got_lease = []
+
+        def work():
+            time.sleep(0.2)  # Several lease TTLs (retries and backoff)
+            other_worker_got_lease.append(redis_client.set('singleflight:k', 'other', nx=True, px=10000))
+            return {'score': 70}
+
+        assert flight.do('k', work, peek=lambda: None) == {'score': 70}
+        assert other_worker_got_lease == [None]
+        assert redis_client.get('singleflight:k') is None
+
+    def test_renewal_stops_after_max_hold(self):
+        """Test a hung owner stops renewing so the lease eventually expires"""
+        redis_client = _FakeRedis()
+        flight = SingleFlight(redis_cache=Mock(client=redis_client), lease_ttl=0.03, max_hold=0.05)
+        taken = []
+
+        def work():
+            time.sleep(0.2)
+            taken.append(redis_client.set('singleflight:k', 'other', nx=True, px=10000))
+            return {'score': 40}
+
+        flight.do('k', work, peek=lambda: None)
+
+        assert taken == [True]
+
+
+class TestSingleFlightAsync:
+    """Test the coroutine variant used by the asyncio analysis engine"""
+
+    async def test_async_waits_for_lease_owner_result(self):
+        """Test a coroutine that loses the lease reuses the owner's published result"""
+        redis_client = _FakeRedis()
+        redis_client.set('singleflight:k', 'other-worker', nx=True, px=10000)
+        coalesced = []
+        flight = SingleFlight(
+            redis_cache=Mock(client=redis_client), poll_interval=0.01, on_coalesced=coalesced.append
+        )
+        peeks = iter([None, None, {'score': 77}])
+        work = Mock()
+
+        async def peek():
+            return next(peeks)
+
+        result = await flight.do_async('k', work, peek=peek)
+
+        assert result == {'score': 77}
+        work.assert_not_called()
+        assert coalesced == ['distributed']
+
+    async def test_async_owner_takes_and_releases_lease(self):
+        """Test the owner holds the lease while fn runs and releases it afterwards"""
+        redis_client = _FakeRedis()
+        flight = SingleFlight(redis_cache=Mock(client=redis_client))
+        held = []
+
+        async def work():
+            held.append(redis_client.get('singleflight:k'))
+            return {'score': 60}
+
+        async def peek():
+            return None
+
+        assert await flight.do_async('k', work, peek=peek) == {'score': 60}
+        assert held[0] is not None
+        assert redis_client.get('singleflight:k') is None
+
+    async def test_concurrent_misses_share_one_renewer_thread(self):
+        """Test many held leases are renewed by a single thread that exits afterwards"""
+        import asyncio
+
+        redis_client = _FakeRedis()
+        flight = SingleFlight(redis_cache=Mock(client=redis_client), lease_ttl=0.06)
+        renewers = []
+
+        def renewer_threads():
+            return sum(t.name.startswith('singleflight') for t in threading.enumerate())
+
+        async def work():
+            await asyncio.sleep(0.2)  # Several lease TTLs
+            renewers.append(renewer_threads())
+            return {'score': 80}
+
+        async def peek():
+            return None
+
+        results = await asyncio.gather(*(flight.do_async(f'k{i}', work, peek=peek) for i in range(20)))
+
+        assert results == [{'score': 80}] * 20
+        assert max(renewers) == 1
+        time.sleep(0.1)
+        assert renewer_threads() == 0
+        assert not redis_client.store  # Leases stayed ours and were released
+
+    async def test_async_caller_waits_for_thread_owner(self):
+        """Test coroutines and threads of one process share the in-flight registry"""
+        coalesced = []
+        flight = SingleFlight(poll_interval=0.01, on_coalesced=coalesced.append)
+        started = threading.Event()
+
+        def work():
+            started.set()
+            time.sleep(0.1)
+            return {'score': 90}
+
+        owner = threading.Thread(target=lambda: flight.do('k', work))
+        owner.start()
+        started.wait(1)
+        second_call = Mock()
+
+        result = await flight.do_async('k', second_call)
+        owner.join()
+
+        assert result == {'score': 90}
+        second_call.assert_not_called()
+        assert coalesced == ['in_process']
+
+
+class TestRouterAnalyzerCoalescing:
+    """Test RouterAnalyzer issues one API call for identical concurrent songs"""
+
+    @patch('app.utils.llm_http.LLMHttpClient.post')
+    def test_identical_songs_make_one_api_call(self, mock_post):
+        """Test concurrent analyses of the same song coalesce"""
+        def slow_post(*args, **kwargs):
+            time.sleep(0.2)
+            response = Mock()
+            response.json.return_value = {'choices': [{'message': {'content': '{"score": 81}'}}]}
+            return response
+
+        mock_post.side_effect = slow_post
+        analyzer = RouterAnalyzer()
+        analyzer.redis_cache = Mock(
+            client=None,
+            get_analysis=Mock(return_value=None),
+            _make_key=Mock(return_value='analysis:m:a:t:h'),
+        )
+        analyzer.analysis_store = Mock(find=Mock(return_value=None))
+        before = analyzer.rate_limiter.get_metrics()['coalesced_in_process']
+
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            results = list(executor.map(
+                lambda _: analyzer.analyze_song('Amazing Grace', 'John Newton', 'Amazing grace how sweet'),
+                range(5)
+            ))
+
+        assert mock_post.call_count == 1
+        assert all(r['score'] == 81 for r in results)
+        assert analyzer.rate_limiter.get_metrics()['coalesced_in_process'] - before == 4
@@ -0,0 +1,180 @@
+"""
+Unit tests for streamed chat completions and early score/verdict reporting
+"""
+
+import json
+from unittest.mock import Mock, patch
+
+import httpx
+import pytest
+
+from app.services.analyzers.router_analyzer import RouterAnalyzer
+from app.services.analyzers.streaming_json import IncrementalJSONParser, iter_sse_events
+from app.services.progress_tracker import JobType, ProgressTracker, song_analysis_job_id
+from app.utils.llm_http import LLMHttpClient
+from app.utils.single_flight import SingleFlight
+from app.utils.token_ledger import TokenLedger
+
+ANALYSIS = {
+    'score': 92,
+    'verdict': 'freely_listen',
+    'formation_risk': 'very_low',
+    'themes_positive': [{'theme': 'Grace, {unearned}', 'points': 10, 'scripture': 'Eph 2:8'}],
+    'scripture_references': ['Ephesians 2:8'],
+    'analysis': 'Celebrates "amazing" grace \\ salvation.',
+}
+
+
+class TestIncrementalJSONParser:
+    """Test top-level fields are reported as soon as they complete"""
+
+    def test_fields_complete_in_order(self):
+        """Test each field is emitted once its delimiter arrives, even one char at a time"""
+        document = json.dumps(ANALYSIS, indent=2)
+        parser = IncrementalJSONParser()
+        order = []
+        for ch in document:
+            order.extend(parser.feed(ch))
+
+        assert order == list(ANALYSIS)
+        assert parser.fields == ANALYSIS
+        assert parser.complete
+
+    def test_score_and_verdict_before_analysis(self):
+        """Test early fields are available from a truncated document"""
+        document = json.dumps(ANALYSIS)
+        cut = document.index('"themes_positive"')
+        parser = IncrementalJSONParser()
+
+        parser.feed("```json\n" + document[:cut])
+
+        assert parser.fields == {'score': 92, 'verdict': 'freely_listen', 'formation_risk': 'very_low'}
+        assert not parser.complete
+
+    def test_sse_events_stop_at_done(self):
+        """Test data lines are decoded and comments/blank lines skipped"""
+        lines = [': keep-alive', 'data: {"a": 1}', '', 'data: not-json', 'data: [DONE]', 'data: {"b": 2}']
+
+        assert list(iter_sse_events(lines)) == [{'a': 1}]
+
+
+def _sse_body(content, chunk_size=7, usage=None):
+    """Yield SSE bytes for content split into small deltas, recording what was sent."""
+    sent = []
+
+    def generate():
+        for i in range(0, len(content), chunk_size):
+            event = {'model': 'gpt-4o-mini', 'choices': [{'delta': {'content': content[i:i + chunk_size]}}]}
+            sent.append(content[i:i + chunk_size])
+            yield f"data: {json.dumps(event)}\n\n".encode()
+        yield f"data: {json.dumps({'model': 'gpt-4o-mini', 'choices': [], 'usage': usage})}\n\n".encode()
+        yield b"data: [DONE]\n\n"
+
+    return generate, sent
+
+
+@pytest.fixture
+def streaming_analyzer(monkeypatch):
+    monkeypatch.setenv('LLM_STREAMING', 'true')
+    analyzer = RouterAnalyzer()
+    analyzer.token_ledger = TokenLedger()
+    analyzer.redis_cache = Mock(client=None, get_analysis=Mock(return_value=None),
+                                _make_key=Mock(return_value='analysis:stream-test'))
+    analyzer.analysis_store = Mock(find=Mock(return_value=None))
+    analyzer.single_flight = SingleFlight()
+    return analyzer
+
+
+def _use_transport(analyzer, handler):
+    http_client = LLMHttpClient(pool_size=2)
+    http_client._client = httpx.Client(transport=httpx.MockTransport(handler))
+    analyzer.http_client = http_client
+
+
+class TestRouterAnalyzerStreaming:
+    """Test the opt-in streaming mode"""
+
+    def test_streaming_reports_verdict_before_completion(self, streaming_analyzer):
+        """Test on_partial fires mid-stream and the final result matches"""
+        content = json.dumps(ANALYSIS)
+        generate, sent = _sse_body(content, usage={'prompt_tokens': 900, 'completion_tokens': 120})
+        requests = []
+
+        def handler(request):
+            requests.append(json.loads(request.content))
+            return httpx.Response(200, content=generate(), headers={'content-type': 'text/event-stream'})
+
+        _use_transport(streaming_analyzer, handler)
+        partials = []
+
+        def on_partial(fields):
+            partials.append((fields, ''.join(sent)))
+
+        result = streaming_analyzer.analyze_song('Amazing Grace', 'John Newton',
+                                                 'Amazing grace how sweet the sound', on_partial=on_partial)
+
+        assert requests[0]['stream'] is True
+        assert requests[0]['stream_options'] == {'include_usage': True}
+        assert len(partials) == 1
+        fields, sent_so_far = partials[0]
+        assert fields == {'score': 92, 'verdict': 'freely_listen'}
+        assert '"analysis"' not in sent_so_far
+        assert result['score'] == 92
+        assert result['analysis'] == ANALYSIS['analysis']
+        assert streaming_analyzer.token_ledger.get_totals()['gpt-4o-mini']['prompt_tokens'] == 900
+
+    def test_streaming_http_error_degrades(self, streaming_analyzer):
+        """Test a 4xx on the streaming request returns a degraded result"""
+        _use_transport(streaming_analyzer, lambda request: httpx.Response(400, json={'error': 'bad request'}))
+
+        result = streaming_analyzer.analyze_song('Song', 'Artist', 'Some lyrics long enough here')
+
+        assert result['analysis_quality'] == 'degraded'
+
+
+class TestSongAnalysisProgress:
+    """Test single-song analyses publish early results"""
+
+    @pytest.fixture
+    def tracker(self):
+        tracker = ProgressTracker()
+        tracker.persistence = Mock(load_progress=Mock(return_value=None))
+        return tracker
+
+    def test_service_publishes_partial_result(self, app, sample_song, tracker):
+        """Test streamed fields reach the tracker and tracking ends with the job"""
+        from app.services.unified_analysis_service import UnifiedAnalysisService
+
+        job_id = song_analysis_job_id(sample_song.id)
+        seen = []
+
+        def analyze_song(title, artist, lyrics, on_partial=None):
+            on_partial({'score': 88, 'verdict': 'freely_listen'})
+            seen.append(tracker.get_job_progress(job_id).partial_result)
+            return {'score': 88, 'verdict': 'freely_listen', 'analysis': 'Done', 'analysis_quality': 'full'}
+
+        router = Mock(analyze_song=Mock(side_effect=analyze_song))
+        with patch('app.services.unified_analysis_service.get_progress_tracker', return_value=tracker), \
+                patch('app.services.unified_analysis_service.is_analyzer_ready', return_value=True), \
+                patch('app.services.unified_analysis_service.get_shared_analyzer', return_value=router):
+            analysis = UnifiedAnalysisService().analyze_song(sample_song.id, track_progress=True)
+
+        assert seen == [{'score': 88, 'verdict': 'freely_listen'}]
+        assert analysis.score == 88
+        assert tracker.get_job_progress(job_id) is None
+
+    def test_status_endpoint_returns_partial(self, app, client, tracker):
+        """Test analysis-status exposes score/verdict while the analysis is running"""
+        app.config['LOGIN_DISABLED'] = True
+        job_id = song_analysis_job_id(42)
+        tracker.start_job_tracking(job_id, JobType.SONG_ANALYSIS, total_items=1)
+        tracker.update_job_progress(job_id, current_step='verdict_ready',
+                                    partial_result={'score': 75, 'verdict': 'context_required'})
+
+        with patch('app.routes.api.get_progress_tracker', return_value=tracker):
+            data = client.get('/api/songs/42/analysis-status').get_json()
+
+        assert data['completed'] is False
+        assert data['in_progress'] is True
+        assert data['partial'] is True
+        assert data['result'] == {'score': 75, 'verdict': 'context_required'}
@@ -0,0 +1,163 @@
+"""
+Unit tests for the LLM token ledger and prefix-cache friendly requests
+"""
+
+from unittest.mock import Mock, patch
+
+import pytest
+
+from app.services.analyzers.router_analyzer import SYSTEM_PROMPT, RouterAnalyzer
+from app.utils.single_flight import SingleFlight
+from app.utils.token_ledger import TokenLedger, parse_usage
+
+USAGE = {
+    'prompt_tokens': 1200,
+    'completion_tokens': 300,
+    'prompt_tokens_details': {'cached_tokens': 1024},
+}
+
+
+class TestParseUsage:
+    """Test usage block parsing"""
+
+    def test_parse_usage_with_cached_tokens(self):
+        """Test prompt, cached and completion tokens are extracted"""
+        assert parse_usage({'usage': USAGE}) == {
+            'prompt_tokens': 1200, 'cached_tokens': 1024, 'completion_tokens': 300
+        }
+
+    def test_parse_usage_without_details(self):
+        """Test providers that omit prompt_tokens_details report zero cached tokens"""
+        usage = parse_usage({'usage': {'prompt_tokens': 10, 'completion_tokens': 5}})
+        assert usage['cached_tokens'] == 0
+
+    def test_parse_usage_missing(self):
+        """Test responses without usage are ignored"""
+        assert parse_usage({'choices': []}) is None
+
+
+class TestTokenLedger:
+    """Test in-process ledger accounting"""
+
+    def test_totals_per_model(self):
+        """Test usage accumulates per model with batch tracked separately"""
+        ledger = TokenLedger()
+        ledger.record('model-a', parse_usage({'usage': USAGE}))
+        ledger.record('model-a', parse_usage({'usage': USAGE}))
+        ledger.record('model-a', parse_usage({'usage': USAGE}), batch=True)
+        ledger.record('model-b', None)
+
+        totals = ledger.get_totals()
+
+        assert list(totals) == ['model-a']
+        assert totals['model-a']['requests'] == 2
+        assert totals['model-a']['prompt_tokens'] == 2400
+        assert totals['model-a']['cached_tokens'] == 2048
+        assert totals['model-a']['completion_tokens'] == 600
+        assert totals['model-a']['batch_requests'] == 1
+
+    def test_daily_buckets(self):
+        """Test today's usage appears in the daily breakdown"""
+        ledger = TokenLedger()
+        ledger.record('model-a', parse_usage({'usage': USAGE}))
+
+        daily = ledger.get_daily(days=3)
+
+        assert len(daily) == 3
+        assert daily[-1]['by_model']['model-a']['requests'] == 1
+        assert daily[0]['by_model'] == {}
+
+
+    def test_redis_models_read_from_set(self):
+        """Test Redis totals come from the model set instead of a keyspace SCAN"""
+        client = Mock()
+        client.smembers.return_value = {'model-a'}
+        client.pipeline.return_value.execute.return_value = [{'requests': '3', 'prompt_tokens': '90'}]
+        ledger = TokenLedger(redis_cache=Mock(client=client))
+
+        ledger.record('model-a', parse_usage({'usage': USAGE}))
+        totals = ledger.get_totals()
+
+        client.pipeline.return_value.sadd.assert_called_once_with('token_ledger_models', 'model-a')
+        client.scan_iter.assert_not_called()
+        assert totals['model-a']['requests'] == 3
+        assert totals['model-a']['prompt_tokens'] == 90
+
+
+class TestPrefixCacheLayout:
+    """Test request assembly keeps a byte-identical static prefix"""
+
+    def test_system_prefix_is_shared_constant(self):
+        """Test every request starts with the same precomputed system message"""
+        analyzer = RouterAnalyzer()
+        _, first, _ = analyzer._build_request('Song A', 'Artist', 'lyrics one')
+        _, second, _ = analyzer._build_request('Song B', 'Other', 'lyrics two')
+
+        assert first['messages'][0] is second['messages'][0]
+        assert first['messages'][0]['content'] == SYSTEM_PROMPT
+        assert analyzer._get_comprehensive_system_prompt() is SYSTEM_PROMPT
+        assert 'Song A' in first['messages'][-1]['content']
+        assert 'messages' not in analyzer._payload_base
+
+    @patch('app.utils.llm_http.LLMHttpClient.post')
+    def test_response_usage_recorded(self, mock_post):
+        """Test usage from API responses lands in the ledger"""
+        mock_response = Mock()
+        mock_response.json.return_value = {
+            'model': 'gpt-4o-mini',
+            'choices': [{'message': {'content': '{"score": 70}'}}],
+            'usage': USAGE,
+        }
+        mock_post.return_value = mock_response
+
+        analyzer = RouterAnalyzer()
+        analyzer.token_ledger = TokenLedger()
+        analyzer.redis_cache = Mock(client=None, get_analysis=Mock(return_value=None),
+                                    _make_key=Mock(return_value='analysis:usage-test'))
+        analyzer.analysis_store = Mock(find=Mock(return_value=None))
+        analyzer.single_flight = SingleFlight()
+
+        analyzer.analyze_song('Usage Song', 'Artist', 'Some lyrics long enough')
+
+        totals = analyzer.token_ledger.get_totals()
+        assert totals['gpt-4o-mini']['cached_tokens'] == 1024
+
+
+@pytest.fixture
+def admin_client(app, client):
+    """Client whose requests pass admin_required"""
+    app.config['LOGIN_DISABLED'] = True
+    with patch('app.routes.admin.current_user', Mock(is_authenticated=True, is_admin=True)):
+        yield client
+
+
+class TestCostsEndpoint:
+    """Test admin costs use the token ledger"""
+
+    def test_costs_use_ledger(self, admin_client):
+        """Test api_costs reports real token costs when usage exists"""
+        ledger = TokenLedger()
+        ledger.record('model-a', parse_usage({'usage': USAGE}))
+
+        with patch('app.routes.admin.get_token_ledger', return_value=ledger):
+            response = admin_client.get('/admin/api/costs?days=7')
+
+        assert response.status_code == 200
+        data = response.get_json()
+        # (176 uncached * 0.03 + 1024 cached * 0.015 + 300 * 0.12) / 1000
+        expected = (176 * 0.03 + 1024 * 0.015 + 300 * 0.12) / 1000
+        assert data['summary']['cost_source'] == 'token_ledger'
+        assert data['summary']['api_calls'] == 1
+        assert data['summary']['cost_per_analysis'] == pytest.approx(expected, abs=1e-4)
+        assert data['tokens']['model-a']['cached_tokens'] == 1024
+        assert len(data['daily_costs']) == 7
+        assert 'total_tokens_saved' in data['lyrics_preprocessing']
+
+    def test_costs_fall_back_to_estimate(self, admin_client):
+        """Test api_costs estimates from typical token counts before any usage is recorded"""
+
+        with patch('app.routes.admin.get_token_ledger', return_value=TokenLedger()):
+            response = admin_client.get('/admin/api/costs')
+
+        assert response.status_code == 200
+        assert response.get_json()['summary']['cost_source'] == 'estimate'